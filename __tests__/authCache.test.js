@@ -0,0 +1,77 @@
+/**
+ * Tests Unitarios: authCache.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Caché LRU con TTL de /api/auth/verify: vencimiento, desalojo e
+ * invalidación por usuario.
+ */
+
+import { getCachedAuth, cacheAuth, invalidateUserAuth, getAuthCacheStats } from '../lib/authCache.js';
+
+const user = (id) => ({ id, username: `user${id}`, name: `Usuario ${id}`, role: 'Flebotomista', email: null });
+
+beforeEach(() => {
+  global.authCache.entries.clear();
+  global.authCache.byUser.clear();
+});
+
+describe('getCachedAuth / cacheAuth', () => {
+  test('devuelve el usuario guardado para el mismo token', () => {
+    cacheAuth('token-a', user(1));
+    expect(getCachedAuth('token-a')).toEqual(user(1));
+    expect(getCachedAuth('token-b')).toBeNull();
+  });
+
+  test('la entrada vence con el TTL', () => {
+    const now = 1_000_000;
+    cacheAuth('token-a', user(1), { now });
+    const { ttlMs } = getAuthCacheStats();
+    expect(getCachedAuth('token-a', now + ttlMs - 1)).toEqual(user(1));
+    expect(getCachedAuth('token-a', now + ttlMs)).toBeNull();
+  });
+
+  test('no sobrevive a la expiración del JWT', () => {
+    const now = 1_000_000;
+    cacheAuth('token-a', user(1), { now, tokenExp: (now + 5000) / 1000 });
+    expect(getCachedAuth('token-a', now + 4999)).toEqual(user(1));
+    expect(getCachedAuth('token-a', now + 5000)).toBeNull();
+  });
+
+  test('un JWT ya vencido no se guarda', () => {
+    const now = 1_000_000;
+    cacheAuth('token-a', user(1), { now, tokenExp: now / 1000 - 1 });
+    expect(getAuthCacheStats().entries).toBe(0);
+  });
+});
+
+describe('desalojo LRU', () => {
+  test('al llenarse descarta la entrada usada hace más tiempo', () => {
+    const { maxEntries } = getAuthCacheStats();
+    for (let i = 0; i < maxEntries; i++) {
+      cacheAuth(`token-${i}`, user(i));
+    }
+    // token-0 se usa, token-1 pasa a ser el más antiguo
+    expect(getCachedAuth('token-0')).not.toBeNull();
+    cacheAuth('token-nuevo', user(maxEntries));
+
+    expect(getAuthCacheStats().entries).toBe(maxEntries);
+    expect(getCachedAuth('token-1')).toBeNull();
+    expect(getCachedAuth('token-0')).not.toBeNull();
+    expect(getCachedAuth('token-nuevo')).not.toBeNull();
+  });
+});
+
+describe('invalidateUserAuth', () => {
+  test('descarta todos los tokens del usuario y solo los suyos', () => {
+    cacheAuth('token-a', user(1));
+    cacheAuth('token-b', user(1));
+    cacheAuth('token-c', user(2));
+
+    invalidateUserAuth('1');
+
+    expect(getCachedAuth('token-a')).toBeNull();
+    expect(getCachedAuth('token-b')).toBeNull();
+    expect(getCachedAuth('token-c')).toEqual(user(2));
+    expect(global.authCache.byUser.has(1)).toBe(false);
+  });
+});
@@ -0,0 +1,93 @@
+/**
+ * Tests Unitarios: dashboardAggregates.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Las filas de "DashboardAggregate" (mantenidas por triggers) deben producir
+ * el mismo resumen que calculaban los conteos del dashboard.
+ */
+
+jest.mock('../lib/prisma.js', () => ({ __esModule: true, default: {} }));
+
+import { summarizeAggregates } from '../lib/dashboardAggregates.js';
+
+const today = (metric, value, userId = 0) => ({ userId, metric, value, realtime: false });
+const live = (metric, value) => ({ userId: 0, metric, value, realtime: true });
+
+describe('summarizeAggregates', () => {
+  test('contadores del día y total como la suma de estados', () => {
+    // "pending" incluye los holdings; se separan con el conteo en vivo
+    const { summary } = summarizeAggregates([
+      today('pending', 5),
+      today('inCalling', 2),
+      today('inAttention', 3),
+      today('attended', 20),
+      today('cancelled', 2),
+    ], { today: 1, realtime: 1 });
+
+    expect(summary).toMatchObject({
+      total: 32,
+      pending: 4,
+      holding: 1,
+      inProgress: 5,
+      inCalling: 2,
+      inAttention: 3,
+      attended: 20,
+      cancelled: 2,
+    });
+  });
+
+  test('promedios desde sumas y conteos, redondeados a un decimal', () => {
+    const { summary } = summarizeAggregates([
+      today('waitCount', 3),
+      today('waitMinutes', 37),
+      today('attentionCount', 2),
+      today('attentionMinutes', 15.5),
+    ]);
+
+    expect(summary.avgWaitTime).toBe(12.3);
+    expect(summary.avgAttentionTime).toBe(7.8);
+  });
+
+  test('sin datos los promedios del día son 0 y los contadores 0', () => {
+    const { summary, realtime } = summarizeAggregates([]);
+    expect(summary.avgWaitTime).toBe(0);
+    expect(summary.total).toBe(0);
+    expect(realtime.totalActive).toBe(0);
+  });
+
+  test('tiempo real separado del día (inProgressCount = en atención)', () => {
+    const { realtime, summary } = summarizeAggregates([
+      live('pending', 8),
+      live('inCalling', 1),
+      live('inAttention', 4),
+      today('pending', 5),
+    ], { today: 0, realtime: 2 });
+
+    expect(realtime).toEqual({
+      pendingCount: 6,
+      holdingCount: 2,
+      inCallingCount: 1,
+      inProgressCount: 4,
+      totalActive: 13,
+    });
+    expect(summary.pending).toBe(5);
+  });
+
+  test('por flebotomista: atendidos y promedio por toma', () => {
+    const { phlebotomists, summary } = summarizeAggregates([
+      today('attended', 7, 12),
+      today('tomaCount', 7, 12),
+      today('tomaMinutes', 52.5, 12),
+      today('attended', 1, 15),
+    ]);
+
+    expect(phlebotomists.get(12)).toEqual({ attendedToday: 7, avgTimePerToma: 7.5 });
+    expect(phlebotomists.get(15)).toEqual({ attendedToday: 1, avgTimePerToma: null });
+    expect(summary.attended).toBe(0);
+  });
+
+  test('residuos de punto flotante no alteran los contadores', () => {
+    const { summary } = summarizeAggregates([today('attended', 2.0000000001)]);
+    expect(summary.attended).toBe(2);
+  });
+});
@@ -0,0 +1,76 @@
+/**
+ * Tests Unitarios: maintenance.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Elección de líder con advisory lock y métricas por tarea del programador
+ * de mantenimiento.
+ */
+
+jest.mock('../lib/prisma.js', () => ({ __esModule: true, default: {} }));
+
+import { runMaintenance, getMaintenanceStats } from '../lib/maintenance.js';
+
+// Cliente falso: $transaction ejecuta el callback con un tx que responde al lock
+function fakeClient(acquired) {
+  const tx = {
+    $queryRaw: jest.fn().mockResolvedValue([{ acquired }]),
+    $executeRaw: jest.fn().mockResolvedValue(0),
+  };
+  return { tx, $transaction: jest.fn((fn) => fn(tx)) };
+}
+
+describe('runMaintenance', () => {
+  test('con el lock ejecuta las tareas y registra filas afectadas', async () => {
+    const client = fakeClient(true);
+    const tasks = [
+      { name: 'expiredHoldings', run: jest.fn().mockResolvedValue(3) },
+      { name: 'cubicleCleanup', run: jest.fn().mockResolvedValue(0) },
+    ];
+
+    const result = await runMaintenance({ client, tasks });
+
+    expect(result).toEqual({ leader: true, results: { expiredHoldings: 3, cubicleCleanup: 0 } });
+    expect(tasks[0].run).toHaveBeenCalledWith(client.tx);
+    const stats = getMaintenanceStats();
+    expect(stats.tasks.expiredHoldings).toMatchObject({ lastRowsAffected: 3, lastError: null });
+    expect(stats.tasks.expiredHoldings.lastDurationMs).toBeGreaterThanOrEqual(0);
+  });
+
+  test('si otra instancia tiene el lock no ejecuta nada', async () => {
+    const client = fakeClient(false);
+    const task = { name: 'expiredHoldings', run: jest.fn() };
+    const before = getMaintenanceStats().skippedLocked;
+
+    expect(await runMaintenance({ client, tasks: [task] })).toEqual({ leader: false, results: {} });
+    expect(task.run).not.toHaveBeenCalled();
+    expect(getMaintenanceStats().skippedLocked).toBe(before + 1);
+  });
+
+  test('un error en una tarea no impide las demás', async () => {
+    const client = fakeClient(true);
+    const tasks = [
+      { name: 'expiredHoldings', run: jest.fn().mockRejectedValue(new Error('deadlock')) },
+      { name: 'cubicleCleanup', run: jest.fn().mockResolvedValue(2) },
+    ];
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    const result = await runMaintenance({ client, tasks });
+
+    expect(result.results).toEqual({ expiredHoldings: null, cubicleCleanup: 2 });
+    expect(getMaintenanceStats().tasks.expiredHoldings.lastError).toBe('deadlock');
+    console.error.mockRestore();
+  });
+
+  test('no se solapa con una ejecución en curso del mismo proceso', async () => {
+    let release;
+    const client = fakeClient(true);
+    const slow = { name: 'expiredHoldings', run: () => new Promise((resolve) => { release = resolve; }) };
+
+    const first = runMaintenance({ client, tasks: [slow] });
+    await new Promise((resolve) => setImmediate(resolve));
+    expect(await runMaintenance({ client, tasks: [slow] })).toBeNull();
+
+    release(1);
+    expect((await first).leader).toBe(true);
+  });
+});
@@ -0,0 +1,218 @@
+/**
+ * Tests Unitarios: queueEvents.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * El canal de la cola debe calcular el snapshot una vez por cambio
+ * (sin importar cuántas pantallas estén suscritas) y solo difundir
+ * cuando el contenido realmente cambia. Las listas cacheadas se sirven
+ * desde memoria hasta el siguiente cambio y responden 304 a If-None-Match.
+ * El snapshot de la cola sale de una sola consulta repartida por estado.
+ */
+
+jest.mock('../lib/prisma.js', () => ({ __esModule: true, default: { $queryRaw: jest.fn() } }));
+
+import prisma from '../lib/prisma.js';
+import {
+  QueueChannel,
+  formatSseEvent,
+  cachedQueueResponse,
+  invalidateQueueSnapshots,
+  notifyQueueChange,
+  loadQueueSnapshot,
+} from '../lib/queueEvents.js';
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+function createChannel(loader) {
+  return new QueueChannel('test', loader, { coalesceMs: 10, safetyRefreshMs: 0 });
+}
+
+describe('formatSseEvent', () => {
+  test('incluye id, evento y datos terminados en línea en blanco', () => {
+    expect(formatSseEvent('queue', '{"a":1}', 'x-1')).toBe('id: x-1\nevent: queue\ndata: {"a":1}\n\n');
+  });
+
+  test('sin id omite la línea id', () => {
+    expect(formatSseEvent('error', '{}')).toBe('event: error\ndata: {}\n\n');
+  });
+});
+
+describe('loadQueueSnapshot', () => {
+  test('una consulta repartida en espera / llamado / atención conservando el orden', async () => {
+    const row = (id, status, isCalled, cubicleName = null) => ({
+      id, patientName: `P${id}`, assignedTurn: id, tipoAtencion: 'General', isDeferred: false,
+      callCount: 0, patientID: null, workOrder: null, cubicleName, status, isCalled,
+    });
+    prisma.$queryRaw.mockResolvedValueOnce([
+      row(3, 'Pending', false),
+      row(1, 'In Progress', true, 'Cubículo 1'),
+      row(5, 'In Progress', false, 'Cubículo 2'),
+      row(2, 'Pending', false),
+      row(4, 'In Progress', true, 'Cubículo 3'),
+    ]);
+
+    const snapshot = await loadQueueSnapshot();
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(snapshot.pendingTurns.map((t) => t.id)).toEqual([3, 2]);
+    expect(snapshot.inCallingTurns.map((t) => t.id)).toEqual([5]);
+    expect(snapshot.inProgressTurns.map((t) => t.id)).toEqual([1, 4]);
+    expect(snapshot.pendingTurns[0]).not.toHaveProperty('cubicleName');
+    expect(snapshot.inProgressTurns[0]).toMatchObject({ cubicleName: 'Cubículo 1' });
+    expect(snapshot.inProgressTurns[0]).not.toHaveProperty('status');
+    expect(snapshot.inCallingTurns[0]).not.toHaveProperty('isCalled');
+  });
+});
+
+describe('QueueChannel', () => {
+  test('150 suscriptores y 10 avisos seguidos → un solo cálculo y una difusión', async () => {
+    let state = 1;
+    const loader = jest.fn(async () => ({ pendingTurns: [state] }));
+    const channel = createChannel(loader);
+    const frames = [];
+    for (let i = 0; i < 150; i++) channel.subscribe((frame) => frames.push(frame));
+
+    await channel.current();
+    expect(loader).toHaveBeenCalledTimes(1);
+
+    for (let i = 0; i < 10; i++) {
+      state++;
+      channel.notify('turns/create');
+    }
+    await wait(50);
+
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(frames).toHaveLength(150);
+    expect(channel.stats()).toMatchObject({ subscribers: 150, version: 2, broadcasts: 2 });
+  });
+
+  test('snapshot sin cambios no incrementa la versión', async () => {
+    const channel = createChannel(async () => ({ pendingTurns: [] }));
+    const listener = jest.fn();
+    channel.subscribe(listener);
+
+    await channel.current();
+    channel.notify('queue/updateCall');
+    await wait(50);
+
+    expect(channel.version).toBe(1);
+    expect(listener).not.toHaveBeenCalled();
+  });
+
+  test('sin suscriptores solo invalida; el siguiente current() recalcula', async () => {
+    let state = 1;
+    const loader = jest.fn(async () => ({ state }));
+    const channel = createChannel(loader);
+
+    await channel.current();
+    state = 2;
+    channel.notify('attention/complete');
+    await wait(30);
+    expect(loader).toHaveBeenCalledTimes(1);
+
+    const { frame } = await channel.current();
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(frame).toContain('"data":{"state":2}');
+  });
+
+  test('un aviso durante el cálculo provoca exactamente un recálculo más', async () => {
+    let state = 1;
+    const loader = jest.fn(async () => {
+      await wait(20);
+      return { state };
+    });
+    const channel = createChannel(loader);
+    channel.subscribe(() => {});
+
+    const first = channel.refresh('initial');
+    state = 2;
+    channel.refresh('queue/defer');
+    channel.refresh('queue/defer');
+    await first;
+
+    expect(loader).toHaveBeenCalledTimes(2);
+    expect(channel.json).toBe('{"state":2}');
+  });
+
+  test('cancelar la suscripción deja el canal sin suscriptores', () => {
+    const channel = createChannel(async () => ({}));
+    const unsubscribe = channel.subscribe(() => {});
+    expect(channel.stats().subscribers).toBe(1);
+    unsubscribe();
+    expect(channel.stats().subscribers).toBe(0);
+  });
+});
+
+describe('cachedQueueResponse', () => {
+  const request = (etag) => new Request('http://localhost/api/queue/list', {
+    headers: etag ? { 'If-None-Match': etag } : {},
+  });
+
+  test('sirve desde memoria hasta que la cola cambia', async () => {
+    let state = 1;
+    const build = jest.fn(async () => ({ state }));
+
+    const first = await cachedQueueResponse(request(), 'test:memoria', build);
+    const second = await cachedQueueResponse(request(), 'test:memoria', build);
+    expect(build).toHaveBeenCalledTimes(1);
+    expect(await second.json()).toEqual({ state: 1 });
+    expect(second.headers.get('ETag')).toBe(first.headers.get('ETag'));
+
+    state = 2;
+    notifyQueueChange('turns/create');
+    const third = await cachedQueueResponse(request(), 'test:memoria', build);
+    expect(build).toHaveBeenCalledTimes(2);
+    expect(await third.json()).toEqual({ state: 2 });
+    expect(third.headers.get('ETag')).not.toBe(first.headers.get('ETag'));
+  });
+
+  test('If-None-Match con el ETag vigente → 304 sin cuerpo', async () => {
+    const build = async () => ({ pendingTurns: [1, 2, 3] });
+    const first = await cachedQueueResponse(request(), 'test:etag', build);
+    const etag = first.headers.get('ETag');
+
+    const second = await cachedQueueResponse(request(etag), 'test:etag', build);
+    expect(second.status).toBe(304);
+    expect(await second.text()).toBe('');
+  });
+
+  test('recalcular el mismo contenido conserva el ETag (sigue en 304)', async () => {
+    const build = jest.fn(async () => ({ same: true }));
+    const first = await cachedQueueResponse(request(), 'test:mismo', build);
+
+    invalidateQueueSnapshots();
+    const second = await cachedQueueResponse(request(first.headers.get('ETag')), 'test:mismo', build);
+    expect(build).toHaveBeenCalledTimes(2);
+    expect(second.status).toBe(304);
+  });
+
+  test('peticiones simultáneas tras invalidar comparten una sola consulta', async () => {
+    const build = jest.fn(async () => {
+      await wait(20);
+      return { ok: true };
+    });
+    invalidateQueueSnapshots();
+    const responses = await Promise.all(
+      Array.from({ length: 20 }, () => cachedQueueResponse(request(), 'test:simultaneas', build))
+    );
+    expect(build).toHaveBeenCalledTimes(1);
+    expect(responses.every((response) => response.status === 200)).toBe(true);
+  });
+
+  test('expireBy acorta la vigencia aunque la cola no cambie (holding que expira)', async () => {
+    let expiry = Date.now() - 1;
+    const build = jest.fn(async ({ expireBy }) => {
+      expireBy(new Date(expiry));
+      return { ok: true };
+    });
+
+    await cachedQueueResponse(request(), 'test:expira', build);
+    await cachedQueueResponse(request(), 'test:expira', build);
+    expect(build).toHaveBeenCalledTimes(2);
+
+    expiry = Date.now() + 60000;
+    await cachedQueueResponse(request(), 'test:expira', build);
+    await cachedQueueResponse(request(), 'test:expira', build);
+    expect(build).toHaveBeenCalledTimes(3);
+  });
+});
@@ -0,0 +1,115 @@
+/**
+ * Tests Unitarios: rateLimit.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Presupuestos por ruta y ventana deslizante del rate limiter de middleware.ts.
+ */
+
+import { MemoryStore, HttpStore, WINDOW_MS, resolveRule, slidingCount, checkRateLimit } from '../lib/rateLimit.js';
+
+// Inicio de una ventana cualquiera
+const T0 = WINDOW_MS * 1000;
+
+describe('resolveRule', () => {
+  test('polling, admin y login tienen presupuestos propios', () => {
+    expect(resolveRule('/api/queue/list').name).toBe('polling');
+    expect(resolveRule('/api/attention/list').name).toBe('polling');
+    expect(resolveRule('/api/admin/cancel-turn').name).toBe('admin');
+    expect(resolveRule('/api/auth/login').name).toBe('login');
+    expect(resolveRule('/api/auth/verify').name).toBe('default');
+    expect(resolveRule('/turns/queue')).toBeNull();
+  });
+
+  test('las acciones sobre la cola no usan el presupuesto de polling', () => {
+    expect(resolveRule('/api/queue/stream').name).toBe('polling');
+    expect(resolveRule('/api/queue_video/list').name).toBe('polling');
+    expect(resolveRule('/api/queue/assignHolding').name).toBe('default');
+    expect(resolveRule('/api/queue/call').name).toBe('default');
+    expect(resolveRule('/api/queue_video/updateCall').name).toBe('default');
+    expect(resolveRule('/api/attention/complete').name).toBe('default');
+  });
+
+  test('el backend compartido no se limita a sí mismo', () => {
+    expect(resolveRule('/api/internal/rate-limit').limit).toBeNull();
+  });
+});
+
+describe('slidingCount', () => {
+  test('la ventana anterior pesa según lo que aún se traslapa', () => {
+    expect(slidingCount(10, 100, T0)).toBe(110);
+    expect(slidingCount(10, 100, T0 + WINDOW_MS / 4)).toBe(85);
+  });
+});
+
+describe('MemoryStore', () => {
+  test('acepta exactamente `limit` peticiones por ventana y clave', () => {
+    const store = new MemoryStore();
+    const results = Array.from({ length: 12 }, () => store.hit('ip:/api/x', 10, T0 + 5));
+
+    expect(results.filter((r) => r.allowed)).toHaveLength(10);
+    expect(store.hit('otra-ip:/api/x', 10, T0 + 5).allowed).toBe(true);
+  });
+
+  test('los rechazos no consumen presupuesto de la ventana siguiente', () => {
+    const store = new MemoryStore();
+    for (let i = 0; i < 50; i++) store.hit('k', 10, T0);
+
+    // A mitad de la siguiente ventana la anterior (10 aceptadas) pesa 5
+    const middle = T0 + WINDOW_MS * 1.5;
+    const accepted = Array.from({ length: 10 }, () => store.hit('k', 10, middle)).filter((r) => r.allowed);
+    expect(accepted).toHaveLength(5);
+  });
+
+  test('al saltar más de una ventana los conteos viejos se descartan completos', () => {
+    const store = new MemoryStore();
+    for (let i = 0; i < 100; i++) store.hit(`ip-${i}`, 10, T0);
+    expect(store.size).toBe(100);
+
+    store.hit('nueva', 10, T0 + WINDOW_MS * 3);
+    expect(store.size).toBe(1);
+  });
+});
+
+describe('checkRateLimit', () => {
+  test('clave ip:ruta con el límite de la regla', async () => {
+    const store = new MemoryStore();
+    const result = await checkRateLimit(store, '10.0.0.1', '/api/admin/turns', T0);
+    expect(result).toMatchObject({ allowed: true, remaining: 59 });
+    expect(result.rule.limit).toBe(60);
+  });
+
+  test('rechazo con Retry-After hasta el fin de la ventana', async () => {
+    const store = new MemoryStore();
+    for (let i = 0; i < 20; i++) await checkRateLimit(store, 'ip', '/api/auth/login', T0);
+    const result = await checkRateLimit(store, 'ip', '/api/auth/login', T0 + 15000);
+    expect(result).toMatchObject({ allowed: false, remaining: 0, retryAfter: 45 });
+  });
+
+  test('rutas sin límite devuelven null', async () => {
+    expect(await checkRateLimit(new MemoryStore(), 'ip', '/api/internal/rate-limit', T0)).toBeNull();
+  });
+});
+
+describe('HttpStore', () => {
+  const originalFetch = global.fetch;
+  afterEach(() => {
+    global.fetch = originalFetch;
+  });
+
+  test('usa la respuesta del backend compartido', async () => {
+    global.fetch = jest.fn().mockResolvedValue({ ok: true, json: async () => ({ allowed: false, count: 60 }) });
+    const store = new HttpStore({ url: 'http://127.0.0.1:3005/api/internal/rate-limit', secret: 's' });
+
+    expect(await store.hit('k', 60, T0)).toEqual({ allowed: false, count: 60 });
+    expect(global.fetch.mock.calls[0][1].headers['x-rate-limit-secret']).toBe('s');
+  });
+
+  test('si el backend falla cuenta en memoria', async () => {
+    global.fetch = jest.fn().mockRejectedValue(new Error('ECONNREFUSED'));
+    const store = new HttpStore({ url: 'http://127.0.0.1:3005/api/internal/rate-limit', secret: 's' });
+
+    const results = [];
+    for (let i = 0; i < 3; i++) results.push(await store.hit('k', 2, T0));
+    expect(results.map((r) => r.allowed)).toEqual([true, true, false]);
+  });
+});
@@ -0,0 +1,58 @@
+/**
+ * Tests Unitarios: statsRollup.js
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Rangos de días locales del laboratorio y suma de filas de rollup que usan
+ * las rutas de /api/statistics.
+ */
+
+jest.mock('../lib/prisma.js', () => ({ __esModule: true, default: {} }));
+
+import { labDay, isoDay, calendarRange, groupStats } from '../lib/statsRollup.js';
+
+describe('labDay', () => {
+  test('usa el día local de Ciudad de México, no el de UTC', () => {
+    // 2025-03-01 03:00 UTC = 2025-02-28 21:00 en CDMX
+    expect(labDay(new Date('2025-03-01T03:00:00.000Z'))).toBe('2025-02-28');
+    expect(labDay(new Date('2025-03-01T12:00:00.000Z'))).toBe('2025-03-01');
+  });
+});
+
+describe('calendarRange', () => {
+  test('mes completo, incluyendo febrero bisiesto', () => {
+    expect(calendarRange(2024, 2)).toEqual(['2024-02-01', '2024-02-29']);
+    expect(calendarRange(2025, 12)).toEqual(['2025-12-01', '2025-12-31']);
+  });
+
+  test('sin mes devuelve el año completo', () => {
+    expect(calendarRange(2025)).toEqual(['2025-01-01', '2025-12-31']);
+  });
+
+  test('isoDay con día 0 es el último día del mes anterior', () => {
+    expect(isoDay(2025, 3, 0)).toBe('2025-02-28');
+  });
+});
+
+describe('groupStats', () => {
+  const row = (day, userId, attended, attentionMinutes, turnaroundMinutes = attentionMinutes) => ({
+    day, userId, tipoAtencion: 'General', attended, attentionMinutes, turnaroundMinutes,
+  });
+
+  test('suma atendidos y minutos por la clave indicada', () => {
+    const rows = [
+      row('2025-01-10', 3, 4, 20),
+      row('2025-01-10', 5, 2, 12),
+      row('2025-02-03', 3, 1, 8),
+    ];
+
+    const byMonth = groupStats(rows, (r) => r.day.slice(0, 7));
+    expect(byMonth.get('2025-01')).toEqual({ attended: 6, attentionMinutes: 32, turnaroundMinutes: 32 });
+    expect(byMonth.get('2025-02').attended).toBe(1);
+  });
+
+  test('filas con clave null se omiten', () => {
+    const rows = [row('2025-01-10', 0, 3, 9), row('2025-01-10', 7, 1, 5)];
+    const byUser = groupStats(rows, (r) => (r.userId === 0 ? null : r.userId));
+    expect([...byUser.keys()]).toEqual([7]);
+  });
+});
@@ -1,19 +1,28 @@
+// Conexiones a PostgreSQL que puede usar la app en total. Cada instancia
+// abre un pool propio (lib/prisma.js), así que el presupuesto se reparte
+// entre instancias; si se sube INSTANCES el total sigue acotado.
+const INSTANCES = 1;
+const DB_POOL_BUDGET = 20;
+const DATABASE_POOL_SIZE = Math.max(2, Math.floor(DB_POOL_BUDGET / INSTANCES));
+
 module.exports = {
   apps: [{
     name: 'toma-turno',
     script: 'npm',
     args: 'run start:prod',
-    instances: 1,
+    instances: INSTANCES,
     exec_mode: 'fork',
     env: {
       NODE_ENV: 'production',
       PORT: 3005,
-      HOST: '0.0.0.0'
+      HOST: '0.0.0.0',
+      DATABASE_POOL_SIZE
     },
     env_production: {
       NODE_ENV: 'production',
       PORT: 3005,
-      HOST: '0.0.0.0'
+      HOST: '0.0.0.0',
+      DATABASE_POOL_SIZE
     },
     error_file: './logs/err.log',
     out_file: './logs/out.log',
@@ -26,5 +35,23 @@ module.exports = {
     watch: false,
     autorestart: true,
     cron_restart: '0 3 * * *'  // Restart diario a las 3 AM
+  }, {
+    // Consolidación nocturna de estadísticas (scripts/rollupStatistics.js)
+    name: 'toma-turno-stats-rollup',
+    script: 'scripts/rollupStatistics.js',
+    instances: 1,
+    exec_mode: 'fork',
+    env: {
+      NODE_ENV: 'production'
+    },
+    env_production: {
+      NODE_ENV: 'production'
+    },
+    error_file: './logs/stats-rollup-err.log',
+    out_file: './logs/stats-rollup-out.log',
+    time: true,
+    autorestart: false,
+    watch: false,
+    cron_restart: '30 2 * * *'  // 2:30 AM, antes del restart de la app
   }]
 };
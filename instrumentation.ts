@@ -0,0 +1,12 @@
+/**
+ * Arranque del servidor (Next.js instrumentation)
+ *
+ * Inicia el programador de mantenimiento (lib/maintenance.js) en el runtime
+ * de Node; en Edge no hay Prisma.
+ */
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return;
+
+  const { startMaintenanceScheduler } = await import('./lib/maintenance.js');
+  startMaintenanceScheduler();
+}
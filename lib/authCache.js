@@ -0,0 +1,126 @@
+/**
+ * Caché de verificación de tokens (/api/auth/verify)
+ *
+ * AuthContext y ProtectedRoute verifican el token en cada cambio de página;
+ * sin caché cada verificación es jwt.verify + una consulta a "User". Aquí se
+ * guarda, por token, el usuario ya validado (activo, no bloqueado) para
+ * responder sin ir a la base:
+ *
+ * - LRU acotado a MAX_ENTRIES: el Map conserva el orden de inserción, así que
+ *   un acierto reinserta la entrada y la más antigua es la primera al desalojar.
+ * - Cada entrada vence a los TTL_MS o al expirar el JWT, lo que ocurra primero.
+ * - Las rutas que cambian a un usuario (status, reset-password, edición,
+ *   perfil, bloqueo por intentos fallidos, logout) llaman a
+ *   invalidateUserAuth(userId), que descarta todos sus tokens. El TTL acota
+ *   lo que no pasa por ellas (scripts, otro worker).
+ *
+ * La clave es el SHA-256 del token, para no retener tokens en memoria.
+ * Se desactiva con AUTH_CACHE_MAX_ENTRIES=0.
+ *
+ * El estado vive en `global` igual que el cliente de Prisma, para sobrevivir
+ * al hot reload en desarrollo.
+ */
+import { createHash } from "crypto";
+
+const parsedMaxEntries = parseInt(process.env.AUTH_CACHE_MAX_ENTRIES, 10);
+const MAX_ENTRIES = Number.isNaN(parsedMaxEntries) ? 1000 : parsedMaxEntries;
+const TTL_MS = parseInt(process.env.AUTH_CACHE_TTL_MS, 10) || 30000;
+
+function createCache() {
+  return {
+    entries: new Map(),
+    // userId → Set de claves, para invalidar todos los tokens de un usuario
+    byUser: new Map(),
+    stats: { hits: 0, misses: 0, evictions: 0, invalidations: 0 },
+  };
+}
+
+const cache = global.authCache?.entries ? global.authCache : createCache();
+global.authCache = cache;
+
+function tokenKey(token) {
+  return createHash("sha256").update(token).digest("base64url");
+}
+
+function removeEntry(key) {
+  const entry = cache.entries.get(key);
+  if (!entry) return;
+  cache.entries.delete(key);
+  const keys = cache.byUser.get(entry.user.id);
+  if (keys) {
+    keys.delete(key);
+    if (keys.size === 0) cache.byUser.delete(entry.user.id);
+  }
+}
+
+/**
+ * Usuario verificado de un token, o null si no está en caché o ya venció
+ *
+ * @param {string} token
+ * @param {number} [now]
+ */
+export function getCachedAuth(token, now = Date.now()) {
+  const key = tokenKey(token);
+  const entry = cache.entries.get(key);
+
+  if (!entry || entry.expiresAt <= now) {
+    if (entry) removeEntry(key);
+    cache.stats.misses++;
+    return null;
+  }
+
+  // Reinsertar para marcarla como usada recientemente
+  cache.entries.delete(key);
+  cache.entries.set(key, entry);
+  cache.stats.hits++;
+  return entry.user;
+}
+
+/**
+ * Guarda el usuario de un token ya verificado (activo y sin bloqueo)
+ *
+ * @param {string} token
+ * @param {Object} user - { id, username, name, role, email }
+ * @param {Object} [options]
+ * @param {number} [options.tokenExp] - `exp` del JWT (segundos)
+ */
+export function cacheAuth(token, user, { tokenExp = null, now = Date.now() } = {}) {
+  if (MAX_ENTRIES <= 0) return;
+
+  const key = tokenKey(token);
+  removeEntry(key);
+
+  const expiresAt = tokenExp ? Math.min(now + TTL_MS, tokenExp * 1000) : now + TTL_MS;
+  if (expiresAt <= now) return;
+
+  cache.entries.set(key, { user, expiresAt });
+  if (!cache.byUser.has(user.id)) cache.byUser.set(user.id, new Set());
+  cache.byUser.get(user.id).add(key);
+
+  while (cache.entries.size > MAX_ENTRIES) {
+    removeEntry(cache.entries.keys().next().value);
+    cache.stats.evictions++;
+  }
+}
+
+/**
+ * Descarta todos los tokens cacheados de un usuario. Llamar después de
+ * cambiar su estado, rol, contraseña o datos, y al cerrar sesión.
+ */
+export function invalidateUserAuth(userId) {
+  const keys = cache.byUser.get(Number(userId));
+  if (!keys) return;
+  for (const key of [...keys]) {
+    removeEntry(key);
+  }
+  cache.stats.invalidations++;
+}
+
+export function getAuthCacheStats() {
+  return {
+    entries: cache.entries.size,
+    maxEntries: MAX_ENTRIES,
+    ttlMs: TTL_MS,
+    ...cache.stats,
+  };
+}
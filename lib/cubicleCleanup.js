@@ -1,16 +1,17 @@
 import prisma from "./prisma.js";
 
-// Timeout de inactividad: 20 minutos
-const INACTIVITY_TIMEOUT_MS = 20 * 60 * 1000;
+// Timeout de inactividad: 20 minutos (también lo usan las consultas de ocupación)
+export const INACTIVITY_TIMEOUT_MS = 20 * 60 * 1000;
 
 /**
  * Libera cubículos de sesiones inactivas (sin actividad por 20+ minutos)
+ * @param {object} [client] - Cliente de Prisma o transacción
  * @returns {Promise<number>} Número de cubículos liberados
  */
-export async function releaseInactiveCubicles() {
+export async function releaseInactiveCubicles(client = prisma) {
   const inactiveThreshold = new Date(Date.now() - INACTIVITY_TIMEOUT_MS);
 
-  const result = await prisma.session.updateMany({
+  const result = await client.session.updateMany({
     where: {
       lastActivity: { lt: inactiveThreshold },
       selectedCubicleId: { not: null }
@@ -29,12 +30,13 @@ export async function releaseInactiveCubicles() {
 
 /**
  * Libera cubículos de sesiones ya expiradas (expiresAt < NOW)
+ * @param {object} [client] - Cliente de Prisma o transacción
  * @returns {Promise<number>} Número de cubículos liberados
  */
-export async function releaseExpiredCubicles() {
+export async function releaseExpiredCubicles(client = prisma) {
   const now = new Date();
 
-  const result = await prisma.session.updateMany({
+  const result = await client.session.updateMany({
     where: {
       expiresAt: { lt: now },
       selectedCubicleId: { not: null }
@@ -53,11 +55,14 @@ export async function releaseExpiredCubicles() {
 
 /**
  * Ejecuta ambas limpiezas: expiradas e inactivas
- * Llamar antes de consultar o asignar cubículos
+ * Las consultas de ocupación ya filtran por expiresAt y lastActivity, así que
+ * no hace falta antes de leer o asignar: la ejecuta periódicamente el
+ * programador de mantenimiento (lib/maintenance.js)
+ * @param {object} [client] - Cliente de Prisma o transacción
  * @returns {Promise<{expired: number, inactive: number}>}
  */
-export async function cleanupCubicles() {
-  const expired = await releaseExpiredCubicles();
-  const inactive = await releaseInactiveCubicles();
+export async function cleanupCubicles(client = prisma) {
+  const expired = await releaseExpiredCubicles(client);
+  const inactive = await releaseInactiveCubicles(client);
   return { expired, inactive };
 }
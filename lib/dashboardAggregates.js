@@ -0,0 +1,122 @@
+/**
+ * Contadores del panel de administración (/api/admin/dashboard)
+ *
+ * La tabla "DashboardAggregate" la mantienen triggers sobre "TurnRequest"
+ * (prisma/migrations/20261018010000_add_dashboard_aggregates): cada cambio de
+ * estado ajusta los contadores del día, los de tiempo real y las sumas por
+ * flebotomista. Aquí solo se leen, en una consulta que no depende del tamaño
+ * del histórico.
+ *
+ * Los holdings no son agregados (tomarlos no debe escribir en las filas de
+ * tiempo real, que serializarían la cola): "pending" cuenta todos los turnos
+ * Pending y los holdings vigentes se cuentan en vivo sobre la cola activa.
+ *
+ * Si los agregados quedaran desalineados (carga masiva con triggers
+ * deshabilitados, TRUNCATE), `SELECT dashboard_aggregate_rebuild();` los
+ * recalcula desde cero.
+ */
+import prisma from "./prisma.js";
+import { holdingCutoff } from "./holdingUtils.js";
+
+const round1 = (value) => Math.round(value * 10) / 10;
+
+// Los contadores se guardan como DOUBLE PRECISION junto con las sumas de minutos
+const count = (metrics, name) => Math.round(metrics[name] || 0);
+
+const average = (metrics, sumName, countName) => {
+  const n = count(metrics, countName);
+  return n > 0 ? round1(metrics[sumName] / n) : null;
+};
+
+/**
+ * Filas de "DashboardAggregate" → resumen del día, tiempo real y por flebotomista
+ *
+ * @param {Array<{userId: number, metric: string, value: number, realtime: boolean}>} rows
+ * @param {{today: number, realtime: number}} [holding] - Holdings vigentes (de hoy y en total),
+ *   que se separan de "pending"
+ */
+export function summarizeAggregates(rows, holding = { today: 0, realtime: 0 }) {
+  const today = {};
+  const realtime = {};
+  const users = new Map();
+
+  for (const row of rows) {
+    const value = Number(row.value);
+    if (row.realtime) {
+      realtime[row.metric] = value;
+    } else if (row.userId === 0) {
+      today[row.metric] = value;
+    } else {
+      if (!users.has(row.userId)) users.set(row.userId, {});
+      users.get(row.userId)[row.metric] = value;
+    }
+  }
+
+  const holdingToday = Number(holding.today) || 0;
+  const holdingRealtime = Number(holding.realtime) || 0;
+
+  const pending = count(today, "pending") - holdingToday;
+  const inCalling = count(today, "inCalling");
+  const inAttention = count(today, "inAttention");
+  const attended = count(today, "attended");
+  const cancelled = count(today, "cancelled");
+
+  const realtimePending = count(realtime, "pending") - holdingRealtime;
+  const realtimeInCalling = count(realtime, "inCalling");
+  const realtimeInProgress = count(realtime, "inAttention");
+
+  const phlebotomists = new Map();
+  for (const [userId, metrics] of users) {
+    phlebotomists.set(userId, {
+      attendedToday: count(metrics, "attended"),
+      avgTimePerToma: average(metrics, "tomaMinutes", "tomaCount"),
+    });
+  }
+
+  return {
+    summary: {
+      total: pending + inCalling + inAttention + attended + cancelled + holdingToday,
+      pending,
+      inProgress: inCalling + inAttention,
+      inCalling,
+      inAttention,
+      attended,
+      cancelled,
+      holding: holdingToday,
+      avgWaitTime: average(today, "waitMinutes", "waitCount") ?? 0,
+      avgAttentionTime: average(today, "attentionMinutes", "attentionCount") ?? 0,
+    },
+    // Sin filtro de fecha - espejo exacto de monitoreo
+    realtime: {
+      pendingCount: realtimePending,
+      holdingCount: holdingRealtime,
+      inCallingCount: realtimeInCalling,
+      inProgressCount: realtimeInProgress,
+      totalActive: realtimePending + holdingRealtime + realtimeInCalling + realtimeInProgress,
+    },
+    phlebotomists,
+  };
+}
+
+/**
+ * Contadores de hoy (día local del laboratorio) y de tiempo real en una lectura
+ */
+export async function loadDashboardAggregates() {
+  const [rows, [holding]] = await Promise.all([
+    prisma.$queryRaw`
+      SELECT "userId", metric, value, day = DATE '1970-01-01' AS realtime
+      FROM "DashboardAggregate"
+      WHERE day IN (DATE '1970-01-01', dashboard_local_day((now() AT TIME ZONE 'UTC')::timestamp))
+    `,
+    prisma.$queryRaw`
+      SELECT
+        count(*)::int AS "realtime",
+        (count(*) FILTER (
+          WHERE dashboard_local_day("createdAt") = dashboard_local_day((now() AT TIME ZONE 'UTC')::timestamp)
+        ))::int AS "today"
+      FROM "TurnRequest"
+      WHERE status = 'Pending' AND "holdingBy" IS NOT NULL AND "holdingAt" >= ${holdingCutoff()}
+    `,
+  ]);
+  return summarizeAggregates(rows, holding);
+}
@@ -1,21 +1,54 @@
 import prisma from "./prisma.js";
 import { CUBICULOS_POR_TIPO, saltaFila } from "./prioridadUtils.js";
+import { invalidateQueueSnapshots } from "./queueEvents.js";
 
 // Timeout de holding en minutos
 const HOLDING_TIMEOUT_MINUTES = 5;
 
+// Turnos de la cabeza de la cola entre los que se elige por cubículo
+const HOLDING_CANDIDATES = 10;
+
+// Relecturas de la cola si otros flebotomistas toman todos los candidatos
+const CLAIM_ROUNDS = 3;
+
+/*
+ * Expiración perezosa: un holding con más de HOLDING_TIMEOUT_MINUTES ya no
+ * cuenta, sin que nadie tenga que liberarlo. Las consultas de asignación y de
+ * /api/attention/list lo evalúan en el predicado (holdingAt < límite = libre),
+ * así que listar o asignar no escribe. Las columnas del turno expirado quedan
+ * con el valor viejo hasta que alguien lo reclama o releaseExpiredHoldings()
+ * las limpia para las vistas de administración.
+ */
+
 /**
- * Libera todos los turnos en holding que han expirado (más de 5 minutos sin ser llamados)
- * Esta función debe llamarse antes de asignar nuevos holdings o listar turnos
- * @returns {Promise<number>} Número de turnos liberados
+ * Instante a partir del cual un holding sigue vigente
+ * @returns {Date}
  */
-export async function releaseExpiredHoldings() {
-  const timeoutDate = new Date(Date.now() - HOLDING_TIMEOUT_MINUTES * 60 * 1000);
+export function holdingCutoff(now = Date.now()) {
+  return new Date(now - HOLDING_TIMEOUT_MINUTES * 60 * 1000);
+}
 
-  const result = await prisma.turnRequest.updateMany({
+/**
+ * Instante en que expira un holding tomado en holdingAt
+ * @returns {Date}
+ */
+export function holdingExpiry(holdingAt) {
+  return new Date(new Date(holdingAt).getTime() + HOLDING_TIMEOUT_MINUTES * 60 * 1000);
+}
+
+/**
+ * Limpia holdingBy/holdingAt de los turnos con holding expirado
+ * Ya no es necesario antes de asignar o listar (ver expiración perezosa);
+ * solo ordena las columnas que leen el panel y la lista de administración.
+ * Lo ejecuta el programador de mantenimiento (lib/maintenance.js)
+ * @param {object} [client] - Cliente de Prisma o transacción
+ * @returns {Promise<number>} Número de turnos liberados
+ */
+export async function releaseExpiredHoldings(client = prisma) {
+  const result = await client.turnRequest.updateMany({
     where: {
       status: "Pending",
-      holdingAt: { lt: timeoutDate },
+      holdingAt: { lt: holdingCutoff() },
       holdingBy: { not: null },
     },
     data: {
@@ -26,6 +59,7 @@ export async function releaseExpiredHoldings() {
 
   if (result.count > 0) {
     console.log(`[HoldingUtils] Liberados ${result.count} turnos con holding expirado`);
+    invalidateQueueSnapshots();
   }
 
   return result.count;
@@ -53,11 +87,92 @@ export async function releaseUserHoldings(userId) {
 
   if (result.count > 0) {
     console.log(`[HoldingUtils] Liberados ${result.count} turnos en holding del usuario ${userId}`);
+    invalidateQueueSnapshots();
   }
 
   return result.count;
 }
 
+/**
+ * Tipos de atención cuyos cubículos preferidos no incluyen el del flebotomista
+ * (ver CUBICULOS_POR_TIPO). Sin cubículo, todos los tipos con preferencia.
+ */
+function incompatibleTypes(cubicleName) {
+  return Object.entries(CUBICULOS_POR_TIPO)
+    .filter(([, preferidos]) => preferidos && !(cubicleName && preferidos.map(String).includes(String(cubicleName))))
+    .map(([tipo]) => tipo);
+}
+
+/**
+ * Reclama el siguiente turno libre para un flebotomista
+ *
+ * - Se lee sin bloquear la cabeza de la cola (HOLDING_CANDIDATES turnos
+ *   libres por prioridad y tiempo de cola) y se ordena por ruteo: primero los
+ *   compatibles con el cubículo (mismo ruteo que antes). Sin `route` queda el
+ *   orden de la cola.
+ * - Se bloquea solo el candidato elegido (FOR UPDATE SKIP LOCKED sobre esa
+ *   fila) y se vuelve a comprobar que siga libre. Si otro lo tomó se pasa al
+ *   siguiente; si se acaban, se relee la cola. Así quien reclama dentro de una
+ *   transacción (skipHolding) retiene una sola fila y los demás siguen tomando
+ *   los turnos en orden.
+ * - Libre = sin holding o con holding expirado (expiración perezosa).
+ *
+ * @param {number} userId - ID del flebotomista
+ * @param {Object} [options]
+ * @param {string|null} [options.cubicleName] - Cubículo del flebotomista
+ * @param {boolean} [options.route] - Aplicar CUBICULOS_POR_TIPO
+ * @param {number[]} [options.excludeIds] - Turnos que no se deben reclamar
+ * @param {Object} [options.client] - prisma o el `tx` de una transacción
+ * @returns {Promise<number|null>} id del turno reclamado
+ */
+export async function claimNextTurn(userId, { cubicleName = null, route = true, excludeIds = [], client = prisma } = {}) {
+  const incompatible = route ? incompatibleTypes(cubicleName) : [];
+
+  for (let round = 0; round < CLAIM_ROUNDS; round++) {
+    const cutoff = holdingCutoff();
+    const candidates = await client.$queryRaw`
+      SELECT id FROM (
+        SELECT id, "tipoAtencion",
+          CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END AS priority,
+          COALESCE("deferredAt", "createdAt") AS "queueTime"
+        FROM "TurnRequest"
+        WHERE status = 'Pending'
+          AND ("holdingBy" IS NULL OR "holdingAt" IS NULL OR "holdingAt" < ${cutoff})
+          AND NOT (id = ANY(${excludeIds}::int[]))
+        ORDER BY
+          CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
+          COALESCE("deferredAt", "createdAt") ASC
+        LIMIT ${HOLDING_CANDIDATES}
+      ) head
+      ORDER BY ("tipoAtencion" = ANY(${incompatible}::text[])), priority, "queueTime"
+    `;
+
+    if (candidates.length === 0) {
+      return null;
+    }
+
+    for (const { id } of candidates) {
+      const [claimed] = await client.$queryRaw`
+        UPDATE "TurnRequest"
+        SET "holdingBy" = ${userId}::int, "holdingAt" = ${new Date()}
+        WHERE id = (
+          SELECT id FROM "TurnRequest"
+          WHERE id = ${id}
+            AND status = 'Pending'
+            AND ("holdingBy" IS NULL OR "holdingAt" IS NULL OR "holdingAt" < ${holdingCutoff()})
+          FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id
+      `;
+      if (claimed) {
+        return claimed.id;
+      }
+    }
+  }
+
+  return null;
+}
+
 /**
  * Busca y asigna el siguiente turno disponible a un flebotomista
  * Respeta la prioridad: Special > General, y dentro de cada grupo por orden de llegada
@@ -67,14 +182,12 @@ export async function releaseUserHoldings(userId) {
 export async function assignNextHolding(userId) {
   if (!userId) return null;
 
-  // Primero limpiar holdings expirados
-  await releaseExpiredHoldings();
-
-  // Verificar si el usuario ya tiene un turno en holding
+  // Verificar si el usuario ya tiene un turno en holding vigente
   const existingHolding = await prisma.turnRequest.findFirst({
     where: {
       status: "Pending",
       holdingBy: userId,
+      holdingAt: { gte: holdingCutoff() },
     },
     include: {
       cubicle: true,
@@ -90,9 +203,14 @@ export async function assignNextHolding(userId) {
       const higherPriorityAvailable = await prisma.turnRequest.findFirst({
         where: {
           status: "Pending",
-          holdingBy: null,
           tipoAtencion: { in: ['MuyEspecial', 'Prioritario', 'PrioritarioRiesgo'] },
+          OR: [
+            { holdingBy: null },
+            { holdingAt: null },
+            { holdingAt: { lt: holdingCutoff() } },
+          ],
         },
+        select: { id: true, tipoAtencion: true },
       });
 
       if (higherPriorityAvailable) {
@@ -101,6 +219,7 @@ export async function assignNextHolding(userId) {
           where: { id: existingHolding.id },
           data: { holdingBy: null, holdingAt: null },
         });
+        invalidateQueueSnapshots();
         // Caer al bloque de asignación de abajo
       } else {
         console.log(`[HoldingUtils] Usuario ${userId} ya tiene turno ${existingHolding.id} en holding`);
@@ -124,6 +243,7 @@ export async function assignNextHolding(userId) {
       status: "In Progress",
       attendedBy: userId,
     },
+    select: { id: true },
   });
 
   if (inProgressTurn) {
@@ -131,93 +251,36 @@ export async function assignNextHolding(userId) {
     return null;
   }
 
-  // Obtener el cubículo del flebotomista para ruteo inteligente
-  const userSession = await prisma.session.findFirst({
-    where: { userId, expiresAt: { gt: new Date() }, selectedCubicleId: { not: null } },
-    select: { selectedCubicleId: true },
-    orderBy: { lastActivity: 'desc' }
-  });
-  let cubicleName = null;
-  if (userSession?.selectedCubicleId) {
-    const cubicle = await prisma.cubicle.findUnique({
-      where: { id: userSession.selectedCubicleId },
-      select: { name: true }
-    });
-    cubicleName = cubicle?.name || null;
+  // Cubículo del flebotomista para ruteo inteligente (sesión vigente más reciente)
+  const [userCubicle] = await prisma.$queryRaw`
+    SELECT c.name
+    FROM "Session" s
+    JOIN "Cubicle" c ON c.id = s."selectedCubicleId"
+    WHERE s."userId" = ${userId}::int AND s."expiresAt" > ${new Date()}
+    ORDER BY s."lastActivity" DESC
+    LIMIT 1
+  `;
+  const cubicleName = userCubicle?.name || null;
+
+  const turnId = await claimNextTurn(userId, { cubicleName });
+  if (!turnId) {
+    return null;
   }
 
-  // Buscar el siguiente turno disponible con ruteo por cubículo
-  const nextTurn = await prisma.$transaction(async (tx) => {
-    // Buscar turno disponible — prioriza pacientes que requieren ESTE cubículo
-    const turns = await tx.$queryRaw`
-      SELECT id, "tipoAtencion" FROM "TurnRequest"
-      WHERE status = 'Pending' AND "holdingBy" IS NULL
-      ORDER BY
-        CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
-        COALESCE("deferredAt", "createdAt") ASC
-      LIMIT 10
-    `;
-
-    if (!turns || turns.length === 0) {
-      return null;
-    }
-
-    // Seleccionar el turno considerando restricciones de cubículo
-    // Prioriza pacientes compatibles con el cubículo, pero si no hay, toma el primero disponible
-    let selectedTurnId = null;
-    let fallbackTurnId = null;
-    for (const turn of turns) {
-      const preferidos = CUBICULOS_POR_TIPO[turn.tipoAtencion];
-      if (preferidos) {
-        // Paciente tiene PREFERENCIA de cubículo
-        if (cubicleName && preferidos.map(String).includes(String(cubicleName))) {
-          // Flebotomista está en un cubículo compatible — match perfecto
-          selectedTurnId = turn.id;
-          break;
-        }
-        // No es compatible — guardar como fallback si no hay mejor opción
-        if (!fallbackTurnId) fallbackTurnId = turn.id;
-        continue;
-      }
-      // Sin restricción de cubículo — asignar
-      selectedTurnId = turn.id;
-      break;
-    }
-
-    // Usar fallback si no se encontró match perfecto
-    if (!selectedTurnId) {
-      selectedTurnId = fallbackTurnId;
-    }
-
-    if (!selectedTurnId) {
-      return null;
-    }
+  invalidateQueueSnapshots();
 
-    const turnId = selectedTurnId;
-
-    // Asignar el turno en holding
-    const updatedTurn = await tx.turnRequest.update({
-      where: {
-        id: turnId,
-        holdingBy: null, // Doble verificación para evitar race condition
-      },
-      data: {
-        holdingBy: userId,
-        holdingAt: new Date(),
-      },
-      include: {
-        cubicle: true,
-      },
-    });
-
-    console.log(`[HoldingUtils] Turno ${updatedTurn.id} (${updatedTurn.tipoAtencion}) asignado en holding al usuario ${userId} (cubículo: ${cubicleName || 'sin'})`);
-    return {
-      ...updatedTurn,
-      isSpecial: saltaFila(updatedTurn.tipoAtencion)
-    };
+  const updatedTurn = await prisma.turnRequest.findUnique({
+    where: { id: turnId },
+    include: {
+      cubicle: true,
+    },
   });
 
-  return nextTurn;
+  console.log(`[HoldingUtils] Turno ${updatedTurn.id} (${updatedTurn.tipoAtencion}) asignado en holding al usuario ${userId} (cubículo: ${cubicleName || 'sin'})`);
+  return {
+    ...updatedTurn,
+    isSpecial: saltaFila(updatedTurn.tipoAtencion)
+  };
 }
 
 /**
@@ -228,13 +291,12 @@ export async function assignNextHolding(userId) {
 export async function getUserHoldingTurn(userId) {
   if (!userId) return null;
 
-  // Primero limpiar expirados
-  await releaseExpiredHoldings();
-
+  // Solo holdings vigentes (expiración perezosa)
   const turn = await prisma.turnRequest.findFirst({
     where: {
       status: "Pending",
       holdingBy: userId,
+      holdingAt: { gte: holdingCutoff() },
     },
     include: {
       cubicle: true,
@@ -0,0 +1,184 @@
+/**
+ * Programador de mantenimiento en segundo plano
+ *
+ * Los barridos que antes corrían dentro de las rutas (holdings expirados,
+ * cubículos de sesiones expiradas o inactivas) se ejecutan aquí cada
+ * MAINTENANCE_INTERVAL_MS, fuera del camino de las peticiones: listar ya no
+ * escribe. Las rutas no dependen del barrido para ser correctas (expiración
+ * perezosa en lib/holdingUtils.js; las consultas de ocupación filtran por
+ * expiresAt y lastActivity); solo mantiene las columnas limpias.
+ *
+ * Elección de líder: cada ejecución toma pg_try_advisory_xact_lock dentro de
+ * una transacción y corre las tareas en ella. Si otra instancia (PM2 con
+ * varias instancias, otro servidor) tiene el lock, esta ejecución se salta.
+ * El lock se libera al terminar la transacción, así que no depende de qué
+ * conexión del pool toque. Los barridos son idempotentes: que dos instancias
+ * corran uno tras otro en el mismo intervalo solo afecta 0 filas.
+ *
+ * Lo arranca instrumentation.ts al iniciar el servidor. Métricas por tarea
+ * (última ejecución, filas afectadas, duración) en getMaintenanceStats(),
+ * expuestas en GET /api/admin/maintenance.
+ *
+ * Se desactiva con MAINTENANCE_SCHEDULER=off. El estado vive en `global`
+ * igual que el cliente de Prisma, para no arrancar dos timers con el hot
+ * reload en desarrollo.
+ */
+import prisma from "./prisma.js";
+import { releaseExpiredHoldings } from "./holdingUtils.js";
+import { cleanupCubicles } from "./cubicleCleanup.js";
+
+export const MAINTENANCE_INTERVAL_MS = parseInt(process.env.MAINTENANCE_INTERVAL_MS, 10) || 60 * 1000;
+
+// Clave del advisory lock (compartida por todas las instancias de la app)
+export const MAINTENANCE_LOCK_KEY = 73_104_025;
+
+// Tiempo máximo de una ejecución completa
+const TRANSACTION_TIMEOUT_MS = 30 * 1000;
+
+// Cada tarea devuelve las filas afectadas
+export const MAINTENANCE_TASKS = [
+  { name: "expiredHoldings", run: (tx) => releaseExpiredHoldings(tx) },
+  {
+    name: "cubicleCleanup",
+    run: async (tx) => {
+      const { expired, inactive } = await cleanupCubicles(tx);
+      return expired + inactive;
+    },
+  },
+];
+
+function createTaskStats() {
+  return { runs: 0, errors: 0, lastRunAt: null, lastDurationMs: null, lastRowsAffected: null, totalRowsAffected: 0, lastError: null };
+}
+
+function createState() {
+  return {
+    timer: null,
+    running: false,
+    stats: { ticks: 0, leaderRuns: 0, skippedLocked: 0, skippedBusy: 0, failures: 0, lastTickAt: null, lastLeaderAt: null },
+    tasks: {},
+  };
+}
+
+const state = global.maintenanceScheduler?.stats ? global.maintenanceScheduler : createState();
+global.maintenanceScheduler = state;
+
+function taskStats(name) {
+  if (!state.tasks[name]) state.tasks[name] = createTaskStats();
+  return state.tasks[name];
+}
+
+/**
+ * Ejecuta las tareas si esta instancia obtiene el advisory lock
+ *
+ * Un error en una tarea se registra en sus métricas y no impide las demás;
+ * para que la transacción siga utilizable cada tarea corre en un savepoint.
+ *
+ * @param {object} [options]
+ * @param {object} [options.client] - Cliente de Prisma
+ * @param {Array} [options.tasks]
+ * @returns {Promise<{leader: boolean, results: Object<string, number|null>}|null>}
+ *   null si la ejecución anterior de este proceso sigue en curso
+ */
+export async function runMaintenance({ client = prisma, tasks = MAINTENANCE_TASKS } = {}) {
+  if (state.running) {
+    state.stats.skippedBusy++;
+    return null;
+  }
+
+  state.running = true;
+  state.stats.ticks++;
+  state.stats.lastTickAt = new Date();
+
+  try {
+    return await client.$transaction(
+      async (tx) => {
+        const [{ acquired }] = await tx.$queryRaw`
+          SELECT pg_try_advisory_xact_lock(${MAINTENANCE_LOCK_KEY}::bigint) AS "acquired"
+        `;
+        if (!acquired) {
+          state.stats.skippedLocked++;
+          return { leader: false, results: {} };
+        }
+
+        state.stats.leaderRuns++;
+        state.stats.lastLeaderAt = new Date();
+        const results = {};
+
+        for (const task of tasks) {
+          const stats = taskStats(task.name);
+          const started = Date.now();
+          stats.runs++;
+          stats.lastRunAt = new Date(started);
+
+          await tx.$executeRaw`SAVEPOINT maintenance_task`;
+          try {
+            const rows = await task.run(tx);
+            await tx.$executeRaw`RELEASE SAVEPOINT maintenance_task`;
+            stats.lastRowsAffected = rows;
+            stats.totalRowsAffected += rows;
+            stats.lastError = null;
+            results[task.name] = rows;
+          } catch (error) {
+            await tx.$executeRaw`ROLLBACK TO SAVEPOINT maintenance_task`;
+            console.error(`[Maintenance] Error en ${task.name}:`, error);
+            stats.errors++;
+            stats.lastRowsAffected = null;
+            stats.lastError = error.message;
+            results[task.name] = null;
+          } finally {
+            stats.lastDurationMs = Date.now() - started;
+          }
+        }
+
+        return { leader: true, results };
+      },
+      { timeout: TRANSACTION_TIMEOUT_MS }
+    );
+  } catch (error) {
+    // Sin conexión o transacción abortada: se reintenta en el siguiente intervalo
+    state.stats.failures++;
+    console.error("[Maintenance] Error ejecutando el mantenimiento:", error);
+    return { leader: false, results: {} };
+  } finally {
+    state.running = false;
+  }
+}
+
+/**
+ * Arranca el timer del proceso (una vez; llamadas repetidas no hacen nada)
+ *
+ * @returns {boolean} true si el programador quedó activo
+ */
+export function startMaintenanceScheduler({ intervalMs = MAINTENANCE_INTERVAL_MS, env = process.env } = {}) {
+  if (env.MAINTENANCE_SCHEDULER === "off") return false;
+  if (state.timer) return true;
+
+  state.intervalMs = intervalMs;
+  state.timer = setInterval(() => {
+    runMaintenance();
+  }, intervalMs);
+  // No mantener vivo el proceso solo por el timer
+  state.timer.unref?.();
+
+  console.log(`[Maintenance] Programador activo cada ${Math.round(intervalMs / 1000)}s`);
+  return true;
+}
+
+export function stopMaintenanceScheduler() {
+  if (state.timer) clearInterval(state.timer);
+  state.timer = null;
+}
+
+/**
+ * Métricas del programador y de cada tarea en este proceso
+ */
+export function getMaintenanceStats() {
+  return {
+    enabled: Boolean(state.timer),
+    intervalMs: state.intervalMs ?? MAINTENANCE_INTERVAL_MS,
+    running: state.running,
+    ...state.stats,
+    tasks: Object.fromEntries(MAINTENANCE_TASKS.map(({ name }) => [name, { ...taskStats(name) }])),
+  };
+}
@@ -5,7 +5,8 @@
  */
 
 // Cap en minutos (4 horas) para evitar datos anómalos.
-// Mismo cap usado por /api/statistics/dashboard.
+// Mismo cap usado por /api/statistics/dashboard y por stats_duration_minutes()
+// en la base (prisma/migrations/20261018020000_add_statistics_rollups).
 export const DURATION_CAP_MIN = 240;
 
 /**
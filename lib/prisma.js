@@ -1,19 +1,47 @@
 import { PrismaClient } from "@prisma/client";
 
+// Tamaño del pool de conexiones por proceso. ecosystem.config.js lo reparte
+// entre las instancias de PM2 (DATABASE_POOL_SIZE) para no rebasar
+// max_connections de PostgreSQL; un connection_limit explícito en
+// DATABASE_URL tiene prioridad.
+const DEFAULT_POOL_SIZE = 10;
+const DEFAULT_POOL_TIMEOUT_S = 10;
+
+function pooledDatabaseUrl(databaseUrl = process.env.DATABASE_URL) {
+  if (!databaseUrl) return undefined;
+
+  let url;
+  try {
+    url = new URL(databaseUrl);
+  } catch {
+    return databaseUrl;
+  }
+
+  const poolSize = parseInt(process.env.DATABASE_POOL_SIZE, 10);
+  if (!url.searchParams.has("connection_limit")) {
+    url.searchParams.set("connection_limit", String(poolSize > 0 ? poolSize : DEFAULT_POOL_SIZE));
+  }
+  if (!url.searchParams.has("pool_timeout")) {
+    url.searchParams.set("pool_timeout", String(DEFAULT_POOL_TIMEOUT_S));
+  }
+  return url.toString();
+}
+
 // Configuración optimizada para producción
 const prismaClientOptions = {
   log: process.env.NODE_ENV === 'production' 
     ? ['error'] 
     : ['query', 'info', 'warn', 'error'],
   errorFormat: process.env.NODE_ENV === 'production' ? 'minimal' : 'pretty',
+  datasourceUrl: pooledDatabaseUrl(),
 };
 
-// Singleton pattern para evitar múltiples instancias
+// Singleton: un solo cliente (y un solo pool) por proceso. También en
+// producción se guarda en global, porque Next puede empaquetar este módulo en
+// varios chunks de rutas y cada copia abriría su propio pool.
 const prisma = global.prisma || new PrismaClient(prismaClientOptions);
 
-if (process.env.NODE_ENV !== "production") {
-  global.prisma = prisma;
-}
+global.prisma = prisma;
 
 // Manejo de desconexión en producción
 if (process.env.NODE_ENV === 'production') {
@@ -0,0 +1,402 @@
+/**
+ * Difusión de la cola a las pantallas de sala (Server-Sent Events)
+ *
+ * Cada pantalla (queue, queue-tv, queue_video) se suscribe a /api/queue/stream
+ * en lugar de consultar la lista cada pocos segundos. El snapshot de la cola se
+ * calcula una sola vez por cambio y se envía a todos los suscriptores con un
+ * número de versión:
+ *
+ * - Las rutas que modifican turnos llaman a notifyQueueChange(motivo).
+ * - Los avisos que llegan juntos se agrupan (COALESCE_MS) en un solo cálculo.
+ * - Si el snapshot no cambió no se incrementa la versión ni se envía nada.
+ * - Mientras haya suscriptores se recalcula cada SAFETY_REFRESH_MS para
+ *   detectar cambios hechos fuera de este proceso (scripts, otro worker).
+ *
+ * Las mismas notificaciones invalidan la caché de respuestas de los endpoints
+ * de lista (cachedQueueResponse): entre cambios, /api/queue/list,
+ * /api/queue_video/list y /api/attention/list se sirven desde memoria con un
+ * ETag fuerte y responden 304 a If-None-Match. /api/admin/dashboard usa la
+ * misma caché con una vigencia más corta.
+ *
+ * El estado vive en `global` igual que el cliente de Prisma, para sobrevivir
+ * al hot reload en desarrollo.
+ */
+import { createHash } from "crypto";
+import prisma from "./prisma.js";
+
+const COALESCE_MS = 150;
+const SAFETY_REFRESH_MS = 15000;
+// Red de seguridad para escrituras fuera de este proceso (igual que SAFETY_REFRESH_MS)
+const SNAPSHOT_MAX_AGE_MS = 15000;
+const MAX_SNAPSHOTS = 200;
+
+// Distingue versiones entre reinicios del servidor (Last-Event-ID del navegador)
+const BOOT_ID = Date.now().toString(36);
+
+/**
+ * Snapshot de /api/queue/list (queue.js y queue-tv.js)
+ *
+ * Una sola consulta sobre los turnos activos, ya ordenada, que se reparte en
+ * una pasada en espera / en llamado / en atención. El orden coincide con el
+ * índice parcial "TurnRequest_active_queue_idx" (ver prisma/schema.prisma),
+ * así que el costo depende de los turnos activos y no del histórico.
+ *
+ * Ordenamiento: prioridad (MuyEspecial > Prioritario/PrioritarioRiesgo > resto)
+ * y luego "tiempo efectivo de cola" = COALESCE(deferredAt, createdAt):
+ * - Pacientes no diferidos se ordenan por createdAt
+ * - Pacientes diferidos se ordenan por deferredAt (que se setea al final de la cola)
+ * - Nuevos pacientes creados después de un diferimiento aparecen según su createdAt
+ */
+export async function loadQueueSnapshot() {
+  const activeTurns = await prisma.$queryRaw`
+    SELECT
+      t.id,
+      t."patientName",
+      t."assignedTurn",
+      t."tipoAtencion",
+      t."isDeferred",
+      t."callCount",
+      t.patient_id as "patientID",
+      t.work_order as "workOrder",
+      c.name as "cubicleName",
+      t.status,
+      t."isCalled"
+    FROM "TurnRequest" t
+    LEFT JOIN "Cubicle" c ON t."cubicleId" = c.id
+    WHERE t.status IN ('Pending', 'In Progress')
+    ORDER BY
+      CASE WHEN t."tipoAtencion" = 'MuyEspecial' THEN 0 WHEN t."tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
+      COALESCE(t."deferredAt", t."createdAt") ASC
+  `;
+
+  const pendingTurns = [];
+  const inCallingTurns = [];
+  const inProgressTurns = [];
+
+  for (const { status, isCalled, cubicleName, ...turn } of activeTurns) {
+    if (status === 'Pending') {
+      // Pacientes en Espera (sin cubículo todavía)
+      pendingTurns.push(turn);
+    } else if (isCalled) {
+      // Pacientes en Atención
+      inProgressTurns.push({ ...turn, cubicleName });
+    } else {
+      // Pacientes en Llamado
+      inCallingTurns.push({ ...turn, cubicleName });
+    }
+  }
+
+  return { pendingTurns, inCallingTurns, inProgressTurns };
+}
+
+const videoTurnSelect = {
+  id: true,
+  patientName: true,
+  assignedTurn: true,
+  status: true,
+  createdAt: true,
+  cubicle: { select: { name: true } },
+  user: { select: { name: true } },
+  patientID: true,
+  workOrder: true,
+};
+
+/**
+ * Snapshot de /api/queue_video/list (queue_video.js)
+ */
+export async function loadVideoQueueSnapshot() {
+  const [pendingTurns, inProgressTurns, inCallingTurns] = await Promise.all([
+    prisma.turnRequest.findMany({
+      where: { status: 'Pending', isCalled: false },
+      orderBy: { assignedTurn: 'asc' },
+      select: videoTurnSelect,
+    }),
+    prisma.turnRequest.findMany({
+      where: { status: 'In Progress' },
+      orderBy: { assignedTurn: 'asc' },
+      select: videoTurnSelect,
+    }),
+    // Turnos en estado 'Calling' (In Progress sin anunciar); solo el primero para el anuncio
+    prisma.turnRequest.findMany({
+      where: { status: 'In Progress', isCalled: false },
+      orderBy: { assignedTurn: 'asc' },
+      select: {
+        id: true,
+        patientName: true,
+        assignedTurn: true,
+        cubicle: { select: { name: true } },
+        patientID: true,
+        workOrder: true,
+      },
+      take: 1,
+    }),
+  ]);
+
+  return { pendingTurns, inProgressTurns, inCallingTurns };
+}
+
+/**
+ * Formato de un evento SSE; `data` ya serializado una sola vez por versión
+ */
+export function formatSseEvent(event, data, id) {
+  return `${id ? `id: ${id}\n` : ''}event: ${event}\ndata: ${data}\n\n`;
+}
+
+/**
+ * Un snapshot versionado con sus suscriptores
+ */
+export class QueueChannel {
+  constructor(name, loader, { coalesceMs = COALESCE_MS, safetyRefreshMs = SAFETY_REFRESH_MS } = {}) {
+    this.name = name;
+    this.loader = loader;
+    this.coalesceMs = coalesceMs;
+    this.safetyRefreshMs = safetyRefreshMs;
+    this.subscribers = new Set();
+    this.version = 0;
+    this.json = null;
+    this.frame = null;
+    this.stale = true;
+    this.computations = 0;
+    this.broadcasts = 0;
+    this.lastReason = null;
+    this.timer = null;
+    this.safetyTimer = null;
+    this.inflight = null;
+    this.rerun = false;
+  }
+
+  get eventId() {
+    return `${BOOT_ID}-${this.version}`;
+  }
+
+  subscribe(listener) {
+    this.subscribers.add(listener);
+    if (!this.safetyTimer && this.safetyRefreshMs > 0) {
+      this.safetyTimer = setInterval(() => {
+        this.refresh('safety').catch((error) => {
+          console.error(`[queueEvents] Error al recalcular ${this.name}:`, error);
+        });
+      }, this.safetyRefreshMs);
+      this.safetyTimer.unref?.();
+    }
+    return () => {
+      this.subscribers.delete(listener);
+      if (this.subscribers.size === 0 && this.safetyTimer) {
+        clearInterval(this.safetyTimer);
+        this.safetyTimer = null;
+      }
+    };
+  }
+
+  /**
+   * Último evento; lo calcula si nunca se calculó o quedó invalidado sin suscriptores
+   */
+  async current() {
+    if (this.stale || !this.frame) {
+      await this.refresh(this.lastReason || 'initial');
+    }
+    return { id: this.eventId, frame: this.frame };
+  }
+
+  /**
+   * Aviso de cambio: sin suscriptores solo se invalida; con suscriptores se
+   * programa un único recálculo para todos los avisos de la ventana
+   */
+  notify(reason) {
+    this.lastReason = reason;
+    if (this.subscribers.size === 0) {
+      this.stale = true;
+      return;
+    }
+    if (this.timer) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.refresh(this.lastReason).catch((error) => {
+        console.error(`[queueEvents] Error al recalcular ${this.name}:`, error);
+      });
+    }, this.coalesceMs);
+    this.timer.unref?.();
+  }
+
+  /**
+   * Recalcula el snapshot (una sola consulta en vuelo; los avisos que llegan
+   * durante el cálculo provocan exactamente un recálculo más)
+   */
+  async refresh(reason) {
+    if (this.inflight) {
+      this.rerun = true;
+      return this.inflight;
+    }
+    this.inflight = (async () => {
+      try {
+        do {
+          this.rerun = false;
+          this.stale = false;
+          this.computations++;
+          const snapshot = await this.loader();
+          const json = JSON.stringify(snapshot);
+          if (json !== this.json) {
+            this.json = json;
+            this.version++;
+            this.publish(reason);
+          }
+        } while (this.rerun);
+      } catch (error) {
+        this.stale = true;
+        throw error;
+      } finally {
+        this.inflight = null;
+      }
+    })();
+    return this.inflight;
+  }
+
+  publish(reason) {
+    const payload = `{"version":${this.version},"reason":${JSON.stringify(reason || null)},` +
+      `"hub":{"computations":${this.computations},"subscribers":${this.subscribers.size}},` +
+      `"data":${this.json}}`;
+    this.frame = formatSseEvent('queue', payload, this.eventId);
+    this.broadcasts++;
+    for (const listener of this.subscribers) {
+      try {
+        listener(this.frame);
+      } catch (error) {
+        console.error(`[queueEvents] Error al enviar a un suscriptor de ${this.name}:`, error);
+      }
+    }
+  }
+
+  stats() {
+    return {
+      subscribers: this.subscribers.size,
+      version: this.version,
+      computations: this.computations,
+      broadcasts: this.broadcasts,
+    };
+  }
+}
+
+function createHub() {
+  return {
+    generation: 0,
+    channels: {
+      queue: new QueueChannel('queue', loadQueueSnapshot),
+      video: new QueueChannel('video', loadVideoQueueSnapshot),
+    },
+    snapshots: new Map(),
+    pending: new Map(),
+    cacheStats: { hits: 0, misses: 0, notModified: 0 },
+  };
+}
+
+const hub = global.queueEventsHub?.channels ? global.queueEventsHub : createHub();
+global.queueEventsHub = hub;
+
+export function getQueueChannel(view) {
+  return hub.channels[view] || hub.channels.queue;
+}
+
+/**
+ * Invalida las respuestas cacheadas sin recalcular los streams. Para cambios
+ * que solo ve /api/attention/list (holding, sugerencias).
+ */
+export function invalidateQueueSnapshots() {
+  hub.generation++;
+}
+
+/**
+ * Llamar después de cualquier escritura que cambie la cola
+ * (crear, llamar, finalizar, diferir, cancelar, reasignar...)
+ */
+export function notifyQueueChange(reason) {
+  invalidateQueueSnapshots();
+  for (const channel of Object.values(hub.channels)) {
+    channel.notify(reason);
+  }
+}
+
+export function getQueueStreamStats() {
+  return {
+    ...Object.fromEntries(Object.entries(hub.channels).map(([name, channel]) => [name, channel.stats()])),
+    snapshots: { generation: hub.generation, entries: hub.snapshots.size, ...hub.cacheStats },
+  };
+}
+
+async function buildSnapshot(key, generation, build, maxAgeMs) {
+  let expiresAt = Date.now() + maxAgeMs;
+  const expireBy = (time) => {
+    expiresAt = Math.min(expiresAt, new Date(time).getTime());
+  };
+  const body = JSON.stringify(await build({ expireBy }));
+  const entry = {
+    generation,
+    body,
+    etag: `"${createHash("sha1").update(body).digest("base64url")}"`,
+    expiresAt,
+  };
+  // Si hubo un cambio durante la consulta, la entrada nace vieja y se recalcula en la próxima petición
+  hub.snapshots.delete(key);
+  hub.snapshots.set(key, entry);
+  if (hub.snapshots.size > MAX_SNAPSHOTS) {
+    hub.snapshots.delete(hub.snapshots.keys().next().value);
+  }
+  return entry;
+}
+
+function etagMatches(header, etag) {
+  if (!header) return false;
+  return header.trim() === "*" || header.split(",").some((value) => value.trim() === etag);
+}
+
+/**
+ * Respuesta JSON de un endpoint de lista, cacheada hasta el siguiente cambio
+ * de la cola. Las peticiones simultáneas tras una invalidación comparten una
+ * sola consulta. El ETag depende del contenido: si el recálculo da lo mismo,
+ * el cliente sigue recibiendo 304.
+ *
+ * @param {Request} req - Para leer If-None-Match
+ * @param {string} key - Identifica la variante (p. ej. `attention:${userId}`)
+ * @param {({expireBy}) => Promise<Object>} build - Consulta a la base. Si el
+ *   resultado deja de ser válido en un instante conocido sin que la cola cambie
+ *   (p. ej. un holding que expira), lo avisa con expireBy(fecha)
+ * @param {Object} [options]
+ * @param {number} [options.maxAgeMs] - Vigencia máxima aunque la cola no cambie
+ *   (más corta para respuestas que dependen del reloj o de las sesiones)
+ */
+export async function cachedQueueResponse(req, key, build, { maxAgeMs = SNAPSHOT_MAX_AGE_MS } = {}) {
+  const generation = hub.generation;
+  let entry = hub.snapshots.get(key);
+
+  if (entry && entry.generation === generation && entry.expiresAt > Date.now()) {
+    hub.cacheStats.hits++;
+  } else {
+    let pending = hub.pending.get(key);
+    if (!pending || pending.generation !== generation) {
+      hub.cacheStats.misses++;
+      pending = { generation, promise: buildSnapshot(key, generation, build, maxAgeMs) };
+      hub.pending.set(key, pending);
+      pending.promise.finally(() => {
+        if (hub.pending.get(key) === pending) hub.pending.delete(key);
+      }).catch(() => {});
+    } else {
+      hub.cacheStats.hits++;
+    }
+    entry = await pending.promise;
+  }
+
+  const headers = {
+    ETag: entry.etag,
+    // El navegador guarda la respuesta pero la revalida en cada polling (If-None-Match)
+    "Cache-Control": "private, no-cache",
+  };
+
+  if (etagMatches(req.headers.get("if-none-match"), entry.etag)) {
+    hub.cacheStats.notModified++;
+    return new Response(null, { status: 304, headers });
+  }
+
+  return new Response(entry.body, {
+    status: 200,
+    headers: { ...headers, "Content-Type": "application/json" },
+  });
+}
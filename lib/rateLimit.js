@@ -0,0 +1,154 @@
+/**
+ * Rate limiting de /api/* (middleware.ts)
+ *
+ * Ventana deslizante aproximada por clave ip:ruta: el conteo de la ventana
+ * actual más el de la anterior ponderado por la fracción que aún se traslapa.
+ * Solo cuentan las peticiones aceptadas, así que un cliente que se pasa del
+ * límite recupera su presupuesto al ritmo normal.
+ *
+ * Presupuestos por ruta (RATE_LIMIT_RULES, primera coincidencia por prefijo):
+ * las pantallas de sala consultan la cola cada pocos segundos y tienen más
+ * margen que las acciones de administración o el login.
+ *
+ * Backends:
+ * - MemoryStore (default): conteos del proceso en dos Maps (ventana actual y
+ *   anterior). Al cambiar de ventana se descartan completas, así que no hay
+ *   que recorrer claves para limpiar: O(1) por petición.
+ * - HttpStore (RATE_LIMIT_BACKEND=postgres): conteos compartidos entre
+ *   procesos en la tabla UNLOGGED "RateLimitCounter", a través de
+ *   /api/internal/rate-limit (el middleware corre en Edge y no puede usar
+ *   Prisma). Si esa ruta falla o tarda se usa MemoryStore.
+ *
+ * Este módulo no importa nada de Node: corre en el runtime Edge.
+ */
+
+export const WINDOW_MS = 60 * 1000;
+
+// Límite de peticiones por minuto, por IP y ruta
+export const RATE_LIMIT_RULES = [
+  // Conteos compartidos: no se limitan a sí mismos
+  { name: "internal", prefix: "/api/internal/", limit: null },
+  // Pantallas de sala y flebotomistas (polling y stream). Solo las lecturas:
+  // las acciones sobre la cola (llamar, holdings, diferir) usan el default
+  { name: "polling", prefix: "/api/queue/list", limit: 300 },
+  { name: "polling", prefix: "/api/queue/stream", limit: 300 },
+  { name: "polling", prefix: "/api/queue_video/list", limit: 300 },
+  { name: "polling", prefix: "/api/attention/list", limit: 300 },
+  { name: "login", prefix: "/api/auth/login", limit: 20 },
+  { name: "admin", prefix: "/api/admin/", limit: 60 },
+  { name: "default", prefix: "/api/", limit: 100 },
+];
+
+/**
+ * Regla que aplica a una ruta, o null si no es de /api/
+ */
+export function resolveRule(pathname, rules = RATE_LIMIT_RULES) {
+  return rules.find((rule) => pathname.startsWith(rule.prefix)) || null;
+}
+
+/**
+ * Conteo estimado de la ventana deslizante
+ */
+export function slidingCount(current, previous, now, windowMs = WINDOW_MS) {
+  const elapsed = (now % windowMs) / windowMs;
+  return current + previous * (1 - elapsed);
+}
+
+export class MemoryStore {
+  constructor(windowMs = WINDOW_MS) {
+    this.windowMs = windowMs;
+    this.window = null;
+    this.current = new Map();
+    this.previous = new Map();
+  }
+
+  advance(window) {
+    if (window === this.window) return;
+    // La ventana actual pasa a ser la anterior solo si es la inmediata anterior
+    this.previous = window === this.window + 1 ? this.current : new Map();
+    this.current = new Map();
+    this.window = window;
+  }
+
+  /**
+   * Cuenta la petición si cabe en el límite
+   *
+   * @returns {{allowed: boolean, count: number}}
+   */
+  hit(key, limit, now = Date.now()) {
+    this.advance(Math.floor(now / this.windowMs));
+    const current = this.current.get(key) || 0;
+    const count = slidingCount(current, this.previous.get(key) || 0, now, this.windowMs);
+
+    if (count >= limit) {
+      return { allowed: false, count };
+    }
+    this.current.set(key, current + 1);
+    return { allowed: true, count: count + 1 };
+  }
+
+  get size() {
+    return this.current.size + this.previous.size;
+  }
+}
+
+export class HttpStore {
+  constructor({ url, secret, timeoutMs = 250, fallback = new MemoryStore() }) {
+    this.url = url;
+    this.secret = secret;
+    this.timeoutMs = timeoutMs;
+    this.fallback = fallback;
+  }
+
+  async hit(key, limit, now = Date.now()) {
+    try {
+      const response = await fetch(this.url, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", "x-rate-limit-secret": this.secret },
+        body: JSON.stringify({ key, limit, windowMs: WINDOW_MS }),
+        signal: AbortSignal.timeout(this.timeoutMs),
+      });
+      if (!response.ok) throw new Error(`status ${response.status}`);
+      return await response.json();
+    } catch (error) {
+      // Sin backend compartido se sigue limitando por proceso
+      return this.fallback.hit(key, limit, now);
+    }
+  }
+
+  get size() {
+    return this.fallback.size;
+  }
+}
+
+/**
+ * Backend según RATE_LIMIT_BACKEND ('memory' | 'postgres')
+ */
+export function createStore(env = process.env) {
+  if (env.RATE_LIMIT_BACKEND === "postgres" && env.RATE_LIMIT_SECRET) {
+    return new HttpStore({
+      url: env.RATE_LIMIT_STORE_URL || `http://127.0.0.1:${env.PORT || 3005}/api/internal/rate-limit`,
+      secret: env.RATE_LIMIT_SECRET,
+    });
+  }
+  return new MemoryStore();
+}
+
+/**
+ * Aplica el presupuesto de la ruta a una petición
+ *
+ * @returns {Promise<{rule: {name: string, prefix: string, limit: number}, allowed: boolean, remaining: number, retryAfter: number}|null>}
+ *   null si la ruta no se limita
+ */
+export async function checkRateLimit(store, ip, pathname, now = Date.now()) {
+  const rule = resolveRule(pathname);
+  if (!rule || rule.limit === null) return null;
+
+  const { allowed, count } = await store.hit(`${ip}:${pathname}`, rule.limit, now);
+  return {
+    rule,
+    allowed,
+    remaining: Math.max(0, Math.floor(rule.limit - count)),
+    retryAfter: allowed ? 0 : Math.ceil((WINDOW_MS - (now % WINDOW_MS)) / 1000),
+  };
+}
@@ -0,0 +1,124 @@
+/**
+ * Lectura de los rollups de estadísticas ("StatsDailyRollup" / "StatsMonthlyRollup")
+ *
+ * Los días hasta la marca de "StatsRollupState" salen de las tablas
+ * consolidadas; los posteriores (hoy, o días que el job nocturno aún no
+ * consolida) se calculan en vivo con stats_rollup_compute(), que aplica las
+ * mismas reglas. Así una vista anual lee ~12 filas por flebotomista y tipo de
+ * atención sin importar cuántos turnos haya en el histórico.
+ *
+ * Los días son locales del laboratorio (LAB_TIME_ZONE) y se pasan como
+ * 'YYYY-MM-DD'. Duraciones con las reglas de calculateDurationMinutes
+ * (lib/patientStatsUtils.js).
+ *
+ * Consolidación: scripts/rollupStatistics.js (incremental cada noche, --backfill).
+ */
+import prisma from "./prisma.js";
+
+// La misma zona de dashboard_local_day() / stats_day_start() en la base
+export const LAB_TIME_ZONE = "America/Mexico_City";
+
+const dayFormatter = new Intl.DateTimeFormat("en-CA", {
+  timeZone: LAB_TIME_ZONE,
+  year: "numeric",
+  month: "2-digit",
+  day: "2-digit",
+});
+
+/**
+ * Día local del laboratorio ('YYYY-MM-DD') de un instante
+ */
+export function labDay(date = new Date()) {
+  return dayFormatter.format(date);
+}
+
+/**
+ * 'YYYY-MM-DD' de una fecha de calendario (month 1-12; day 0 = último del mes anterior)
+ */
+export function isoDay(year, month, day) {
+  return new Date(Date.UTC(year, month - 1, day)).toISOString().slice(0, 10);
+}
+
+/**
+ * Primer y último día de un mes, o del año completo si no hay mes
+ */
+export function calendarRange(year, month) {
+  return month ? [isoDay(year, month, 1), isoDay(year, month + 1, 0)] : [isoDay(year, 1, 1), isoDay(year, 12, 31)];
+}
+
+function normalize(rows) {
+  return rows.map((row) => ({
+    day: row.day instanceof Date ? row.day.toISOString().slice(0, 10) : String(row.day).slice(0, 10),
+    userId: Number(row.userId),
+    tipoAtencion: row.tipoAtencion,
+    attended: Number(row.attended),
+    attentionMinutes: Number(row.attentionMinutes),
+    turnaroundMinutes: Number(row.turnaroundMinutes),
+  }));
+}
+
+/**
+ * Filas por (día, flebotomista, tipoAtencion) entre dos días locales, inclusive
+ *
+ * @param {string} fromDay - 'YYYY-MM-DD'
+ * @param {string} toDay - 'YYYY-MM-DD'
+ * @param {Object} [options]
+ * @param {number} [options.userId] - Solo un flebotomista (attendedBy)
+ */
+export async function loadDailyStats(fromDay, toDay, { userId = null } = {}) {
+  const rows = await prisma.$queryRaw`
+    WITH state AS (
+      SELECT COALESCE((SELECT "through" FROM "StatsRollupState" WHERE "name" = 'daily'), DATE '1970-01-01') AS "through"
+    )
+    SELECT r."day", r."userId", r."tipoAtencion", r."attended", r."attentionMinutes", r."turnaroundMinutes"
+    FROM "StatsDailyRollup" r, state s
+    WHERE r."day" BETWEEN ${fromDay}::date AND LEAST(${toDay}::date, s."through")
+      AND (${userId}::int IS NULL OR r."userId" = ${userId}::int)
+    UNION ALL
+    SELECT c."day", c."userId", c."tipoAtencion", c."attended", c."attentionMinutes", c."turnaroundMinutes"
+    FROM state s, LATERAL stats_rollup_compute(GREATEST(${fromDay}::date, s."through" + 1), ${toDay}::date) c
+    WHERE (${userId}::int IS NULL OR c."userId" = ${userId}::int)
+  `;
+  return normalize(rows);
+}
+
+/**
+ * Filas por (mes, flebotomista, tipoAtencion); `day` es el primer día del mes.
+ * El rango debe cubrir meses completos (ver calendarRange).
+ */
+export async function loadMonthlyStats(fromDay, toDay, { userId = null } = {}) {
+  const rows = await prisma.$queryRaw`
+    WITH state AS (
+      SELECT COALESCE((SELECT "through" FROM "StatsRollupState" WHERE "name" = 'daily'), DATE '1970-01-01') AS "through"
+    )
+    SELECT m."month" AS "day", m."userId", m."tipoAtencion", m."attended", m."attentionMinutes", m."turnaroundMinutes"
+    FROM "StatsMonthlyRollup" m, state s
+    WHERE m."month" BETWEEN ${fromDay}::date AND LEAST(${toDay}::date, s."through")
+      AND (${userId}::int IS NULL OR m."userId" = ${userId}::int)
+    UNION ALL
+    SELECT date_trunc('month', c."day")::date, c."userId", c."tipoAtencion", c."attended",
+           c."attentionMinutes", c."turnaroundMinutes"
+    FROM state s, LATERAL stats_rollup_compute(GREATEST(${fromDay}::date, s."through" + 1), ${toDay}::date) c
+    WHERE (${userId}::int IS NULL OR c."userId" = ${userId}::int)
+  `;
+  return normalize(rows);
+}
+
+/**
+ * Suma filas de rollup por la clave que devuelve keyFn (filas con clave null se omiten)
+ *
+ * @returns {Map<*, {attended: number, attentionMinutes: number, turnaroundMinutes: number}>}
+ */
+export function groupStats(rows, keyFn) {
+  const groups = new Map();
+  for (const row of rows) {
+    const key = keyFn(row);
+    if (key === null || key === undefined) continue;
+    const group = groups.get(key) || { attended: 0, attentionMinutes: 0, turnaroundMinutes: 0 };
+    group.attended += row.attended;
+    group.attentionMinutes += row.attentionMinutes;
+    group.turnaroundMinutes += row.turnaroundMinutes;
+    groups.set(key, group);
+  }
+  return groups;
+}
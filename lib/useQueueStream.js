@@ -0,0 +1,103 @@
+import { useEffect, useRef, useState } from "react";
+
+const FALLBACK_POLL_MS = 5000;
+
+/**
+ * Suscripción de las pantallas de sala a /api/queue/stream (ver lib/queueEvents.js)
+ *
+ * - onSnapshot(data) recibe el mismo objeto que devuelven /api/queue/list o
+ *   /api/queue_video/list (según `view`), solo cuando cambia la versión. El
+ *   servidor tampoco reenvía un snapshot que no cambió: si el componente
+ *   ignora uno (p. ej. durante un anuncio) debe guardarlo y aplicarlo después.
+ * - Mientras el stream está caído se llama a poll() cada pollInterval ms; al
+ *   reconectar el polling se detiene. Sin EventSource (navegadores viejos) se
+ *   queda en polling.
+ *
+ * Los callbacks se leen de refs para que el stream no se reabra cuando
+ * cambian las dependencias del componente.
+ */
+export function useQueueStream({ view = "queue", enabled = true, onSnapshot, poll, pollInterval = FALLBACK_POLL_MS }) {
+  const [connected, setConnected] = useState(false);
+  const onSnapshotRef = useRef(onSnapshot);
+  const pollRef = useRef(poll);
+  const intervalRef = useRef(pollInterval);
+  const versionRef = useRef(null);
+
+  onSnapshotRef.current = onSnapshot;
+  pollRef.current = poll;
+  intervalRef.current = pollInterval;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    let source = null;
+    let pollTimer = null;
+    let disposed = false;
+
+    const stopPolling = () => {
+      if (pollTimer) {
+        clearTimeout(pollTimer);
+        pollTimer = null;
+      }
+    };
+
+    const startPolling = () => {
+      if (pollTimer || disposed || !pollRef.current) return;
+      const tick = async () => {
+        try {
+          await pollRef.current?.();
+        } catch (err) {
+          // Sin servidor el polling también falla; se reintenta en el siguiente tick
+          console.error("[useQueueStream] Error en polling:", err);
+        } finally {
+          if (pollTimer && !disposed) {
+            pollTimer = setTimeout(tick, intervalRef.current);
+          }
+        }
+      };
+      pollTimer = setTimeout(tick, 0);
+    };
+
+    if (typeof window === "undefined" || !window.EventSource) {
+      startPolling();
+      return () => {
+        disposed = true;
+        stopPolling();
+      };
+    }
+
+    source = new EventSource(`/api/queue/stream${view === "video" ? "?view=video" : ""}`);
+
+    source.onopen = () => {
+      setConnected(true);
+      stopPolling();
+    };
+
+    source.addEventListener("queue", (event) => {
+      try {
+        const message = JSON.parse(event.data);
+        // lastEventId incluye el arranque del servidor: una versión 1 nueva no se confunde con la anterior
+        const id = event.lastEventId || message.version;
+        if (id === versionRef.current) return;
+        versionRef.current = id;
+        onSnapshotRef.current?.(message.data);
+      } catch (err) {
+        console.error("[useQueueStream] Evento inválido:", err);
+      }
+    });
+
+    // EventSource reintenta solo; mientras tanto la pantalla sigue actualizándose por polling
+    source.onerror = () => {
+      setConnected(false);
+      startPolling();
+    };
+
+    return () => {
+      disposed = true;
+      stopPolling();
+      source.close();
+    };
+  }, [view, enabled]);
+
+  return { connected };
+}
@@ -1,51 +1,42 @@
 import { NextResponse } from 'next/server';
 import type { NextRequest } from 'next/server';
+import { checkRateLimit, createStore } from './lib/rateLimit.js';
 
-// Rate limiting simple basado en IP
-const rateLimit = new Map();
-const WINDOW_MS = 60 * 1000; // 1 minuto
-const MAX_REQUESTS = 100; // 100 requests por minuto
+// Rate limiting por IP y ruta, con presupuestos por ruta (ver lib/rateLimit.js)
+const rateLimitStore = createStore();
 
-function getRateLimitKey(request: NextRequest): string {
-  const ip = request.headers.get('x-real-ip') || 
-             request.headers.get('x-forwarded-for') || 
-             'unknown';
-  return `${ip}:${request.nextUrl.pathname}`;
+function getClientIp(request: NextRequest): string {
+  return request.headers.get('x-real-ip') || 
+         request.headers.get('x-forwarded-for') || 
+         'unknown';
 }
 
-export function middleware(request: NextRequest) {
+export async function middleware(request: NextRequest) {
+  let rateLimit = null;
+
   // Solo aplicar rate limiting a las rutas API
   if (request.nextUrl.pathname.startsWith('/api/')) {
-    const key = getRateLimitKey(request);
-    const now = Date.now();
-    
-    // Limpiar entradas antiguas
-    for (const [k, v] of rateLimit.entries()) {
-      if (now - v.firstRequest > WINDOW_MS) {
-        rateLimit.delete(k);
-      }
-    }
-    
-    // Verificar rate limit
-    const rateLimitInfo = rateLimit.get(key);
-    
-    if (rateLimitInfo) {
-      if (now - rateLimitInfo.firstRequest < WINDOW_MS) {
-        if (rateLimitInfo.count >= MAX_REQUESTS) {
-          return new NextResponse('Too Many Requests', { status: 429 });
-        }
-        rateLimitInfo.count++;
-      } else {
-        // Reiniciar ventana
-        rateLimit.set(key, { firstRequest: now, count: 1 });
-      }
-    } else {
-      rateLimit.set(key, { firstRequest: now, count: 1 });
+    rateLimit = await checkRateLimit(rateLimitStore, getClientIp(request), request.nextUrl.pathname);
+
+    if (rateLimit && !rateLimit.allowed) {
+      return new NextResponse('Too Many Requests', {
+        status: 429,
+        headers: {
+          'Retry-After': String(rateLimit.retryAfter),
+          'X-RateLimit-Limit': String(rateLimit.rule.limit),
+          'X-RateLimit-Remaining': '0',
+        },
+      });
     }
   }
   
   // Agregar headers de seguridad
   const response = NextResponse.next();
+
+  if (rateLimit) {
+    response.headers.set('X-RateLimit-Limit', String(rateLimit.rule.limit));
+    response.headers.set('X-RateLimit-Remaining', String(rateLimit.remaining));
+  }
   
   // Headers de seguridad para producción
   if (process.env.NODE_ENV === 'production') {
@@ -657,7 +657,11 @@ function AdminControlPanel() {
                         <HStack key={p.id} justify="space-between" p={2} bg="gray.50" borderRadius="md">
                           <VStack align="start" spacing={0}>
                             <Text fontSize="sm" fontWeight="medium">{p.name}</Text>
-                            <Text fontSize="xs" color="gray.500">{p.cubicleName}</Text>
+                            <Text fontSize="xs" color="gray.500">
+                              {p.cubicleName}
+                              {p.attendedToday > 0 && ` · ${p.attendedToday} hoy`}
+                              {p.avgTimePerToma != null && ` · ${p.avgTimePerToma} min/toma`}
+                            </Text>
                           </VStack>
                           <VStack align="end" spacing={0}>
                             <Badge
@@ -3,6 +3,7 @@ import { Box, Heading, Text, Grid, Flex, extendTheme, VStack, HStack, Icon, Circ
 import { keyframes } from "@emotion/react";
 import { FaHeartbeat, FaClock, FaUserMd, FaUser, FaWheelchair, FaMicrophone, FaStar, FaQrcode } from 'react-icons/fa';
 import QRCode from 'react-qr-code';
+import { useQueueStream } from '../../lib/useQueueStream';
 
 // Tema personalizado optimizado para TV - Tamaños aumentados significativamente
 const theme = extendTheme({
@@ -117,6 +118,10 @@ const QueueTV = memo(function QueueTV() {
     const [mounted, setMounted] = useState(false);
     const [scrollPositions, setScrollPositions] = useState({ inProgress: 0, pending: 0 });
     const [retryCount, setRetryCount] = useState(0);
+    // Último snapshot recibido y último paciente anunciado: un snapshot que
+    // llega durante un anuncio se vuelve a aplicar al terminar (ver useQueueStream)
+    const latestSnapshotRef = useRef(null);
+    const announcedIdRef = useRef(null);
 
     // Effect para marcar el componente como montado
     useEffect(() => {
@@ -132,7 +137,37 @@ const QueueTV = memo(function QueueTV() {
         }
     }, [retryCount]);
 
-    // Función para obtener datos de la cola con auto-recuperación
+    // Aplica un snapshot de la cola (recibido por el stream o por polling)
+    const applyQueueData = useCallback((data) => {
+        latestSnapshotRef.current = data;
+        const sortedPendingTurns = (data.pendingTurns || []).sort((a, b) => a.assignedTurn - b.assignedTurn);
+        const sortedInProgressTurns = (data.inProgressTurns || []).sort((a, b) => a.assignedTurn - b.assignedTurn);
+
+        // Limpiar error cuando la conexión se recupera
+        if (error) {
+            console.log('[queue-tv] Conexión recuperada, limpiando error');
+            setError(null);
+        }
+        if (retryCount > 0) {
+            setRetryCount(0);
+        }
+
+        setPendingTurns(sortedPendingTurns);
+        setInProgressTurns(sortedInProgressTurns);
+
+        const callingTurns = data.inCallingTurns || [];
+        // El recién anunciado puede seguir en un snapshot anterior a updateCall
+        if (!callingTurns.some(turn => turn.id === announcedIdRef.current)) {
+            announcedIdRef.current = null;
+        }
+        const nextCall = callingTurns.find(turn => turn.id !== announcedIdRef.current);
+        if (!isCalling && nextCall) {
+            setCallingPatient(nextCall);
+            setIsCalling(true);
+        }
+    }, [isCalling, error, retryCount]);
+
+    // Función para obtener datos de la cola con auto-recuperación (fallback mientras el stream está caído)
     const fetchQueueData = useCallback(async () => {
         try {
             // Agregar timeout de 10 segundos para evitar que fetch se cuelgue
@@ -145,27 +180,7 @@ const QueueTV = memo(function QueueTV() {
             clearTimeout(timeoutId);
 
             if (!response.ok) throw new Error("Error al obtener los turnos");
-            const data = await response.json();
-
-            const sortedPendingTurns = (data.pendingTurns || []).sort((a, b) => a.assignedTurn - b.assignedTurn);
-            const sortedInProgressTurns = (data.inProgressTurns || []).sort((a, b) => a.assignedTurn - b.assignedTurn);
-
-            // Limpiar error cuando la conexión se recupera
-            if (error) {
-                console.log('[queue-tv] Conexión recuperada, limpiando error');
-                setError(null);
-            }
-            if (retryCount > 0) {
-                setRetryCount(0);
-            }
-
-            setPendingTurns(sortedPendingTurns);
-            setInProgressTurns(sortedInProgressTurns);
-
-            if (!isCalling && data.inCallingTurns && data.inCallingTurns.length > 0) {
-                setCallingPatient(data.inCallingTurns[0]);
-                setIsCalling(true);
-            }
+            applyQueueData(await response.json());
         } catch (err) {
             console.error("[queue-tv] Error al cargar los turnos:", err);
             setRetryCount(prev => prev + 1);
@@ -180,7 +195,7 @@ const QueueTV = memo(function QueueTV() {
                 window.location.reload();
             }
         }
-    }, [isCalling, error, retryCount]);
+    }, [applyQueueData, retryCount]);
 
     // Función para actualizar estado de llamado
     const updateCallStatus = useCallback(async () => {
@@ -194,6 +209,7 @@ const QueueTV = memo(function QueueTV() {
             });
             if (!response.ok) throw new Error("Error al actualizar el estado del paciente.");
             
+            announcedIdRef.current = callingPatient.id;
             setCallingPatient(null);
             setIsCalling(false);
         } catch (err) {
@@ -203,17 +219,22 @@ const QueueTV = memo(function QueueTV() {
         }
     }, [callingPatient]);
 
-    // Effect para obtener datos
-    useEffect(() => {
-        if (!mounted) return;
-
-        fetchQueueData();
-
-        const pollInterval = pendingTurns.length > 0 || isCalling ? 3000 : 8000;
-        const interval = setInterval(fetchQueueData, pollInterval);
+    // Cola en tiempo real por SSE; polling solo mientras el stream está caído
+    useQueueStream({
+        enabled: mounted,
+        onSnapshot: applyQueueData,
+        poll: fetchQueueData,
+        pollInterval: pendingTurns.length > 0 || isCalling ? 3000 : 8000,
+    });
 
-        return () => clearInterval(interval);
-    }, [mounted, fetchQueueData, pendingTurns.length, isCalling]);
+    // Al terminar un anuncio, aplicar el snapshot que llegó durante él: el
+    // stream no lo reenvía hasta que la cola vuelva a cambiar
+    useEffect(() => {
+        if (!isCalling && latestSnapshotRef.current) {
+            applyQueueData(latestSnapshotRef.current);
+        }
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [isCalling]);
 
     // Efecto para scroll automático - Rotación cada 5 pacientes
     useEffect(() => {
@@ -2,6 +2,7 @@ import { useEffect, useState, useCallback, memo, useRef } from "react";
 import { Box, Heading, Text, Flex, extendTheme, VStack, HStack, Grid } from "@chakra-ui/react";
 import { FaHeartbeat, FaClock, FaMicrophone, FaWheelchair, FaHourglass } from 'react-icons/fa';
 import QRCode from 'react-qr-code';
+import { useQueueStream } from '../../lib/useQueueStream';
 
 // Tema ultra-minimalista optimizado para máxima densidad de información
 const theme = extendTheme({
@@ -65,6 +66,10 @@ const Queue = memo(function Queue() {
     const [currentPhraseIndex, setCurrentPhraseIndex] = useState(0);
     const [audioEnabled, setAudioEnabled] = useState(false);
     const errorCountRef = useRef(0);
+    // Último snapshot recibido y último paciente anunciado: un snapshot que
+    // llega durante un anuncio se vuelve a aplicar al terminar (ver useQueueStream)
+    const latestSnapshotRef = useRef(null);
+    const announcedIdRef = useRef(null);
 
     // Frases motivacionales que rotan
     const phrases = [
@@ -148,37 +153,45 @@ const Queue = memo(function Queue() {
         };
     }, [enableAudio]);
 
-    // Función para obtener datos de la cola
+    // Aplica un snapshot de la cola (recibido por el stream o por polling)
+    const applyQueueData = useCallback((data) => {
+        latestSnapshotRef.current = data;
+        // El API ya devuelve los datos ordenados correctamente (FIFO estricto por updatedAt)
+        // No necesitamos re-ordenar en el cliente
+        setPendingTurns(data.pendingTurns || []);
+        setInProgressTurns(data.inProgressTurns || []);
+        errorCountRef.current = 0; // Reset error counter on success
+        if (error) setError(null); // Clear any previous error
+
+        // Detectar pacientes siendo llamados
+        // El recién anunciado puede seguir en un snapshot anterior a updateCall
+        const callingTurns = data.inCallingTurns || [];
+        if (!callingTurns.some(turn => turn.id === announcedIdRef.current)) {
+            announcedIdRef.current = null;
+        }
+        const newCallingPatient = callingTurns.find(turn => turn.id !== announcedIdRef.current);
+        if (newCallingPatient) {
+            // Si no hay llamado activo, o si hay un paciente DIFERENTE siendo llamado
+            if (!isCalling || (callingPatient && callingPatient.id !== newCallingPatient.id)) {
+                console.log('[Queue] Nuevo paciente detectado para llamar:', newCallingPatient.patientName);
+                setCallingPatient(newCallingPatient);
+                setIsCalling(true);
+            }
+        } else {
+            // Si no hay pacientes en llamado pero el estado dice que sí, resetear
+            if (isCalling && !callingPatient) {
+                console.log('[Queue] Reseteando estado de llamado huérfano');
+                setIsCalling(false);
+            }
+        }
+    }, [isCalling, callingPatient]);
+
+    // Función para obtener datos de la cola (fallback mientras el stream está caído)
     const fetchQueueData = useCallback(async () => {
         try {
             const response = await fetch("/api/queue/list");
             if (!response.ok) throw new Error("Error al obtener los turnos");
-            const data = await response.json();
-
-            // El API ya devuelve los datos ordenados correctamente (FIFO estricto por updatedAt)
-            // No necesitamos re-ordenar en el cliente
-            setPendingTurns(data.pendingTurns || []);
-            setInProgressTurns(data.inProgressTurns || []);
-            errorCountRef.current = 0; // Reset error counter on success
-            if (error) setError(null); // Clear any previous error
-
-            // Detectar pacientes siendo llamados
-            if (data.inCallingTurns && data.inCallingTurns.length > 0) {
-                const newCallingPatient = data.inCallingTurns[0];
-
-                // Si no hay llamado activo, o si hay un paciente DIFERENTE siendo llamado
-                if (!isCalling || (callingPatient && callingPatient.id !== newCallingPatient.id)) {
-                    console.log('[Queue] Nuevo paciente detectado para llamar:', newCallingPatient.patientName);
-                    setCallingPatient(newCallingPatient);
-                    setIsCalling(true);
-                }
-            } else {
-                // Si no hay pacientes en llamado pero el estado dice que sí, resetear
-                if (isCalling && !callingPatient) {
-                    console.log('[Queue] Reseteando estado de llamado huérfano');
-                    setIsCalling(false);
-                }
-            }
+            applyQueueData(await response.json());
         } catch (err) {
             console.error("Error al cargar los turnos:", err);
             // Auto-recovery para modo kiosco: contar errores consecutivos
@@ -191,7 +204,7 @@ const Queue = memo(function Queue() {
             }
             // No mostrar error en pantalla — el polling reintentará automáticamente
         }
-    }, [isCalling, callingPatient]);
+    }, [applyQueueData]);
 
     // Función para actualizar estado de llamado
     const updateCallStatus = useCallback(async () => {
@@ -205,6 +218,7 @@ const Queue = memo(function Queue() {
             });
             if (!response.ok) throw new Error("Error al actualizar el estado del paciente.");
 
+            announcedIdRef.current = callingPatient.id;
             setCallingPatient(null);
             setIsCalling(false);
         } catch (err) {
@@ -214,17 +228,22 @@ const Queue = memo(function Queue() {
         }
     }, [callingPatient]);
 
-    // Effect para obtener datos
-    useEffect(() => {
-        if (!mounted) return;
-
-        fetchQueueData();
-
-        const pollInterval = pendingTurns.length > 0 || isCalling ? 3000 : 8000;
-        const interval = setInterval(fetchQueueData, pollInterval);
+    // Cola en tiempo real por SSE; polling solo mientras el stream está caído
+    useQueueStream({
+        enabled: mounted,
+        onSnapshot: applyQueueData,
+        poll: fetchQueueData,
+        pollInterval: pendingTurns.length > 0 || isCalling ? 3000 : 8000,
+    });
 
-        return () => clearInterval(interval);
-    }, [mounted, fetchQueueData, pendingTurns.length, isCalling]);
+    // Al terminar un anuncio, aplicar el snapshot que llegó durante él: el
+    // stream no lo reenvía hasta que la cola vuelva a cambiar
+    useEffect(() => {
+        if (!isCalling && latestSnapshotRef.current) {
+            applyQueueData(latestSnapshotRef.current);
+        }
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [isCalling]);
 
     // Effect para actualizar la hora
     useEffect(() => {
@@ -23,6 +23,7 @@ import {
   FaFrown
 } from 'react-icons/fa';
 import QRCode from 'react-qr-code';
+import { useQueueStream } from '../../lib/useQueueStream';
 
 // Tema moderno con gradientes suaves
 const modernTheme = extendTheme({
@@ -143,7 +144,53 @@ const QueueVideoScreen = memo(function QueueVideoScreen() {
     }
   }, []);
 
-  // Función para obtener datos de la cola
+  // Aplica un snapshot de la cola (recibido por el stream o por polling)
+  const applyQueueData = useCallback((data) => {
+    setPendingTurns(data.pendingTurns || []);
+    setInProgressTurns(data.inProgressTurns || []);
+
+    // El API devuelve inCallingTurns que es un array, tomamos el primer elemento
+    const callingTurn = data.inCallingTurns && data.inCallingTurns.length > 0 ? data.inCallingTurns[0] : null;
+    
+    if (callingTurn) {
+      console.log('Paciente llamado detectado:', callingTurn);
+      const isNewCall = !lastCalledTurnId.current || 
+                       lastCalledTurnId.current !== callingTurn.id;
+      
+      if (isNewCall) {
+        console.log('Nuevo llamado - mostrando pantalla de video');
+        lastCalledTurnId.current = callingTurn.id;
+        setCurrentCallingTurn(callingTurn);
+        setDisplayAnnouncement(true);
+        
+        speakAnnouncement(callingTurn, callingTurn.cubicle?.name || 'Sin asignar');
+        
+        // El video se reproducirá automáticamente con autoPlay en el JSX
+        
+        if (audioRef.current) {
+          audioRef.current.currentTime = 0;
+          audioRef.current.play().catch(console.error);
+        }
+        
+        setTimeout(async () => {
+          console.log('Ocultando pantalla de llamado');
+          try {
+            await fetch('/api/queue_video/updateCall', {
+              method: 'PUT',
+              headers: { 'Content-Type': 'application/json' },
+              body: JSON.stringify({ id: callingTurn.id, isCalled: true })
+            });
+          } catch (error) {
+            console.error('Error actualizando llamado:', error);
+          }
+          setDisplayAnnouncement(false);
+          setCurrentCallingTurn(null);
+        }, 15000);
+      }
+    }
+  }, [speakAnnouncement]);
+
+  // Función para obtener datos de la cola (fallback mientras el stream está caído)
   const fetchQueueData = useCallback(async () => {
     try {
       const response = await fetch('/api/queue_video/list');
@@ -151,63 +198,15 @@ const QueueVideoScreen = memo(function QueueVideoScreen() {
         console.error('Error en respuesta:', response.status);
         return;
       }
-      
-      const data = await response.json();
-      console.log('Datos recibidos:', data);
-      
-      setPendingTurns(data.pendingTurns || []);
-      setInProgressTurns(data.inProgressTurns || []);
 
-      // El API devuelve inCallingTurns que es un array, tomamos el primer elemento
-      const callingTurn = data.inCallingTurns && data.inCallingTurns.length > 0 ? data.inCallingTurns[0] : null;
-      
-      if (callingTurn) {
-        console.log('Paciente llamado detectado:', callingTurn);
-        const isNewCall = !lastCalledTurnId.current || 
-                         lastCalledTurnId.current !== callingTurn.id;
-        
-        if (isNewCall) {
-          console.log('Nuevo llamado - mostrando pantalla de video');
-          lastCalledTurnId.current = callingTurn.id;
-          setCurrentCallingTurn(callingTurn);
-          setDisplayAnnouncement(true);
-          
-          speakAnnouncement(callingTurn, callingTurn.cubicle?.name || 'Sin asignar');
-          
-          // El video se reproducirá automáticamente con autoPlay en el JSX
-          
-          if (audioRef.current) {
-            audioRef.current.currentTime = 0;
-            audioRef.current.play().catch(console.error);
-          }
-          
-          setTimeout(async () => {
-            console.log('Ocultando pantalla de llamado');
-            try {
-              await fetch('/api/queue_video/updateCall', {
-                method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ id: callingTurn.id, isCalled: true })
-              });
-            } catch (error) {
-              console.error('Error actualizando llamado:', error);
-            }
-            setDisplayAnnouncement(false);
-            setCurrentCallingTurn(null);
-          }, 15000);
-        }
-      }
+      applyQueueData(await response.json());
     } catch (error) {
       console.error('Error obteniendo datos:', error);
     }
-  }, [speakAnnouncement]);
+  }, [applyQueueData]);
 
-  // Polling de datos
-  useEffect(() => {
-    fetchQueueData();
-    const interval = setInterval(fetchQueueData, 3000);
-    return () => clearInterval(interval);
-  }, [fetchQueueData]);
+  // Cola en tiempo real por SSE; polling cada 3 s solo mientras el stream está caído
+  useQueueStream({ view: 'video', onSnapshot: applyQueueData, poll: fetchQueueData, pollInterval: 3000 });
 
   // Actualizar reloj
   useEffect(() => {
@@ -0,0 +1,11 @@
+-- Índice parcial para la cola activa (/api/queue/list, lib/queueEvents.js)
+-- Solo contiene turnos 'Pending' / 'In Progress', así que no crece con el
+-- histórico de turnos atendidos. Las columnas son las mismas expresiones del
+-- ORDER BY de loadQueueSnapshot(): prioridad y tiempo efectivo de cola.
+-- Prisma no puede declarar índices parciales ni de expresión en schema.prisma.
+
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "TurnRequest_active_queue_idx" ON "public"."TurnRequest"(
+  (CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END),
+  (COALESCE("deferredAt", "createdAt"))
+) WHERE "status" IN ('Pending', 'In Progress');
@@ -0,0 +1,198 @@
+-- Agregados del panel de administración (/api/admin/dashboard)
+--
+-- "DashboardAggregate" guarda contadores y sumas por (día, usuario, métrica).
+-- Lo mantienen triggers sobre "TurnRequest": cada cambio resta la contribución
+-- de las filas viejas y suma la de las nuevas, así que el dashboard lee los
+-- contadores del día en una consulta sin recorrer el histórico.
+--
+-- Solo cuentan las columnas de estado y tiempos: un UPDATE que no las cambia
+-- (holdings, heartbeats, datos del paciente) no dispara el trigger y no
+-- escribe en las filas de tiempo real, que todas las escrituras compartirían.
+-- Por eso "holding" no es un agregado: "pending" cuenta todos los turnos
+-- Pending y el dashboard cuenta en vivo los holdings vigentes (expiración
+-- perezosa, ver lib/holdingUtils.js).
+--
+-- - day = '1970-01-01': contadores en tiempo real (turnos activos sin filtro de fecha)
+-- - userId = 0: todo el laboratorio; userId > 0: flebotomista (attendedBy)
+-- - Los días son locales del laboratorio (America/Mexico_City); las columnas
+--   TIMESTAMP(3) de Prisma guardan UTC.
+
+-- CreateTable
+CREATE TABLE "public"."DashboardAggregate" (
+    "day" DATE NOT NULL,
+    "userId" INTEGER NOT NULL DEFAULT 0,
+    "metric" TEXT NOT NULL,
+    "value" DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    CONSTRAINT "DashboardAggregate_pkey" PRIMARY KEY ("day","userId","metric")
+);
+
+-- Día local del laboratorio para un timestamp UTC de Prisma
+CREATE OR REPLACE FUNCTION dashboard_local_day(ts TIMESTAMP) RETURNS DATE AS $$
+  SELECT ((ts AT TIME ZONE 'UTC') AT TIME ZONE 'America/Mexico_City')::date
+$$ LANGUAGE sql STABLE;
+
+-- Contribución de un turno a los agregados (sign = 1 al sumar, -1 al restar).
+-- Reproduce los filtros que tenía el dashboard:
+-- - pending/inCalling/inAttention: por día de createdAt y en tiempo real
+-- - attended/cancelled: por día de finishedAt
+-- - waitMinutes (calledAt - createdAt) y attentionMinutes (finishedAt - attendedAt):
+--   atendidos con calledAt y finishedAt, por día de createdAt
+-- - por flebotomista: atendidos y tomaMinutes (finishedAt - calledAt) por día de finishedAt
+CREATE OR REPLACE FUNCTION dashboard_turn_contribution(
+    sign INTEGER,
+    status TEXT,
+    created_at TIMESTAMP,
+    called_at TIMESTAMP,
+    attended_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    is_called BOOLEAN,
+    attended_by INTEGER
+) RETURNS TABLE ("day" DATE, "userId" INTEGER, "metric" TEXT, "value" DOUBLE PRECISION) AS $$
+DECLARE
+  realtime CONSTANT DATE := DATE '1970-01-01';
+  created DATE := dashboard_local_day(created_at);
+  finished DATE := dashboard_local_day(finished_at);
+  active TEXT;
+BEGIN
+  active := CASE
+    WHEN status = 'Pending' THEN 'pending'
+    WHEN status = 'In Progress' AND is_called THEN 'inAttention'
+    WHEN status = 'In Progress' THEN 'inCalling'
+  END;
+
+  IF active IS NOT NULL THEN
+    RETURN QUERY VALUES (realtime, 0, active, sign::float8), (created, 0, active, sign::float8);
+    RETURN;
+  END IF;
+
+  IF finished_at IS NULL OR status NOT IN ('Attended', 'Cancelled') THEN
+    RETURN;
+  END IF;
+
+  IF status = 'Cancelled' THEN
+    RETURN QUERY VALUES (finished, 0, 'cancelled', sign::float8);
+    RETURN;
+  END IF;
+
+  RETURN QUERY VALUES (finished, 0, 'attended', sign::float8);
+
+  IF attended_by IS NOT NULL THEN
+    RETURN QUERY VALUES (finished, attended_by, 'attended', sign::float8);
+  END IF;
+
+  IF called_at IS NOT NULL THEN
+    RETURN QUERY VALUES
+      (created, 0, 'waitCount', sign::float8),
+      (created, 0, 'waitMinutes', sign * EXTRACT(EPOCH FROM called_at - created_at)::float8 / 60);
+    IF attended_at IS NOT NULL THEN
+      RETURN QUERY VALUES
+        (created, 0, 'attentionCount', sign::float8),
+        (created, 0, 'attentionMinutes', sign * EXTRACT(EPOCH FROM finished_at - attended_at)::float8 / 60);
+    END IF;
+    IF attended_by IS NOT NULL THEN
+      RETURN QUERY VALUES
+        (finished, attended_by, 'tomaCount', sign::float8),
+        (finished, attended_by, 'tomaMinutes', sign * EXTRACT(EPOCH FROM finished_at - called_at)::float8 / 60);
+    END IF;
+  END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- INSERT / DELETE por sentencia (tablas de transición new_rows / old_rows):
+-- una carga masiva escribe cada agregado una vez
+CREATE OR REPLACE FUNCTION dashboard_aggregate_apply() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO "DashboardAggregate" AS a ("day", "userId", "metric", "value")
+    SELECT c."day", c."userId", c."metric", sum(c."value")
+    FROM new_rows r,
+      LATERAL dashboard_turn_contribution(1, r.status, r."createdAt", r."calledAt", r."attendedAt",
+                                          r."finishedAt", r."isCalled", r."attendedBy") c
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT ("day", "userId", "metric") DO UPDATE SET "value" = a."value" + EXCLUDED."value";
+  ELSE
+    INSERT INTO "DashboardAggregate" AS a ("day", "userId", "metric", "value")
+    SELECT c."day", c."userId", c."metric", sum(c."value")
+    FROM old_rows r,
+      LATERAL dashboard_turn_contribution(-1, r.status, r."createdAt", r."calledAt", r."attendedAt",
+                                          r."finishedAt", r."isCalled", r."attendedBy") c
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT ("day", "userId", "metric") DO UPDATE SET "value" = a."value" + EXCLUDED."value";
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- UPDATE por fila: resta la contribución de OLD y suma la de NEW. Las que se
+-- anulan no escriben, y las filas se bloquean en orden fijo para no provocar
+-- deadlocks entre dos turnos que cambian a la vez
+CREATE OR REPLACE FUNCTION dashboard_aggregate_apply_row() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO "DashboardAggregate" AS a ("day", "userId", "metric", "value")
+  SELECT c."day", c."userId", c."metric", sum(c."value")
+  FROM (
+    SELECT * FROM dashboard_turn_contribution(1, NEW.status, NEW."createdAt", NEW."calledAt", NEW."attendedAt",
+                                              NEW."finishedAt", NEW."isCalled", NEW."attendedBy")
+    UNION ALL
+    SELECT * FROM dashboard_turn_contribution(-1, OLD.status, OLD."createdAt", OLD."calledAt", OLD."attendedAt",
+                                              OLD."finishedAt", OLD."isCalled", OLD."attendedBy")
+  ) c
+  GROUP BY 1, 2, 3
+  HAVING sum(c."value") <> 0
+  ORDER BY 1, 2, 3
+  ON CONFLICT ("day", "userId", "metric") DO UPDATE SET "value" = a."value" + EXCLUDED."value";
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recalcula todos los agregados desde "TurnRequest" (carga inicial, o reparación
+-- después de cargas masivas con los triggers deshabilitados o TRUNCATE)
+CREATE OR REPLACE FUNCTION dashboard_aggregate_rebuild() RETURNS BIGINT AS $$
+DECLARE
+  inserted BIGINT;
+BEGIN
+  LOCK TABLE "TurnRequest" IN SHARE MODE;
+  DELETE FROM "DashboardAggregate";
+  INSERT INTO "DashboardAggregate" ("day", "userId", "metric", "value")
+  SELECT c."day", c."userId", c."metric", sum(c."value")
+  FROM "TurnRequest" r,
+    LATERAL dashboard_turn_contribution(1, r.status, r."createdAt", r."calledAt", r."attendedAt",
+                                        r."finishedAt", r."isCalled", r."attendedBy") c
+  GROUP BY 1, 2, 3;
+  GET DIAGNOSTICS inserted = ROW_COUNT;
+  RETURN inserted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- CreateTrigger (las tablas de transición exigen un trigger por evento)
+CREATE TRIGGER "TurnRequest_dashboard_insert"
+  AFTER INSERT ON "public"."TurnRequest"
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION dashboard_aggregate_apply();
+
+-- UPDATE OF con las columnas que entran en dashboard_turn_contribution, y WHEN
+-- para que alguna cambie de valor. PostgreSQL no permite tablas de transición
+-- en un trigger con lista de columnas, así que este es por fila
+CREATE TRIGGER "TurnRequest_dashboard_update"
+  AFTER UPDATE OF "status", "createdAt", "calledAt", "attendedAt", "finishedAt", "isCalled", "attendedBy"
+  ON "public"."TurnRequest"
+  FOR EACH ROW
+  WHEN (OLD."status" IS DISTINCT FROM NEW."status"
+     OR OLD."createdAt" IS DISTINCT FROM NEW."createdAt"
+     OR OLD."calledAt" IS DISTINCT FROM NEW."calledAt"
+     OR OLD."attendedAt" IS DISTINCT FROM NEW."attendedAt"
+     OR OLD."finishedAt" IS DISTINCT FROM NEW."finishedAt"
+     OR OLD."isCalled" IS DISTINCT FROM NEW."isCalled"
+     OR OLD."attendedBy" IS DISTINCT FROM NEW."attendedBy")
+  EXECUTE FUNCTION dashboard_aggregate_apply_row();
+
+CREATE TRIGGER "TurnRequest_dashboard_delete"
+  AFTER DELETE ON "public"."TurnRequest"
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION dashboard_aggregate_apply();
+
+-- Carga inicial
+SELECT dashboard_aggregate_rebuild();
@@ -0,0 +1,111 @@
+-- Rollups de estadísticas (/api/statistics/{monthly,daily,average-time,phlebotomists})
+--
+-- "StatsDailyRollup": turnos atendidos por día local (de finishedAt),
+-- flebotomista (attendedBy, 0 = sin asignar) y tipoAtencion, con la suma de
+-- duraciones. "StatsMonthlyRollup" es la misma suma por mes.
+-- "StatsRollupState" guarda hasta qué día están consolidadas: los días
+-- posteriores se calculan en vivo con stats_rollup_compute() (ver lib/statsRollup.js).
+--
+-- Los llena scripts/rollupStatistics.js (incremental cada noche, --backfill completo).
+
+-- CreateTable
+CREATE TABLE "public"."StatsDailyRollup" (
+    "day" DATE NOT NULL,
+    "userId" INTEGER NOT NULL,
+    "tipoAtencion" TEXT NOT NULL,
+    "attended" INTEGER NOT NULL,
+    "attentionMinutes" DOUBLE PRECISION NOT NULL,
+    "turnaroundMinutes" DOUBLE PRECISION NOT NULL,
+
+    CONSTRAINT "StatsDailyRollup_pkey" PRIMARY KEY ("day","userId","tipoAtencion")
+);
+
+-- CreateTable
+CREATE TABLE "public"."StatsMonthlyRollup" (
+    "month" DATE NOT NULL,
+    "userId" INTEGER NOT NULL,
+    "tipoAtencion" TEXT NOT NULL,
+    "attended" INTEGER NOT NULL,
+    "attentionMinutes" DOUBLE PRECISION NOT NULL,
+    "turnaroundMinutes" DOUBLE PRECISION NOT NULL,
+
+    CONSTRAINT "StatsMonthlyRollup_pkey" PRIMARY KEY ("month","userId","tipoAtencion")
+);
+
+-- CreateTable
+CREATE TABLE "public"."StatsRollupState" (
+    "name" TEXT NOT NULL,
+    "through" DATE NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "StatsRollupState_pkey" PRIMARY KEY ("name")
+);
+
+-- CreateIndex
+CREATE INDEX "StatsDailyRollup_userId_day_idx" ON "public"."StatsDailyRollup"("userId", "day");
+
+-- CreateIndex
+CREATE INDEX "StatsMonthlyRollup_userId_month_idx" ON "public"."StatsMonthlyRollup"("userId", "month");
+
+-- Mismas reglas que calculateDurationMinutes (lib/patientStatsUtils.js): sin
+-- fechas o negativa = 0, tope DURATION_CAP_MIN (240), redondeo a un decimal
+CREATE OR REPLACE FUNCTION stats_duration_minutes(start_at TIMESTAMP, end_at TIMESTAMP) RETURNS DOUBLE PRECISION AS $$
+  SELECT CASE
+    WHEN start_at IS NULL OR end_at IS NULL THEN 0
+    ELSE round(LEAST(GREATEST(EXTRACT(EPOCH FROM end_at - start_at)::numeric / 60, 0), 240), 1)::float8
+  END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Inicio de un día local del laboratorio como timestamp UTC (inverso de dashboard_local_day)
+CREATE OR REPLACE FUNCTION stats_day_start(d DATE) RETURNS TIMESTAMP AS $$
+  SELECT (d::timestamp AT TIME ZONE 'America/Mexico_City') AT TIME ZONE 'UTC'
+$$ LANGUAGE sql STABLE;
+
+-- Agregado diario directo de "TurnRequest" para [from_day, to_day]; usa el
+-- índice de finishedAt, así que el costo es proporcional al rango pedido
+-- - attentionMinutes: COALESCE(calledAt, createdAt) → finishedAt
+-- - turnaroundMinutes: createdAt → finishedAt
+CREATE OR REPLACE FUNCTION stats_rollup_compute(from_day DATE, to_day DATE)
+RETURNS TABLE ("day" DATE, "userId" INTEGER, "tipoAtencion" TEXT, "attended" INTEGER,
+               "attentionMinutes" DOUBLE PRECISION, "turnaroundMinutes" DOUBLE PRECISION) AS $$
+  SELECT dashboard_local_day(t."finishedAt"),
+         COALESCE(t."attendedBy", 0),
+         t."tipoAtencion",
+         count(*)::int,
+         sum(stats_duration_minutes(COALESCE(t."calledAt", t."createdAt"), t."finishedAt")),
+         sum(stats_duration_minutes(t."createdAt", t."finishedAt"))
+  FROM "TurnRequest" t
+  WHERE t.status = 'Attended'
+    AND t."finishedAt" >= stats_day_start(from_day)
+    AND t."finishedAt" < stats_day_start(to_day + 1)
+  GROUP BY 1, 2, 3
+$$ LANGUAGE sql STABLE;
+
+-- Consolida [from_day, to_day] (idempotente) y recalcula los meses tocados.
+-- Avanza la marca "daily" hasta to_day si es mayor que la actual.
+CREATE OR REPLACE FUNCTION stats_rollup_refresh(from_day DATE, to_day DATE) RETURNS INTEGER AS $$
+DECLARE
+  written INTEGER;
+  first_month DATE := date_trunc('month', from_day)::date;
+  last_month DATE := date_trunc('month', to_day)::date;
+BEGIN
+  DELETE FROM "StatsDailyRollup" WHERE "day" BETWEEN from_day AND to_day;
+  INSERT INTO "StatsDailyRollup" ("day", "userId", "tipoAtencion", "attended", "attentionMinutes", "turnaroundMinutes")
+  SELECT * FROM stats_rollup_compute(from_day, to_day);
+  GET DIAGNOSTICS written = ROW_COUNT;
+
+  DELETE FROM "StatsMonthlyRollup" WHERE "month" BETWEEN first_month AND last_month;
+  INSERT INTO "StatsMonthlyRollup" ("month", "userId", "tipoAtencion", "attended", "attentionMinutes", "turnaroundMinutes")
+  SELECT date_trunc('month', d."day")::date, d."userId", d."tipoAtencion",
+         sum(d."attended")::int, sum(d."attentionMinutes"), sum(d."turnaroundMinutes")
+  FROM "StatsDailyRollup" d
+  WHERE d."day" >= first_month AND d."day" < (last_month + interval '1 month')::date
+  GROUP BY 1, 2, 3;
+
+  INSERT INTO "StatsRollupState" ("name", "through", "updatedAt") VALUES ('daily', to_day, now())
+  ON CONFLICT ("name") DO UPDATE
+    SET "through" = GREATEST("StatsRollupState"."through", EXCLUDED."through"), "updatedAt" = now();
+
+  RETURN written;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,64 @@
+-- Conteos compartidos del rate limiter de /api/* (RATE_LIMIT_BACKEND=postgres)
+--
+-- Ventana deslizante aproximada, igual que MemoryStore en lib/rateLimit.js:
+-- conteo de la ventana actual + el de la anterior ponderado por lo que aún se
+-- traslapa. La tabla es UNLOGGED: los conteos son efímeros y no vale la pena
+-- escribirlos al WAL; tras un crash simplemente empiezan en cero.
+--
+-- La usa /api/internal/rate-limit, que llama el middleware.
+
+-- CreateTable
+CREATE UNLOGGED TABLE "public"."RateLimitCounter" (
+    "key" TEXT NOT NULL,
+    "window" BIGINT NOT NULL,
+    "count" INTEGER NOT NULL DEFAULT 0,
+
+    CONSTRAINT "RateLimitCounter_pkey" PRIMARY KEY ("key","window")
+);
+
+-- CreateIndex
+CREATE INDEX "RateLimitCounter_window_idx" ON "public"."RateLimitCounter"("window");
+
+-- Cuenta una petición de p_key si cabe en p_limit. El reloj es el de la base,
+-- así todos los procesos ven las mismas ventanas. El upsert bloquea la fila de
+-- la ventana actual, de modo que peticiones simultáneas de la misma clave se
+-- cuentan una tras otra.
+CREATE OR REPLACE FUNCTION rate_limit_hit(p_key TEXT, p_limit INTEGER, p_window_ms BIGINT)
+RETURNS TABLE (current_window BIGINT, is_allowed BOOLEAN, estimated DOUBLE PRECISION) AS $$
+DECLARE
+  now_ms BIGINT := floor(EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::bigint;
+  win BIGINT := now_ms / p_window_ms;
+  overlap DOUBLE PRECISION := 1 - (now_ms % p_window_ms)::float8 / p_window_ms;
+  previous_count INTEGER;
+  current_count INTEGER;
+  total DOUBLE PRECISION;
+BEGIN
+  SELECT r."count" INTO previous_count
+  FROM "RateLimitCounter" r
+  WHERE r."key" = p_key AND r."window" = win - 1;
+
+  INSERT INTO "RateLimitCounter" AS r ("key", "window", "count") VALUES (p_key, win, 0)
+  ON CONFLICT ("key", "window") DO UPDATE SET "count" = r."count"
+  RETURNING r."count" INTO current_count;
+
+  total := current_count + COALESCE(previous_count, 0) * overlap;
+  IF total >= p_limit THEN
+    RETURN QUERY SELECT win, false, total;
+    RETURN;
+  END IF;
+
+  UPDATE "RateLimitCounter" r SET "count" = r."count" + 1 WHERE r."key" = p_key AND r."window" = win;
+  RETURN QUERY SELECT win, true, total + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Descarta las ventanas que ya no cuentan (anteriores a la previa de current_window)
+CREATE OR REPLACE FUNCTION rate_limit_prune(current_window BIGINT) RETURNS INTEGER AS $$
+DECLARE
+  removed INTEGER;
+BEGIN
+  DELETE FROM "RateLimitCounter" WHERE "window" < current_window - 1;
+  GET DIAGNOSTICS removed = ROW_COUNT;
+  RETURN removed;
+END;
+$$ LANGUAGE plpgsql;
@@ -7,14 +7,22 @@ Versión mejorada que captura cada módulo específicamente
 """
 
 import os
-import time
+import sys
 import json
+import argparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
+# Harness compartido de tests/ (esperas adaptativas, sesiones, etc.)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+from harness.capture_cache import IncrementalCapture
+from harness.image_pipeline import DEFAULT_WORKERS, postprocess_screenshots, apply_to_metadata, print_savings
+from harness.session import restore_session
+from harness.waits import PageReadiness
+
 BASE_URL = "http://localhost:3005"
 SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/public/docs/screenshots"
 
@@ -22,19 +30,26 @@ SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/public/docs
 os.makedirs(SCREENSHOT_DIR, exist_ok=True)
 
 class ModuleScreenshotCapture:
-    def __init__(self):
+    def __init__(self, full=False, optimize=True, workers=DEFAULT_WORKERS, avif=False):
         options = Options()
         options.add_argument("--window-size=1920,1080")
         options.add_argument("--force-device-scale-factor=1")
         self.driver = webdriver.Chrome(options=options)
         self.wait = WebDriverWait(self.driver, 10)
+        self.readiness = PageReadiness(self.driver)
+        self.incremental = IncrementalCapture(SCREENSHOT_DIR, full=full)
+        self.optimize = optimize
+        self.workers = workers
+        self.avif = avif
         self.screenshots = []
 
     def login(self):
         """Login como admin"""
         print("🔐 Iniciando sesión...")
-        self.driver.get(f"{BASE_URL}/login")
-        time.sleep(2)
+        if restore_session(self.driver, "admin", "123"):
+            return
+
+        self.readiness.navigate(f"{BASE_URL}/login")
 
         # Login con admin/123
         username_field = self.driver.find_elements(By.TAG_NAME, "input")[0]
@@ -45,13 +60,15 @@ class ModuleScreenshotCapture:
 
         submit_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
         submit_btn.click()
-        time.sleep(3)
+        self.readiness.wait_for(lambda d: "/login" not in d.current_url, "login admin")
+        self.readiness.wait_ready("post-login")
         print("✅ Sesión iniciada")
 
     def capture(self, filename, name, description, tags, module_id):
         """Captura un screenshot con metadata"""
         filepath = os.path.join(SCREENSHOT_DIR, filename)
-        self.driver.save_screenshot(filepath)
+        # Si el DOM normalizado no cambió se conserva el PNG existente
+        changed = self.incremental.save(self.driver, filename, filepath)
 
         file_size = os.path.getsize(filepath)
         size_kb = file_size / 1024
@@ -66,13 +83,15 @@ class ModuleScreenshotCapture:
             'size': f"{size_kb:.1f} KB"
         })
 
-        print(f"  📸 {filename} ({size_kb:.1f} KB)")
+        if changed:
+            print(f"  📸 {filename} ({size_kb:.1f} KB)")
+        else:
+            print(f"  ⏭️  {filename} sin cambios ({size_kb:.1f} KB)")
 
     def capture_dashboard(self):
         """Captura del Dashboard Administrativo"""
         print("\n📊 Capturando Dashboard Administrativo...")
-        self.driver.get(f"{BASE_URL}/")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/")
 
         self.capture(
             "dashboard-main.png",
@@ -93,8 +112,7 @@ class ModuleScreenshotCapture:
     def capture_users(self):
         """Captura del Módulo de Usuarios"""
         print("\n👥 Capturando Gestión de Usuarios...")
-        self.driver.get(f"{BASE_URL}/users")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/users")
 
         self.capture(
             "users-list.png",
@@ -106,7 +124,7 @@ class ModuleScreenshotCapture:
 
         # Scroll para ver más usuarios
         self.driver.execute_script("window.scrollTo(0, 400)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "users-details.png",
@@ -119,8 +137,7 @@ class ModuleScreenshotCapture:
     def capture_atencion(self):
         """Captura del Módulo de Atención"""
         print("\n🩺 Capturando Módulo de Atención...")
-        self.driver.get(f"{BASE_URL}/turns/attention")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns/attention")
 
         self.capture(
             "atencion-main.png",
@@ -132,7 +149,7 @@ class ModuleScreenshotCapture:
 
         # Scroll para ver el sidebar
         self.driver.execute_script("window.scrollTo(0, 300)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "atencion-sidebar.png",
@@ -144,7 +161,7 @@ class ModuleScreenshotCapture:
 
         # Captura de botones de acción
         self.driver.execute_script("window.scrollTo(0, 0)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "atencion-actions.png",
@@ -157,8 +174,7 @@ class ModuleScreenshotCapture:
     def capture_cola(self):
         """Captura del Módulo de Cola"""
         print("\n📋 Capturando Gestión de Cola...")
-        self.driver.get(f"{BASE_URL}/turns/queue")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns/queue")
 
         self.capture(
             "cola-main.png",
@@ -170,7 +186,7 @@ class ModuleScreenshotCapture:
 
         # Scroll para ver más pacientes
         self.driver.execute_script("window.scrollTo(0, 400)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "cola-priority.png",
@@ -185,8 +201,7 @@ class ModuleScreenshotCapture:
         print("\n📈 Capturando Módulo de Estadísticas...")
 
         # Dashboard de estadísticas
-        self.driver.get(f"{BASE_URL}/statistics")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics")
         self.capture(
             "estadisticas-dashboard.png",
             "estadisticas-dashboard",
@@ -196,8 +211,7 @@ class ModuleScreenshotCapture:
         )
 
         # Estadísticas diarias
-        self.driver.get(f"{BASE_URL}/statistics/daily")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/daily")
         self.capture(
             "estadisticas-daily.png",
             "estadisticas-daily",
@@ -207,8 +221,7 @@ class ModuleScreenshotCapture:
         )
 
         # Estadísticas mensuales
-        self.driver.get(f"{BASE_URL}/statistics/monthly")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/monthly")
         self.capture(
             "estadisticas-monthly.png",
             "estadisticas-monthly",
@@ -218,8 +231,7 @@ class ModuleScreenshotCapture:
         )
 
         # Rendimiento de flebotomistas
-        self.driver.get(f"{BASE_URL}/statistics/phlebotomists")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/phlebotomists")
         self.capture(
             "estadisticas-phlebotomists.png",
             "estadisticas-phlebotomists",
@@ -229,8 +241,7 @@ class ModuleScreenshotCapture:
         )
 
         # Tiempo promedio
-        self.driver.get(f"{BASE_URL}/statistics/average-time")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/average-time")
         self.capture(
             "estadisticas-time.png",
             "estadisticas-time",
@@ -242,8 +253,7 @@ class ModuleScreenshotCapture:
     def capture_cubiculos(self):
         """Captura del Módulo de Cubículos"""
         print("\n🏥 Capturando Gestión de Cubículos...")
-        self.driver.get(f"{BASE_URL}/cubicles")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/cubicles")
 
         self.capture(
             "cubiculos-list.png",
@@ -255,7 +265,7 @@ class ModuleScreenshotCapture:
 
         # Scroll para ver más cubículos
         self.driver.execute_script("window.scrollTo(0, 300)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "cubiculos-types.png",
@@ -268,8 +278,7 @@ class ModuleScreenshotCapture:
     def capture_turnos(self):
         """Captura del Módulo de Turnos"""
         print("\n🎫 Capturando Creación de Turnos...")
-        self.driver.get(f"{BASE_URL}/turns")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns")
 
         self.capture(
             "turnos-form.png",
@@ -281,7 +290,7 @@ class ModuleScreenshotCapture:
 
         # Scroll para ver campos completos
         self.driver.execute_script("window.scrollTo(0, 400)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "turnos-details.png",
@@ -291,6 +300,17 @@ class ModuleScreenshotCapture:
             "turnos"
         )
 
+    def postprocess(self):
+        """Recomprime los PNG y genera variantes WebP/miniaturas en paralelo"""
+        if not self.optimize:
+            return
+        print("\n🗜️  Optimizando screenshots...")
+        results = postprocess_screenshots(
+            SCREENSHOT_DIR, [s['filename'] for s in self.screenshots], workers=self.workers, avif=self.avif
+        )
+        apply_to_metadata(self.screenshots, results)
+        print_savings(results)
+
     def save_metadata(self):
         """Guarda metadata de screenshots"""
         metadata_file = os.path.join(SCREENSHOT_DIR, "screenshots-metadata.json")
@@ -312,13 +332,15 @@ class ModuleScreenshotCapture:
             self.capture_cubiculos()
             self.capture_turnos()
 
-            # Guardar metadata
+            # Variantes optimizadas, metadata y manifiesto de hashes
+            self.postprocess()
             self.save_metadata()
+            captured, skipped = self.incremental.finish()
 
             # Resumen
             total_size = sum(float(s['size'].replace(' KB', '')) for s in self.screenshots)
             print(f"\n✅ Captura completada!")
-            print(f"📊 Total screenshots: {len(self.screenshots)}")
+            print(f"📊 Total screenshots: {len(self.screenshots)} ({captured} capturados, {skipped} sin cambios)")
             print(f"💾 Tamaño total: {total_size:.1f} KB ({total_size/1024:.2f} MB)")
 
             # Resumen por módulo
@@ -331,14 +353,27 @@ class ModuleScreenshotCapture:
             for module, count in sorted(modules.items()):
                 print(f"  • {module}: {count} screenshots")
 
+            self.readiness.print_summary()
+
         finally:
             self.driver.quit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Captura screenshots de todos los módulos")
+    parser.add_argument("--full", action="store_true",
+                        help="Recapturar todo aunque el contenido de la página no haya cambiado")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="No recomprimir ni generar variantes WebP/miniaturas")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Procesos para el post-procesamiento")
+    parser.add_argument("--avif", action="store_true", help="Generar también variantes AVIF (si Pillow lo soporta)")
+    args = parser.parse_args()
+
     print("🚀 Iniciando captura de screenshots de todos los módulos...")
     print(f"📂 Guardando en: {SCREENSHOT_DIR}\n")
 
-    capturer = ModuleScreenshotCapture()
+    capturer = ModuleScreenshotCapture(
+        full=args.full, optimize=not args.no_optimize, workers=args.workers, avif=args.avif
+    )
     capturer.run()
 
     print("\n🎉 ¡Proceso completado!")
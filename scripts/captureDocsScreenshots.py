@@ -3,8 +3,9 @@
 Script para capturar screenshots de toda la aplicación y generar documentación
 con Selenium + inserción automática en la base de datos
 """
-import time
 import os
+import sys
+import argparse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -13,11 +14,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 
+# Harness compartido de tests/ (esperas adaptativas, sesiones, etc.)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+from harness.capture_cache import IncrementalCapture
+from harness.image_pipeline import DEFAULT_WORKERS, postprocess_screenshots, apply_to_metadata, print_savings
+from harness.session import restore_session
+from harness.waits import PageReadiness
+
 BASE_URL = "http://localhost:3005"
 SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/public/docs/screenshots"
 
 class DocsScreenshotCapture:
-    def __init__(self):
+    def __init__(self, full=False, optimize=True, workers=DEFAULT_WORKERS, avif=False):
         os.makedirs(SCREENSHOT_DIR, exist_ok=True)
 
         chrome_options = Options()
@@ -26,6 +34,11 @@ class DocsScreenshotCapture:
 
         self.driver = webdriver.Chrome(options=chrome_options)
         self.wait = WebDriverWait(self.driver, 15)
+        self.readiness = PageReadiness(self.driver)
+        self.incremental = IncrementalCapture(SCREENSHOT_DIR, full=full)
+        self.optimize = optimize
+        self.workers = workers
+        self.avif = avif
         self.screenshots = []
 
         print("🎬 Iniciando captura de screenshots para documentación...")
@@ -33,8 +46,10 @@ class DocsScreenshotCapture:
     def login(self):
         """Login como admin"""
         print("\n🔐 Login como admin...")
-        self.driver.get(f"{BASE_URL}/login")
-        time.sleep(2)
+        if restore_session(self.driver, "admin", "123"):
+            return
+
+        self.readiness.navigate(f"{BASE_URL}/login")
 
         username = self.driver.find_elements(By.TAG_NAME, "input")[0]
         password = self.driver.find_elements(By.TAG_NAME, "input")[1]
@@ -44,14 +59,15 @@ class DocsScreenshotCapture:
 
         submit = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
         submit.click()
-        time.sleep(3)
+        self.readiness.wait_for(lambda d: "/login" not in d.current_url, "login admin")
+        self.readiness.wait_ready("post-login")
         print("✅ Login exitoso")
 
     def capture(self, name, description, tags=[]):
         """Captura un screenshot"""
         filename = f"{name}.png"
         filepath = os.path.join(SCREENSHOT_DIR, filename)
-        self.driver.save_screenshot(filepath)
+        changed = self.incremental.save(self.driver, filename, filepath)
 
         self.screenshots.append({
             'filename': filename,
@@ -61,14 +77,12 @@ class DocsScreenshotCapture:
             'path': f"/docs/screenshots/{filename}"
         })
 
-        print(f"  📸 {filename}")
-        time.sleep(1)
+        print(f"  📸 {filename}" if changed else f"  ⏭️  {filename} sin cambios")
 
     def capture_dashboard(self):
         """Captura el dashboard administrativo"""
         print("\n📊 Capturando Dashboard Administrativo...")
-        self.driver.get(f"{BASE_URL}/")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/")
 
         self.capture(
             "admin-dashboard-overview",
@@ -79,8 +93,7 @@ class DocsScreenshotCapture:
     def capture_users(self):
         """Captura gestión de usuarios"""
         print("\n👥 Capturando Gestión de Usuarios...")
-        self.driver.get(f"{BASE_URL}/users")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/users")
 
         self.capture(
             "admin-users-list",
@@ -90,7 +103,7 @@ class DocsScreenshotCapture:
 
         # Scroll para ver más contenido
         self.driver.execute_script("window.scrollTo(0, 500)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "admin-users-details",
@@ -101,8 +114,7 @@ class DocsScreenshotCapture:
     def capture_cubicles(self):
         """Captura gestión de cubículos"""
         print("\n🏥 Capturando Gestión de Cubículos...")
-        self.driver.get(f"{BASE_URL}/cubicles")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/cubicles")
 
         self.capture(
             "admin-cubicles-list",
@@ -113,8 +125,7 @@ class DocsScreenshotCapture:
     def capture_queue(self):
         """Captura cola pública"""
         print("\n📋 Capturando Cola Pública...")
-        self.driver.get(f"{BASE_URL}/turns/queue")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns/queue")
 
         self.capture(
             "queue-public-view",
@@ -125,8 +136,7 @@ class DocsScreenshotCapture:
     def capture_attention(self):
         """Captura página de atención"""
         print("\n🏥 Capturando Página de Atención...")
-        self.driver.get(f"{BASE_URL}/turns/attention")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns/attention")
 
         self.capture(
             "attention-interface",
@@ -136,7 +146,7 @@ class DocsScreenshotCapture:
 
         # Scroll para ver sidebar
         self.driver.execute_script("window.scrollTo(0, 300)")
-        time.sleep(1)
+        self.readiness.wait_ready("scroll")
 
         self.capture(
             "attention-patients-sidebar",
@@ -149,8 +159,7 @@ class DocsScreenshotCapture:
         print("\n📊 Capturando Estadísticas...")
 
         # Dashboard de estadísticas
-        self.driver.get(f"{BASE_URL}/statistics")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics")
         self.capture(
             "statistics-dashboard",
             "Dashboard principal de estadísticas con métricas generales",
@@ -158,8 +167,7 @@ class DocsScreenshotCapture:
         )
 
         # Estadísticas diarias
-        self.driver.get(f"{BASE_URL}/statistics/daily")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/daily")
         self.capture(
             "statistics-daily",
             "Estadísticas diarias mostrando pacientes atendidos por día",
@@ -167,8 +175,7 @@ class DocsScreenshotCapture:
         )
 
         # Estadísticas mensuales
-        self.driver.get(f"{BASE_URL}/statistics/monthly")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/monthly")
         self.capture(
             "statistics-monthly",
             "Estadísticas mensuales con comparativas y tendencias",
@@ -176,8 +183,7 @@ class DocsScreenshotCapture:
         )
 
         # Rendimiento de flebotomistas
-        self.driver.get(f"{BASE_URL}/statistics/phlebotomists")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/phlebotomists")
         self.capture(
             "statistics-phlebotomists",
             "Rendimiento individual de flebotomistas con métricas de productividad",
@@ -185,8 +191,7 @@ class DocsScreenshotCapture:
         )
 
         # Tiempo promedio
-        self.driver.get(f"{BASE_URL}/statistics/average-time")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/statistics/average-time")
         self.capture(
             "statistics-time",
             "Análisis de tiempo promedio de atención por paciente",
@@ -196,8 +201,7 @@ class DocsScreenshotCapture:
     def capture_turns_creation(self):
         """Captura creación de turnos"""
         print("\n🎫 Capturando Creación de Turnos...")
-        self.driver.get(f"{BASE_URL}/turns")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns")
 
         self.capture(
             "turns-creation-form",
@@ -205,6 +209,17 @@ class DocsScreenshotCapture:
             ["turnos", "crear", "formulario"]
         )
 
+    def postprocess(self):
+        """Recomprime los PNG y genera variantes WebP/miniaturas en paralelo"""
+        if not self.optimize:
+            return
+        print("\n🗜️  Optimizando screenshots...")
+        results = postprocess_screenshots(
+            SCREENSHOT_DIR, [s['filename'] for s in self.screenshots], workers=self.workers, avif=self.avif
+        )
+        apply_to_metadata(self.screenshots, results)
+        print_savings(results)
+
     def run_capture(self):
         """Ejecuta todas las capturas"""
         try:
@@ -218,7 +233,11 @@ class DocsScreenshotCapture:
             self.capture_statistics()
             self.capture_turns_creation()
 
-            print(f"\n✅ Capturas completadas: {len(self.screenshots)} screenshots")
+            captured, skipped = self.incremental.finish()
+            print(f"\n✅ Capturas completadas: {len(self.screenshots)} screenshots "
+                  f"({captured} capturados, {skipped} sin cambios)")
+
+            self.postprocess()
 
             # Generar archivo JSON con metadata
             import json
@@ -236,14 +255,25 @@ class DocsScreenshotCapture:
                 print(f"    Tags: {', '.join(ss['tags'])}")
                 print()
 
-            time.sleep(3)
+            self.readiness.print_summary()
 
         finally:
             self.driver.quit()
             print("✅ Navegador cerrado")
 
 def main():
-    capturer = DocsScreenshotCapture()
+    parser = argparse.ArgumentParser(description="Captura screenshots para la documentación")
+    parser.add_argument("--full", action="store_true",
+                        help="Recapturar todo aunque el contenido de la página no haya cambiado")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="No recomprimir ni generar variantes WebP/miniaturas")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Procesos para el post-procesamiento")
+    parser.add_argument("--avif", action="store_true", help="Generar también variantes AVIF (si Pillow lo soporta)")
+    args = parser.parse_args()
+
+    capturer = DocsScreenshotCapture(
+        full=args.full, optimize=not args.no_optimize, workers=args.workers, avif=args.avif
+    )
     capturer.run_capture()
 
 if __name__ == "__main__":
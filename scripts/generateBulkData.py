@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Generador masivo de datos sintéticos para benchmarks de estadísticas
+
+Genera años de operación de toma de muestras y los carga con COPY directo a
+PostgreSQL (sin Prisma, sin inserts fila por fila), respetando el schema:
+- TurnRequest con studies/studies_json estructurados, tubesDetails,
+  samplesGenerated, mezcla de tipoAtencion (y codigo_atencion de LABSIS),
+  llamados repetidos, tomas diferidas, cancelaciones y asignación de
+  flebotomista/cubículo por jornada
+- AuditLog: LOGIN de cada flebotomista por jornada y acciones ADMIN_* sobre turnos
+- Session: una sesión por flebotomista por jornada con su cubículo
+
+Con --live N el día de hoy queda además con N turnos en curso (Pending con
+holding, diferidos, In Progress) para medir las rutas de cola.
+
+Las filas generadas quedan marcadas (labsisOrderId 'BULK-*', ipAddress /
+userAgent 'bulk-generator') y se pueden borrar con --clean.
+
+ATENCIÓN: escribe en la base de DATABASE_URL. Usar una base de benchmark.
+
+Uso:
+    python3 scripts/generateBulkData.py --years 3 --per-day 450
+    python3 scripts/generateBulkData.py --years 5 --per-day 900 --live 120 --seed 7
+    python3 scripts/generateBulkData.py --years 1 --output-dir /tmp/bulk   # CSV + load.sql para psql
+    python3 scripts/generateBulkData.py --clean
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import random
+import secrets
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+# Harness compartido de tests/ (esperas adaptativas, sesiones, etc.)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+from harness.console import print_header, print_success, print_error, print_info
+from harness.pg import DatabaseError, connect, copy_rows, driver_available
+
+MARKER = 'bulk-generator'
+ORDER_PREFIX = 'BULK-'
+BATCH_ROWS = 50000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+TURN_COLUMNS = [
+    'id', 'patientName', 'age', 'gender', 'contactInfo', 'studies', 'studies_json', 'tubesRequired',
+    'tubesDetails', 'observations', 'clinicalInfo', 'status', 'createdAt', 'updatedAt', 'assignedTurn',
+    'attendedAt', 'attendedBy', 'calledAt', 'tipoAtencion', 'cubicleId', 'isCalled', 'finishedAt',
+    'callCount', 'isDeferred', 'deferredAt', 'suggestedFor', 'suggestedAt', 'holdingBy', 'holdingAt',
+    'labsisOrderId', 'samplesGenerated', 'patient_id', 'work_order', 'codigo_atencion',
+]
+AUDIT_COLUMNS = ['userId', 'action', 'entity', 'entityId', 'oldValue', 'newValue', 'ipAddress', 'createdAt']
+SESSION_COLUMNS = ['userId', 'token', 'ipAddress', 'userAgent', 'createdAt', 'expiresAt', 'lastActivity',
+                   'refreshToken', 'selectedCubicleId']
+
+FIRST_NAMES_F = ['María', 'Ana', 'Luisa', 'Carmen', 'Elena', 'Isabel', 'Rosa', 'Guadalupe', 'Patricia',
+                 'Teresa', 'Beatriz', 'Gloria', 'Leticia', 'Verónica', 'Alejandra', 'Sofía', 'Fernanda']
+FIRST_NAMES_M = ['José', 'Carlos', 'Miguel', 'Francisco', 'Antonio', 'Manuel', 'Juan', 'Javier', 'Rafael',
+                 'Alejandro', 'Fernando', 'Roberto', 'Eduardo', 'Sergio', 'Raúl', 'Jorge', 'Luis']
+LAST_NAMES = ['García', 'González', 'Rodríguez', 'Hernández', 'López', 'Martínez', 'Sánchez', 'Pérez',
+              'Gómez', 'Jiménez', 'Ruiz', 'Díaz', 'Moreno', 'Álvarez', 'Romero', 'Torres', 'Ramírez',
+              'Flores', 'Cruz', 'Reyes', 'Morales', 'Ortiz', 'Vázquez', 'Castillo', 'Mendoza', 'Aguilar']
+
+# (id, code, name, category, tubo del catálogo INER, tipo de muestra)
+STUDIES = [
+    (101, 'BH', 'Biometría Hemática Completa', 'Hematología', 'mor', 'Sangre total'),
+    (102, 'QS24', 'Química Sanguínea 24 elementos', 'Química clínica', 'morq', 'Suero'),
+    (103, 'GLU', 'Glucosa en ayunas', 'Química clínica', 'morq', 'Suero'),
+    (104, 'HBA1C', 'Hemoglobina Glicosilada', 'Química clínica', 'mor', 'Sangre total'),
+    (105, 'PL', 'Perfil Lipídico', 'Química clínica', 'morq', 'Suero'),
+    (106, 'PFH', 'Pruebas de Función Hepática', 'Química clínica', 'morq', 'Suero'),
+    (107, 'PT', 'Perfil Tiroideo', 'Hormonas', 'morq', 'Suero'),
+    (108, 'TP', 'Tiempo de Protrombina', 'Coagulación', 'azul', 'Plasma citratado'),
+    (109, 'TTP', 'Tiempo de Tromboplastina Parcial', 'Coagulación', 'azul', 'Plasma citratado'),
+    (110, 'DD', 'Dímero D', 'Coagulación', 'azul', 'Plasma citratado'),
+    (111, 'EGO', 'Examen General de Orina', 'Uroanálisis', 'ego', 'Orina'),
+    (112, 'UROC', 'Urocultivo', 'Microbiología', 'est', 'Orina'),
+    (113, 'PCR', 'Proteína C Reactiva', 'Inmunología', 'rojo', 'Suero'),
+    (114, 'VIH', 'VIH 1 y 2', 'Serología', 'rojo', 'Suero'),
+    (115, 'VITD', 'Vitamina D 25-OH', 'Hormonas', 'vitd', 'Suero'),
+    (116, 'B12', 'Vitamina B12', 'Hormonas', 'b12', 'Suero'),
+    (117, 'PTH', 'Paratohormona', 'Hormonas', 'pth', 'Plasma EDTA'),
+    (118, 'NH3', 'Amonio', 'Química clínica', 'amoni', 'Plasma'),
+    (119, 'GASO', 'Gasometría Arterial', 'Gases', 'verd', 'Sangre arterial'),
+    (120, 'DEP24', 'Depuración de Creatinina 24 h', 'Uroanálisis', 'co24h', 'Orina de 24 horas'),
+]
+# Frecuencia relativa de cada estudio (BH, química y glucosa dominan)
+STUDY_WEIGHTS = [22, 16, 12, 7, 9, 6, 6, 4, 3, 2, 10, 3, 4, 2, 2, 2, 1, 1, 1, 1]
+
+TUBES = {
+    'mor': ('Tubo Tapa Lila', 'Lila/Morado'),
+    'morq': ('Tubo Tapa Amarilla', 'Amarillo'),
+    'azul': ('Tubo Tapa Azul', 'Azul'),
+    'ego': ('Frasco EGO', 'Transparente'),
+    'est': ('Recipiente Estéril', 'Azul claro'),
+    'rojo': ('Tubo Tapa Roja', 'Rojo'),
+    'vitd': ('Tubo Vitamina D', 'Amarillo'),
+    'b12': ('Tubo Vitamina B12', 'Rojo'),
+    'pth': ('Tubo PTH', 'Lila/Morado'),
+    'amoni': ('Tubo Amonio (en hielo)', 'Verde'),
+    'verd': ('Tubo Tapa Verde', 'Verde'),
+    'co24h': ('Contenedor Orina 24 h', 'Ámbar'),
+}
+
+# tipoAtencion canónico → (peso, códigos de LABSIS que lo producen)
+TIPOS_ATENCION = [
+    ('General', 82, ['NO', '3ra Edad']),
+    ('Prioritario', 11, ['Oxígeno Dependientes', 'En Camilla', 'Menor de 1 Año', 'Discapacidad psicosocial']),
+    ('RiesgoCaida', 4, ['Riesgo de caida']),
+    ('PrioritarioRiesgo', 2, ['PRIESGO']),
+    ('MuyEspecial', 1, ['PPL']),
+]
+
+# Llegadas por hora desde las 7:00 (pico al abrir)
+ARRIVALS_BY_HOUR = [0.22, 0.19, 0.15, 0.12, 0.10, 0.09, 0.07, 0.06]
+
+# Tiempo de servicio (scripts/simulate-real-attention.js): 70% 5-10, 20% 10-15, 10% 15-20 min
+SERVICE_TIMES = [(0.70, 5, 10), (0.20, 10, 15), (0.10, 15, 20)]
+ANOMALY_RATE = 0.003       # turnos olvidados abiertos (> DURATION_CAP_MIN de lib/patientStatsUtils.js)
+CANCEL_RATE = 0.03
+DEFER_RATE = 0.04
+ADMIN_ACTION_RATE = 0.01
+SEASONAL = [1.15, 1.10, 1.05, 1.02, 1.00, 0.90, 0.85, 0.88, 1.08, 1.12, 1.06, 0.80]
+
+
+def ts(value):
+    return value.isoformat(' ', 'milliseconds') if value else None
+
+
+def js(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')) if value is not None else None
+
+
+def boolean(value):
+    return 't' if value else 'f'
+
+
+class CsvBuffer:
+    """Filas CSV acumuladas para un COPY; None se escribe como NULL (campo vacío sin comillas)"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+        self.rows = 0
+
+    def add(self, row):
+        self.writer.writerow(row)
+        self.rows += 1
+
+    def take(self):
+        text = self.buffer.getvalue()
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+        count, self.rows = self.rows, 0
+        return text, count
+
+
+class Generator:
+    """Genera jornadas completas a partir de los flebotomistas y cubículos existentes"""
+
+    def __init__(self, rng, phlebotomists, cubicles, admin_id, utc_offset):
+        self.rng = rng
+        self.phlebotomists = phlebotomists
+        self.cubicles = cubicles
+        self.special_cubicles = [c for c, special in cubicles if special] or [cubicles[-1][0]]
+        self.general_cubicles = [c for c, special in cubicles if not special] or [c for c, _ in cubicles]
+        self.admin_id = admin_id
+        self.offset = timedelta(hours=-utc_offset)
+        self.tipo_names = [t[0] for t in TIPOS_ATENCION]
+        self.tipo_weights = [t[1] for t in TIPOS_ATENCION]
+        self.tipo_codes = {t[0]: t[2] for t in TIPOS_ATENCION}
+        self._study_cache = {}
+
+    def utc(self, local):
+        return local + self.offset
+
+    def roster(self):
+        """Flebotomistas de la jornada, cada uno en un cubículo (los especiales primero al MuyEspecial)"""
+        count = min(len(self.phlebotomists), max(1, round(len(self.phlebotomists) * self.rng.uniform(0.7, 1.0))))
+        people = self.rng.sample(self.phlebotomists, count)
+        cubicles = self.general_cubicles + self.special_cubicles
+        return [(user, cubicles[i % len(cubicles)]) for i, user in enumerate(people)]
+
+    def patient(self):
+        female = self.rng.random() < 0.56
+        first = self.rng.choice(FIRST_NAMES_F if female else FIRST_NAMES_M)
+        name = f"{first} {self.rng.choice(LAST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+        age = min(95, max(0, int(self.rng.gauss(52, 17))))
+        return name, age, 'Femenino' if female else 'Masculino'
+
+    def studies(self):
+        """
+        Combinación de estudios ya serializada: (studies_json, legacy, tubesDetails,
+        tubesRequired, samplesGenerated con TURN_ID por reemplazar). Se cachea por
+        combinación porque serializar JSON es lo más caro de cada fila
+        """
+        count = 1 if self.rng.random() < 0.45 else self.rng.randint(2, 6)
+        picked = {}
+        for study in self.rng.choices(STUDIES, weights=STUDY_WEIGHTS, k=count):
+            picked[study[0]] = study
+        key = tuple(picked)
+        if key not in self._study_cache:
+            self._study_cache[key] = self._serialize_studies(picked.values())
+        return self._study_cache[key]
+
+    def _serialize_studies(self, picked):
+        structured = []
+        for study_id, code, name, category, tube, sample in picked:
+            tube_name, color = TUBES[tube]
+            structured.append({
+                'id': study_id, 'code': code, 'name': name, 'category': category,
+                'container': {'id': tube, 'type': tube_name, 'name': tube_name, 'color': color},
+                'sample': {'type': sample},
+            })
+        by_tube = {}
+        for study in structured:
+            by_tube.setdefault(study['container']['id'], []).append(study)
+        tubes = [{'type': tube, 'quantity': len(studies)} for tube, studies in by_tube.items()]
+        samples = [{
+            'correlative': i + 1,
+            'barcode': f"TURN_ID{i + 1:02d}",
+            'container': {'id': tube, 'type': TUBES[tube][0], 'color': TUBES[tube][1]},
+            'studiesInTube': [{'id': s['id'], 'name': s['name']} for s in studies],
+        } for i, (tube, studies) in enumerate(by_tube.items())]
+        return js(structured), js([s['name'] for s in structured]), js(tubes), len(structured), js(samples)
+
+    def service_minutes(self):
+        if self.rng.random() < ANOMALY_RATE:
+            return self.rng.uniform(300, 900)
+        roll = self.rng.random()
+        for probability, low, high in SERVICE_TIMES:
+            if roll < probability:
+                return self.rng.uniform(low, high)
+            roll -= probability
+        return self.rng.uniform(15, 20)
+
+    def arrival(self, day):
+        hour = self.rng.choices(range(len(ARRIVALS_BY_HOUR)), weights=ARRIVALS_BY_HOUR)[0]
+        return datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=7 + hour, seconds=self.rng.uniform(0, 3600))
+
+    def day(self, day, count, first_id, live=False, now=None):
+        """
+        Filas (turnos, auditoría, sesiones) de una jornada
+        Con live=True los turnos posteriores a `now` quedan en cola/holding/atención
+        """
+        roster = self.roster()
+        arrivals = sorted(self.arrival(day) for _ in range(count))
+        turns, audits, sessions = [], [], []
+        stamp = day.strftime('%y%m%d')
+        busy_until = {user: None for user, _ in roster}
+        holding_free = [user for user, _ in roster]
+
+        for user, cubicle in roster:
+            login = self.utc(datetime.combine(day, datetime.min.time()) + timedelta(hours=6, minutes=self.rng.randint(40, 59)))
+            ip = f"10.10.{cubicle % 255}.{self.rng.randint(2, 250)}"
+            audits.append((user, 'LOGIN', 'User', user, None, js({'cubicleId': cubicle}), MARKER, ts(login)))
+            last_activity = min(now, self.utc(datetime.combine(day, datetime.min.time()) + timedelta(hours=15, minutes=30))) if live \
+                else self.utc(datetime.combine(day, datetime.min.time()) + timedelta(hours=15, minutes=self.rng.randint(0, 59)))
+            sessions.append((user, f"bulk-{secrets.token_hex(24)}", ip, MARKER, ts(login), ts(login + timedelta(hours=8)),
+                             ts(last_activity), secrets.token_hex(32), cubicle))
+
+        for seq, created_local in enumerate(arrivals, start=1):
+            turn_id = first_id + seq - 1
+            created = self.utc(created_local)
+            name, age, gender = self.patient()
+            studies_json, legacy_json, tubes_json, tubes_required, samples_json = self.studies()
+            tipo = self.rng.choices(self.tipo_names, weights=self.tipo_weights)[0]
+            skips_line = tipo in ('Prioritario', 'PrioritarioRiesgo', 'MuyEspecial')
+
+            if tipo == 'MuyEspecial':
+                candidates = [(u, c) for u, c in roster if c in self.special_cubicles] or roster
+            elif tipo in ('RiesgoCaida', 'PrioritarioRiesgo'):
+                candidates = [(u, c) for u, c in roster if c in self.general_cubicles[:2]] or roster
+            else:
+                candidates = roster
+            user, cubicle = self.rng.choice(candidates)
+
+            wait = self.rng.uniform(2, 15) if skips_line else self.rng.uniform(5, 55)
+            called = created + timedelta(minutes=wait)
+            if busy_until[user] and called < busy_until[user]:
+                called = busy_until[user] + timedelta(seconds=self.rng.uniform(20, 120))
+            attended = called + timedelta(minutes=self.rng.uniform(0.5, 4))
+            finished = attended + timedelta(minutes=self.service_minutes())
+
+            call_count = self.rng.choices([1, 2, 3], weights=[85, 12, 3])[0]
+            deferred = self.rng.random() < DEFER_RATE
+            deferred_at = None
+            if deferred:
+                call_count = max(call_count, 2)
+                deferred_at = called + timedelta(minutes=self.rng.uniform(1, 3))
+                attended = deferred_at + timedelta(minutes=self.rng.uniform(3, 25))
+                finished = attended + timedelta(minutes=self.service_minutes())
+
+            status, is_called = 'Attended', True
+            holding_by = holding_at = suggested_for = suggested_at = None
+            if live and created > now:
+                # Turno aún en cola: en holding del primer flebotomista libre, o pendiente
+                created = now - timedelta(minutes=self.rng.uniform(0, 45))
+                status, is_called, call_count = 'Pending', False, 0
+                attended = finished = called = None
+                if deferred:
+                    is_called, call_count = True, 2
+                    called = created + timedelta(minutes=1)
+                    deferred_at = min(now, called + timedelta(minutes=2))
+                if holding_free and self.rng.random() < 0.3:
+                    holding_by = suggested_for = holding_free.pop()
+                    holding_at = suggested_at = now - timedelta(minutes=self.rng.uniform(0, 4))
+            elif live and finished > now:
+                status, finished = 'In Progress', None
+                attended = min(attended, now)
+                called = min(called, attended)
+                deferred_at = min(deferred_at, called) if deferred_at else None
+            elif self.rng.random() < CANCEL_RATE:
+                status, attended, finished = 'Cancelled', None, None
+                is_called = self.rng.random() < 0.5
+                called = called if is_called else None
+                call_count = call_count if is_called else 0
+
+            if finished:
+                busy_until[user] = finished
+            updated = finished or attended or called or created
+            # 10% en formato legacy (array de nombres), sin contenedores ni muestras de LABSIS
+            legacy = self.rng.random() < 0.1
+            studies_text = legacy_json if legacy else studies_json
+            turns.append((
+                turn_id, name, age, gender, f"55{self.rng.randint(10000000, 99999999)}",
+                studies_text, studies_text, tubes_required, tubes_json,
+                'Paciente en ayunas' if self.rng.random() < 0.3 else None,
+                self.rng.choice(['Diabetes tipo 2', 'Hipertensión arterial', 'EPOC', 'Asma']) if self.rng.random() < 0.15 else None,
+                status, ts(created), ts(updated), seq,
+                ts(attended), user if status in ('Attended', 'In Progress') else None, ts(called), tipo,
+                cubicle if is_called else None, boolean(is_called), ts(finished), call_count,
+                boolean(deferred), ts(deferred_at), suggested_for, ts(suggested_at), holding_by, ts(holding_at),
+                f"{ORDER_PREFIX}{turn_id}",
+                samples_json.replace('TURN_ID', f"{turn_id:09d}") if not legacy and self.rng.random() < 0.7 else None,
+                f"EXP{self.rng.randint(100000, 999999)}", f"OT{stamp}{seq:04d}",
+                self.rng.choice(self.tipo_codes[tipo]),
+            ))
+
+            if self.rng.random() < ADMIN_ACTION_RATE or status == 'Cancelled':
+                action = 'ADMIN_CANCEL_TURN' if status == 'Cancelled' else self.rng.choice([
+                    'ADMIN_REASSIGN_CUBICLE', 'ADMIN_CHANGE_PRIORITY', 'ADMIN_RELEASE_HOLDING',
+                    'ADMIN_RETURN_TO_QUEUE', 'ADMIN_REASSIGN_PHLEBOTOMIST'])
+                audits.append((self.admin_id, action, 'TurnRequest', turn_id, js({'status': 'Pending'}),
+                               js({'status': status, 'reason': 'Generado para benchmark'}), MARKER,
+                               ts(updated + timedelta(seconds=5))))
+
+        return turns, audits, sessions
+
+
+def generate_block(config, block):
+    """
+    Genera un bloque de jornadas en un proceso del pool y lo devuelve como CSV
+    @param {list} block - [(fecha, turnos, primer id)]
+    @returns {dict} {tabla: (texto CSV, filas)}
+    """
+    seed, phlebotomists, cubicles, admin_id, utc_offset, live_day, now = config
+    generator = Generator(random.Random(), phlebotomists, cubicles, admin_id, utc_offset)
+    buffers = {
+        'TurnRequest': CsvBuffer(TURN_COLUMNS),
+        'AuditLog': CsvBuffer(AUDIT_COLUMNS),
+        'Session': CsvBuffer(SESSION_COLUMNS),
+    }
+    for day, count, first_id in block:
+        if seed is not None:
+            # Semilla por jornada: el dataset no depende de --workers ni de --batch
+            generator.rng = random.Random(f"{seed}-{day.isoformat()}")
+        turns, audits, sessions = generator.day(day, count, first_id, live=day == live_day, now=now)
+        for table, rows in (('TurnRequest', turns), ('AuditLog', audits), ('Session', sessions)):
+            for row in rows:
+                buffers[table].add(row)
+    return {table: buffer.take() for table, buffer in buffers.items()}
+
+
+def split_blocks(days, first_id, batch):
+    """Agrupa las jornadas en bloques de ~batch turnos con sus ids ya asignados"""
+    blocks, current, rows = [], [], 0
+    next_id = first_id
+    for day, count in days:
+        current.append((day, count, next_id))
+        next_id += count
+        rows += count
+        if rows >= batch:
+            blocks.append(current)
+            current, rows = [], 0
+    if current:
+        blocks.append(current)
+    return blocks, next_id - 1
+
+
+def workdays(start, end):
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def plan_days(rng, start, end, per_day):
+    """[(fecha, turnos)] con variación estacional y ±15% diario"""
+    return [(day, max(1, round(per_day * SEASONAL[day.month - 1] * rng.uniform(0.85, 1.15))))
+            for day in workdays(start, end)]
+
+
+def load_reference_data(conn):
+    with conn.cursor() as cur:
+        cur.execute('SELECT id FROM "User" WHERE lower(role) = %s AND "isActive" ORDER BY id', ('flebotomista',))
+        phlebotomists = [row[0] for row in cur.fetchall()]
+        cur.execute('SELECT id, "isSpecial" OR type = %s FROM "Cubicle" WHERE "isActive" ORDER BY id', ('SPECIAL',))
+        cubicles = [(row[0], row[1]) for row in cur.fetchall()]
+        cur.execute('SELECT id FROM "User" WHERE lower(role) = %s ORDER BY id LIMIT 1', ('admin',))
+        admin = cur.fetchone()
+    return phlebotomists, cubicles, admin[0] if admin else (phlebotomists[0] if phlebotomists else None)
+
+
+def reserve_turn_ids(conn, count):
+    """Aparta un rango de ids en la secuencia de TurnRequest (seguro con la app escribiendo en paralelo)"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_get_serial_sequence('\"TurnRequest\"', 'id')")
+        sequence = cur.fetchone()[0]
+        cur.execute(f'SELECT setval(%s, GREATEST((SELECT COALESCE(MAX(id), 0) FROM "TurnRequest"), '
+                    f'(SELECT last_value FROM {sequence})) + %s)', (sequence, count))
+        last = cur.fetchone()[0]
+    conn.commit()
+    return last - count + 1
+
+
+def clean(conn):
+    with conn.cursor() as cur:
+        cur.execute('DELETE FROM "AuditLog" WHERE "ipAddress" = %s', (MARKER,))
+        audits = cur.rowcount
+        cur.execute('DELETE FROM "Session" WHERE "userAgent" = %s', (MARKER,))
+        sessions = cur.rowcount
+        cur.execute('DELETE FROM "TurnRequest" WHERE "labsisOrderId" LIKE %s', (ORDER_PREFIX + '%',))
+        turns = cur.rowcount
+    conn.commit()
+    print_success(f"Eliminados {turns:,} turnos, {audits:,} registros de auditoría y {sessions:,} sesiones generados")
+
+
+class Sink:
+    """Destino de los bloques CSV: COPY a PostgreSQL o archivos para \\copy de psql"""
+
+    def __init__(self, conn=None, output_dir=None):
+        self.conn = conn
+        self.output_dir = output_dir
+        self.files = {}
+        self.totals = {'TurnRequest': 0, 'AuditLog': 0, 'Session': 0}
+
+    COLUMNS = {'TurnRequest': TURN_COLUMNS, 'AuditLog': AUDIT_COLUMNS, 'Session': SESSION_COLUMNS}
+
+    def write(self, table, text, count):
+        if not count:
+            return
+        if self.conn is not None:
+            copy_rows(self.conn, table, self.COLUMNS[table], text)
+            self.conn.commit()
+        else:
+            if table not in self.files:
+                self.files[table] = open(os.path.join(self.output_dir, f"{table}.csv"), 'w', encoding='utf-8')
+            self.files[table].write(text)
+        self.totals[table] += count
+
+    def close(self, last_turn_id):
+        if self.conn is not None:
+            return
+        for f in self.files.values():
+            f.close()
+        with open(os.path.join(self.output_dir, 'load.sql'), 'w', encoding='utf-8') as f:
+            for table in self.files:
+                column_list = ', '.join(f'"{c}"' for c in self.COLUMNS[table])
+                f.write(f"\\copy \"{table}\" ({column_list}) FROM '{table}.csv' WITH (FORMAT csv)\n")
+            f.write(f"SELECT setval(pg_get_serial_sequence('\"TurnRequest\"', 'id'), "
+                    f"GREATEST({last_turn_id}, (SELECT MAX(id) FROM \"TurnRequest\")));\n")
+            f.write('ANALYZE "TurnRequest"; ANALYZE "AuditLog"; ANALYZE "Session";\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga masiva de datos sintéticos con COPY")
+    parser.add_argument("--years", type=float, default=3, help="Años de historia hacia atrás desde hoy")
+    parser.add_argument("--per-day", type=int, default=450, help="Turnos promedio por día hábil")
+    parser.add_argument("--live", type=int, default=0, help="Turnos en curso para el día de hoy")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para reproducir el mismo dataset")
+    parser.add_argument("--utc-offset", type=float, default=-6, help="Huso horario del laboratorio (CDMX = -6)")
+    parser.add_argument("--batch", type=int, default=BATCH_ROWS, help="Turnos por bloque (un COPY + commit por bloque)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Procesos generando bloques en paralelo")
+    parser.add_argument("--output-dir", help="Escribir CSV + load.sql en lugar de conectarse a la base")
+    parser.add_argument("--phlebotomists", default="2,3,4,5,6,7,8,9",
+                        help="Ids de flebotomistas para --output-dir (sin conexión)")
+    parser.add_argument("--cubicles", default="1,2,3,4,5,6:special", help="Ids de cubículos para --output-dir")
+    parser.add_argument("--start-id", type=int, default=10000000, help="Primer id de TurnRequest para --output-dir")
+    parser.add_argument("--clean", action="store_true", help="Borrar los datos generados anteriormente y salir")
+    args = parser.parse_args()
+
+    print_header("GENERADOR MASIVO DE DATOS")
+    rng = random.Random(args.seed)
+    conn = None
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        phlebotomists = [int(x) for x in args.phlebotomists.split(',') if x]
+        cubicles = [(int(c.split(':')[0]), c.endswith(':special')) for c in args.cubicles.split(',') if c]
+        admin_id = 1
+    else:
+        if not driver_available():
+            print_error("Se requiere psycopg o psycopg2 (pip install 'psycopg[binary]'), o usar --output-dir")
+            sys.exit(2)
+        try:
+            conn = connect()
+        except DatabaseError as e:
+            print_error(str(e))
+            sys.exit(2)
+        if args.clean:
+            clean(conn)
+            return
+        phlebotomists, cubicles, admin_id = load_reference_data(conn)
+        if not phlebotomists or not cubicles:
+            print_error("Se necesitan flebotomistas y cubículos activos (ejecutar primero el seed de usuarios)")
+            sys.exit(1)
+
+    today = date.today()
+    start = today - timedelta(days=math.ceil(args.years * 365))
+    days = plan_days(rng, start, today - timedelta(days=1), args.per_day)
+    if args.live:
+        days.append((today, args.live))
+    total = sum(count for _, count in days)
+
+    print_info(f"{len(days)} días hábiles desde {start.isoformat()} · {total:,} turnos "
+               f"· {len(phlebotomists)} flebotomistas · {len(cubicles)} cubículos")
+
+    first_id = args.start_id if conn is None else reserve_turn_ids(conn, total)
+    blocks, last_id = split_blocks(days, first_id, args.batch)
+    now = datetime.now() + timedelta(hours=-args.utc_offset)
+    config = (args.seed, phlebotomists, cubicles, admin_id, args.utc_offset, today if args.live else None, now)
+    sink = Sink(conn, args.output_dir)
+    started = time.perf_counter()
+    last_report = started
+
+    # Generación en paralelo, escritura en orden; a lo sumo 2 bloques en espera por worker
+    # para no acumular cientos de MB de CSV si la base escribe más lento de lo que se genera
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append((block, pool.submit(generate_block, config, block)))
+            if len(pending) < args.workers * 2:
+                continue
+            block_done, future = pending.popleft()
+            for table, (text, count) in future.result().items():
+                sink.write(table, text, count)
+            if time.perf_counter() - last_report > 5:
+                last_report = time.perf_counter()
+                done = sink.totals['TurnRequest']
+                print_info(f"   {block_done[-1][0].isoformat()}: {done:,}/{total:,} turnos "
+                           f"({done / (last_report - started):,.0f} filas/s)")
+        for _, future in pending:
+            for table, (text, count) in future.result().items():
+                sink.write(table, text, count)
+    sink.close(last_id)
+
+    if conn is not None:
+        with conn.cursor() as cur:
+            for table in sink.totals:
+                cur.execute(f'ANALYZE "{table}"')
+        conn.commit()
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print_success(f"{sink.totals['TurnRequest']:,} turnos, {sink.totals['AuditLog']:,} registros de auditoría y "
+                  f"{sink.totals['Session']:,} sesiones en {elapsed:.1f}s "
+                  f"({sink.totals['TurnRequest'] / elapsed:,.0f} turnos/s)")
+    print_info(f"Ids de TurnRequest: {first_id:,} - {last_id:,}")
+    if args.output_dir:
+        print_info(f"Cargar con: cd {args.output_dir} && psql \"$DATABASE_URL\" -f load.sql")
+
+
+if __name__ == "__main__":
+    main()
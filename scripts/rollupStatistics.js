@@ -0,0 +1,126 @@
+/**
+ * Consolidación de rollups de estadísticas
+ * Sistema TomaTurnoModerno - INER
+ *
+ * Llena "StatsDailyRollup" / "StatsMonthlyRollup" con stats_rollup_refresh()
+ * (prisma/migrations/20261018020000_add_statistics_rollups), que leen las
+ * rutas de /api/statistics a través de lib/statsRollup.js.
+ *
+ * - Incremental (default, cada noche desde ecosystem.config.js): reconsolida
+ *   los últimos --lookback días hasta ayer, para recoger correcciones tardías.
+ *   Sin marca previa hace el backfill completo.
+ * - --backfill: todo el histórico (o desde --from), mes por mes para no
+ *   mantener transacciones largas.
+ *
+ * Los días son locales del laboratorio (dashboard_local_day en la base).
+ * Hoy nunca se consolida: las rutas lo calculan en vivo.
+ *
+ * Uso:
+ *   node scripts/rollupStatistics.js [opciones]
+ *
+ * Opciones:
+ *   --backfill         Reconsolidar todo el histórico
+ *   --from YYYY-MM-DD  Primer día del backfill (default: primer turno atendido)
+ *   --lookback N       Días a reconsolidar en modo incremental (default: 3)
+ *   --status           Solo mostrar la marca actual
+ */
+
+const { PrismaClient } = require('@prisma/client');
+const prisma = new PrismaClient();
+
+const DEFAULT_LOOKBACK_DAYS = 3;
+
+// Parsear argumentos de línea de comandos
+const args = process.argv.slice(2);
+const isBackfill = args.includes('--backfill');
+const statusOnly = args.includes('--status');
+const fromIndex = args.indexOf('--from');
+const fromArg = fromIndex !== -1 ? args[fromIndex + 1] : null;
+const lookbackIndex = args.indexOf('--lookback');
+const lookback = lookbackIndex !== -1 ? parseInt(args[lookbackIndex + 1], 10) : DEFAULT_LOOKBACK_DAYS;
+
+const isoDate = (value) => (value instanceof Date ? value.toISOString().slice(0, 10) : String(value).slice(0, 10));
+
+function addDays(day, days) {
+  const date = new Date(`${day}T00:00:00.000Z`);
+  date.setUTCDate(date.getUTCDate() + days);
+  return isoDate(date);
+}
+
+function endOfMonth(day) {
+  const date = new Date(`${day}T00:00:00.000Z`);
+  return isoDate(new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + 1, 0)));
+}
+
+async function readState() {
+  const [row] = await prisma.$queryRaw`
+    SELECT
+      (SELECT "through" FROM "StatsRollupState" WHERE "name" = 'daily') AS "through",
+      (SELECT "updatedAt" FROM "StatsRollupState" WHERE "name" = 'daily') AS "updatedAt",
+      dashboard_local_day((now() AT TIME ZONE 'UTC')::timestamp) - 1 AS "yesterday",
+      (SELECT dashboard_local_day(MIN("finishedAt")) FROM "TurnRequest" WHERE status = 'Attended') AS "firstDay"
+  `;
+  return {
+    through: row.through ? isoDate(row.through) : null,
+    updatedAt: row.updatedAt,
+    yesterday: isoDate(row.yesterday),
+    firstDay: row.firstDay ? isoDate(row.firstDay) : null,
+  };
+}
+
+async function refresh(fromDay, toDay) {
+  const started = Date.now();
+  const [{ written }] = await prisma.$queryRaw`
+    SELECT stats_rollup_refresh(${fromDay}::date, ${toDay}::date) AS "written"
+  `;
+  console.log(`  ${fromDay} → ${toDay}: ${written} filas en ${Date.now() - started} ms`);
+  return Number(written);
+}
+
+async function backfill(fromDay, toDay) {
+  let total = 0;
+  for (let start = fromDay; start <= toDay; start = addDays(endOfMonth(start), 1)) {
+    const end = endOfMonth(start) < toDay ? endOfMonth(start) : toDay;
+    total += await refresh(start, end);
+  }
+  return total;
+}
+
+async function main() {
+  const state = await readState();
+
+  console.log('\n===========================================');
+  console.log('  ROLLUPS DE ESTADÍSTICAS');
+  console.log('===========================================');
+  console.log(`Consolidado hasta: ${state.through || '(nunca)'}${state.updatedAt ? ` (actualizado ${state.updatedAt.toISOString()})` : ''}`);
+  console.log(`Ayer (día local):  ${state.yesterday}`);
+
+  if (statusOnly) return;
+
+  if (!state.firstDay) {
+    console.log('No hay turnos atendidos; nada que consolidar.');
+    return;
+  }
+
+  const started = Date.now();
+  let total;
+
+  if (isBackfill || !state.through) {
+    const fromDay = fromArg || state.firstDay;
+    console.log(`\nBackfill ${fromDay} → ${state.yesterday}${isBackfill ? '' : ' (sin marca previa)'}`);
+    total = await backfill(fromDay, state.yesterday);
+  } else {
+    const fromDay = addDays(state.through < state.yesterday ? state.through : state.yesterday, -(lookback - 1));
+    console.log(`\nIncremental ${fromDay} → ${state.yesterday}`);
+    total = await backfill(fromDay, state.yesterday);
+  }
+
+  console.log(`\n✅ ${total} filas diarias consolidadas en ${((Date.now() - started) / 1000).toFixed(1)}s`);
+}
+
+main()
+  .catch((error) => {
+    console.error('❌ Error consolidando estadísticas:', error);
+    process.exitCode = 1;
+  })
+  .finally(() => prisma.$disconnect());
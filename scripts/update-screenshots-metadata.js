@@ -254,9 +254,28 @@ function getFileSizeString(filePath) {
   }
 }
 
+// Variantes generadas por el post-procesamiento (tests/harness/image_pipeline.py)
+function loadExistingVariants() {
+  if (!fs.existsSync(metadataPath)) return {};
+  try {
+    const previous = JSON.parse(fs.readFileSync(metadataPath, 'utf8'));
+    const byFilename = {};
+    previous.forEach(item => {
+      if (item.variants) {
+        byFilename[item.filename] = { width: item.width, height: item.height, variants: item.variants };
+      }
+    });
+    return byFilename;
+  } catch (error) {
+    console.warn(`⚠️  No se pudo leer el metadata anterior: ${error.message}`);
+    return {};
+  }
+}
+
 // Función para generar metadata automáticamente
 function generateMetadata() {
   const metadata = [];
+  const existingVariants = loadExistingVariants();
 
   // Leer todos los archivos PNG en el directorio
   const files = fs.readdirSync(screenshotsDir)
@@ -290,7 +309,8 @@ function generateMetadata() {
       description: config.description,
       tags: config.tags,
       path: `/docs/screenshots/${filename}`,
-      size: size
+      size: size,
+      ...existingVariants[filename]
     });
 
     console.log(`✅ ${filename} (${size}) - ${config.moduleId}`);
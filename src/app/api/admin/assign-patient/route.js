@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -107,6 +108,8 @@ export async function POST(request) {
 
     console.log(`[assign-patient] Turno ${turnIdNum} (${turn.patientName}) asignado a ${phlebotomist.name} por admin ${decoded.name}`);
 
+    notifyQueueChange("admin/assign-patient");
+
     return NextResponse.json({
       success: true,
       message: `Paciente ${turn.patientName} asignado a ${phlebotomist.name}`,
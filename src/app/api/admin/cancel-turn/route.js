@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -134,6 +135,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Turno cancelado: ${turn.assignedTurn} por ${decodedToken.name || decodedToken.userId}. Razón: ${reason}`);
 
+    notifyQueueChange("admin/cancel-turn");
+
     return NextResponse.json({
       success: true,
       message: `Turno ${turn.assignedTurn} cancelado`,
@@ -2,6 +2,7 @@ import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
 import { TIPOS_ATENCION } from "../../../../../lib/prioridadUtils.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 const VALID_PRIORITIES = Object.values(TIPOS_ATENCION);
@@ -110,6 +111,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Prioridad cambiada: Turno ${turn.assignedTurn} de ${oldValue.tipoAtencion} a ${newPriority} por ${decodedToken.name || decodedToken.userId}`);
 
+    notifyQueueChange("admin/change-priority");
+
     return NextResponse.json({
       success: true,
       message: `Turno ${turn.assignedTurn} cambiado a ${newPriority}`,
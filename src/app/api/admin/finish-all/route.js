@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -113,6 +114,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Finalización masiva: ${result.count} turnos finalizados por ${decodedToken.name || decodedToken.userId}. Razón: ${reason}`);
 
+    notifyQueueChange("admin/finish-all");
+
     return NextResponse.json({
       success: true,
       message: `${result.count} turnos finalizados exitosamente`,
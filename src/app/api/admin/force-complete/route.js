@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -127,6 +128,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Turno forzado a finalizado: ${turn.assignedTurn} por ${decodedToken.name || decodedToken.userId}. Razón: ${reason}`);
 
+    notifyQueueChange("admin/force-complete");
+
     return NextResponse.json({
       success: true,
       message: `Turno ${turn.assignedTurn} marcado como finalizado`,
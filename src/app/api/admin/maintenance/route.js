@@ -0,0 +1,25 @@
+import { NextResponse } from "next/server";
+import { getMaintenanceStats } from "../../../../../lib/maintenance.js";
+import { checkSupervisorToken } from "../../users/utils/checkAdmin.js";
+
+export const dynamic = "force-dynamic";
+
+/**
+ * GET /api/admin/maintenance
+ *
+ * Métricas del programador de mantenimiento de este proceso (lib/maintenance.js):
+ * ejecuciones, veces que otra instancia tenía el lock y, por tarea, última
+ * ejecución, filas afectadas y duración.
+ */
+export async function GET(request) {
+  // Solo admin y supervisor
+  const auth = checkSupervisorToken(request);
+  if (!auth.success) {
+    return NextResponse.json({ success: false, error: auth.error }, { status: auth.status });
+  }
+
+  return NextResponse.json(
+    { success: true, data: getMaintenanceStats() },
+    { headers: { "Cache-Control": "no-store" } }
+  );
+}
@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -135,6 +136,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Flebotomista reasignado: Turno ${turn.assignedTurn} de ${oldValue.attendedByName || 'ninguno'} a ${newPhlebotomist.name}`);
 
+    notifyQueueChange("admin/reassign-phlebotomist");
+
     return NextResponse.json({
       success: true,
       message: `Flebotomista reasignado para turno ${turn.assignedTurn}`,
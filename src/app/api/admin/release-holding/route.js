@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
+import { notifyQueueChange } from "../../../../../lib/queueEvents.js";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -100,6 +101,8 @@ export async function POST(request) {
 
     console.log(`[Admin] Holding liberado: Turno ${turn.assignedTurn} por usuario ${decodedToken.name || decodedToken.userId}`);
 
+    notifyQueueChange("admin/release-holding");
+
     return NextResponse.json({
       success: true,
       message: `Holding liberado para turno ${turn.assignedTurn}`,
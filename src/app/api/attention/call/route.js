@@ -1,4 +1,6 @@
 import prisma from "@/lib/prisma";
+import { holdingCutoff } from "@/lib/holdingUtils";
+import { notifyQueueChange } from "@/lib/queueEvents";
 
 export async function POST(req) {
   try {
@@ -22,7 +24,7 @@ export async function POST(req) {
         // SELECT FOR UPDATE bloquea la fila para otras transacciones
         // Esto evita que otra transacción lea hasta que esta termine
         const turns = await tx.$queryRaw`
-          SELECT id, status, "holdingBy", "patientName"
+          SELECT id, status, "holdingBy", "holdingAt", "patientName"
           FROM "TurnRequest"
           WHERE id = ${turnIdInt}
           FOR UPDATE
@@ -44,8 +46,10 @@ export async function POST(req) {
           };
         }
 
-        // Verificar holding DENTRO de la transacción
-        if (turn.holdingBy && turn.holdingBy !== userIdInt) {
+        // Verificar holding DENTRO de la transacción (uno expirado ya no reserva)
+        const heldByOther = turn.holdingBy && turn.holdingBy !== userIdInt
+          && turn.holdingAt && turn.holdingAt >= holdingCutoff();
+        if (heldByOther) {
           return {
             success: false,
             error: "Este turno está reservado por otro flebotomista",
@@ -87,6 +91,8 @@ export async function POST(req) {
         );
       }
 
+      notifyQueueChange("attention/call");
+
       return new Response(JSON.stringify(result.turn), {
         status: 200,
         headers: { "Content-Type": "application/json" },
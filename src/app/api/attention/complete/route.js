@@ -1,5 +1,6 @@
 import prisma from "@/lib/prisma";
 import { assignNextHolding } from "@/lib/holdingUtils";
+import { notifyQueueChange } from "@/lib/queueEvents";
 
 export async function POST(req) {
   try {
@@ -53,6 +54,8 @@ export async function POST(req) {
       }
     }
 
+    notifyQueueChange("attention/complete");
+
     return new Response(
       JSON.stringify({
         success: true,
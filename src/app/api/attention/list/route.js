@@ -1,5 +1,6 @@
 import prisma from "@/lib/prisma";
-import { releaseExpiredHoldings } from "@/lib/holdingUtils";
+import { holdingCutoff, holdingExpiry } from "@/lib/holdingUtils";
+import { cachedQueueResponse } from "@/lib/queueEvents";
 
 export async function GET(request) {
   try {
@@ -8,149 +9,9 @@ export async function GET(request) {
     const userId = searchParams.get('userId');
     const userIdNum = userId ? parseInt(userId, 10) : null;
 
-    // Limpiar holdings expirados antes de listar
-    await releaseExpiredHoldings();
-
-    // Consulta para turnos pendientes
-    // Filtra turnos en holding de OTROS usuarios (solo muestra los propios o sin holding)
-    // Ordenamiento: Por prioridad (Special primero), luego por tiempo efectivo de cola
-    const pendingTurns = await prisma.$queryRaw`
-      SELECT
-        id,
-        "patientName",
-        age,
-        gender,
-        "contactInfo",
-        studies,
-        "assignedTurn",
-        "tipoAtencion",
-        "isDeferred",
-        "callCount",
-        "suggestedFor",
-        "suggestedAt",
-        "holdingBy",
-        "holdingAt",
-        "createdAt",
-        "deferredAt",
-        "tubesRequired",
-        "tubesDetails",
-        observations,
-        "clinicalInfo",
-        patient_id as "patientID",
-        work_order as "workOrder",
-        codigo_atencion as "codigoAtencion"
-      FROM "TurnRequest"
-      WHERE status = 'Pending'
-        AND ("holdingBy" IS NULL OR "holdingBy" = ${userIdNum})
-      ORDER BY
-        CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
-        COALESCE("deferredAt", "createdAt") ASC
-    `;
-
-    // Consulta para turnos en progreso
-    const inProgressTurns = await prisma.turnRequest.findMany({
-      where: { status: "In Progress" },
-      select: {
-        id: true,
-        patientName: true,
-        age: true,
-        gender: true,
-        contactInfo: true,
-        studies: true,
-        assignedTurn: true,
-        tipoAtencion: true,
-        isCalled: true,
-        isDeferred: true,
-        callCount: true,
-        tubesRequired: true,
-        tubesDetails: true,
-        observations: true,
-        clinicalInfo: true,
-        patientID: true,  // CI/Expediente del paciente
-        workOrder: true,  // Número de orden de trabajo
-        codigoAtencion: true, // KAB-7378: Código departamento laboratorio
-        attendedBy: true, // Para identificar quién está atendiendo
-        cubicleId: true, // Para restaurar el cubículo
-        cubicle: {
-          select: {
-            id: true,
-            name: true,
-          },
-        },
-        user: {
-          select: {
-            name: true,
-          },
-        },
-      },
-      orderBy: [
-        { isDeferred: 'desc' },
-        { assignedTurn: 'asc' }
-      ]
-    });
-
-    // El ordenamiento ya está hecho por Prisma (tipoAtencion DESC, updatedAt ASC)
-    // NO re-ordenar aquí para evitar que la cola "rote" en cada refresh
-    // El orden debe ser estático y solo cambiar cuando haya acciones reales (llamar, diferir, nuevo)
-    const sortedPendingTurns = pendingTurns;
-
-    // Respuesta con los datos
-    return new Response(
-      JSON.stringify({
-        pendingTurns: sortedPendingTurns.map((turn) => ({
-          id: turn.id,
-          patientName: turn.patientName,
-          age: turn.age,
-          gender: turn.gender,
-          contactInfo: turn.contactInfo,
-          studies: turn.studies,
-          assignedTurn: turn.assignedTurn,
-          isSpecial: turn.tipoAtencion === "Special",
-          tipoAtencion: turn.tipoAtencion,  // KAB-7378: Tipo de atención literal
-          codigoAtencion: turn.codigoAtencion,  // KAB-7378: Código departamento
-          isDeferred: turn.isDeferred,
-          callCount: turn.callCount,
-          // Campos de holding (nuevo sistema)
-          isHeldByMe: userIdNum ? turn.holdingBy === userIdNum : false,
-          holdingBy: turn.holdingBy,
-          // Campos de sugerencia (deprecated, mantener para compatibilidad)
-          isSuggestedForMe: userIdNum ? turn.suggestedFor === userIdNum : false,
-          suggestedFor: turn.suggestedFor,
-          tubesRequired: turn.tubesRequired,
-          tubesDetails: turn.tubesDetails,
-          observations: turn.observations,
-          clinicalInfo: turn.clinicalInfo,
-          patientID: turn.patientID,
-          workOrder: turn.workOrder,
-        })),
-        inProgressTurns: inProgressTurns.map((turn) => ({
-          id: turn.id,
-          patientName: turn.patientName,
-          age: turn.age,
-          gender: turn.gender,
-          contactInfo: turn.contactInfo,
-          studies: turn.studies,
-          assignedTurn: turn.assignedTurn,
-          isSpecial: turn.tipoAtencion === "Special",
-          tipoAtencion: turn.tipoAtencion,  // KAB-7378: Tipo de atención literal
-          codigoAtencion: turn.codigoAtencion,  // KAB-7378: Código departamento
-          isCalled: turn.isCalled,
-          isDeferred: turn.isDeferred,
-          callCount: turn.callCount,
-          cubicleName: turn.cubicle?.name || "Sin cubículo",
-          cubicleId: turn.cubicleId,
-          cubicle: turn.cubicle,
-          flebotomistName: turn.user?.name || "Sin flebotomista",
-          attendedBy: turn.attendedBy, // Para identificar el paciente del usuario actual
-          tubesRequired: turn.tubesRequired,
-          tubesDetails: turn.tubesDetails,
-          observations: turn.observations,
-          clinicalInfo: turn.clinicalInfo,
-          patientID: turn.patientID,
-          workOrder: turn.workOrder,
-        })),
-      }),
-      { status: 200, headers: { "Content-Type": "application/json" } }
+    // Una variante por usuario: los holdings de otros no se muestran
+    return await cachedQueueResponse(request, `attention:${userIdNum ?? ""}`, ({ expireBy }) =>
+      loadAttentionList(userIdNum, expireBy)
     );
   } catch (error) {
     console.error("Error en /api/attention/list:", error);
@@ -162,3 +23,155 @@ export async function GET(request) {
     );
   }
 }
+
+async function loadAttentionList(userIdNum, expireBy) {
+  // Consulta para turnos pendientes
+  // Filtra turnos en holding de OTROS usuarios (solo muestra los propios o sin holding)
+  // Un holding expirado cuenta como libre sin liberarlo (ver lib/holdingUtils.js)
+  // Ordenamiento: Por prioridad (Special primero), luego por tiempo efectivo de cola
+  const cutoff = holdingCutoff();
+
+  // La lista cambia cuando expira un holding vigente (propio u oculto de otro
+  // usuario) aunque nadie escriba: la respuesta cacheada vence en ese instante
+  const [{ nextHoldingAt }] = await prisma.$queryRaw`
+    SELECT min("holdingAt") AS "nextHoldingAt"
+    FROM "TurnRequest"
+    WHERE status = 'Pending' AND "holdingBy" IS NOT NULL AND "holdingAt" >= ${cutoff}
+  `;
+  if (nextHoldingAt) expireBy(holdingExpiry(nextHoldingAt));
+
+  const pendingTurns = await prisma.$queryRaw`
+    SELECT
+      id,
+      "patientName",
+      age,
+      gender,
+      "contactInfo",
+      studies,
+      "assignedTurn",
+      "tipoAtencion",
+      "isDeferred",
+      "callCount",
+      "suggestedFor",
+      "suggestedAt",
+      CASE WHEN "holdingAt" >= ${cutoff} THEN "holdingBy" END AS "holdingBy",
+      CASE WHEN "holdingAt" >= ${cutoff} THEN "holdingAt" END AS "holdingAt",
+      "createdAt",
+      "deferredAt",
+      "tubesRequired",
+      "tubesDetails",
+      observations,
+      "clinicalInfo",
+      patient_id as "patientID",
+      work_order as "workOrder",
+      codigo_atencion as "codigoAtencion"
+    FROM "TurnRequest"
+    WHERE status = 'Pending'
+      AND ("holdingBy" IS NULL OR "holdingAt" IS NULL OR "holdingAt" < ${cutoff} OR "holdingBy" = ${userIdNum})
+    ORDER BY
+      CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
+      COALESCE("deferredAt", "createdAt") ASC
+  `;
+
+  // Consulta para turnos en progreso
+  const inProgressTurns = await prisma.turnRequest.findMany({
+    where: { status: "In Progress" },
+    select: {
+      id: true,
+      patientName: true,
+      age: true,
+      gender: true,
+      contactInfo: true,
+      studies: true,
+      assignedTurn: true,
+      tipoAtencion: true,
+      isCalled: true,
+      isDeferred: true,
+      callCount: true,
+      tubesRequired: true,
+      tubesDetails: true,
+      observations: true,
+      clinicalInfo: true,
+      patientID: true,  // CI/Expediente del paciente
+      workOrder: true,  // Número de orden de trabajo
+      codigoAtencion: true, // KAB-7378: Código departamento laboratorio
+      attendedBy: true, // Para identificar quién está atendiendo
+      cubicleId: true, // Para restaurar el cubículo
+      cubicle: {
+        select: {
+          id: true,
+          name: true,
+        },
+      },
+      user: {
+        select: {
+          name: true,
+        },
+      },
+    },
+    orderBy: [
+      { isDeferred: 'desc' },
+      { assignedTurn: 'asc' }
+    ]
+  });
+
+  // El ordenamiento ya está hecho por Prisma (tipoAtencion DESC, updatedAt ASC)
+  // NO re-ordenar aquí para evitar que la cola "rote" en cada refresh
+  // El orden debe ser estático y solo cambiar cuando haya acciones reales (llamar, diferir, nuevo)
+  const sortedPendingTurns = pendingTurns;
+
+  return {
+    pendingTurns: sortedPendingTurns.map((turn) => ({
+      id: turn.id,
+      patientName: turn.patientName,
+      age: turn.age,
+      gender: turn.gender,
+      contactInfo: turn.contactInfo,
+      studies: turn.studies,
+      assignedTurn: turn.assignedTurn,
+      isSpecial: turn.tipoAtencion === "Special",
+      tipoAtencion: turn.tipoAtencion,  // KAB-7378: Tipo de atención literal
+      codigoAtencion: turn.codigoAtencion,  // KAB-7378: Código departamento
+      isDeferred: turn.isDeferred,
+      callCount: turn.callCount,
+      // Campos de holding (nuevo sistema)
+      isHeldByMe: userIdNum ? turn.holdingBy === userIdNum : false,
+      holdingBy: turn.holdingBy,
+      // Campos de sugerencia (deprecated, mantener para compatibilidad)
+      isSuggestedForMe: userIdNum ? turn.suggestedFor === userIdNum : false,
+      suggestedFor: turn.suggestedFor,
+      tubesRequired: turn.tubesRequired,
+      tubesDetails: turn.tubesDetails,
+      observations: turn.observations,
+      clinicalInfo: turn.clinicalInfo,
+      patientID: turn.patientID,
+      workOrder: turn.workOrder,
+    })),
+    inProgressTurns: inProgressTurns.map((turn) => ({
+      id: turn.id,
+      patientName: turn.patientName,
+      age: turn.age,
+      gender: turn.gender,
+      contactInfo: turn.contactInfo,
+      studies: turn.studies,
+      assignedTurn: turn.assignedTurn,
+      isSpecial: turn.tipoAtencion === "Special",
+      tipoAtencion: turn.tipoAtencion,  // KAB-7378: Tipo de atención literal
+      codigoAtencion: turn.codigoAtencion,  // KAB-7378: Código departamento
+      isCalled: turn.isCalled,
+      isDeferred: turn.isDeferred,
+      callCount: turn.callCount,
+      cubicleName: turn.cubicle?.name || "Sin cubículo",
+      cubicleId: turn.cubicleId,
+      cubicle: turn.cubicle,
+      flebotomistName: turn.user?.name || "Sin flebotomista",
+      attendedBy: turn.attendedBy, // Para identificar el paciente del usuario actual
+      tubesRequired: turn.tubesRequired,
+      tubesDetails: turn.tubesDetails,
+      observations: turn.observations,
+      clinicalInfo: turn.clinicalInfo,
+      patientID: turn.patientID,
+      workOrder: turn.workOrder,
+    })),
+  };
+}
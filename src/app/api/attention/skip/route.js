@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 export async function POST(req) {
   try {
@@ -65,6 +66,8 @@ export async function POST(req) {
       },
     });
 
+    notifyQueueChange("attention/skip");
+
     return new Response(
       JSON.stringify({
         success: true,
@@ -1,9 +1,9 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../lib/prisma.js";
 import bcrypt from 'bcryptjs';
 import jwt from 'jsonwebtoken';
+import { invalidateUserAuth } from "../../../../../lib/authCache.js";
 
-const prisma = new PrismaClient();
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
 if (!JWT_SECRET) {
@@ -74,6 +74,9 @@ export async function POST(req) {
         where: { id: user.id },
         data: updateData
       });
+      if (updateData.lockedUntil) {
+        invalidateUserAuth(user.id);
+      }
 
       return NextResponse.json(
         { error: 'Contraseña incorrecta' },
@@ -160,7 +163,5 @@ export async function POST(req) {
       { error: 'Error en el servidor' },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
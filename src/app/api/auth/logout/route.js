@@ -2,6 +2,7 @@ import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
 import { releaseUserHoldings } from "@/lib/holdingUtils";
+import { invalidateUserAuth } from "../../../../../lib/authCache.js";
 
 // POST - Cerrar sesión y limpiar datos de sesión
 export async function POST(request) {
@@ -44,6 +45,7 @@ export async function POST(request) {
         userId: decodedToken.userId
       }
     });
+    invalidateUserAuth(decodedToken.userId);
 
     console.log(`[Logout] ${deleteResult.count} sesiones ELIMINADAS de BD para usuario ${decodedToken.userId} (${decodedToken.username || 'unknown'})`);
 
@@ -1,8 +1,9 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../lib/prisma.js";
 import jwt from "jsonwebtoken";
+import { getCachedAuth, cacheAuth, getAuthCacheStats } from "../../../../../lib/authCache.js";
+import { checkSupervisorToken } from "../../users/utils/checkAdmin.js";
 
-const prisma = new PrismaClient();
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
 if (!JWT_SECRET) {
@@ -57,6 +58,14 @@ export async function POST(req) {
       );
     }
 
+    // Usuario ya verificado recientemente (lib/authCache.js). Cache-Control:
+    // no-cache obliga a consultar la base y refresca la entrada.
+    const bypassCache = (req.headers.get('cache-control') || '').includes('no-cache');
+    const cachedUser = bypassCache ? null : getCachedAuth(token);
+    if (cachedUser) {
+      return NextResponse.json({ success: true, valid: true, user: cachedUser, session: null });
+    }
+
     // Verificar que el usuario existe y está activo
     const user = await prisma.user.findUnique({
       where: { id: decodedToken.userId },
@@ -106,17 +115,20 @@ export async function POST(req) {
     //   }
     // });
 
+    const verifiedUser = {
+      id: user.id,
+      username: user.username,
+      name: user.name,
+      role: user.role,
+      email: user.email
+    };
+    cacheAuth(token, verifiedUser, { tokenExp: decodedToken.exp });
+
     // Retornar datos del usuario y sesión válida
     return NextResponse.json({
       success: true,
       valid: true,
-      user: {
-        id: user.id,
-        username: user.username,
-        name: user.name,
-        role: user.role,
-        email: user.email
-      },
+      user: verifiedUser,
       session: null
     });
 
@@ -126,14 +138,22 @@ export async function POST(req) {
       { success: false, error: 'Error del servidor' },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
 
 // GET endpoint para verificación rápida
+// GET /api/auth/verify?stats=1 → contadores de la caché de verificación (admin/supervisor)
 export async function GET(req) {
   try {
+    if (new URL(req.url).searchParams.get('stats')) {
+      // Los contadores de la caché solo los ven admin y supervisor
+      const auth = checkSupervisorToken(req);
+      if (!auth.success) {
+        return NextResponse.json({ success: false, error: auth.error }, { status: auth.status });
+      }
+      return NextResponse.json(getAuthCacheStats());
+    }
+
     const authHeader = req.headers.get('authorization');
 
     if (!authHeader || !authHeader.startsWith('Bearer ')) {
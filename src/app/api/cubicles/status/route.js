@@ -1,17 +1,12 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
-import { cleanupCubicles } from "@/lib/cubicleCleanup";
-
-const prisma = new PrismaClient();
-
-// Timeout de inactividad: 20 minutos
-const INACTIVITY_TIMEOUT_MS = 20 * 60 * 1000;
+import prisma from "../../../../../lib/prisma.js";
+import { INACTIVITY_TIMEOUT_MS } from "../../../../../lib/cubicleCleanup.js";
 
 // GET - Obtener estado de cubículos (ocupados/disponibles)
 export async function GET(request) {
   try {
-    // LIMPIEZA: Liberar cubículos de sesiones expiradas o inactivas (>20 min)
-    await cleanupCubicles();
+    // Las sesiones expiradas o inactivas (>20 min) se descartan en la consulta;
+    // la limpieza de selectedCubicleId corre en lib/maintenance.js
 
     // Obtener todos los cubículos activos
     const cubicles = await prisma.cubicle.findMany({
@@ -116,7 +111,5 @@ export async function GET(request) {
       { success: false, error: "Error al obtener estado de cubículos" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
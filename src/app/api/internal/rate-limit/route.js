@@ -0,0 +1,49 @@
+import { NextResponse } from "next/server";
+import prisma from "@/lib/prisma";
+
+export const dynamic = "force-dynamic";
+
+const RATE_LIMIT_SECRET = process.env.RATE_LIMIT_SECRET;
+
+// Última ventana vista por este proceso: al cambiar se purgan las viejas una
+// sola vez, en lugar de limpiar en cada petición
+let prunedWindow = null;
+
+/**
+ * Backend compartido del rate limiter (RATE_LIMIT_BACKEND=postgres)
+ *
+ * POST /api/internal/rate-limit { key, limit, windowMs } → { allowed, count }
+ *
+ * Solo lo llama middleware.ts (HttpStore en lib/rateLimit.js) con el header
+ * x-rate-limit-secret. Cualquier error devuelve 503 y el middleware sigue con
+ * los conteos en memoria.
+ */
+export async function POST(req) {
+  if (!RATE_LIMIT_SECRET || req.headers.get("x-rate-limit-secret") !== RATE_LIMIT_SECRET) {
+    return NextResponse.json({ error: "No autorizado" }, { status: 401 });
+  }
+
+  try {
+    const { key, limit, windowMs } = await req.json();
+    if (typeof key !== "string" || !(limit > 0) || !(windowMs > 0)) {
+      return NextResponse.json({ error: "key, limit y windowMs son requeridos" }, { status: 400 });
+    }
+
+    const [row] = await prisma.$queryRaw`
+      SELECT current_window AS "window", is_allowed AS "allowed", estimated AS "count"
+      FROM rate_limit_hit(${key}, ${Math.floor(limit)}::int, ${Math.floor(windowMs)}::bigint)
+    `;
+
+    if (row.window !== prunedWindow) {
+      prunedWindow = row.window;
+      prisma.$queryRaw`SELECT rate_limit_prune(${row.window}::bigint)`.catch((error) => {
+        console.error("[RateLimit] Error purgando ventanas:", error);
+      });
+    }
+
+    return NextResponse.json({ allowed: row.allowed, count: Number(row.count) });
+  } catch (error) {
+    console.error("[RateLimit] Error en el backend compartido:", error);
+    return NextResponse.json({ error: "Backend no disponible" }, { status: 503 });
+  }
+}
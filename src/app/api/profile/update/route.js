@@ -1,8 +1,8 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../lib/prisma.js";
 import jwt from "jsonwebtoken";
+import { invalidateUserAuth } from "../../../../../lib/authCache.js";
 
-const prisma = new PrismaClient();
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
 if (!JWT_SECRET) {
@@ -108,6 +108,7 @@ export async function PUT(req) {
         isActive: true
       }
     });
+    invalidateUserAuth(decodedToken.userId);
 
     // Registrar en auditoría
     try {
@@ -144,7 +145,5 @@ export async function PUT(req) {
       { success: false, error: 'Error interno del servidor' },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
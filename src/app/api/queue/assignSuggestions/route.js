@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { invalidateQueueSnapshots } from '@/lib/queueEvents';
 
 /**
  * POST /api/queue/assignSuggestions
@@ -12,7 +13,7 @@ export async function POST(req) {
     // 1. Liberar sugerencias expiradas (más de 5 minutos sin atender)
     const timeoutDate = new Date(Date.now() - SUGGESTION_TIMEOUT_MINUTES * 60 * 1000);
 
-    await prisma.turnRequest.updateMany({
+    const expired = await prisma.turnRequest.updateMany({
       where: {
         status: 'Pending',
         suggestedAt: {
@@ -28,6 +29,10 @@ export async function POST(req) {
       }
     });
 
+    if (expired.count > 0) {
+      invalidateQueueSnapshots();
+    }
+
     // 2. Obtener flebotomistas activos (con sesión activa en las últimas 30 minutos)
     // ORDENADOS POR ORDEN DE LOGIN (createdAt de la sesión)
     const activeSessionTime = new Date(Date.now() - 30 * 60 * 1000);
@@ -135,6 +140,10 @@ export async function POST(req) {
       });
     }
 
+    if (assignments.length > 0) {
+      invalidateQueueSnapshots();
+    }
+
     console.log(`✅ ${assignments.length} pacientes asignados automáticamente (por orden de login)`);
     assignments.forEach((a, index) => {
       console.log(`   Flebotomista #${index + 1} (${a.assignedTo}) → Turno #${a.turnNumber} (${a.patientName})`);
@@ -1,4 +1,5 @@
 import prisma from '../../../../../lib/prisma.js';
+import { notifyQueueChange } from '../../../../../lib/queueEvents.js';
 
 /**
  * POST /api/queue/defer
@@ -110,6 +111,8 @@ export async function POST(req) {
 
     console.log(`✅ Turno ${turnId} (${turn.patientName}) marcado como diferido - Llamados: ${turn.callCount}`);
 
+    notifyQueueChange("queue/defer");
+
     return new Response(
       JSON.stringify({
         success: true,
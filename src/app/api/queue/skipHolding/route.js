@@ -1,5 +1,6 @@
 import prisma from "@/lib/prisma";
-import { Prisma } from "@prisma/client";
+import { claimNextTurn } from "@/lib/holdingUtils";
+import { invalidateQueueSnapshots } from "@/lib/queueEvents";
 
 /**
  * Transforma un turno agregando isSpecial derivado de tipoAtencion
@@ -66,31 +67,11 @@ export async function POST(request) {
         ...(skippedTurnIds || []).map(id => parseInt(id, 10))
       ].filter(id => !isNaN(id));
 
-      // Buscar siguiente turno con prioridad correcta (4 niveles)
-      let nextTurnQuery;
-      if (idsToExclude.length > 0) {
-        nextTurnQuery = await tx.$queryRaw`
-          SELECT id FROM "TurnRequest"
-          WHERE status = 'Pending' AND "holdingBy" IS NULL
-            AND id NOT IN (${Prisma.join(idsToExclude)})
-          ORDER BY
-            CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
-            COALESCE("deferredAt", "createdAt") ASC
-          LIMIT 1
-        `;
-      } else {
-        nextTurnQuery = await tx.$queryRaw`
-          SELECT id FROM "TurnRequest"
-          WHERE status = 'Pending' AND "holdingBy" IS NULL
-          ORDER BY
-            CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END,
-            COALESCE("deferredAt", "createdAt") ASC
-          LIMIT 1
-        `;
-      }
-      const nextTurn = nextTurnQuery?.[0] ? await tx.turnRequest.findUnique({ where: { id: nextTurnQuery[0].id } }) : null;
+      // Reclamar el siguiente por prioridad (4 niveles), sin esperar por filas
+      // que otro flebotomista esté reclamando (FOR UPDATE SKIP LOCKED)
+      const nextTurnId = await claimNextTurn(userIdNum, { route: false, excludeIds: idsToExclude, client: tx });
 
-      if (!nextTurn) {
+      if (!nextTurnId) {
         // No hay más turnos disponibles — dejar sin holding
         console.log(`[skipHolding] No hay más turnos disponibles para usuario ${userIdNum}`);
         return {
@@ -100,16 +81,9 @@ export async function POST(request) {
         };
       }
 
-      // 3. Asignar el siguiente turno en holding
-      const assignedTurn = await tx.turnRequest.update({
-        where: {
-          id: nextTurn.id,
-          holdingBy: null, // Verificación adicional para evitar race condition
-        },
-        data: {
-          holdingBy: userIdNum,
-          holdingAt: new Date(),
-        },
+      // 3. El turno ya quedó en holding del usuario al reclamarlo
+      const assignedTurn = await tx.turnRequest.findUnique({
+        where: { id: nextTurnId },
         include: {
           cubicle: true,
         },
@@ -124,6 +98,8 @@ export async function POST(request) {
       };
     });
 
+    invalidateQueueSnapshots();
+
     return Response.json({
       success: true,
       skippedTurn: transformTurn(result.skippedTurn),
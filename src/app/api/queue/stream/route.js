@@ -0,0 +1,95 @@
+import { formatSseEvent, getQueueChannel, getQueueStreamStats } from "@/lib/queueEvents";
+import { checkSupervisorToken } from "../../users/utils/checkAdmin.js";
+
+export const dynamic = "force-dynamic";
+
+const HEARTBEAT_MS = 25000;
+const RETRY_MS = 3000;
+
+/**
+ * Cola en tiempo real para las pantallas de sala (Server-Sent Events)
+ *
+ * GET /api/queue/stream              → snapshot de /api/queue/list
+ * GET /api/queue/stream?view=video   → snapshot de /api/queue_video/list
+ * GET /api/queue/stream?stats=1      → JSON con suscriptores/versiones/cálculos por canal
+ *                                      (Bearer de admin/supervisor)
+ *
+ * Cada evento `queue` lleva { version, reason, hub, data }. Al conectarse se
+ * envía el snapshot vigente, salvo que el navegador reconecte con el mismo
+ * Last-Event-ID.
+ */
+export async function GET(req) {
+  const { searchParams } = new URL(req.url);
+
+  if (searchParams.get("stats")) {
+    const auth = checkSupervisorToken(req);
+    if (!auth.success) {
+      return new Response(JSON.stringify({ success: false, error: auth.error }), {
+        status: auth.status,
+        headers: { "Content-Type": "application/json" },
+      });
+    }
+    return new Response(JSON.stringify(getQueueStreamStats()), {
+      status: 200,
+      headers: { "Content-Type": "application/json", "Cache-Control": "no-store" },
+    });
+  }
+
+  const channel = getQueueChannel(searchParams.get("view") === "video" ? "video" : "queue");
+  const lastEventId = req.headers.get("last-event-id");
+  const encoder = new TextEncoder();
+  let cleanup = () => {};
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      let closed = false;
+      const send = (chunk) => {
+        if (closed) return;
+        try {
+          controller.enqueue(encoder.encode(chunk));
+        } catch {
+          cleanup();
+        }
+      };
+
+      const unsubscribe = channel.subscribe(send);
+      const heartbeat = setInterval(() => send(": ping\n\n"), HEARTBEAT_MS);
+      cleanup = () => {
+        if (closed) return;
+        closed = true;
+        clearInterval(heartbeat);
+        unsubscribe();
+      };
+      req.signal.addEventListener("abort", () => {
+        cleanup();
+        try {
+          controller.close();
+        } catch {
+          // ya cerrado por el cliente
+        }
+      });
+
+      send(`retry: ${RETRY_MS}\n\n`);
+      try {
+        const { id, frame } = await channel.current();
+        if (id !== lastEventId) send(frame);
+      } catch (error) {
+        console.error("Error en /api/queue/stream:", error);
+        send(formatSseEvent("error", JSON.stringify({ error: "Error al obtener los turnos" })));
+      }
+    },
+    cancel() {
+      cleanup();
+    },
+  });
+
+  return new Response(stream, {
+    status: 200,
+    headers: {
+      "Content-Type": "text/event-stream; charset=utf-8",
+      "Cache-Control": "no-cache, no-transform",
+      Connection: "keep-alive",
+      "X-Accel-Buffering": "no",
+    },
+  });
+}
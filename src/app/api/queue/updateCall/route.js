@@ -1,4 +1,5 @@
 import prisma from '../../../../../lib/prisma.js';
+import { notifyQueueChange } from '../../../../../lib/queueEvents.js';
 
 export async function PUT(req) {
   try {
@@ -32,6 +33,8 @@ export async function PUT(req) {
       data: updateData,
     });
 
+    notifyQueueChange("queue/updateCall");
+
     return new Response(JSON.stringify(updatedTurn), { status: 200 });
   } catch (error) {
     console.error("Error al actualizar el estado de llamado:", error);
@@ -1,4 +1,5 @@
 import prisma from "@/lib/prisma";
+import { notifyQueueChange } from "@/lib/queueEvents";
 
 export async function POST(req) {
   try {
@@ -15,6 +16,8 @@ export async function POST(req) {
       data: { status: "In Progress", isCalled: false },
     });
 
+    notifyQueueChange("queue_video/call");
+
     return new Response(
       JSON.stringify(updatedTurn),
       { status: 200, headers: { "Content-Type": "application/json" } }
@@ -1,5 +1,6 @@
 // src/app/api/queue_video/updateCall/route.js
 import prisma from '../../../../../lib/prisma.js';
+import { notifyQueueChange } from '../../../../../lib/queueEvents.js';
 
 export async function PUT(req) {
   try {
@@ -19,6 +20,8 @@ export async function PUT(req) {
       data: { isCalled },
     });
 
+    notifyQueueChange("queue_video/updateCall");
+
     return new Response(JSON.stringify(updatedTurn), { status: 200 });
   } catch (error) {
     console.error("Error al actualizar el estado de llamado:", error);
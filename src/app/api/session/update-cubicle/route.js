@@ -1,7 +1,6 @@
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import prisma from "../../../../../lib/prisma.js";
-import { cleanupCubicles } from "@/lib/cubicleCleanup";
 
 const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
 
@@ -78,9 +77,6 @@ export async function POST(request) {
       );
     }
 
-    // LIMPIEZA: Liberar cubículos de sesiones expiradas o inactivas antes de verificar
-    await cleanupCubicles();
-
     // PREVENCIÓN DE RACE CONDITION usando transacción con isolation level SERIALIZABLE
     // Esto garantiza que solo una transacción pueda leer y modificar el cubículo a la vez
     const cubicleIdInt = parseInt(cubicleId);
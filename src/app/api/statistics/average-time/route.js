@@ -1,6 +1,11 @@
 // src/app/api/statistics/average-time/route.js
-import { parseISO, differenceInSeconds } from 'date-fns';
 import prisma from '../../../../../lib/prisma.js';
+import { calendarRange, groupStats, labDay, loadDailyStats } from '../../../../../lib/statsRollup.js';
+
+// Sin año: todo el histórico consolidado
+const FIRST_DAY = '2000-01-01';
+
+const averageMinutes = (stats) => parseFloat((stats.turnaroundMinutes / stats.attended).toFixed(2));
 
 export async function GET(req) {
   try {
@@ -8,107 +13,29 @@ export async function GET(req) {
     const yearParam = searchParams.get('year');
     const monthParam = searchParams.get('month');
 
-    const filters = {
-      status: 'Attended',
-    };
-
-    let startFilterDate, endFilterDate;
-
-    // Si se selecciona año y/o mes, aplicamos los filtros de rango de fecha a createdAt
-    if (yearParam && monthParam) {
-      const year = parseInt(yearParam);
-      const month = parseInt(monthParam); // Mes es 1-indexed (1-12)
-
-      startFilterDate = new Date(Date.UTC(year, month - 1, 1, 0, 0, 0, 0));
-      endFilterDate = new Date(Date.UTC(year, month, 1, 0, 0, 0, 0));
-      endFilterDate.setUTCMilliseconds(endFilterDate.getUTCMilliseconds() - 1);
-
-      filters.createdAt = {
-        gte: startFilterDate,
-        lte: endFilterDate,
-      };
-    } else if (yearParam) {
-      const year = parseInt(yearParam);
-      startFilterDate = new Date(Date.UTC(year, 0, 1, 0, 0, 0, 0));
-      endFilterDate = new Date(Date.UTC(year + 1, 0, 1, 0, 0, 0, 0));
-      endFilterDate.setUTCMilliseconds(endFilterDate.getUTCMilliseconds() - 1);
-
-      filters.createdAt = {
-        gte: startFilterDate,
-        lte: endFilterDate,
-      };
-    }
-
-    // Importante: Aquí NO añadimos filtros explícitos como `createdAt: { not: null }`
-    // o `finishedAt: { not: null }` directamente en el `filters` del `findMany`.
-    // Confiamos en que la base de datos solo tendrá turnos 'Attended' con fechas,
-    // y la validación en el bucle 'for...of' (`if (turn.createdAt && turn.finishedAt ... )`)
-    // se encargará de cualquier caso borde si las fechas fueran nulas a pesar del status.
+    // Rango de días locales: año y/o mes (1-12) seleccionados, o todo el histórico
+    const [fromDay, toDay] = yearParam
+      ? calendarRange(parseInt(yearParam), monthParam ? parseInt(monthParam) : null)
+      : [FIRST_DAY, labDay()];
 
-    console.log("-----------------------------------------");
-    console.log("API /api/statistics/average-time recibió filtros:");
-    console.log(`yearParam: ${yearParam}, monthParam: ${monthParam}`);
-    console.log("Filtros finales para Prisma:", JSON.stringify(filters, null, 2));
-    if (startFilterDate && endFilterDate) {
-        console.log(`Rango de filtro UTC: ${startFilterDate.toISOString()} a ${endFilterDate.toISOString()}`);
-    }
-    console.log("-----------------------------------------");
+    // Tiempo de turno (createdAt → finishedAt) por flebotomista y día desde los rollups
+    const rows = (await loadDailyStats(fromDay, toDay)).filter((row) => row.userId !== 0);
 
-    const attendedTurns = await prisma.turnRequest.findMany({
-      where: filters, // Usamos los filtros construidos
-      select: {
-        id: true,
-        attendedBy: true,
-        createdAt: true,
-        finishedAt: true,
-        user: {
-          select: { name: true },
-        },
-      },
+    const users = await prisma.user.findMany({
+      where: { id: { in: [...new Set(rows.map((row) => row.userId))] } },
+      select: { id: true, name: true },
     });
-
-    console.log(`Número de turnos encontrados: ${attendedTurns.length}`);
-    if (attendedTurns.length > 0) {
-        console.log("Muestra de fechas de los turnos encontrados:");
-        attendedTurns.slice(0, 5).forEach(turn => {
-            console.log(`  ID: ${turn.id}, createdAt (DB): ${turn.createdAt.toISOString()}, finishedAt (DB): ${turn.finishedAt.toISOString()}`);
-        });
-        if (attendedTurns.length > 5) {
-            console.log(`  ... y ${attendedTurns.length - 5} más.`);
-        }
-    }
-    console.log("-----------------------------------------");
-
-    const phlebotomistDailyStats = new Map();
-    const phlebotomistTotalStats = new Map();
-
-    for (const turn of attendedTurns) {
-      // Verificación de no-nulidad aquí, antes de usar las fechas
-      if (turn.createdAt && turn.finishedAt && turn.attendedBy && turn.user) {
-        const start = parseISO(turn.createdAt.toISOString());
-        const end = parseISO(turn.finishedAt.toISOString());
-
-        const durationSeconds = differenceInSeconds(end, start);
-        const phlebotomistName = turn.user.name;
-        
-        const dayOfMonth = turn.createdAt.getDate(); 
-
-        if (!phlebotomistDailyStats.has(phlebotomistName)) {
-          phlebotomistDailyStats.set(phlebotomistName, new Map());
-        }
-        const dailyData = phlebotomistDailyStats.get(phlebotomistName);
-        if (!dailyData.has(dayOfMonth)) {
-          dailyData.set(dayOfMonth, { totalDuration: 0, count: 0 });
-        }
-        dailyData.get(dayOfMonth).totalDuration += durationSeconds;
-        dailyData.get(dayOfMonth).count += 1;
-
-        if (!phlebotomistTotalStats.has(phlebotomistName)) {
-          phlebotomistTotalStats.set(phlebotomistName, { totalDuration: 0, count: 0 });
-        }
-        phlebotomistTotalStats.get(phlebotomistName).totalDuration += durationSeconds;
-        phlebotomistTotalStats.get(phlebotomistName).count += 1;
+    const names = new Map(users.map((user) => [user.id, user.name]));
+
+    const phlebotomistTotalStats = groupStats(rows, (row) => names.get(row.userId));
+    const phlebotomistRows = new Map();
+    for (const row of rows) {
+      const phlebotomistName = names.get(row.userId);
+      if (!phlebotomistName) continue;
+      if (!phlebotomistRows.has(phlebotomistName)) {
+        phlebotomistRows.set(phlebotomistName, []);
       }
+      phlebotomistRows.get(phlebotomistName).push(row);
     }
 
     const result = {
@@ -122,24 +49,24 @@ export async function GET(req) {
     let countAllPatients = 0;
 
     for (const [phlebotomistName, totalData] of phlebotomistTotalStats.entries()) {
-      const averageDurationMinutes = parseFloat((totalData.totalDuration / totalData.count / 60).toFixed(2));
+      if (totalData.attended === 0) continue;
       result.phlebotomists.push({
         name: phlebotomistName,
-        averageDuration: averageDurationMinutes,
-        totalPatients: totalData.count,
+        averageDuration: averageMinutes(totalData),
+        totalPatients: totalData.attended,
       });
-      totalAllDurations += totalData.totalDuration;
-      countAllPatients += totalData.count;
+      totalAllDurations += totalData.turnaroundMinutes;
+      countAllPatients += totalData.attended;
 
-      const dailyMap = phlebotomistDailyStats.get(phlebotomistName);
       const formattedDailyData = {};
-      for (const [day, data] of dailyMap.entries()) {
-        formattedDailyData[day] = parseFloat((data.totalDuration / data.count / 60).toFixed(2));
+      const dailyStats = groupStats(phlebotomistRows.get(phlebotomistName), (row) => Number(row.day.slice(8, 10)));
+      for (const [day, data] of [...dailyStats].sort(([a], [b]) => a - b)) {
+        formattedDailyData[day] = averageMinutes(data);
       }
       result.dailySummary[phlebotomistName] = formattedDailyData;
     }
 
-    result.overallAverage = countAllPatients > 0 ? parseFloat((totalAllDurations / countAllPatients / 60).toFixed(2)) : 0;
+    result.overallAverage = countAllPatients > 0 ? parseFloat((totalAllDurations / countAllPatients).toFixed(2)) : 0;
     result.overallTotalPatients = countAllPatients;
 
     return new Response(JSON.stringify(result), {
@@ -154,4 +81,4 @@ export async function GET(req) {
       headers: { 'Content-Type': 'application/json' },
     });
   }
-}
\ No newline at end of file
+}
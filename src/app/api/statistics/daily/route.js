@@ -1,74 +1,32 @@
 import prisma from '@/lib/prisma';
+import { calendarRange, groupStats, labDay, loadDailyStats } from '@/lib/statsRollup';
 
 // GET: Returns current day statistics
 export async function GET() {
   try {
-    const today = new Date();
-    const startOfDay = new Date(today.getFullYear(), today.getMonth(), today.getDate(), 0, 0, 0);
-    const endOfDay = new Date(today.getFullYear(), today.getMonth(), today.getDate(), 23, 59, 59);
+    const today = labDay();
 
-    // Get total attended patients today
-    const totalAttended = await prisma.turnRequest.count({
-      where: {
-        status: "Attended",
-        finishedAt: {
-          gte: startOfDay,
-          lte: endOfDay,
+    // Attended patients today (lab local day) with their attention time sums
+    const [todayStats, totalPending, totalInProgress] = await Promise.all([
+      loadDailyStats(today, today),
+      // Get total pending patients
+      prisma.turnRequest.count({
+        where: {
+          status: "Pending",
         },
-      },
-    });
-
-    // Get attended patients with time data for average calculation
-    const attendedTurns = await prisma.turnRequest.findMany({
-      where: {
-        status: "Attended",
-        finishedAt: {
-          gte: startOfDay,
-          lte: endOfDay,
+      }),
+      // Get total in progress patients
+      prisma.turnRequest.count({
+        where: {
+          status: "In Progress",
         },
-      },
-      select: {
-        createdAt: true,
-        finishedAt: true,
-        calledAt: true,
-      },
-    });
-
-    // Calculate average attention time in minutes
-    let averageAttentionTime = 0;
-    if (attendedTurns.length > 0) {
-      const validTurns = attendedTurns.filter(turn => {
-        // Use calledAt if available, otherwise use createdAt
-        const startTime = turn.calledAt || turn.createdAt;
-        return startTime && turn.finishedAt;
-      });
-
-      if (validTurns.length > 0) {
-        const totalTime = validTurns.reduce((sum, turn) => {
-          const startTime = turn.calledAt || turn.createdAt;
-          const timeDiff = new Date(turn.finishedAt) - new Date(startTime);
-          // Only count reasonable times (less than 4 hours per turn)
-          const maxReasonableTime = 4 * 60 * 60 * 1000; // 4 hours in milliseconds
-          const validTimeDiff = Math.min(timeDiff, maxReasonableTime);
-          return sum + validTimeDiff;
-        }, 0);
-        averageAttentionTime = Math.round(totalTime / validTurns.length / 1000 / 60); // Convert to minutes
-      }
-    }
-
-    // Get total pending patients
-    const totalPending = await prisma.turnRequest.count({
-      where: {
-        status: "Pending",
-      },
-    });
+      }),
+    ]);
 
-    // Get total in progress patients
-    const totalInProgress = await prisma.turnRequest.count({
-      where: {
-        status: "In Progress",
-      },
-    });
+    // Average attention time in minutes (calledAt or createdAt → finishedAt, capped at 4 hours)
+    const totalAttended = todayStats.reduce((sum, row) => sum + row.attended, 0);
+    const attentionMinutes = todayStats.reduce((sum, row) => sum + row.attentionMinutes, 0);
+    const averageAttentionTime = totalAttended > 0 ? Math.round(attentionMinutes / totalAttended) : 0;
 
     // Calculate efficiency percentage (attended vs total processed today)
     const totalProcessed = totalAttended + totalPending + totalInProgress;
@@ -83,7 +41,7 @@ export async function GET() {
           efficiencyPercentage,
           totalPending,
           totalInProgress,
-          date: today.toISOString().split('T')[0],
+          date: today,
         },
       }),
       { status: 200, headers: { "Content-Type": "application/json" } }
@@ -102,41 +60,19 @@ export async function POST(req) {
   try {
     const { year, month } = await req.json();
 
-    const filters = {};
-    if (year) {
-      filters.createdAt = {
-        gte: new Date(year, month ? month - 1 : 0, 1),
-        lt: new Date(year, month ? month : 12, 1),
-      };
-    }
+    const [fromDay, toDay] = calendarRange(year || new Date().getFullYear(), month || null);
 
-    // First, let's get the data grouped by day for the specified period
-    const data = await prisma.turnRequest.findMany({
-      where: {
-        status: "Attended",
-        finishedAt: filters.createdAt || {
-          gte: new Date(year || new Date().getFullYear(), month ? month - 1 : 0, 1),
-          lt: new Date(year || new Date().getFullYear(), month ? month : 12, 1),
-        },
-      },
-      select: {
-        id: true,
-        finishedAt: true,
-      },
-    });
+    // Agrupar por días del mes (día local de finishedAt) desde los rollups
+    const rows = await loadDailyStats(fromDay, toDay);
+    const byDay = groupStats(rows, (row) => Number(row.day.slice(8, 10)));
 
-    // Agrupar por días del mes usando finishedAt
-    const dailyData = data.reduce((acc, item) => {
-      if (item.finishedAt) {
-        const date = new Date(item.finishedAt);
-        const day = date.getDate();
-        acc[day] = (acc[day] || 0) + 1;
-      }
-      return acc;
-    }, {});
+    const dailyData = {};
+    for (const [day, stats] of [...byDay].sort(([a], [b]) => a - b)) {
+      dailyData[day] = stats.attended;
+    }
 
     // Calcular el total general
-    const totalPatients = data.length;
+    const totalPatients = Object.values(dailyData).reduce((sum, count) => sum + count, 0);
 
     return new Response(
       JSON.stringify({
@@ -1,49 +1,29 @@
-import prisma from '../../../../../lib/prisma.js';
+import { calendarRange, groupStats, labDay, loadMonthlyStats } from '../../../../../lib/statsRollup.js';
 
 const monthNames = [
   "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
   "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
 ];
 
+// Sin año: todo el histórico consolidado
+const FIRST_DAY = "2000-01-01";
+
 export async function POST(req) {
   try {
     const { year, phlebotomistId } = await req.json();
 
-    const filters = {};
-    if (year) {
-      filters.createdAt = {
-        gte: new Date(year, 0, 1),
-        lte: new Date(year, 11, 31),
-      };
-    }
-    if (phlebotomistId && phlebotomistId !== "all") {
-      filters.attendedBy = phlebotomistId;
-    }
+    const [fromDay, toDay] = year ? calendarRange(Number(year)) : [FIRST_DAY, labDay()];
+    const userId = phlebotomistId && phlebotomistId !== "all" ? parseInt(phlebotomistId) || null : null;
 
-    // Obtener datos agrupados por mes usando finishedAt para turnos atendidos
-    const data = await prisma.turnRequest.findMany({
-      where: {
-        status: "Attended",
-        finishedAt: filters.createdAt ? {
-          gte: filters.createdAt.gte,
-          lte: filters.createdAt.lte,
-        } : undefined,
-        attendedBy: filters.attendedBy,
-      },
-      select: {
-        finishedAt: true,
-      },
-    });
+    // Turnos atendidos por mes (día local de finishedAt) desde los rollups
+    const rows = await loadMonthlyStats(fromDay, toDay, { userId });
+    const byMonth = groupStats(rows, (row) => Number(row.day.slice(5, 7)) - 1);
 
-    // Calcular totales por mes usando finishedAt
-    const monthlyData = data.reduce((acc, item) => {
-      if (item.finishedAt) {
-        const date = new Date(item.finishedAt);
-        const month = monthNames[date.getMonth()]; // Traducir el mes al nombre
-        acc[month] = (acc[month] || 0) + 1;
-      }
-      return acc;
-    }, {});
+    // Calcular totales por mes (solo meses con atenciones, en orden de calendario)
+    const monthlyData = {};
+    for (const [month, stats] of [...byMonth].sort(([a], [b]) => a - b)) {
+      if (stats.attended > 0) monthlyData[monthNames[month]] = stats.attended;
+    }
 
     // Calcular el total general
     const totalPatients = Object.values(monthlyData).reduce((sum, count) => sum + count, 0);
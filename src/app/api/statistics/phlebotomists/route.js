@@ -1,4 +1,4 @@
-import prisma from '../../../../../lib/prisma.js';
+import { calendarRange, groupStats, loadDailyStats } from '../../../../../lib/statsRollup.js';
 
 export async function POST(req) {
   try {
@@ -12,31 +12,16 @@ export async function POST(req) {
       );
     }
 
-    // Construir rango de fechas
-    const startDate = new Date(year, month - 1, 1); // Primer día del mes
-    const endDate = new Date(year, month, 0, 23, 59, 59); // Último día del mes
-
-    // Consultar datos agrupados por día (normalizando la fecha)
-    const turnRequests = await prisma.$queryRaw`
-      SELECT
-        DATE("finishedAt") AS "day",
-        COUNT(*)::INT AS "count" -- Convertir a INT explícitamente
-      FROM "TurnRequest"
-      WHERE "attendedBy" = ${parseInt(phlebotomistId)}
-        AND "status" = 'Attended'
-        AND "finishedAt" BETWEEN ${startDate} AND ${endDate}
-      GROUP BY DATE("finishedAt")
-      ORDER BY DATE("finishedAt");
-    `;
+    // Turnos atendidos por día (día local de finishedAt) desde los rollups
+    const [fromDay, toDay] = calendarRange(parseInt(year), parseInt(month));
+    const rows = await loadDailyStats(fromDay, toDay, { userId: parseInt(phlebotomistId) });
+    const byDay = groupStats(rows, (row) => Number(row.day.slice(8, 10)));
 
     // Formatear datos para enviar al frontend
-    const daysInMonth = new Date(year, month, 0).getDate();
+    const daysInMonth = Number(toDay.slice(8, 10));
     const dailyData = Array.from({ length: daysInMonth }, (_, i) => {
       const day = i + 1;
-      const matchingRequest = turnRequests.find(
-        (request) => new Date(request.day).getDate() === day
-      );
-      return { day, count: matchingRequest ? Number(matchingRequest.count) : 0 };
+      return { day, count: byDay.get(day)?.attended || 0 };
     });
 
     // Total de turnos atendidos
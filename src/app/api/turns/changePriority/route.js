@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 /**
  * PUT /api/turns/changePriority
@@ -68,6 +69,8 @@ export async function PUT(req) {
       `${turn.tipoAtencion} → ${newPriority}`
     );
 
+    notifyQueueChange("turns/changePriority");
+
     return new Response(
       JSON.stringify({
         success: true,
@@ -5,6 +5,7 @@ import { processStudiesComplete } from '@/lib/studiesProcessor';
 import { getMappingByLabsisCode } from '@/lib/labsisTubeMapping';
 import { tipoAtencionFromCodigo } from '@/lib/labsisCodigoAtencionMapping';
 import DOMPurify from 'isomorphic-dompurify';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 // Generar array de IDs de tubos válidos desde el catálogo actualizado (43 tipos INER)
 const validTubeTypes = TUBE_TYPES.map(t => t.id);
@@ -416,6 +417,8 @@ export async function POST(req) {
           }
         });
 
+        notifyQueueChange("turns/create");
+
         return new Response(
           JSON.stringify({
             assignedTurn: existingByOT.assignedTurn,
@@ -458,6 +461,8 @@ export async function POST(req) {
       data: { assignedTurn },
     });
 
+    notifyQueueChange("turns/create");
+
     // Respuesta enriquecida con información procesada
     return new Response(
       JSON.stringify({
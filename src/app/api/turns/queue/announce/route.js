@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 export async function POST(req) {
   try {
@@ -16,6 +17,8 @@ export async function POST(req) {
       data: { isCalled: true }
     });
 
+    notifyQueueChange("turns/announce");
+
     return new Response(
       JSON.stringify(updatedTurn),
       { status: 200, headers: { "Content-Type": "application/json" } }
@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 export async function GET() {
   try {
@@ -90,6 +91,8 @@ export async function POST(req) {
       data: { isCalled }
     });
 
+    notifyQueueChange("turns/queue");
+
     return new Response(
       JSON.stringify(updatedTurn),
       { status: 200, headers: { "Content-Type": "application/json" } }
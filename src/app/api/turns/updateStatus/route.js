@@ -1,4 +1,5 @@
 import prisma from '@/lib/prisma';
+import { notifyQueueChange } from '@/lib/queueEvents';
 
 export async function POST(req) {
   try {
@@ -20,6 +21,8 @@ export async function POST(req) {
 
     console.log("Estado del llamado actualizado:", updatedTurn);
 
+    notifyQueueChange("turns/updateStatus");
+
     return new Response(
       JSON.stringify({ success: true, updatedTurn }),
       { status: 200, headers: { "Content-Type": "application/json" } }
@@ -1,9 +1,8 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../../lib/prisma.js";
 import bcrypt from "bcryptjs";
 import jwt from "jsonwebtoken";
-
-const prisma = new PrismaClient();
+import { invalidateUserAuth } from "../../../../../../lib/authCache.js";
 
 // Generar contraseña aleatoria segura
 function generateRandomPassword() {
@@ -105,6 +104,7 @@ export async function POST(request, { params }) {
         updatedAt: new Date()
       }
     });
+    invalidateUserAuth(parseInt(id));
 
     // Cerrar todas las sesiones existentes del usuario
     await prisma.session.updateMany({
@@ -152,7 +152,5 @@ export async function POST(request, { params }) {
       { success: false, error: "Error al resetear contraseña" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
@@ -1,9 +1,8 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../lib/prisma.js";
 import bcrypt from "bcryptjs";
 import jwt from "jsonwebtoken";
-
-const prisma = new PrismaClient();
+import { invalidateUserAuth } from "../../../../../lib/authCache.js";
 
 // Helper function to verify admin access
 async function verifyAdmin(request) {
@@ -119,8 +118,6 @@ export async function GET(request, { params }) {
       { success: false, error: "Error al obtener usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
 
@@ -246,6 +243,7 @@ export async function PUT(request, { params }) {
         updatedAt: true
       }
     });
+    invalidateUserAuth(parseInt(id));
 
     // Registrar en auditoría
     await prisma.auditLog.create({
@@ -282,8 +280,6 @@ export async function PUT(request, { params }) {
       { success: false, error: "Error al actualizar usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
 
@@ -363,6 +359,7 @@ export async function PATCH(request, { params }) {
         updatedAt: true
       }
     });
+    invalidateUserAuth(parseInt(id));
 
     // Registrar en auditoría
     await prisma.auditLog.create({
@@ -389,8 +386,6 @@ export async function PATCH(request, { params }) {
       { success: false, error: "Error al actualizar usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
 
@@ -459,6 +454,7 @@ export async function DELETE(request, { params }) {
         status: true
       }
     });
+    invalidateUserAuth(parseInt(id));
 
     // Cerrar todas las sesiones del usuario
     await prisma.session.updateMany({
@@ -499,7 +495,5 @@ export async function DELETE(request, { params }) {
       { success: false, error: "Error al eliminar usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
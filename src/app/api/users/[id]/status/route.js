@@ -1,8 +1,7 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../../lib/prisma.js";
 import jwt from "jsonwebtoken";
-
-const prisma = new PrismaClient();
+import { invalidateUserAuth } from "../../../../../../lib/authCache.js";
 
 // PATCH - Activar/desactivar usuario
 export async function PATCH(request, { params }) {
@@ -111,6 +110,7 @@ export async function PATCH(request, { params }) {
         updatedAt: true
       }
     });
+    invalidateUserAuth(parseInt(id));
 
     // Si se desactiva, cerrar todas las sesiones
     if (!isActive) {
@@ -145,7 +145,5 @@ export async function PATCH(request, { params }) {
       { success: false, error: "Error al cambiar estado del usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
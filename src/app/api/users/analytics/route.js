@@ -1,9 +1,7 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../../lib/prisma.js";
 import jwt from "jsonwebtoken";
 
-const prisma = new PrismaClient();
-
 // GET - Obtener métricas y estadísticas de usuarios
 export async function GET(request) {
   try {
@@ -311,7 +309,5 @@ export async function GET(request) {
       { success: false, error: "Error al obtener analytics" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
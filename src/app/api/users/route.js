@@ -1,10 +1,8 @@
 import { NextResponse } from "next/server";
-import { PrismaClient } from "@prisma/client";
+import prisma from "../../../../lib/prisma.js";
 import bcrypt from "bcryptjs";
 import jwt from "jsonwebtoken";
 
-const prisma = new PrismaClient();
-
 // GET - Obtener todos los usuarios con datos extendidos
 export async function GET(request) {
   try {
@@ -180,8 +178,6 @@ export async function GET(request) {
       { success: false, error: "Error al obtener usuarios" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
 
@@ -353,7 +349,5 @@ export async function POST(request) {
       { success: false, error: "Error al crear usuario" },
       { status: 500 }
     );
-  } finally {
-    await prisma.$disconnect();
   }
 }
\ No newline at end of file
@@ -1,6 +1,12 @@
+import jwt from "jsonwebtoken";
+
+const JWT_SECRET = process.env.NEXTAUTH_SECRET || process.env.JWT_SECRET;
+
+// Roles que pueden consultar métricas internas (mantenimiento, cachés, stream)
+const SUPERVISOR_ROLES = ['admin', 'administrador', 'supervisor'];
+
 // Función helper para verificar si un usuario es administrador
 // Acepta tanto 'admin' como 'Administrador' para compatibilidad
-
 export function isUserAdmin(user) {
   if (!user) return false;
 
@@ -22,4 +28,26 @@ export function checkAdminPermission(requestingUser) {
   }
 
   return { success: true };
-}
\ No newline at end of file
+}
+
+// Verifica el Bearer token de la petición y que el rol sea admin o supervisor.
+// Devuelve { success: true, user } o { success: false, error, status } (401/403)
+export function checkSupervisorToken(request) {
+  const authHeader = request.headers.get("authorization");
+  if (!authHeader || !authHeader.startsWith("Bearer ")) {
+    return { success: false, error: "No autorizado", status: 401 };
+  }
+
+  let decodedToken;
+  try {
+    decodedToken = jwt.verify(authHeader.substring(7), JWT_SECRET);
+  } catch (error) {
+    return { success: false, error: "Token inválido", status: 401 };
+  }
+
+  if (!SUPERVISOR_ROLES.includes(decodedToken.role?.toLowerCase())) {
+    return { success: false, error: "Acceso denegado", status: 403 };
+  }
+
+  return { success: true, user: decodedToken };
+}
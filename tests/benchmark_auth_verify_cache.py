@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la caché de verificación de tokens (/api/auth/verify)
+
+N usuarios concurrentes verifican su token en bucle, como AuthContext y
+ProtectedRoute en cada cambio de página, en dos fases de igual duración:
+
+1. sin-cache: cada petición manda Cache-Control: no-cache, que obliga a la
+   ruta a consultar "User" (el comportamiento anterior a lib/authCache.js)
+2. con-cache: peticiones normales; tras la primera, se responden desde memoria
+
+En cada fase se mide:
+- throughput (req/s) y latencia p50/p95/p99
+- aciertos/fallos de la caché (/api/auth/verify?stats=1, requiere admin/supervisor)
+- scans sobre "User" en pg_stat_user_tables, si hay psycopg/psycopg2
+
+Uso:
+    python3 tests/benchmark_auth_verify_cache.py --users 50 --duration 30
+    python3 tests/benchmark_auth_verify_cache.py --users 100 -o auth_cache.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+from harness.pg import connect, driver_available
+from harness.session import get_broker, SessionError
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.91.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 91
+ENDPOINT = '/api/auth/verify'
+
+
+def user_scans(conn):
+    """Total de scans (secuenciales + índice) sobre "User" según PostgreSQL"""
+    if conn is None:
+        return None
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute('''SELECT COALESCE(seq_scan, 0) + COALESCE(idx_scan, 0)
+                       FROM pg_stat_user_tables WHERE relname = 'User' ''')
+        row = cur.fetchone()
+    conn.rollback()
+    return row[0] if row else None
+
+
+async def cache_stats(client, token):
+    response = await client.get(f"{ENDPOINT}?stats=1",
+                                headers={**forwarded_headers(FORWARDED_PREFIX, 0), 'Authorization': f"Bearer {token}"})
+    if response.status != 200:
+        raise HttpError(f"stats: status {response.status}")
+    return response.json()
+
+
+async def verify_loop(client, recorder, token, bypass, deadline, counter):
+    while time.monotonic() < deadline:
+        counter[0] += 1
+        headers = forwarded_headers(FORWARDED_PREFIX, counter[0])
+        if bypass:
+            headers['Cache-Control'] = 'no-cache'
+        try:
+            response = await client.post(ENDPOINT, {'token': token}, headers=headers)
+            recorder.record(ENDPOINT, response.elapsed, response.status)
+        except HttpError as e:
+            recorder.record(ENDPOINT, 0.0, None, str(e))
+
+
+async def run_phase(args, name, bypass, token, conn, counter):
+    recorder = LatencyRecorder()
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.users) as client:
+        # Calentar: compilar la ruta y dejar el token en caché
+        await client.post(ENDPOINT, {'token': token}, headers=forwarded_headers(FORWARDED_PREFIX, 0))
+        before = await cache_stats(client, token)
+        scans_before = user_scans(conn)
+
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(*(verify_loop(client, recorder, token, bypass, deadline, counter)
+                               for _ in range(args.users)))
+        recorder.stop()
+
+        after = await cache_stats(client, token)
+        scans_after = user_scans(conn)
+
+    return {
+        'phase': name,
+        'latency': recorder.summary()['endpoints'].get(ENDPOINT, {}),
+        'cacheHits': after.get('hits', 0) - before.get('hits', 0),
+        'cacheMisses': after.get('misses', 0) - before.get('misses', 0),
+        'userScans': scans_after - scans_before if scans_before is not None and scans_after is not None else None,
+    }
+
+
+def print_phases(phases):
+    print(f"\n{Colors.BOLD}{'Fase':<11}{'peticiones':>11}{'req/s':>9}{'errores':>9}{'aciertos':>10}"
+          f"{'scans User':>12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{Colors.END}")
+    print('-' * 89)
+    for phase in phases:
+        latency = phase['latency']
+        scans = phase['userScans']
+        print(f"{phase['phase']:<11}{latency.get('requests', 0):>11}{latency.get('throughput', 0):>9.1f}"
+              f"{latency.get('errors', 0):>9}{phase['cacheHits']:>10}{scans if scans is not None else '-':>12}"
+              f"{latency.get('p50') or 0:>9.1f}{latency.get('p95') or 0:>9.1f}{latency.get('p99') or 0:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput de /api/auth/verify con y sin caché de tokens")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--users", "-n", type=int, default=50, help="Usuarios concurrentes")
+    parser.add_argument("--duration", "-d", type=float, default=30, help="Segundos por fase")
+    parser.add_argument("--user", default="admin", help="Usuario admin/supervisor (lee los contadores de la caché)")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--no-pg", action="store_true", help="No leer pg_stat_user_tables")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("BENCHMARK CACHÉ DE VERIFICACIÓN DE TOKENS")
+
+    try:
+        token = get_broker().get(args.user, args.password).token
+    except SessionError as e:
+        print_error(f"No se pudo iniciar sesión como {args.user}: {e}")
+        sys.exit(1)
+
+    conn = None
+    if not args.no_pg and driver_available():
+        try:
+            conn = connect()
+        except Exception as e:
+            print_info(f"Sin contadores de PostgreSQL: {e}")
+
+    phases = []
+    counter = [0]
+    try:
+        for name, bypass in (('sin-cache', True), ('con-cache', False)):
+            print_info(f"Fase {name}: {args.users} usuarios durante {args.duration:g}s")
+            phases.append(asyncio.run(run_phase(args, name, bypass, token, conn, counter)))
+    except HttpError as e:
+        print_error(f"No se pudo consultar {args.base_url}: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print_phases(phases)
+    uncached, cached = (phase['latency'] for phase in phases)
+    print()
+    if uncached.get('throughput'):
+        print_success(f"Throughput: {uncached['throughput']:.1f} → {cached.get('throughput', 0):.1f} req/s "
+                      f"(x{cached.get('throughput', 0) / uncached['throughput']:.2f})")
+    if phases[1]['cacheMisses']:
+        print_info(f"{phases[1]['cacheMisses']} fallos de caché en la fase con caché "
+                   f"(vencimiento por TTL o invalidaciones)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args), 'phases': phases},
+                      f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark de conexiones a PostgreSQL bajo carga de /api/auth/verify
+
+N usuarios concurrentes verifican su token en bucle (como hace cada página al
+montar AuthContext) mientras se muestrea pg_stat_activity de la base de la app:
+
+- conexiones totales, activas e inactivas (máximo y promedio del muestreo)
+- backends nuevos abiertos durante la corrida (backend_start posterior al
+  inicio): con un PrismaClient por ruta y $disconnect() en cada petición el
+  servidor abre y cierra conexiones sin parar; con el cliente compartido de
+  lib/prisma.js el número se queda en el tamaño del pool
+- latencia p50/p95 de /api/auth/verify
+
+Para comparar antes/después se corre una vez por versión del servidor y se
+guarda cada resultado:
+
+    python3 tests/benchmark_connection_churn.py --label antes -o antes.json
+    # desplegar la versión nueva
+    python3 tests/benchmark_connection_churn.py --label despues -o despues.json --compare antes.json
+
+Requiere psycopg o psycopg2 para leer pg_stat_activity (ver harness/pg.py);
+sin driver solo se mide la latencia.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+from harness.pg import connect, driver_available
+from harness.session import get_broker, SessionError
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.81.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 81
+ENDPOINT = '/api/auth/verify'
+SAMPLE_INTERVAL = 0.5
+
+
+class ActivitySampler:
+    """Muestrea pg_stat_activity de la base actual, excluyendo la propia conexión"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.samples = []
+        self.started_at = None
+        self.new_backends = None
+
+    def _query(self, sql, params=None):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            row = cur.fetchone()
+        self.conn.rollback()
+        return row
+
+    def mark_start(self):
+        self.started_at = self._query("SELECT clock_timestamp()")[0]
+
+    def sample(self):
+        total, active, idle = self._query('''
+            SELECT count(*),
+                   count(*) FILTER (WHERE state = 'active'),
+                   count(*) FILTER (WHERE state LIKE 'idle%%')
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid() AND backend_type = 'client backend'
+        ''')
+        self.samples.append({'total': total, 'active': active, 'idle': idle})
+
+    def finish(self):
+        # Los backends que ya se cerraron no aparecen aquí; sessionsOpened
+        # (pg_stat_database.sessions, PostgreSQL 14+) cuenta también esos
+        self.new_backends = self._query('''
+            SELECT count(*) FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid()
+              AND backend_type = 'client backend' AND backend_start >= %s
+        ''', (self.started_at,))[0]
+
+    def sessions_counter(self):
+        try:
+            return self._query("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")[0]
+        except Exception:
+            self.conn.rollback()
+            return None
+
+    async def run(self, stop):
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self):
+        if not self.samples:
+            return None
+        count = len(self.samples)
+        return {
+            'samples': count,
+            'maxTotal': max(s['total'] for s in self.samples),
+            'avgTotal': round(sum(s['total'] for s in self.samples) / count, 1),
+            'maxActive': max(s['active'] for s in self.samples),
+            'maxIdle': max(s['idle'] for s in self.samples),
+            'openedDuringRunStillAlive': self.new_backends,
+        }
+
+
+async def verify_loop(client, recorder, token, deadline, counter):
+    while time.monotonic() < deadline:
+        counter[0] += 1
+        try:
+            response = await client.post(ENDPOINT, {'token': token}, headers=forwarded_headers(FORWARDED_PREFIX, counter[0]))
+            recorder.record(ENDPOINT, response.elapsed, response.status)
+        except HttpError as e:
+            recorder.record(ENDPOINT, 0.0, None, str(e))
+
+
+async def run(args, token, sampler):
+    recorder = LatencyRecorder()
+    counter = [0]
+    stop = asyncio.Event()
+    sessions_before = None
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.users) as client:
+        # Calentar: compilar la ruta y abrir el pool antes de medir
+        await client.post(ENDPOINT, {'token': token}, headers=forwarded_headers(FORWARDED_PREFIX, 0))
+        if sampler:
+            sampler.mark_start()
+            sessions_before = sampler.sessions_counter()
+        sampler_task = asyncio.create_task(sampler.run(stop)) if sampler else None
+
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(*(verify_loop(client, recorder, token, deadline, counter) for _ in range(args.users)))
+        recorder.stop()
+
+        stop.set()
+        if sampler_task:
+            await sampler_task
+
+    result = {'requests': counter[0], 'latency': recorder.summary()['endpoints'].get(ENDPOINT, {})}
+    if sampler:
+        sampler.finish()
+        result['connections'] = sampler.summary()
+        sessions_after = sampler.sessions_counter()
+        if sessions_before is not None and sessions_after is not None:
+            result['connections']['sessionsOpened'] = sessions_after - sessions_before
+    return result
+
+
+def print_result(result, label):
+    latency = result['latency']
+    print(f"\n{Colors.BOLD}{label}{Colors.END}")
+    print(f"  Peticiones:  {result['requests']}  ({latency.get('throughput', 0):.1f} req/s, "
+          f"errores {latency.get('errors', 0)}, 429 {latency.get('throttled', 0)})")
+    print(f"  Latencia:    p50 {latency.get('p50') or 0:.1f} ms   p95 {latency.get('p95') or 0:.1f} ms")
+    connections = result.get('connections')
+    if connections:
+        print(f"  Conexiones:  máx {connections['maxTotal']} (prom {connections['avgTotal']}), "
+              f"activas máx {connections['maxActive']}, inactivas máx {connections['maxIdle']}")
+        opened = connections.get('sessionsOpened')
+        print(f"  Nuevas:      {opened if opened is not None else '-'} sesiones abiertas durante la corrida "
+              f"({connections['openedDuringRunStillAlive']} siguen abiertas)")
+
+
+def print_comparison(before, after):
+    rows = [
+        ('p50 ms', before['latency'].get('p50'), after['latency'].get('p50')),
+        ('p95 ms', before['latency'].get('p95'), after['latency'].get('p95')),
+        ('peticiones', before['requests'], after['requests']),
+    ]
+    for key, name in (('maxTotal', 'conexiones máx'), ('sessionsOpened', 'sesiones abiertas')):
+        rows.append((name, (before.get('connections') or {}).get(key), (after.get('connections') or {}).get(key)))
+
+    print(f"\n{Colors.BOLD}{'':<20}{before['label']:>12}{after['label']:>12}{'cambio':>10}{Colors.END}")
+    print('-' * 54)
+    for name, old, new in rows:
+        change = f"{(new - old) / old * 100:+.0f}%" if old and new is not None else '-'
+        fmt = lambda v: '-' if v is None else (f"{v:.1f}" if isinstance(v, float) else str(v))
+        print(f"{name:<20}{fmt(old):>12}{fmt(new):>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conexiones a PostgreSQL y latencia de /api/auth/verify bajo carga")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--users", "-n", type=int, default=50, help="Usuarios concurrentes")
+    parser.add_argument("--duration", "-d", type=float, default=30, help="Segundos de carga")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--label", default=datetime.now().strftime('%H%M%S'), help="Nombre de la corrida")
+    parser.add_argument("--compare", help="JSON de una corrida previa (p. ej. antes del cambio)")
+    parser.add_argument("--no-pg", action="store_true", help="No leer pg_stat_activity")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("BENCHMARK DE CONEXIONES: /api/auth/verify")
+
+    try:
+        token = get_broker().get(args.user, args.password).token
+    except SessionError as e:
+        print_error(f"No se pudo iniciar sesión como {args.user}: {e}")
+        sys.exit(1)
+
+    conn = None
+    if not args.no_pg and driver_available():
+        try:
+            conn = connect()
+        except Exception as e:
+            print_info(f"Sin pg_stat_activity: {e}")
+    elif not args.no_pg:
+        print_info("Sin psycopg/psycopg2: solo se mide la latencia")
+
+    print_info(f"{args.users} usuarios durante {args.duration:g}s contra {args.base_url}{ENDPOINT}")
+    try:
+        result = asyncio.run(run(args, token, ActivitySampler(conn) if conn else None))
+    except HttpError as e:
+        print_error(f"No se pudo consultar {args.base_url}: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    result = {'label': args.label, 'timestamp': datetime.now().isoformat(timespec='seconds'),
+              'users': args.users, 'duration': args.duration, **result}
+    print_result(result, args.label)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(json.load(f), result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia de la asignación de holdings por número de cubículos
+
+Mide, directo en PostgreSQL, cuántos turnos por segundo se asignan en holding
+cuando K flebotomistas (uno por cubículo, cada uno con su conexión) reclaman a
+la vez, para K en --cubicles. Dos estrategias:
+
+- anterior: lo que hacía assignNextHolding() — barrido de holdings expirados
+  (UPDATE), leer la cabeza de la cola sin bloqueo y asignar con
+  UPDATE ... WHERE "holdingBy" IS NULL. Dos flebotomistas que leen la misma
+  cabeza chocan: uno gana y el otro falla (en la app, error P2025 → 500).
+- skip-locked: lo que hace claimNextTurn() — leer la cabeza de la cola sin
+  bloqueo, bloquear solo el candidato elegido con FOR UPDATE SKIP LOCKED y
+  volver a comprobar que siga libre (si otro lo tomó, pasar al siguiente).
+  Expiración perezosa en el predicado, sin barrido.
+
+Se esperan: throughput que crece con K y 0 conflictos con skip-locked (los
+candidatos que otro tomó se cuentan como reintentos, no como fallos); con la
+estrategia anterior los conflictos crecen con K y el barrido escribe en cada
+asignación.
+
+Los turnos de prueba (labsisOrderId 'HAB-*') se crean al inicio y se liberan
+entre corridas; las consultas se limitan a ellos.
+
+ATENCIÓN: escribe en la base de DATABASE_URL. Usar una base de benchmark.
+
+Uso:
+    python3 tests/benchmark_holding_assignment.py
+    python3 tests/benchmark_holding_assignment.py --cubicles 1,2,4,8,12 --claims 600 -o holding.json
+    python3 tests/benchmark_holding_assignment.py --clean
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.pg import DatabaseError, connect, driver_available
+
+ORDER_PREFIX = 'HAB-'
+HOLDING_TIMEOUT_MINUTES = 5
+HOLDING_CANDIDATES = 10
+
+PRIORITY = ('''CASE WHEN "tipoAtencion" = 'MuyEspecial' THEN 0 '''
+            '''WHEN "tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END''')
+BENCH_ONLY = f'''"labsisOrderId" LIKE '{ORDER_PREFIX}%%' '''
+
+# Cola de prueba: mezcla de prioridades; 1 de cada 20 con un holding ya expirado
+SEED_INSERT = f'''
+    INSERT INTO "TurnRequest" ("patientName", age, gender, studies, "tubesRequired", status, "createdAt",
+                               "updatedAt", "tipoAtencion", "isCalled", "callCount", "assignedTurn",
+                               "holdingBy", "holdingAt", "labsisOrderId")
+    SELECT 'Holding ' || g, 40, 'M', '["Biometría hemática"]', 1, 'Pending',
+           now() - g * interval '1 second', now(),
+           (ARRAY['General', 'General', 'General', 'Prioritario', 'RiesgoCaida'])[1 + g %% 5],
+           false, 0, 800000 + g,
+           CASE WHEN g %% 20 = 0 THEN %s END,
+           CASE WHEN g %% 20 = 0 THEN (now() AT TIME ZONE 'UTC') - interval '{HOLDING_TIMEOUT_MINUTES + 1} minutes' END,
+           '{ORDER_PREFIX}' || g
+    FROM generate_series(1, %s) AS g
+'''
+
+RESET = f'''UPDATE "TurnRequest" SET "holdingBy" = NULL, "holdingAt" = NULL
+            WHERE {BENCH_ONLY} AND "holdingBy" IS NOT NULL'''
+
+# Estrategia anterior (assignNextHolding antes de la expiración perezosa)
+PREVIOUS_SWEEP = f'''
+    UPDATE "TurnRequest" SET "holdingBy" = NULL, "holdingAt" = NULL
+    WHERE status = 'Pending' AND "holdingBy" IS NOT NULL
+      AND "holdingAt" < (now() AT TIME ZONE 'UTC') - interval '{HOLDING_TIMEOUT_MINUTES} minutes'
+'''
+PREVIOUS_HEAD = f'''
+    SELECT id, "tipoAtencion" FROM "TurnRequest"
+    WHERE status = 'Pending' AND "holdingBy" IS NULL AND {BENCH_ONLY}
+    ORDER BY {PRIORITY}, COALESCE("deferredAt", "createdAt") ASC
+    LIMIT {HOLDING_CANDIDATES}
+'''
+PREVIOUS_ASSIGN = '''
+    UPDATE "TurnRequest" SET "holdingBy" = %s, "holdingAt" = now() AT TIME ZONE 'UTC'
+    WHERE id = %s AND "holdingBy" IS NULL
+'''
+
+# claimNextTurn() (lib/holdingUtils.js), sin ruteo por cubículo
+FREE = ('''("holdingBy" IS NULL OR "holdingAt" IS NULL '''
+        f'''OR "holdingAt" < (now() AT TIME ZONE 'UTC') - interval '{HOLDING_TIMEOUT_MINUTES} minutes')''')
+CANDIDATES = f'''
+    SELECT id FROM "TurnRequest"
+    WHERE status = 'Pending' AND {FREE} AND {BENCH_ONLY}
+    ORDER BY {PRIORITY}, COALESCE("deferredAt", "createdAt") ASC
+    LIMIT {HOLDING_CANDIDATES}
+'''
+CLAIM = f'''
+    UPDATE "TurnRequest" SET "holdingBy" = %s, "holdingAt" = now() AT TIME ZONE 'UTC'
+    WHERE id = (SELECT id FROM "TurnRequest"
+                WHERE id = %s AND status = 'Pending' AND {FREE}
+                FOR UPDATE SKIP LOCKED)
+    RETURNING id
+'''
+
+
+def clean(conn):
+    with conn.cursor() as cur:
+        cur.execute(f'DELETE FROM "TurnRequest" WHERE {BENCH_ONLY}')
+        deleted = cur.rowcount
+    conn.commit()
+    return deleted
+
+
+def seed(conn, count, user_id):
+    with conn.cursor() as cur:
+        cur.execute(SEED_INSERT, (user_id, count))
+        cur.execute('ANALYZE "TurnRequest"')
+    conn.commit()
+
+
+def reset(conn):
+    with conn.cursor() as cur:
+        cur.execute(RESET)
+    conn.commit()
+
+
+def claim_previous(conn, user_id):
+    """Devuelve (id reclamado o None, chocó con otro flebotomista, candidatos reintentados)"""
+    with conn.cursor() as cur:
+        cur.execute(PREVIOUS_SWEEP)
+        conn.commit()
+        cur.execute(PREVIOUS_HEAD)
+        head = cur.fetchall()
+        if not head:
+            conn.commit()
+            return None, False, 0
+        cur.execute(PREVIOUS_ASSIGN, (user_id, head[0][0]))
+        won = cur.rowcount == 1
+    conn.commit()
+    return (head[0][0], False, 0) if won else (None, True, 0)
+
+
+def claim_skip_locked(conn, user_id):
+    retries = 0
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(CANDIDATES)
+            candidates = [row[0] for row in cur.fetchall()]
+            conn.commit()
+            if not candidates:
+                return None, False, retries
+            for candidate in candidates:
+                cur.execute(CLAIM, (user_id, candidate))
+                row = cur.fetchone()
+                conn.commit()
+                if row:
+                    return row[0], False, retries
+                retries += 1
+            # Todos los candidatos tomados por otros: releer la cola
+
+
+STRATEGIES = {'anterior': claim_previous, 'skip-locked': claim_skip_locked}
+
+
+def run(strategy, cubicles, claims, user_ids):
+    """K hilos reclamando hasta asignar `claims` turnos entre todos"""
+    claim = STRATEGIES[strategy]
+    connections = [connect() for _ in range(cubicles)]
+    lock = threading.Lock()
+    state = {'claimed': [], 'conflicts': 0, 'retries': 0, 'empty': 0, 'errors': []}
+    start = threading.Barrier(cubicles + 1)
+
+    def worker(index):
+        conn = connections[index]
+        user_id = user_ids[index % len(user_ids)]
+        start.wait()
+        while True:
+            with lock:
+                if len(state['claimed']) >= claims:
+                    return
+            try:
+                turn_id, conflict, retries = claim(conn, user_id)
+            except Exception as e:
+                conn.rollback()
+                with lock:
+                    state['errors'].append(str(e))
+                return
+            with lock:
+                state['retries'] += retries
+                if turn_id is not None:
+                    state['claimed'].append(turn_id)
+                elif conflict:
+                    state['conflicts'] += 1
+                else:
+                    state['empty'] += 1
+                    return
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(cubicles)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for conn in connections:
+        conn.close()
+
+    claimed = state['claimed']
+    return {
+        'strategy': strategy,
+        'cubicles': cubicles,
+        'claimed': len(claimed),
+        'duplicates': len(claimed) - len(set(claimed)),
+        'conflicts': state['conflicts'],
+        'retries': state['retries'],
+        'errors': state['errors'][:5],
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(claimed) / elapsed, 1) if elapsed else 0,
+    }
+
+
+def print_results(results):
+    print(f"\n{Colors.BOLD}{'Estrategia':<13}{'cubículos':>10}{'asignados':>11}{'asig/s':>9}{'escala':>8}"
+          f"{'conflictos':>12}{'reintentos':>12}{'duplicados':>12}{Colors.END}")
+    print('-' * 87)
+    base = {}
+    for r in results:
+        base.setdefault(r['strategy'], r['throughput'])
+        scale = r['throughput'] / base[r['strategy']] if base[r['strategy']] else 0
+        r['scale'] = round(scale, 2)
+        color = Colors.RED if r['duplicates'] or r['errors'] else ''
+        print(f"{color}{r['strategy']:<13}{r['cubicles']:>10}{r['claimed']:>11}{r['throughput']:>9.1f}"
+              f"{scale:>7.2f}x{r['conflicts']:>12}{r['retries']:>12}{r['duplicates']:>12}{Colors.END if color else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput de asignación de holdings por número de cubículos")
+    parser.add_argument("--cubicles", type=lambda s: sorted(int(x) for x in s.split(',') if x),
+                        default=[1, 2, 4, 8], help="Flebotomistas concurrentes a medir, separados por coma")
+    parser.add_argument("--claims", type=int, default=400, help="Asignaciones por corrida")
+    parser.add_argument("--strategies", default="anterior,skip-locked",
+                        help="Estrategias a medir: anterior, skip-locked")
+    parser.add_argument("--min-scale", type=float, default=1.5,
+                        help="Escala mínima de skip-locked entre el menor y el mayor número de cubículos")
+    parser.add_argument("--keep", action="store_true", help="No borrar los turnos generados al terminar")
+    parser.add_argument("--clean", action="store_true", help="Solo borrar turnos generados por este script")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("ASIGNACIÓN DE HOLDINGS CONCURRENTE")
+
+    if not driver_available():
+        print_error("Se requiere psycopg o psycopg2 (pip install 'psycopg[binary]')")
+        sys.exit(1)
+    try:
+        conn = connect()
+    except DatabaseError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+    if args.clean:
+        print_success(f"Eliminados {clean(conn):,} turnos generados")
+        conn.close()
+        return
+
+    strategies = [s for s in args.strategies.split(',') if s]
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        print_error(f"Estrategias desconocidas: {', '.join(unknown)}")
+        sys.exit(1)
+
+    with conn.cursor() as cur:
+        cur.execute('SELECT id FROM "User" ORDER BY id LIMIT %s', (max(args.cubicles),))
+        user_ids = [row[0] for row in cur.fetchall()]
+    conn.rollback()
+    if not user_ids:
+        print_error('No hay usuarios en la base ("holdingBy" referencia a "User")')
+        sys.exit(1)
+
+    clean(conn)
+    seed(conn, args.claims + HOLDING_CANDIDATES * max(args.cubicles), user_ids[0])
+    print_info(f"{args.claims + HOLDING_CANDIDATES * max(args.cubicles)} turnos de prueba en espera")
+
+    results = []
+    try:
+        for strategy in strategies:
+            for cubicles in args.cubicles:
+                reset(conn)
+                print_info(f"{strategy}: {cubicles} cubículos reclamando {args.claims} turnos...")
+                results.append(run(strategy, cubicles, args.claims, user_ids))
+    finally:
+        if not args.keep:
+            print_info(f"Limpieza: {clean(conn):,} turnos generados eliminados")
+        conn.close()
+
+    print_results(results)
+    print()
+
+    failures = 0
+    for r in results:
+        if r['duplicates']:
+            print_error(f"{r['strategy']} con {r['cubicles']} cubículos asignó {r['duplicates']} turnos dos veces")
+            failures += 1
+        if r['errors']:
+            print_error(f"{r['strategy']} con {r['cubicles']} cubículos: {r['errors'][0]}")
+            failures += 1
+
+    skip = [r for r in results if r['strategy'] == 'skip-locked']
+    if len(skip) > 1:
+        first, last = skip[0], skip[-1]
+        scale = last['throughput'] / first['throughput'] if first['throughput'] else 0
+        if scale >= args.min_scale and not any(r['conflicts'] for r in skip):
+            print_success(f"skip-locked: {first['throughput']:.0f} → {last['throughput']:.0f} asig/s "
+                          f"de {first['cubicles']} a {last['cubicles']} cubículos (×{scale:.2f}), sin conflictos")
+        else:
+            print_error(f"skip-locked escala ×{scale:.2f} de {first['cubicles']} a {last['cubicles']} cubículos "
+                        f"(mínimo ×{args.min_scale:g})")
+            failures += 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args), 'results': results},
+                      f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escrituras de mantenimiento bajo carga de polling
+
+N clientes consultan en bucle las rutas que sondean los flebotomistas y la
+selección de cubículo (/api/cubicles/status, /api/attention/list) durante
+--duration segundos. Se mide:
+
+- latencia p50/p95/p99 y throughput por ruta
+- WAL generado en la base (pg_current_wal_lsn) y filas actualizadas en
+  "Session" / "TurnRequest" (pg_stat_user_tables), si hay psycopg/psycopg2
+- métricas del programador (GET /api/admin/maintenance): ejecuciones, veces
+  que otra instancia tenía el lock, filas afectadas y duración por tarea
+
+Antes de lib/maintenance.js cada consulta de /api/cubicles/status hacía dos
+UPDATE sobre "Session": el WAL crecía con el número de peticiones. Ahora las
+rutas solo leen y el WAL del periodo es el del programador (una ejecución por
+intervalo). Para comparar contra otra versión del servidor, guardar su corrida
+con -o y pasarla con --baseline.
+
+Uso:
+    python3 tests/benchmark_maintenance_polling.py --users 30 --duration 60
+    python3 tests/benchmark_maintenance_polling.py -o antes.json        # versión anterior
+    python3 tests/benchmark_maintenance_polling.py --baseline antes.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+from harness.pg import connect, driver_available
+from harness.session import get_broker, SessionError
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.120.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 120
+ENDPOINTS = ['/api/cubicles/status', '/api/attention/list']
+
+
+def db_counters(conn):
+    """Posición del WAL y filas actualizadas en las tablas que tocaba el mantenimiento"""
+    if conn is None:
+        return None
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute('''SELECT pg_current_wal_lsn()::text,
+                              COALESCE(SUM(n_tup_upd) FILTER (WHERE relname = 'Session'), 0),
+                              COALESCE(SUM(n_tup_upd) FILTER (WHERE relname = 'TurnRequest'), 0)
+                       FROM pg_stat_user_tables WHERE relname IN ('Session', 'TurnRequest')''')
+        lsn, session_updates, turn_updates = cur.fetchone()
+    conn.rollback()
+    return {'lsn': lsn, 'sessionUpdates': int(session_updates), 'turnUpdates': int(turn_updates)}
+
+
+def wal_bytes(conn, before, after):
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_wal_lsn_diff(%s::pg_lsn, %s::pg_lsn)", (after['lsn'], before['lsn']))
+        row = cur.fetchone()
+    conn.rollback()
+    return int(row[0])
+
+
+async def maintenance_stats(client, token):
+    response = await client.get('/api/admin/maintenance',
+                                headers={**forwarded_headers(FORWARDED_PREFIX, 0), 'Authorization': f"Bearer {token}"})
+    if response.status != 200:
+        return None
+    return response.json().get('data')
+
+
+async def poll_loop(client, recorder, user_id, deadline, counter):
+    while time.monotonic() < deadline:
+        for endpoint in ENDPOINTS:
+            counter[0] += 1
+            path = f"{endpoint}?userId={user_id}" if endpoint == '/api/attention/list' else endpoint
+            try:
+                response = await client.get(path, headers=forwarded_headers(FORWARDED_PREFIX, counter[0]))
+                recorder.record(endpoint, response.elapsed, response.status)
+            except HttpError as e:
+                recorder.record(endpoint, 0.0, None, str(e))
+
+
+async def run(args, token, user_id, conn):
+    recorder = LatencyRecorder()
+    counter = [0]
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.users) as client:
+        # Calentar: compilar las rutas
+        for endpoint in ENDPOINTS:
+            await client.get(endpoint, headers=forwarded_headers(FORWARDED_PREFIX, 0))
+        scheduler_before = await maintenance_stats(client, token)
+        counters_before = db_counters(conn)
+
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(*(poll_loop(client, recorder, user_id, deadline, counter) for _ in range(args.users)))
+        recorder.stop()
+
+        counters_after = db_counters(conn)
+        scheduler_after = await maintenance_stats(client, token)
+
+    endpoints = recorder.summary()['endpoints']
+    requests = sum(stats.get('requests', 0) for stats in endpoints.values())
+    database = None
+    if counters_before and counters_after:
+        wal = wal_bytes(conn, counters_before, counters_after)
+        database = {
+            'walBytes': wal,
+            'walBytesPer1kRequests': round(wal * 1000 / requests) if requests else None,
+            'sessionUpdates': counters_after['sessionUpdates'] - counters_before['sessionUpdates'],
+            'turnUpdates': counters_after['turnUpdates'] - counters_before['turnUpdates'],
+        }
+
+    return {
+        'requests': requests,
+        'endpoints': endpoints,
+        'database': database,
+        'scheduler': scheduler_after,
+        'schedulerRuns': (scheduler_after['leaderRuns'] - scheduler_before['leaderRuns']
+                          if scheduler_before and scheduler_after else None),
+    }
+
+
+def print_report(result, baseline):
+    print(f"\n{Colors.BOLD}{'Ruta':<24}{'peticiones':>11}{'req/s':>9}{'errores':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'p95 antes':>11}{Colors.END}")
+    print('-' * 91)
+    for endpoint in ENDPOINTS:
+        stats = result['endpoints'].get(endpoint, {})
+        before = (baseline or {}).get('endpoints', {}).get(endpoint, {}).get('p95')
+        print(f"{endpoint:<24}{stats.get('requests', 0):>11}{stats.get('throughput', 0):>9.1f}"
+              f"{stats.get('errors', 0):>9}{stats.get('p50') or 0:>9.1f}{stats.get('p95') or 0:>9.1f}"
+              f"{stats.get('p99') or 0:>9.1f}{before if before is not None else '-':>11}")
+
+    database = result['database']
+    if database:
+        print(f"\n{Colors.BOLD}Base de datos{Colors.END}")
+        print(f"  WAL generado:            {database['walBytes'] / 1024:,.1f} KB "
+              f"({database['walBytesPer1kRequests'] or 0:,} bytes por 1000 peticiones)")
+        print(f"  UPDATE en Session:       {database['sessionUpdates']:,}")
+        print(f"  UPDATE en TurnRequest:   {database['turnUpdates']:,}")
+
+    scheduler = result['scheduler']
+    if scheduler:
+        print(f"\n{Colors.BOLD}Programador de mantenimiento{Colors.END} "
+              f"(cada {scheduler['intervalMs'] / 1000:g}s, {result['schedulerRuns']} ejecuciones en la corrida, "
+              f"{scheduler['skippedLocked']} con el lock en otra instancia)")
+        for name, task in scheduler['tasks'].items():
+            print(f"  {name:<18}última {task['lastRunAt'] or '-'}  filas {task['lastRowsAffected']}  "
+                  f"{task['lastDurationMs']} ms  errores {task['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y WAL de las rutas de polling sin escrituras de mantenimiento")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--users", "-n", type=int, default=30, help="Clientes concurrentes")
+    parser.add_argument("--duration", "-d", type=float, default=60, help="Segundos de carga")
+    parser.add_argument("--user", default="admin", help="Usuario admin/supervisor para leer las métricas")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--no-pg", action="store_true", help="No leer WAL ni pg_stat_user_tables")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior (-o) para comparar")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("MANTENIMIENTO FUERA DE LAS RUTAS DE POLLING")
+
+    try:
+        session = get_broker().get(args.user, args.password)
+    except SessionError as e:
+        print_error(f"No se pudo iniciar sesión como {args.user}: {e}")
+        sys.exit(1)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    conn = None
+    if not args.no_pg and driver_available():
+        try:
+            conn = connect()
+        except Exception as e:
+            print_info(f"Sin contadores de PostgreSQL: {e}")
+
+    print_info(f"{args.users} clientes consultando {', '.join(ENDPOINTS)} durante {args.duration:g}s")
+    try:
+        result = asyncio.run(run(args, session.token, session.user.get('id'), conn))
+    except HttpError as e:
+        print_error(f"No se pudo consultar {args.base_url}: {e}")
+        sys.exit(1)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print_report(result, baseline)
+    print()
+
+    if result['scheduler'] is None:
+        print_info("Sin métricas del programador (/api/admin/maintenance no disponible en este servidor)")
+
+    database, before = result['database'], (baseline or {}).get('database')
+    if database and before and before.get('walBytesPer1kRequests'):
+        ratio = (database['walBytesPer1kRequests'] or 0) / before['walBytesPer1kRequests']
+        print_success(f"WAL por 1000 peticiones: {before['walBytesPer1kRequests']:,} → "
+                      f"{database['walBytesPer1kRequests'] or 0:,} bytes (x{ratio:.2f})")
+    if database and result['schedulerRuns'] == 0 and database['sessionUpdates']:
+        print_info(f"{database['sessionUpdates']:,} UPDATE en Session sin ejecuciones del programador "
+                   f"(actividad de otras sesiones o una ruta de lectura que aún escribe)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args), **result},
+                      f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la caché versionada de la cola (ETag / 304) bajo polling de pantallas
+
+Simula N pantallas de TV consultando /api/queue/list cada 3 s (como
+pages/turns/queue.js sin stream) y M flebotomistas consultando
+/api/attention/list cada 10 s, en dos fases de igual duración:
+
+1. sin-etag: las peticiones nunca mandan If-None-Match (cuerpo completo siempre)
+2. con-etag: cada cliente reenvía el último ETag, como hace el navegador con
+   Cache-Control: no-cache
+
+En cada fase se mide:
+- peticiones, respuestas 200/304 y bytes de cuerpo recibidos
+- cálculos del snapshot en el servidor (misses de la caché, /api/queue/stream?stats=1
+  con sesión de --admin-user);
+  antes de la caché cada petición era un cálculo (1 consulta en /api/queue/list)
+- scans sobre "TurnRequest" en pg_stat_user_tables, si hay psycopg/psycopg2
+
+Con --churn S se crea o cancela un turno de prueba cada S segundos para que la
+caché se invalide como en piso.
+
+Uso:
+    python3 tests/benchmark_queue_etag.py --screens 40 --duration 60
+    python3 tests/benchmark_queue_etag.py --screens 100 --phlebotomists 12 --churn 10 -o etag.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+from harness.pg import connect, driver_available
+from harness.queue_api import QueueApi
+from harness.session import get_broker, SessionError
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.80.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 80
+QUEUE_POLL = 3
+ATTENTION_POLL = 10
+# Consultas SQL por cálculo de cada endpoint (ver lib/queueEvents.js y attention/list)
+QUERIES_PER_BUILD = {'/api/queue/list': 1, '/api/attention/list': 2}
+
+
+class PhaseStats:
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.status = {}
+        self.bytes = 0
+        self.errors = 0
+
+    def add(self, response):
+        self.requests += 1
+        self.status[response.status] = self.status.get(response.status, 0) + 1
+        self.bytes += len(response.body)
+
+
+async def poller(client, recorder, stats, endpoint, path, interval, headers, use_etag, deadline, offset):
+    """Un cliente que consulta `path` cada `interval` s hasta `deadline`"""
+    await asyncio.sleep(offset)
+    etag = None
+    while time.monotonic() < deadline:
+        request_headers = dict(headers)
+        if use_etag and etag:
+            request_headers['If-None-Match'] = etag
+        try:
+            response = await client.get(path, headers=request_headers)
+            recorder.record(endpoint, response.elapsed, response.status)
+            stats.add(response)
+            etag = response.headers.get('etag') or etag
+        except HttpError as e:
+            recorder.record(endpoint, 0.0, None, str(e))
+            stats.errors += 1
+        await asyncio.sleep(interval)
+
+
+async def churn(api, admin_api, every, deadline, run_id):
+    """Alterna crear y cancelar un turno de prueba para invalidar la caché"""
+    pending = None
+    index = 0
+    while time.monotonic() + every < deadline:
+        await asyncio.sleep(every)
+        if pending is None:
+            status, data = await api.create_turn({
+                'patientName': f"ETAG-{run_id}-{index:03d}",
+                'age': 40,
+                'gender': 'M',
+                'studies': ["Benchmark ETag"],
+                'tubesRequired': 1,
+                'tipoAtencion': 'General',
+            })
+            pending = data.get('assignedTurn') if status in (200, 201) and data else None
+            index += 1
+        else:
+            await admin_api.cancel_turn(pending, f"Benchmark ETag {run_id}")
+            pending = None
+    if pending is not None:
+        await admin_api.cancel_turn(pending, f"Benchmark ETag {run_id}")
+
+
+async def server_stats(client, token):
+    response = await client.get("/api/queue/stream?stats=1",
+                                headers={**forwarded_headers(FORWARDED_PREFIX, 9999), 'Authorization': f"Bearer {token}"})
+    if response.status != 200:
+        raise HttpError(f"stats: status {response.status}")
+    return response.json().get('snapshots', {})
+
+
+def turn_scans(conn):
+    """Total de scans (secuenciales + índice) sobre TurnRequest según PostgreSQL"""
+    if conn is None:
+        return None
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute('''SELECT COALESCE(seq_scan, 0) + COALESCE(idx_scan, 0)
+                       FROM pg_stat_user_tables WHERE relname = 'TurnRequest' ''')
+        row = cur.fetchone()
+    conn.rollback()
+    return row[0] if row else None
+
+
+async def run_phase(args, name, use_etag, conn, admin):
+    stats = PhaseStats(name)
+    recorder = LatencyRecorder()
+    run_id = datetime.now().strftime('%H%M%S')
+    connections = min(args.screens + args.phlebotomists + 2, 200)
+
+    async with AsyncHttpClient(args.base_url, max_connections=connections) as client:
+        before = await server_stats(client, admin.token)
+        scans_before = turn_scans(conn)
+        deadline = time.monotonic() + args.duration
+        tasks = []
+        for i in range(args.screens):
+            tasks.append(poller(client, recorder, stats, '/api/queue/list', '/api/queue/list', QUEUE_POLL,
+                                forwarded_headers(FORWARDED_PREFIX, i), use_etag, deadline, QUEUE_POLL * i / max(args.screens, 1)))
+        for j in range(args.phlebotomists):
+            path = f"/api/attention/list?userId={args.user_ids[j % len(args.user_ids)]}" if args.user_ids \
+                else "/api/attention/list"
+            tasks.append(poller(client, recorder, stats, '/api/attention/list', path, ATTENTION_POLL,
+                                forwarded_headers(FORWARDED_PREFIX, 500 + j), use_etag, deadline,
+                                ATTENTION_POLL * j / max(args.phlebotomists, 1)))
+        if args.churn:
+            api = QueueApi(client, recorder, headers=forwarded_headers(FORWARDED_PREFIX, 9000))
+            admin_api = QueueApi(client, recorder, headers={**forwarded_headers(FORWARDED_PREFIX, 9001),
+                                                            'Authorization': f"Bearer {admin.token}"})
+            tasks.append(churn(api, admin_api, args.churn, deadline, run_id))
+
+        await asyncio.gather(*tasks)
+        after = await server_stats(client, admin.token)
+        scans_after = turn_scans(conn)
+
+    builds = after.get('misses', 0) - before.get('misses', 0)
+    result = {
+        'phase': name,
+        'requests': stats.requests,
+        'status': stats.status,
+        'errors': stats.errors,
+        'bodyBytes': stats.bytes,
+        'snapshotBuilds': builds,
+        'hits': after.get('hits', 0) - before.get('hits', 0),
+        'notModified': after.get('notModified', 0) - before.get('notModified', 0),
+        'turnRequestScans': scans_after - scans_before if scans_before is not None and scans_after is not None else None,
+        'latency': recorder.summary(),
+    }
+    return result
+
+
+def uncached_queries(args, duration):
+    """Consultas que habría hecho el servidor sin caché: una construcción por petición"""
+    queue = args.screens * duration / QUEUE_POLL * QUERIES_PER_BUILD['/api/queue/list']
+    attention = args.phlebotomists * duration / ATTENTION_POLL * QUERIES_PER_BUILD['/api/attention/list']
+    return round(queue + attention)
+
+
+def print_phases(phases, args):
+    print(f"\n{Colors.BOLD}{'Fase':<10}{'peticiones':>11}{'200':>7}{'304':>7}{'KB cuerpo':>11}"
+          f"{'cálculos':>10}{'scans PG':>10}{'p50 ms':>9}{'p95 ms':>9}{Colors.END}")
+    print('-' * 84)
+    for phase in phases:
+        latency = phase['latency']['endpoints'].get('/api/queue/list', {})
+        scans = phase['turnRequestScans']
+        print(f"{phase['phase']:<10}{phase['requests']:>11}{phase['status'].get(200, 0):>7}"
+              f"{phase['status'].get(304, 0):>7}{phase['bodyBytes'] / 1024:>11.1f}{phase['snapshotBuilds']:>10}"
+              f"{scans if scans is not None else '-':>10}{latency.get('p50') or 0:>9.1f}{latency.get('p95') or 0:>9.1f}")
+    print_info(f"Sin caché (antes): ~{uncached_queries(args, args.duration)} consultas SQL por fase "
+               f"(una construcción por petición)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la caché ETag/304 de las listas de cola")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--screens", "-n", type=int, default=40, help="Pantallas consultando /api/queue/list")
+    parser.add_argument("--phlebotomists", "-m", type=int, default=6,
+                        help="Flebotomistas consultando /api/attention/list")
+    parser.add_argument("--user-ids", type=lambda s: [int(x) for x in s.split(',') if x], default=[],
+                        help="userId para /api/attention/list (default: sin userId)")
+    parser.add_argument("--duration", "-d", type=float, default=60, help="Segundos por fase")
+    parser.add_argument("--churn", type=float, default=0,
+                        help="Crear/cancelar un turno de prueba cada S segundos (0 = cola sin cambios)")
+    parser.add_argument("--admin-user", default="admin")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--no-pg", action="store_true", help="No leer pg_stat_user_tables")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("BENCHMARK ETAG / 304 DE LA COLA")
+
+    conn = None
+    if not args.no_pg and driver_available():
+        try:
+            conn = connect()
+        except Exception as e:
+            print_info(f"Sin contadores de PostgreSQL: {e}")
+
+    # Las métricas del servidor (y --churn) requieren sesión de admin/supervisor
+    try:
+        admin = get_broker().get(args.admin_user, args.admin_password)
+    except SessionError as e:
+        print_error(f"No se pudo iniciar sesión como {args.admin_user}: {e}")
+        sys.exit(1)
+
+    phases = []
+    for name, use_etag in (('sin-etag', False), ('con-etag', True)):
+        print_info(f"Fase {name}: {args.screens} pantallas + {args.phlebotomists} flebotomistas "
+                   f"durante {args.duration:g}s")
+        try:
+            phases.append(asyncio.run(run_phase(args, name, use_etag, conn, admin)))
+        except HttpError as e:
+            print_error(f"No se pudo consultar {args.base_url}: {e}")
+            sys.exit(1)
+
+    if conn is not None:
+        conn.close()
+
+    print_phases(phases, args)
+    plain, conditional = phases
+    print()
+    if plain['bodyBytes']:
+        saved = 1 - conditional['bodyBytes'] / plain['bodyBytes']
+        print_success(f"Bytes de cuerpo: {plain['bodyBytes'] / 1024:.0f} KB → {conditional['bodyBytes'] / 1024:.0f} KB "
+                      f"({saved * 100:.0f}% menos con If-None-Match)")
+    total = conditional['requests'] or 1
+    print_success(f"Cálculos del snapshot: {conditional['snapshotBuilds']} para {conditional['requests']} peticiones "
+                  f"({conditional['snapshotBuilds'] / total * 100:.1f}% llega a la base)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args),
+                       'uncachedQueriesPerPhase': uncached_queries(args, args.duration), 'phases': phases},
+                      f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
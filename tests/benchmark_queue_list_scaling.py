@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalamiento de la consulta de /api/queue/list contra el histórico
+
+El snapshot de la cola (loadQueueSnapshot en lib/queueEvents.js) es una sola
+consulta sobre los turnos 'Pending' / 'In Progress' que se reparte en una pasada.
+Este script comprueba que su costo depende de la cola activa y no del
+histórico de turnos atendidos:
+
+1. Completa la tabla hasta cada tamaño de histórico (--sizes, default 10k y 100k
+   turnos no activos) con filas marcadas (labsisOrderId 'QLS-*') y ANALYZE
+2. Opcionalmente agrega --active turnos en espera / en llamado / en atención
+3. Para cada tamaño mide, directo en PostgreSQL:
+   - consulta única actual vs. las tres consultas anteriores (una por estado)
+   - EXPLAIN (ANALYZE, BUFFERS) de la consulta única: índices usados, scans
+     secuenciales y bloques leídos
+
+Se mide la consulta y no el endpoint porque /api/queue/list sirve desde la
+caché versionada hasta el siguiente cambio de la cola.
+
+Requiere psycopg o psycopg2 y el índice "TurnRequest_active_queue_idx"
+(prisma/migrations/20261018000000_add_active_queue_index).
+
+ATENCIÓN: escribe en la base de DATABASE_URL. Usar una base de benchmark.
+
+Uso:
+    python3 tests/benchmark_queue_list_scaling.py
+    python3 tests/benchmark_queue_list_scaling.py --sizes 10000,100000,500000 --active 60 -o scaling.json
+    python3 tests/benchmark_queue_list_scaling.py --clean
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.pg import DatabaseError, connect, driver_available, explain, scalar
+
+ORDER_PREFIX = 'QLS-'
+INDEX_NAME = 'TurnRequest_active_queue_idx'
+ACTIVE_STATUSES = ('Pending', 'In Progress')
+
+PRIORITY = ('''CASE WHEN t."tipoAtencion" = 'MuyEspecial' THEN 0 '''
+            '''WHEN t."tipoAtencion" IN ('Prioritario','PrioritarioRiesgo') THEN 1 ELSE 2 END''')
+COLUMNS = '''t.id, t."patientName", t."assignedTurn", t."tipoAtencion", t."isDeferred", t."callCount",
+             t.patient_id AS "patientID", t.work_order AS "workOrder"'''
+
+# Consulta actual de loadQueueSnapshot()
+SINGLE_QUERY = f'''
+    SELECT {COLUMNS}, c.name AS "cubicleName", t.status, t."isCalled"
+    FROM "TurnRequest" t
+    LEFT JOIN "Cubicle" c ON t."cubicleId" = c.id
+    WHERE t.status IN ('Pending', 'In Progress')
+    ORDER BY {PRIORITY}, COALESCE(t."deferredAt", t."createdAt") ASC
+'''
+
+# Versión anterior: una consulta por sección de la pantalla
+PREVIOUS_QUERIES = [
+    f'''SELECT {COLUMNS} FROM "TurnRequest" t WHERE t.status = 'Pending'
+        ORDER BY {PRIORITY}, COALESCE(t."deferredAt", t."createdAt") ASC''',
+    f'''SELECT {COLUMNS}, c.name AS "cubicleName" FROM "TurnRequest" t
+        LEFT JOIN "Cubicle" c ON t."cubicleId" = c.id
+        WHERE t.status = 'In Progress' AND t."isCalled" = false
+        ORDER BY {PRIORITY}, COALESCE(t."deferredAt", t."createdAt") ASC''',
+    f'''SELECT {COLUMNS}, c.name AS "cubicleName" FROM "TurnRequest" t
+        LEFT JOIN "Cubicle" c ON t."cubicleId" = c.id
+        WHERE t.status = 'In Progress' AND t."isCalled" = true
+        ORDER BY {PRIORITY}, COALESCE(t."deferredAt", t."createdAt") ASC''',
+]
+
+# Histórico sintético: atendidos (y algunos cancelados) repartidos en los últimos 3 años.
+# `%%` es el operador módulo escapado para los parámetros del driver.
+HISTORY_INSERT = '''
+    INSERT INTO "TurnRequest" ("patientName", age, gender, studies, "tubesRequired", status, "createdAt",
+                               "updatedAt", "attendedAt", "calledAt", "finishedAt", "tipoAtencion",
+                               "isCalled", "callCount", "labsisOrderId")
+    SELECT 'Histórico ' || g, 20 + g %% 60, CASE WHEN g %% 2 = 0 THEN 'F' ELSE 'M' END, '["Biometría hemática"]', 1,
+           CASE WHEN g %% 50 = 0 THEN 'Cancelled' ELSE 'Attended' END,
+           created, created, created + interval '10 minutes', created + interval '9 minutes',
+           created + interval '15 minutes',
+           CASE WHEN g %% 10 = 0 THEN 'Prioritario' ELSE 'General' END,
+           true, 1, %s || g
+    FROM (SELECT g, now() - (g %% 1095) * interval '1 day' - (g %% 480) * interval '1 minute' AS created
+          FROM generate_series(%s, %s) AS g) s
+'''
+
+# Cola activa: un tercio en espera, un tercio en llamado y un tercio en atención
+ACTIVE_INSERT = '''
+    INSERT INTO "TurnRequest" ("patientName", age, gender, studies, "tubesRequired", status, "createdAt",
+                               "updatedAt", "tipoAtencion", "isCalled", "isDeferred", "deferredAt",
+                               "callCount", "assignedTurn", "labsisOrderId")
+    SELECT 'Activo ' || g, 30, 'F', '["Química sanguínea"]', 1,
+           CASE WHEN g %% 3 = 0 THEN 'Pending' ELSE 'In Progress' END,
+           now() - g * interval '1 minute', now(),
+           (ARRAY['General', 'Prioritario', 'MuyEspecial', 'PrioritarioRiesgo'])[1 + g %% 4],
+           g %% 3 = 2, g %% 7 = 0, CASE WHEN g %% 7 = 0 THEN now() END,
+           g %% 3, 900000 + g, %s || g
+    FROM generate_series(1, %s) AS g
+'''
+
+
+def history_rows(conn):
+    return scalar(conn, 'SELECT count(*) FROM "TurnRequest" WHERE status <> ALL(%s)', (list(ACTIVE_STATUSES),))
+
+
+def active_rows(conn):
+    return scalar(conn, 'SELECT count(*) FROM "TurnRequest" WHERE status = ANY(%s)', (list(ACTIVE_STATUSES),))
+
+
+def index_exists(conn):
+    return bool(scalar(conn, "SELECT 1 FROM pg_indexes WHERE indexname = %s", (INDEX_NAME,)))
+
+
+def grow_history(conn, target):
+    """Agrega filas marcadas hasta tener `target` turnos no activos; devuelve las agregadas"""
+    missing = target - history_rows(conn)
+    if missing <= 0:
+        return 0
+    first = scalar(conn, 'SELECT count(*) FROM "TurnRequest" WHERE "labsisOrderId" LIKE %s',
+                   (ORDER_PREFIX + 'H%',)) + 1
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(HISTORY_INSERT, (ORDER_PREFIX + 'H', first, first + missing - 1))
+        cur.execute('ANALYZE "TurnRequest"')
+    conn.commit()
+    print_info(f"+{missing:,} turnos de histórico en {time.perf_counter() - started:.1f}s")
+    return missing
+
+
+def add_active(conn, count):
+    with conn.cursor() as cur:
+        cur.execute(ACTIVE_INSERT, (ORDER_PREFIX + 'A', count))
+        cur.execute('ANALYZE "TurnRequest"')
+    conn.commit()
+
+
+def clean(conn):
+    with conn.cursor() as cur:
+        cur.execute('DELETE FROM "TurnRequest" WHERE "labsisOrderId" LIKE %s', (ORDER_PREFIX + '%',))
+        deleted = cur.rowcount
+        cur.execute('ANALYZE "TurnRequest"')
+    conn.commit()
+    return deleted
+
+
+def time_queries(conn, queries, repeat, warmup):
+    """Latencia (ms) de ejecutar `queries` en secuencia y leer todas las filas"""
+    samples = []
+    rows = 0
+    with conn.cursor() as cur:
+        for attempt in range(warmup + repeat):
+            started = time.perf_counter()
+            rows = 0
+            for sql in queries:
+                cur.execute(sql)
+                rows += len(cur.fetchall())
+            elapsed = (time.perf_counter() - started) * 1000
+            if attempt >= warmup:
+                samples.append(elapsed)
+    conn.rollback()
+    samples.sort()
+    return {
+        'rows': rows,
+        'p50': round(statistics.median(samples), 2),
+        'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        'mean': round(statistics.mean(samples), 2),
+    }
+
+
+def measure(conn, size, args):
+    single = time_queries(conn, [SINGLE_QUERY], args.repeat, args.warmup)
+    previous = time_queries(conn, PREVIOUS_QUERIES, args.repeat, args.warmup)
+    plan = explain(conn, SINGLE_QUERY)
+    return {
+        'historyRows': history_rows(conn),
+        'activeRows': active_rows(conn),
+        'targetSize': size,
+        'single': single,
+        'previous': previous,
+        'explain': plan,
+    }
+
+
+def print_results(results):
+    print(f"\n{Colors.BOLD}{'Histórico':>11}{'activos':>9}{'1 consulta p50':>16}{'p95':>8}"
+          f"{'3 consultas p50':>17}{'p95':>8}{'bloques':>9}  índices / seq scan{Colors.END}")
+    print('-' * 100)
+    for r in results:
+        plan = r['explain']
+        seq_scan = 'TurnRequest' in plan['seqScans']
+        scans = f"{Colors.RED}seq scan{Colors.END}" if seq_scan else ', '.join(plan['indexes']) or '-'
+        print(f"{r['historyRows']:>11,}{r['activeRows']:>9}{r['single']['p50']:>16.2f}{r['single']['p95']:>8.2f}"
+              f"{r['previous']['p50']:>17.2f}{r['previous']['p95']:>8.2f}{plan['sharedBlocks']:>9}  {scans}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalamiento de la consulta de /api/queue/list con el histórico")
+    parser.add_argument("--sizes", type=lambda s: sorted(int(x) for x in s.split(',') if x), default=[10000, 100000],
+                        help="Turnos de histórico (no activos) a medir, separados por coma")
+    parser.add_argument("--active", type=int, default=0,
+                        help="Turnos activos de prueba a agregar antes de medir (0 = la cola actual)")
+    parser.add_argument("--repeat", type=int, default=50, help="Ejecuciones medidas por consulta")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="Crecimiento máximo aceptado del p50 entre el tamaño menor y el mayor")
+    parser.add_argument("--keep", action="store_true", help="No borrar las filas generadas al terminar")
+    parser.add_argument("--clean", action="store_true", help="Solo borrar filas generadas por este script")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("ESCALAMIENTO DE /api/queue/list")
+
+    if not driver_available():
+        print_error("Se requiere psycopg o psycopg2 (pip install 'psycopg[binary]')")
+        sys.exit(1)
+    try:
+        conn = connect()
+    except DatabaseError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+    if args.clean:
+        print_success(f"Eliminados {clean(conn):,} turnos generados")
+        conn.close()
+        return
+
+    if not index_exists(conn):
+        print_info(f'No existe "{INDEX_NAME}": aplicar migraciones (npx prisma migrate deploy)')
+
+    if args.active:
+        add_active(conn, args.active)
+        print_info(f"+{args.active} turnos activos de prueba")
+
+    results = []
+    try:
+        for size in args.sizes:
+            if grow_history(conn, size) == 0 and history_rows(conn) > size:
+                print_info(f"La base ya tiene {history_rows(conn):,} turnos de histórico (> {size:,})")
+            print_info(f"Midiendo con {history_rows(conn):,} turnos de histórico...")
+            results.append(measure(conn, size, args))
+    finally:
+        if not args.keep:
+            print_info(f"Limpieza: {clean(conn):,} turnos generados eliminados")
+        conn.close()
+
+    print_results(results)
+
+    print()
+    first, last = results[0], results[-1]
+    ratio = last['single']['p50'] / first['single']['p50'] if first['single']['p50'] else None
+    if any('TurnRequest' in r['explain']['seqScans'] for r in results):
+        print_error('La consulta única recorre "TurnRequest" completo (seq scan): revisar el índice parcial')
+    if ratio is not None and ratio <= args.max_ratio:
+        print_success(f"p50 de la consulta única: {first['single']['p50']:.2f} ms → {last['single']['p50']:.2f} ms "
+                      f"(×{ratio:.2f}) de {first['historyRows']:,} a {last['historyRows']:,} turnos de histórico")
+    elif ratio is not None:
+        print_error(f"p50 de la consulta única creció ×{ratio:.2f} (> ×{args.max_ratio:g}) con el histórico")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args), 'results': results},
+                      f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
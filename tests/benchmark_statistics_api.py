@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los endpoints de estadísticas con captura de planes de ejecución
+
+Recorre una matriz de parámetros (año, flebotomista, rango de fechas) sobre
+/api/statistics/{monthly,daily,average-time,phlebotomists,patient-stats,dashboard}
+y por cada caso registra:
+- latencia (p50/máx de --repeat peticiones, después de un calentamiento)
+- tamaño de la respuesta
+- RSS del servidor Next.js (antes, pico durante la petición, después)
+- EXPLAIN (ANALYZE, BUFFERS) del SQL equivalente a la consulta de Prisma:
+  tiempo de ejecución, filas, buffers leídos de disco/caché y scans secuenciales
+
+Pensado para correr contra el dataset de scripts/generateBulkData.py y ver
+qué endpoints dejan de escalar con varios años de datos. monthly, daily,
+average-time y phlebotomists leen los rollups (lib/statsRollup.js): correr
+antes `node scripts/rollupStatistics.js --backfill` sobre el dataset.
+
+Uso:
+    python3 tests/benchmark_statistics_api.py --years 2024,2025,2026
+    python3 tests/benchmark_statistics_api.py --endpoints monthly,patient-stats --repeat 5 -o stats-bench.json
+    python3 tests/benchmark_statistics_api.py --server-pids $(pm2 pid toma-turno | tr '\\n' ',') --no-explain
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.network import forwarded_headers
+from harness.pg import DatabaseError, connect, driver_available, explain
+from harness.process_stats import RssSampler, listening_pids
+from harness.session import SessionError, get_broker
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.60.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 60
+ENDPOINTS = ('monthly', 'daily', 'average-time', 'phlebotomists', 'patient-stats', 'dashboard')
+RANGES_DAYS = (1, 7, 31, 365)
+HTTP_TIMEOUT = 120
+
+ATTENDED_RANGE = '''"status" = 'Attended' AND "finishedAt" >= %(start)s AND "finishedAt" <= %(end)s'''
+
+# Lectura de rollups como en lib/statsRollup.js: días consolidados + días posteriores en vivo
+ROLLUP_STATE = '''WITH state AS (
+    SELECT COALESCE((SELECT "through" FROM "StatsRollupState" WHERE "name" = 'daily'), DATE '1970-01-01') AS "through")
+'''
+ROLLUP_LIVE = '''
+    FROM state s, LATERAL stats_rollup_compute(GREATEST(%(from)s::date, s."through" + 1), %(to)s::date) c
+    WHERE (%(user)s::int IS NULL OR c."userId" = %(user)s::int)'''
+DAILY_ROLLUP = ROLLUP_STATE + '''
+    SELECT r."day", r."userId", r."tipoAtencion", r."attended", r."attentionMinutes", r."turnaroundMinutes"
+    FROM "StatsDailyRollup" r, state s
+    WHERE r."day" BETWEEN %(from)s::date AND LEAST(%(to)s::date, s."through")
+      AND (%(user)s::int IS NULL OR r."userId" = %(user)s::int)
+    UNION ALL
+    SELECT c."day", c."userId", c."tipoAtencion", c."attended", c."attentionMinutes", c."turnaroundMinutes"''' + ROLLUP_LIVE
+MONTHLY_ROLLUP = ROLLUP_STATE + '''
+    SELECT m."month", m."userId", m."tipoAtencion", m."attended", m."attentionMinutes", m."turnaroundMinutes"
+    FROM "StatsMonthlyRollup" m, state s
+    WHERE m."month" BETWEEN %(from)s::date AND LEAST(%(to)s::date, s."through")
+      AND (%(user)s::int IS NULL OR m."userId" = %(user)s::int)
+    UNION ALL
+    SELECT date_trunc('month', c."day")::date, c."userId", c."tipoAtencion", c."attended",
+           c."attentionMinutes", c."turnaroundMinutes"''' + ROLLUP_LIVE
+
+
+class Case:
+    """Una petición de la matriz con las consultas SQL que dispara en el servidor"""
+
+    def __init__(self, endpoint, label, method, path, body=None, queries=()):
+        self.endpoint = endpoint
+        self.label = label
+        self.method = method
+        self.path = path
+        self.body = body
+        self.queries = list(queries)
+
+
+def local_bounds(start, end, utc_offset):
+    """Fechas locales del servidor (new Date(y, m, d) en Node) convertidas a UTC, como las guarda Prisma"""
+    shift = timedelta(hours=-utc_offset)
+    return start + shift, end + shift
+
+
+def build_cases(args):
+    cases = []
+    offset = args.utc_offset
+    month = args.month
+
+    for year in args.years:
+        year_range = {'from': f"{year}-01-01", 'to': f"{year}-12-31"}
+        month_range = {'from': f"{year}-{month:02d}-01",
+                       'to': (date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)).isoformat()}
+
+        for phleb in ['all'] + args.phlebotomists:
+            body = {'year': year, 'phlebotomistId': phleb}
+            params = {**year_range, 'user': None if phleb == 'all' else int(phleb)}
+            cases.append(Case('monthly', f"{year} flebo={phleb}", 'POST', '/api/statistics/monthly', body,
+                              [('rollup mensual', MONTHLY_ROLLUP, params)]))
+
+        for label, body, bounds in (
+            (f"{year}", {'year': year}, year_range),
+            (f"{year}-{month:02d}", {'year': year, 'month': month}, month_range),
+        ):
+            cases.append(Case('daily', label, 'POST', '/api/statistics/daily', body,
+                              [('rollup diario', DAILY_ROLLUP, {**bounds, 'user': None})]))
+
+        for label, query, bounds in (
+            (f"{year}", {'year': year}, year_range),
+            (f"{year}-{month:02d}", {'year': year, 'month': month}, month_range),
+        ):
+            cases.append(Case('average-time', label, 'GET', f"/api/statistics/average-time?{urlencode(query)}",
+                              queries=[('rollup diario', DAILY_ROLLUP, {**bounds, 'user': None})]))
+
+        for phleb in args.phlebotomists:
+            cases.append(Case('phlebotomists', f"{year}-{month:02d} flebo={phleb}", 'POST',
+                              '/api/statistics/phlebotomists',
+                              {'year': year, 'month': month, 'phlebotomistId': phleb},
+                              [('rollup diario', DAILY_ROLLUP, {**month_range, 'user': int(phleb)})]))
+
+    for days in RANGES_DAYS:
+        date_from = args.until - timedelta(days=days - 1)
+        for phleb in [None] + args.phlebotomists[:1]:
+            query = {'dateFrom': date_from.isoformat(), 'dateTo': args.until.isoformat(), 'limit': 50}
+            params = {'start': datetime.combine(date_from, datetime.min.time()),
+                      'end': datetime.combine(args.until, datetime.max.time())}
+            where = ATTENDED_RANGE
+            if phleb:
+                query['phlebotomistId'] = phleb
+                params['phleb'] = phleb
+                where += ' AND "attendedBy" = %(phleb)s'
+            cases.append(Case('patient-stats', f"{days}d" + (f" flebo={phleb}" if phleb else ""), 'GET',
+                              f"/api/statistics/patient-stats?{urlencode(query)}", queries=[
+                                  ('findMany página',
+                                   f'''SELECT "id", "assignedTurn", "patientName", "work_order", "createdAt",
+                                              "calledAt", "finishedAt", "tipoAtencion", "attendedBy"
+                                       FROM "TurnRequest" WHERE {where}
+                                       ORDER BY "finishedAt" DESC LIMIT 50 OFFSET 0''', params),
+                                  ('count', f'SELECT COUNT(*) FROM "TurnRequest" WHERE {where}', params),
+                                  ('groupBy attendedBy',
+                                   f'''SELECT "attendedBy" FROM "TurnRequest"
+                                       WHERE {ATTENDED_RANGE} AND "attendedBy" IS NOT NULL
+                                       GROUP BY "attendedBy"''', params),
+                              ]))
+
+    today = date.today()
+    month_start, month_end = local_bounds(datetime(today.year, today.month, 1),
+                                          datetime(today.year + (today.month == 12), today.month % 12 + 1, 1)
+                                          - timedelta(seconds=1), offset)
+    # El dashboard repite count + findMany por cada uno de los últimos 6 meses; se explica el mes actual
+    cases.append(Case('dashboard', 'actual', 'GET', '/api/statistics/dashboard', queries=[
+        ('count mes', f'SELECT COUNT(*) FROM "TurnRequest" WHERE {ATTENDED_RANGE}',
+         {'start': month_start, 'end': month_end}),
+        ('findMany tiempos mes',
+         f'SELECT "createdAt", "finishedAt", "calledAt" FROM "TurnRequest" WHERE {ATTENDED_RANGE}',
+         {'start': month_start, 'end': month_end}),
+        ('top flebotomistas',
+         f'''SELECT u."id", u."name", (SELECT COUNT(*) FROM "TurnRequest" t
+                                       WHERE t."attendedBy" = u."id" AND {ATTENDED_RANGE.replace('"status"', 't."status"').replace('"finishedAt"', 't."finishedAt"')}) AS "count"
+             FROM "User" u
+             WHERE EXISTS (SELECT 1 FROM "TurnRequest" t WHERE t."attendedBy" = u."id"
+                           AND {ATTENDED_RANGE.replace('"status"', 't."status"').replace('"finishedAt"', 't."finishedAt"')})''',
+         {'start': month_start, 'end': month_end}),
+    ]))
+
+    return [case for case in cases if case.endpoint in args.endpoints]
+
+
+async def run_case(client, case, args, headers, pids, counter):
+    samples, sizes, statuses, rss = [], [], [], []
+    for attempt in range(args.warmup + args.repeat):
+        counter[0] += 1
+        request_headers = {**headers, **forwarded_headers(FORWARDED_PREFIX, counter[0])}
+        sampler = RssSampler(pids)
+        try:
+            with sampler:
+                response = await client.request(case.method, case.path, case.body, request_headers)
+        except HttpError as e:
+            return {'error': str(e)}
+        if attempt < args.warmup:
+            continue
+        samples.append(response.elapsed * 1000)
+        sizes.append(len(response.body))
+        statuses.append(response.status)
+        rss.append(sampler.result())
+
+    deltas = [r['deltaMB'] for r in rss if r['deltaMB'] is not None]
+    return {
+        'status': max(set(statuses), key=statuses.count),
+        'p50Ms': round(statistics.median(samples), 1),
+        'maxMs': round(max(samples), 1),
+        'samplesMs': [round(s, 1) for s in samples],
+        'bytes': max(sizes),
+        'rss': {
+            'beforeMB': rss[0]['beforeMB'],
+            'peakMB': max((r['peakMB'] for r in rss if r['peakMB'] is not None), default=None),
+            'maxDeltaMB': max(deltas) if deltas else None,
+        },
+    }
+
+
+async def run_benchmark(args, cases, headers, pids, conn):
+    results = []
+    counter = [0]
+    async with AsyncHttpClient(args.base_url, max_connections=1, timeout=HTTP_TIMEOUT) as client:
+        for i, case in enumerate(cases, start=1):
+            print_info(f"[{i}/{len(cases)}] {case.endpoint} {case.label}")
+            result = {'endpoint': case.endpoint, 'case': case.label, 'method': case.method, 'path': case.path,
+                      'body': case.body, **await run_case(client, case, args, headers, pids, counter)}
+            if conn is not None:
+                result['explain'] = []
+                for name, sql, params in case.queries:
+                    try:
+                        result['explain'].append({'query': name, 'sql': ' '.join(sql.split()),
+                                                  **explain(conn, sql, params)})
+                    except Exception as e:
+                        conn.rollback()
+                        result['explain'].append({'query': name, 'error': str(e)[:200]})
+            results.append(result)
+    return results
+
+
+def print_results(results):
+    print(f"\n{Colors.BOLD}{'Endpoint':<15}{'Caso':<24}{'HTTP':>5}{'p50 ms':>9}{'máx ms':>9}{'KB':>9}"
+          f"{'ΔRSS MB':>9}{'SQL ms':>9}{'filas':>9}{'leídos':>8}  seq scan{Colors.END}")
+    print('-' * 118)
+    for r in results:
+        if 'error' in r:
+            print(f"{r['endpoint']:<15}{r['case'][:23]:<24}{Colors.RED}{r['error'][:70]}{Colors.END}")
+            continue
+        plans = [e for e in r.get('explain', []) if 'error' not in e]
+        sql_ms = sum(e['executionMs'] for e in plans) if plans else None
+        rows = max((e['rows'] or 0 for e in plans), default=None) if plans else None
+        read = sum(e['sharedRead'] for e in plans) if plans else None
+        seq = ','.join(sorted({s for e in plans for s in e['seqScans']}))
+        color = Colors.RED if r['status'] >= 400 else (Colors.YELLOW if r['p50Ms'] > 1000 else '')
+        end = Colors.END if color else ''
+        delta = r['rss']['maxDeltaMB']
+        print(f"{r['endpoint']:<15}{r['case'][:23]:<24}{color}{r['status']:>5}{r['p50Ms']:>9.1f}{end}{r['maxMs']:>9.1f}"
+              f"{r['bytes'] / 1024:>9.1f}{delta if delta is not None else '-':>9}"
+              f"{sql_ms if sql_ms is not None else '-':>9}{rows if rows is not None else '-':>9}"
+              f"{read if read is not None else '-':>8}  {seq}")
+
+
+def print_worst(results, count=5):
+    """Endpoints más lentos y cuánto del tiempo se va fuera de la base (serialización/agregación en JS)"""
+    valid = [r for r in results if 'error' not in r and r['status'] < 400]
+    if not valid:
+        return
+    print_header("CASOS MÁS LENTOS")
+    for r in sorted(valid, key=lambda r: r['p50Ms'], reverse=True)[:count]:
+        sql_ms = sum(e.get('executionMs', 0) for e in r.get('explain', []))
+        outside = f" · {max(0.0, r['p50Ms'] - sql_ms):.0f} ms fuera de PostgreSQL" if r.get('explain') else ""
+        print_info(f"{r['endpoint']} {r['case']}: {r['p50Ms']:.0f} ms, {r['bytes'] / 1024:.0f} KB{outside}")
+
+
+def parse_ids(value):
+    return [int(x) for x in value.split(',') if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /api/statistics/* con EXPLAIN (ANALYZE, BUFFERS)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--endpoints", type=lambda s: [x for x in s.split(',') if x], default=list(ENDPOINTS),
+                        help=f"Subconjunto separado por coma ({', '.join(ENDPOINTS)})")
+    parser.add_argument("--years", type=parse_ids, default=None, help="Años a consultar (default: últimos 3)")
+    parser.add_argument("--month", type=int, default=6, help="Mes para los casos mensuales")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today(),
+                        help="Fin de los rangos de patient-stats (YYYY-MM-DD)")
+    parser.add_argument("--phlebotomists", type=parse_ids, default=None,
+                        help="Ids de flebotomistas (default: los 2 con más turnos atendidos)")
+    parser.add_argument("--repeat", type=int, default=3, help="Peticiones medidas por caso")
+    parser.add_argument("--warmup", type=int, default=1, help="Peticiones de calentamiento por caso")
+    parser.add_argument("--user", default="admin", help="Usuario para los endpoints con JWT")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--server-pids", type=parse_ids, default=None,
+                        help="PIDs del servidor para medir RSS (default: procesos escuchando en el puerto)")
+    parser.add_argument("--utc-offset", type=float, default=-6, help="Huso horario del servidor Node (CDMX = -6)")
+    parser.add_argument("--no-explain", action="store_true", help="No conectarse a PostgreSQL")
+    parser.add_argument("--output", "-o", help="Guardar resultados y planes completos en JSON")
+    args = parser.parse_args()
+
+    unknown = [e for e in args.endpoints if e not in ENDPOINTS]
+    if unknown:
+        print_error(f"Endpoints desconocidos: {', '.join(unknown)}")
+        sys.exit(2)
+    args.years = args.years or [date.today().year - i for i in (2, 1, 0)]
+
+    print_header("BENCHMARK DE ESTADÍSTICAS")
+
+    conn = None
+    if not args.no_explain:
+        if not driver_available():
+            print_error("EXPLAIN requiere psycopg o psycopg2; continuar con --no-explain")
+            sys.exit(2)
+        try:
+            conn = connect()
+        except DatabaseError as e:
+            print_error(str(e))
+            sys.exit(2)
+
+    if args.phlebotomists is None:
+        if conn is None:
+            print_error("Sin conexión a la base: indicar --phlebotomists")
+            sys.exit(2)
+        with conn.cursor() as cur:
+            cur.execute('''SELECT "attendedBy" FROM "TurnRequest" WHERE "status" = 'Attended'
+                           AND "attendedBy" IS NOT NULL GROUP BY "attendedBy" ORDER BY COUNT(*) DESC LIMIT 2''')
+            args.phlebotomists = [row[0] for row in cur.fetchall()]
+        conn.rollback()
+
+    try:
+        headers = {'Authorization': f"Bearer {get_broker().get(args.user, args.password).token}"}
+    except SessionError as e:
+        print_error(f"Sin token ({e}); patient-stats responderá 401")
+        headers = {}
+
+    pids = args.server_pids or listening_pids(urlsplit(args.base_url).port or 80)
+    if not pids:
+        print_info("No se detectó el proceso del servidor: sin medición de RSS (usar --server-pids)")
+
+    cases = build_cases(args)
+    print_info(f"{len(cases)} casos × {args.repeat} peticiones · años {args.years} · "
+               f"flebotomistas {args.phlebotomists} · PIDs {pids or '-'}")
+
+    started = time.time()
+    results = asyncio.run(run_benchmark(args, cases, headers, pids, conn))
+    if conn is not None:
+        conn.close()
+
+    print_results(results)
+    print_worst(results)
+    failed = [r for r in results if 'error' in r or r['status'] >= 400]
+    print()
+    if failed:
+        print_error(f"{len(failed)} casos con error HTTP")
+    print_success(f"{len(results)} casos en {time.time() - started:.1f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), 'baseUrl': args.base_url,
+                       'years': args.years, 'phlebotomists': args.phlebotomists, 'repeat': args.repeat,
+                       'results': results}, f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados y planes guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Prueba Completa de la Aplicación con Selenium
 import time
 import sys
 import os
+import argparse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,6 +19,11 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.support.ui import Select
 
+from harness.runner import ShardableTester, ShardTask, add_parallel_arguments, run_parallel_suite
+from harness.report import ReportedSteps
+from harness.session import restore_session
+from harness.waits import PageReadiness
+
 BASE_URL = "http://localhost:3005"
 WAIT_TIMEOUT = 15
 SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/screenshots/complete_test"
@@ -52,8 +58,15 @@ def print_error(message):
 def print_info(message):
     print(f"  {Colors.BLUE}ℹ{Colors.END} {message}")
 
-class CompleteTester:
-    def __init__(self):
+class CompleteTester(ShardableTester, ReportedSteps):
+    REPORT_TITLE = "Reporte Completo de Pruebas - Sistema de Turnos INER"
+    REPORT_SUITE = "complete"
+    ROLES = {
+        'admin': ("admin", "admin123", "(Administrador)"),
+        'flebotomista': ("flebo1", "flebo123", "(Flebotomista)"),
+    }
+
+    def __init__(self, driver=None):
         print_header("PRUEBA COMPLETA - Sistema de Turnos INER")
 
         # Crear directorio de screenshots
@@ -68,44 +81,61 @@ class CompleteTester:
         # chrome_options.add_argument('--headless')  # Descomentar para modo headless
 
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            # El runner paralelo inyecta su propio Chrome headless
+            self.driver = driver or webdriver.Chrome(options=chrome_options)
             self.wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
+            self.readiness = PageReadiness(self.driver, timeout=WAIT_TIMEOUT)
             print_success("Navegador Chrome iniciado")
             self.screenshot_counter = 1
             self.test_results = []
-            time.sleep(1)
         except Exception as e:
             print_error(f"Error al iniciar Chrome: {e}")
             sys.exit(1)
 
+    @classmethod
+    def collect_tasks(cls):
+        """Tareas para el runner paralelo, en el mismo orden que run_all_tests"""
+        return [
+            ShardTask("test_queue_page"),
+            ShardTask("test_turns_creation", role='admin'),
+            ShardTask("test_attention_page", role='admin'),
+            ShardTask("test_statistics_pages", role='admin'),
+            ShardTask("test_cubicles_page", role='admin'),
+            ShardTask("test_users_page", role='admin'),
+            ShardTask("test_attention_page", role='flebotomista'),
+        ]
+
     def take_screenshot(self, name, description=""):
         """Toma un screenshot y lo guarda"""
         filename = f"{self.screenshot_counter:03d}_{name}.png"
         filepath = os.path.join(SCREENSHOT_DIR, filename)
         self.driver.save_screenshot(filepath)
+        self.note_screenshot(filename)
         print_success(f"Screenshot: {filename}")
         if description:
             print_info(f"  {description}")
         self.screenshot_counter += 1
-        time.sleep(0.5)
         return filename
 
     def add_result(self, test_name, status, details=""):
         """Registra el resultado de una prueba"""
-        self.test_results.append({
+        self.test_results.append(self.record_step({
             'test': test_name,
             'status': status,
             'details': details,
             'timestamp': datetime.now().strftime('%H:%M:%S')
-        })
+        }))
 
     def login(self, username, password, role=""):
         """Realiza login en la aplicación"""
         print_action(f"Login como '{username}' {role}...")
 
+        if restore_session(self.driver, username, password):
+            self.add_result(f"Login como {username}", "PASS", "Sesión reutilizada vía /api/auth/login")
+            return True
+
         try:
-            self.driver.get(f"{BASE_URL}/login")
-            time.sleep(2)
+            self.readiness.navigate(f"{BASE_URL}/login")
 
             self.take_screenshot(f"login_page_{username}", f"Página de login para {username}")
 
@@ -120,13 +150,13 @@ class CompleteTester:
             password_field.clear()
             password_field.send_keys(password)
 
-            time.sleep(0.5)
-
             # Click en login
             login_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
             login_button.click()
 
-            time.sleep(3)
+            # Esperar redirección fuera de /login y carga de la página destino
+            self.readiness.wait_for(lambda d: "/login" not in d.current_url, f"login {username}")
+            self.readiness.wait_ready(f"post-login {username}")
 
             # Verificar redirección
             if "/login" not in self.driver.current_url:
@@ -149,8 +179,7 @@ class CompleteTester:
         print_action("Cerrando sesión...")
         try:
             # Buscar botón de logout en el menú
-            self.driver.get(f"{BASE_URL}/login")
-            time.sleep(2)
+            self.readiness.navigate(f"{BASE_URL}/login")
             print_success("Sesión cerrada")
         except Exception as e:
             print_info(f"Error al cerrar sesión: {e}")
@@ -160,8 +189,7 @@ class CompleteTester:
         print_step(1, "Probando Página de Cola Pública")
 
         try:
-            self.driver.get(f"{BASE_URL}/turns/queue")
-            time.sleep(3)
+            self.readiness.navigate(f"{BASE_URL}/turns/queue")
 
             self.take_screenshot("queue_page", "Cola pública con pacientes de prueba")
 
@@ -193,8 +221,7 @@ class CompleteTester:
         print_step(2, "Probando Creación de Turno")
 
         try:
-            self.driver.get(f"{BASE_URL}/turns")
-            time.sleep(2)
+            self.readiness.navigate(f"{BASE_URL}/turns")
 
             self.take_screenshot("turns_create_page", "Formulario de creación de turno")
 
@@ -224,14 +251,13 @@ class CompleteTester:
                 except:
                     print_info(f"Campo '{field_name}' no encontrado (puede no existir)")
 
-            time.sleep(1)
             self.take_screenshot("turns_form_filled", "Formulario completo")
 
             # Buscar botón de crear
             try:
                 create_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
                 create_button.click()
-                time.sleep(2)
+                self.readiness.wait_ready("crear turno")
                 print_success("Turno creado exitosamente")
                 self.add_result("Creación de Turno", "PASS", "Turno creado desde formulario")
             except:
@@ -250,8 +276,7 @@ class CompleteTester:
         print_step(3, "Probando Página de Atención")
 
         try:
-            self.driver.get(f"{BASE_URL}/turns/attention")
-            time.sleep(4)
+            self.readiness.navigate(f"{BASE_URL}/turns/attention")
 
             self.take_screenshot("attention_page", "Página de atención de pacientes")
 
@@ -294,8 +319,7 @@ class CompleteTester:
         for page, title in stats_pages:
             try:
                 print_action(f"Probando {title}...")
-                self.driver.get(f"{BASE_URL}/statistics/{page}")
-                time.sleep(3)
+                self.readiness.navigate(f"{BASE_URL}/statistics/{page}")
 
                 self.take_screenshot(f"statistics_{page}", title)
 
@@ -321,8 +345,7 @@ class CompleteTester:
         print_step(5, "Probando Gestión de Cubículos")
 
         try:
-            self.driver.get(f"{BASE_URL}/cubicles")
-            time.sleep(3)
+            self.readiness.navigate(f"{BASE_URL}/cubicles")
 
             self.take_screenshot("cubicles_page", "Gestión de cubículos")
 
@@ -349,8 +372,7 @@ class CompleteTester:
         print_step(6, "Probando Gestión de Usuarios")
 
         try:
-            self.driver.get(f"{BASE_URL}/users")
-            time.sleep(3)
+            self.readiness.navigate(f"{BASE_URL}/users")
 
             self.take_screenshot("users_page", "Gestión de usuarios")
 
@@ -373,295 +395,9 @@ class CompleteTester:
             return False
 
     def generate_html_report(self):
-        """Genera un reporte HTML completo"""
+        """Cierra el reporte HTML (escrito en streaming) con el resumen de la corrida"""
         print_step(7, "Generando Reporte HTML Completo")
-
-        screenshots = sorted([f for f in os.listdir(SCREENSHOT_DIR) if f.endswith('.png')])
-
-        # Calcular estadísticas
-        total_tests = len(self.test_results)
-        passed = len([r for r in self.test_results if r['status'] == 'PASS'])
-        failed = len([r for r in self.test_results if r['status'] == 'FAIL'])
-        errors = len([r for r in self.test_results if r['status'] == 'ERROR'])
-        skipped = len([r for r in self.test_results if r['status'] == 'SKIP'])
-
-        success_rate = (passed / total_tests * 100) if total_tests > 0 else 0
-
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Reporte Completo de Pruebas - Sistema de Turnos INER</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        .header p {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 40px;
-            background: #f8f9fa;
-        }}
-        .stat-card {{
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            text-align: center;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
-        .stat-card h3 {{
-            font-size: 3em;
-            margin-bottom: 10px;
-        }}
-        .stat-card p {{
-            color: #666;
-            font-size: 1.1em;
-        }}
-        .stat-card.success h3 {{ color: #10b981; }}
-        .stat-card.fail h3 {{ color: #ef4444; }}
-        .stat-card.error h3 {{ color: #f59e0b; }}
-        .stat-card.skip h3 {{ color: #6b7280; }}
-        .stat-card.total h3 {{ color: #3b82f6; }}
-
-        .content {{
-            padding: 40px;
-        }}
-
-        .test-results {{
-            margin-bottom: 40px;
-        }}
-        .test-results h2 {{
-            color: #1f2937;
-            margin-bottom: 20px;
-            font-size: 2em;
-            border-bottom: 3px solid #667eea;
-            padding-bottom: 10px;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-bottom: 30px;
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
-        th {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 15px;
-            text-align: left;
-            font-weight: 600;
-        }}
-        td {{
-            padding: 15px;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        tr:last-child td {{
-            border-bottom: none;
-        }}
-        tr:hover {{
-            background: #f9fafb;
-        }}
-        .status-badge {{
-            display: inline-block;
-            padding: 5px 15px;
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 0.9em;
-        }}
-        .status-PASS {{ background: #d1fae5; color: #065f46; }}
-        .status-FAIL {{ background: #fee2e2; color: #991b1b; }}
-        .status-ERROR {{ background: #fef3c7; color: #92400e; }}
-        .status-SKIP {{ background: #e5e7eb; color: #374151; }}
-
-        .screenshots {{
-            margin-top: 40px;
-        }}
-        .screenshots h2 {{
-            color: #1f2937;
-            margin-bottom: 20px;
-            font-size: 2em;
-            border-bottom: 3px solid #667eea;
-            padding-bottom: 10px;
-        }}
-        .screenshot-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(400px, 1fr));
-            gap: 30px;
-            margin-top: 20px;
-        }}
-        .screenshot-card {{
-            background: white;
-            border-radius: 15px;
-            overflow: hidden;
-            box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-            transition: transform 0.3s ease;
-        }}
-        .screenshot-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 15px 35px rgba(0,0,0,0.2);
-        }}
-        .screenshot-card img {{
-            width: 100%;
-            height: 250px;
-            object-fit: cover;
-            border-bottom: 3px solid #667eea;
-        }}
-        .screenshot-info {{
-            padding: 20px;
-        }}
-        .screenshot-title {{
-            font-weight: bold;
-            color: #1f2937;
-            margin-bottom: 5px;
-            font-size: 1.1em;
-        }}
-        .screenshot-meta {{
-            color: #6b7280;
-            font-size: 0.9em;
-        }}
-
-        .footer {{
-            background: #f8f9fa;
-            padding: 30px;
-            text-align: center;
-            color: #6b7280;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🧪 Reporte Completo de Pruebas</h1>
-            <p>Sistema de Gestión de Turnos - INER</p>
-            <p style="font-size: 0.9em; margin-top: 10px;">
-                Generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
-            </p>
-        </div>
-
-        <div class="stats">
-            <div class="stat-card total">
-                <h3>{total_tests}</h3>
-                <p>Total Pruebas</p>
-            </div>
-            <div class="stat-card success">
-                <h3>{passed}</h3>
-                <p>Exitosas</p>
-            </div>
-            <div class="stat-card fail">
-                <h3>{failed}</h3>
-                <p>Fallidas</p>
-            </div>
-            <div class="stat-card error">
-                <h3>{errors}</h3>
-                <p>Errores</p>
-            </div>
-            <div class="stat-card skip">
-                <h3>{skipped}</h3>
-                <p>Omitidas</p>
-            </div>
-            <div class="stat-card total">
-                <h3>{success_rate:.1f}%</h3>
-                <p>Tasa de Éxito</p>
-            </div>
-        </div>
-
-        <div class="content">
-            <div class="test-results">
-                <h2>📊 Resultados Detallados</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>#</th>
-                            <th>Prueba</th>
-                            <th>Estado</th>
-                            <th>Detalles</th>
-                            <th>Hora</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-"""
-
-        for i, result in enumerate(self.test_results, 1):
-            html_content += f"""
-                        <tr>
-                            <td>{i}</td>
-                            <td><strong>{result['test']}</strong></td>
-                            <td><span class="status-badge status-{result['status']}">{result['status']}</span></td>
-                            <td>{result['details']}</td>
-                            <td>{result['timestamp']}</td>
-                        </tr>
-"""
-
-        html_content += """
-                    </tbody>
-                </table>
-            </div>
-
-            <div class="screenshots">
-                <h2>📸 Capturas de Pantalla ({} screenshots)</h2>
-                <div class="screenshot-grid">
-""".format(len(screenshots))
-
-        for i, screenshot in enumerate(screenshots, 1):
-            name = screenshot.replace('.png', '').replace('_', ' ').title()
-            html_content += f"""
-                    <div class="screenshot-card">
-                        <img src="{screenshot}" alt="{name}">
-                        <div class="screenshot-info">
-                            <div class="screenshot-title">{i}. {name}</div>
-                            <div class="screenshot-meta">{screenshot}</div>
-                        </div>
-                    </div>
-"""
-
-        html_content += """
-                </div>
-            </div>
-        </div>
-
-        <div class="footer">
-            <p><strong>Sistema de Gestión de Turnos - INER</strong></p>
-            <p>Versión 2.6.1 | Pruebas Automatizadas con Selenium</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-        report_path = os.path.join(SCREENSHOT_DIR, "COMPLETE_TEST_REPORT.html")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
+        report_path = self.finish_report(SCREENSHOT_DIR)
         print_success(f"Reporte HTML generado: {report_path}")
         return report_path
 
@@ -671,7 +407,7 @@ class CompleteTester:
 
         try:
             print_action("Iniciando batería completa de pruebas...\n")
-            time.sleep(1)
+            self.open_report(SCREENSHOT_DIR)
 
             # 1. Probar cola pública (sin login)
             self.test_queue_page()
@@ -707,6 +443,7 @@ class CompleteTester:
             print_success(f"Screenshots guardados: {self.screenshot_counter - 1}")
             print_success(f"Pruebas ejecutadas: {len(self.test_results)}")
             print_success(f"Reporte HTML: {report_path}")
+            self.readiness.print_summary()
 
             print_info("\n📋 Para revisar los resultados:")
             print_info(f"   Abrir: {report_path}")
@@ -725,6 +462,13 @@ class CompleteTester:
             print_success("Navegador cerrado")
 
 def main():
+    parser = add_parallel_arguments(argparse.ArgumentParser(description="Prueba completa con Selenium"))
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        run_parallel_suite(CompleteTester, args.workers)
+        return
+
     tester = CompleteTester()
     tester.run_all_tests()
 
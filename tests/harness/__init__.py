@@ -0,0 +1,22 @@
+"""
+Harness compartido para las suites Selenium y las pruebas de carga del Sistema de Turnos INER
+
+Módulos:
+- asynchttp: cliente HTTP/1.1 asíncrono (keep-alive) para generar carga sobre la API y suscripciones SSE
+- capture_cache: captura incremental de screenshots (hash del DOM normalizado + manifiesto)
+- console: colores y helpers de impresión usados por todas las suites
+- driver: creación de instancias de Chrome WebDriver (visibles o headless)
+- image_pipeline: recompresión sin pérdida, variantes WebP/AVIF y miniaturas en paralelo
+- metrics: latencias por endpoint (p50/p95/p99, throughput, tasa de error)
+- network: tráfico /api/* por eventos Network de CDP y análisis de polling redundante
+- pg: conexión directa a PostgreSQL (DATABASE_URL de Prisma, psycopg/psycopg2 opcional), COPY y EXPLAIN resumido
+- process_stats: RSS de los procesos del servidor (por puerto o PID) muestreado durante una petición
+- queue_api: operaciones de recepción/flebotomista sobre la API de turnos, con latencia medida
+- report: reporte HTML en streaming con miniaturas lazy, duración por paso e índice de corridas
+- runner: ejecución paralela de pruebas repartidas en un pool de procesos
+- session: login único por API y reutilización del token en cada navegador
+- telemetry: telemetría de rendimiento por visita (CDP: paint, LCP, long tasks, heap, recursos) y presupuestos
+- trends: histórico SQLite de rendimiento por corrida y gate de regresiones contra línea base móvil
+- visual_diff: comparación visual contra línea base (NumPy, antialiasing, regiones, heatmaps)
+- waits: esperas adaptativas de readiness (red /api/* en reposo + DOM estable)
+"""
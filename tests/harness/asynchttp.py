@@ -0,0 +1,314 @@
+"""
+Cliente HTTP/1.1 asíncrono mínimo (solo biblioteca estándar)
+
+Pensado para generar carga contra la API: conexiones keep-alive reutilizadas
+desde un pool acotado, cuerpo JSON, y la latencia de cada petición medida de
+extremo a extremo (incluye la espera por una conexión libre del pool).
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 30
+MAX_CONNECTIONS = 100
+
+# Métodos que se pueden repetir sin duplicar efectos (RFC 9110, 9.2.2)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class HttpError(Exception):
+    """Fallo de red o de protocolo (no un status HTTP de error)"""
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: dict
+    body: bytes
+    elapsed: float
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpClient:
+    """
+    Uso:
+        async with AsyncHttpClient("http://localhost:3005") as client:
+            response = await client.get("/api/queue/list")
+    """
+
+    def __init__(self, base_url, max_connections=MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT, headers=None):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise ValueError("Solo se soporta http:// (la carga se genera contra el servidor local o la LAN)")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.default_headers = headers or {}
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    async def get(self, path, headers=None):
+        return await self.request('GET', path, headers=headers)
+
+    async def post(self, path, json_body=None, headers=None):
+        return await self.request('POST', path, json_body=json_body, headers=headers)
+
+    async def put(self, path, json_body=None, headers=None):
+        return await self.request('PUT', path, json_body=json_body, headers=headers)
+
+    async def request(self, method, path, json_body=None, headers=None):
+        start = time.perf_counter()
+        async with self._slots:
+            try:
+                return await asyncio.wait_for(
+                    self._send(method, path, json_body, headers, start),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                raise HttpError(f"Timeout de {self.timeout}s en {method} {path}")
+
+    async def _send(self, method, path, json_body, headers, start):
+        body = b'' if json_body is None else json.dumps(json_body).encode('utf-8')
+        lines = [
+            f"{method} {self.base_path}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept: application/json",
+        ]
+        if json_body is not None:
+            lines.append("Content-Type: application/json")
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            lines.append(f"Content-Length: {len(body)}")
+        for name, value in {**self.default_headers, **(headers or {})}.items():
+            lines.append(f"{name}: {value}")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body
+
+        # Una conexión reutilizada pudo haber sido cerrada por el servidor
+        # (keep-alive timeout): se reintenta una vez con una conexión nueva.
+        # Un POST/PATCH que ya se envió no se repite: el servidor pudo haberlo
+        # procesado antes de cortar, y repetirlo crearía un turno de más
+        for attempt in range(2):
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await self._connect()
+            sent = False
+            try:
+                conn.writer.write(payload)
+                await conn.writer.drain()
+                sent = True
+                status, response_headers, response_body, keep_alive = await self._read_response(conn.reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError, HttpError) as e:
+                conn.close()
+                if reused and attempt == 0 and (method in IDEMPOTENT_METHODS or not sent):
+                    continue
+                raise HttpError(f"{method} {path}: {e}")
+
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn.close()
+            return HttpResponse(status, response_headers, response_body, time.perf_counter() - start)
+
+    async def _connect(self):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            raise HttpError(f"No se pudo conectar con {self.host}:{self.port}: {e}")
+        return _Connection(reader, writer)
+
+    async def _read_response(self, reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError("Conexión cerrada por el servidor")
+        try:
+            _, status, _ = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+        except ValueError:
+            raise HttpError(f"Status inválido: {status_line!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        return status, headers, body, keep_alive
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers opcionales hasta la línea vacía
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+@dataclass
+class ServerEvent:
+    event: str
+    data: str
+    id: str
+    received: float
+
+    def json(self):
+        return json.loads(self.data or 'null')
+
+
+class EventStream:
+    """
+    Suscripción Server-Sent Events sobre una conexión dedicada (no usa el pool)
+
+    Uso:
+        async with EventStream("http://localhost:3005", "/api/queue/stream") as stream:
+            async for event in stream:
+                print(event.event, event.json())
+    """
+
+    def __init__(self, base_url, path, headers=None, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path.rstrip('/') + path
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.status = None
+        self._conn = None
+        self._chunked = False
+        self._buffer = b''
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def open(self):
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise HttpError(f"No se pudo conectar con {self.host}:{self.port}: {e}")
+        self._conn = _Connection(reader, writer)
+        lines = [f"GET {self.path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 "Accept: text/event-stream", "Cache-Control: no-cache"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        try:
+            self.status = int(status_line.decode('latin-1').split(' ', 2)[1])
+        except (IndexError, ValueError):
+            self.close()
+            raise HttpError(f"Status inválido: {status_line!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if self.status != 200 or 'text/event-stream' not in headers.get('content-type', ''):
+            self.close()
+            raise HttpError(f"GET {self.path}: status {self.status} ({headers.get('content-type', '-')})")
+        self._chunked = headers.get('transfer-encoding', '').lower() == 'chunked'
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    async def _read_more(self):
+        reader = self._conn.reader
+        if not self._chunked:
+            data = await reader.read(65536)
+        else:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            data = await reader.readexactly(size) if size else b''
+            await reader.readexactly(2)
+        if not data:
+            raise HttpError("Stream cerrado por el servidor")
+        self._buffer += data
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """Siguiente evento completo (los comentarios ': ping' se descartan)"""
+        while True:
+            for separator in (b'\n\n', b'\r\n\r\n'):
+                index = self._buffer.find(separator)
+                if index >= 0:
+                    block, self._buffer = self._buffer[:index], self._buffer[index + len(separator):]
+                    event = self._parse(block)
+                    if event:
+                        return event
+                    break
+            else:
+                try:
+                    await self._read_more()
+                except (HttpError, ConnectionError, asyncio.IncompleteReadError):
+                    raise StopAsyncIteration
+            continue
+
+    @staticmethod
+    def _parse(block):
+        fields = {'event': 'message', 'data': [], 'id': ''}
+        for line in block.decode('utf-8').splitlines():
+            if not line or line.startswith(':'):
+                continue
+            name, _, value = line.partition(':')
+            value = value[1:] if value.startswith(' ') else value
+            if name == 'data':
+                fields['data'].append(value)
+            elif name in ('event', 'id'):
+                fields[name] = value
+        if not fields['data']:
+            return None
+        return ServerEvent(fields['event'], '\n'.join(fields['data']), fields['id'], time.perf_counter())
@@ -0,0 +1,161 @@
+"""
+Captura incremental de screenshots basada en el contenido de la página
+
+Antes de cada captura se toma una instantánea normalizada del DOM (sin
+scripts, sin horas/fechas/contadores que cambian solos) y se calcula su hash.
+Si coincide con el del manifiesto y el PNG existe, no se vuelve a renderizar ni
+a codificar la imagen. El manifiesto vive junto a screenshots-metadata.json.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+MANIFEST_FILENAME = "screenshots-manifest.json"
+MANIFEST_VERSION = 1
+
+# Serializa el DOM visible: quita scripts y precargas (cambian con cada build
+# aunque la UI sea idéntica) y reemplaza cada canvas (gráficas) por un hash de
+# su contenido, que no aparece en el HTML
+SNAPSHOT_JS = """
+function fnv(str) {
+  var h = 0x811c9dc5;
+  for (var i = 0; i < str.length; i++) { h ^= str.charCodeAt(i); h = Math.imul(h, 0x01000193) >>> 0; }
+  return h.toString(16);
+}
+var canvases = document.querySelectorAll('canvas');
+var root = document.documentElement.cloneNode(true);
+var clones = root.querySelectorAll('canvas');
+for (var i = 0; i < clones.length; i++) {
+  var data = '';
+  try { data = canvases[i].toDataURL(); } catch (e) { data = canvases[i].width + 'x' + canvases[i].height; }
+  clones[i].setAttribute('data-content-hash', fnv(data));
+}
+root.querySelectorAll('script, noscript, link[rel=preload], link[rel=modulepreload], link[rel=prefetch]')
+  .forEach(function (el) { el.remove(); });
+return {
+  html: root.outerHTML,
+  viewport: window.innerWidth + 'x' + window.innerHeight + '@' + window.devicePixelRatio,
+  scroll: Math.round(window.scrollX) + ',' + Math.round(window.scrollY)
+};
+"""
+
+# Rectángulos (en pixeles del screenshot) de los elementos de texto que muestran
+# horas o fechas: la comparación visual (visual_diff) los ignora
+VOLATILE_REGIONS_JS = """
+var patterns = [/\\b\\d{1,2}:\\d{2}(:\\d{2})?/, /\\b\\d{1,2}[\\/-]\\d{1,2}[\\/-]\\d{2,4}\\b/,
+                /\\b\\d{1,2} de [a-záéíóú]+/i, /\\bhace \\d+/i];
+var ratio = window.devicePixelRatio || 1;
+var boxes = [];
+var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+  var text = walker.currentNode.textContent;
+  if (!patterns.some(function (p) { return p.test(text); })) continue;
+  var el = walker.currentNode.parentElement;
+  var rect = el && el.getBoundingClientRect();
+  if (!rect || !rect.width || !rect.height) continue;
+  boxes.push([Math.floor(rect.left * ratio) - 2, Math.floor(rect.top * ratio) - 2,
+              Math.ceil(rect.right * ratio) + 2, Math.ceil(rect.bottom * ratio) + 2]);
+}
+return boxes;
+"""
+
+# Texto que cambia sin que cambie la UI: relojes, fechas, "hace 5 min", esperas
+VOLATILE_PATTERNS = [
+    re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?'),
+    re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'),
+    re.compile(r'\b\d{1,2}\s+de\s+[a-záéíóú]+(\s+de\s+\d{4})?', re.IGNORECASE),
+    re.compile(r'\b(lunes|martes|miércoles|jueves|viernes|sábado|domingo)\b', re.IGNORECASE),
+    re.compile(r'\b\d{1,2}:\d{2}(:\d{2})?(\s*[ap]\.?\s?m\.?)?', re.IGNORECASE),
+    re.compile(r'\bhace\s+\d+\s+\w+', re.IGNORECASE),
+    re.compile(r'\b\d+\s*(min|mins|minutos|seg|segundos|h|hrs|horas)\b', re.IGNORECASE),
+]
+
+
+def normalize_dom(html):
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub('·', html)
+    return re.sub(r'\s+', ' ', html)
+
+
+def page_fingerprint(driver):
+    """Hash estable del estado visible de la página actual"""
+    snapshot = driver.execute_script(SNAPSHOT_JS)
+    digest = hashlib.sha256()
+    digest.update(driver.current_url.split('#')[0].encode('utf-8'))
+    digest.update(snapshot['viewport'].encode('utf-8'))
+    digest.update(snapshot['scroll'].encode('utf-8'))
+    digest.update(normalize_dom(snapshot['html']).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def volatile_regions(driver):
+    """[(x0, y0, x1, y1), ...] de relojes y fechas visibles en el viewport"""
+    return [tuple(box) for box in driver.execute_script(VOLATILE_REGIONS_JS)]
+
+
+class ScreenshotManifest:
+    """Hash de contenido por archivo de screenshot, guardado junto al metadata"""
+
+    def __init__(self, directory, filename=MANIFEST_FILENAME):
+        self.directory = directory
+        self.path = os.path.join(directory, filename)
+        self.entries = {}
+        self.captured = []
+        self.skipped = []
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, filename, digest):
+        entry = self.entries.get(filename)
+        return bool(entry) and entry.get('hash') == digest and os.path.exists(os.path.join(self.directory, filename))
+
+    def record(self, filename, digest, url, ignore_regions=()):
+        filepath = os.path.join(self.directory, filename)
+        self.entries[filename] = {
+            'hash': digest,
+            'url': url,
+            'ignoreRegions': [list(box) for box in ignore_regions],
+            'bytes': os.path.getsize(filepath) if os.path.exists(filepath) else None,
+            'capturedAt': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=2, ensure_ascii=False)
+        return self.path
+
+
+class IncrementalCapture:
+    """
+    Uso dentro de capture():
+        if not self.incremental.save(self.driver, filename, filepath):
+            print("sin cambios")
+    """
+
+    def __init__(self, directory, full=False):
+        self.manifest = ScreenshotManifest(directory)
+        self.full = full
+
+    def save(self, driver, filename, filepath):
+        """Guarda el screenshot solo si la página cambió; True si se capturó"""
+        digest = page_fingerprint(driver)
+        if not self.full and self.manifest.is_current(filename, digest):
+            self.manifest.skipped.append(filename)
+            return False
+
+        driver.save_screenshot(filepath)
+        self.manifest.record(filename, digest, driver.current_url, volatile_regions(driver))
+        self.manifest.captured.append(filename)
+        return True
+
+    def finish(self):
+        """Guarda el manifiesto y devuelve (capturados, sin cambios)"""
+        self.manifest.save()
+        return len(self.manifest.captured), len(self.manifest.skipped)
@@ -0,0 +1,36 @@
+"""
+Colores y helpers de impresión compartidos por las suites Selenium
+"""
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    MAGENTA = '\033[95m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+
+
+def print_header(message, width=80):
+    print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*width}{Colors.END}")
+    print(f"{Colors.BOLD}{Colors.BLUE}{message.center(width)}{Colors.END}")
+    print(f"{Colors.BOLD}{Colors.BLUE}{'='*width}{Colors.END}\n")
+
+
+def print_action(message):
+    print(f"  {Colors.YELLOW}→{Colors.END} {message}")
+
+
+def print_success(message):
+    print(f"  {Colors.GREEN}✓{Colors.END} {message}")
+
+
+def print_error(message):
+    print(f"  {Colors.RED}✗{Colors.END} {message}")
+
+
+def print_info(message):
+    print(f"  {Colors.BLUE}ℹ{Colors.END} {message}")
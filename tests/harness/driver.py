@@ -0,0 +1,48 @@
+"""
+Creación de instancias de Chrome WebDriver para las suites
+
+Los workers del runner paralelo usan siempre modo headless; las suites
+ejecutadas en serie conservan la ventana visible para depuración.
+"""
+import os
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+WINDOW_SIZE = (1920, 1080)
+
+# SELENIUM_HEADLESS=1 fuerza headless también en ejecuciones seriales (CI)
+FORCE_HEADLESS = os.environ.get("SELENIUM_HEADLESS", "0") == "1"
+
+
+def build_chrome_options(headless=False, window_size=WINDOW_SIZE, performance_log=False):
+    """
+    Construye las opciones de Chrome comunes a todas las suites
+
+    performance_log=True habilita el log de rendimiento con los eventos
+    Network.* de CDP (lo consume harness.network.NetworkRecorder)
+    """
+    options = Options()
+    options.add_argument(f"--window-size={window_size[0]},{window_size[1]}")
+    options.add_argument("--force-device-scale-factor=1")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    if headless or FORCE_HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+    else:
+        options.add_argument("--start-maximized")
+
+    if performance_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+    return options
+
+
+def create_driver(headless=False, window_size=WINDOW_SIZE, performance_log=False):
+    """Inicia un Chrome WebDriver con las opciones estándar del harness"""
+    return webdriver.Chrome(options=build_chrome_options(headless, window_size, performance_log))
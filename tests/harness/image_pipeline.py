@@ -0,0 +1,197 @@
+"""
+Post-procesamiento de screenshots para el módulo de documentación
+
+Después de capturar, cada PNG se procesa en un pool de procesos:
+- Recompresión sin pérdida (RGBA opaco → RGB, paleta si hay ≤256 colores,
+  optimize=True); solo se reemplaza el original si queda más chico
+- Variante WebP a tamaño completo (y AVIF si Pillow lo soporta)
+- Miniatura WebP para listados y reportes
+
+Las variantes se regeneran solo si el PNG es más nuevo que ellas, así que con
+la captura incremental (capture_cache) una corrida sin cambios no recodifica
+nada. Requiere Pillow; sin Pillow el pipeline se omite con un aviso.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = ImageChops = None
+
+from harness.console import print_success, print_error, print_info
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+WEBP_QUALITY = 82
+THUMBNAIL_WIDTH = 480
+
+
+def pillow_available():
+    return Image is not None
+
+
+def avif_supported():
+    if Image is None:
+        return False
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+def _describe(path, filename=None):
+    with Image.open(path) as img:
+        width, height = img.size
+    return {
+        'filename': filename or os.path.basename(path),
+        'width': width,
+        'height': height,
+        'bytes': os.path.getsize(path),
+    }
+
+
+def _is_fresh(variant_path, source_path):
+    return os.path.exists(variant_path) and os.path.getmtime(variant_path) >= os.path.getmtime(source_path)
+
+
+def _save_atomic(img, path, fmt, **params):
+    """Escribe en un temporal del mismo directorio y renombra (sin archivos a medias)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        img.save(tmp_path, fmt, **params)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def optimize_png(path):
+    """Recomprime el PNG sin pérdida; devuelve bytes ahorrados"""
+    original_bytes = os.path.getsize(path)
+    with Image.open(path) as img:
+        img.load()
+
+    # Chrome entrega RGBA aunque la página sea opaca
+    if img.mode == 'RGBA' and img.getextrema()[3] == (255, 255):
+        img = img.convert('RGB')
+    # Capturas con pocos colores (formularios, tablas) caben en paleta sin perder nada
+    if img.mode == 'RGB' and img.getcolors(256) is not None:
+        paletted = img.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        if ImageChops.difference(paletted.convert('RGB'), img).getbbox() is None:
+            img = paletted
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.png')
+    os.close(fd)
+    try:
+        img.save(tmp_path, 'PNG', optimize=True)
+        saved = original_bytes - os.path.getsize(tmp_path)
+        if saved > 0:
+            os.replace(tmp_path, path)
+            return saved
+        return 0
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_thumbnail(source_path, thumb_path, width=THUMBNAIL_WIDTH):
+    """Miniatura WebP de `width` px de ancho (sin ampliar imágenes más chicas)"""
+    with Image.open(source_path) as img:
+        img = img.convert('RGB')
+        width = min(width, img.width)
+        thumb = img.resize((width, max(1, round(img.height * width / img.width))), Image.Resampling.LANCZOS)
+    os.makedirs(os.path.dirname(thumb_path) or '.', exist_ok=True)
+    _save_atomic(thumb, thumb_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+    return thumb_path
+
+
+def process_screenshot(path, webp_quality=WEBP_QUALITY, thumbnail_width=THUMBNAIL_WIDTH, avif=False):
+    """
+    Procesa un PNG y devuelve la descripción de sus variantes:
+    {'width', 'height', 'bytes', 'savedBytes', 'variants': {'webp': {...}, 'thumbnail': {...}}}
+
+    Se ejecuta en un proceso del pool, por eso recibe solo tipos serializables
+    """
+    directory = os.path.dirname(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    webp_path = os.path.join(directory, f"{stem}.webp")
+    thumb_path = os.path.join(directory, f"{stem}-thumb.webp")
+    avif_path = os.path.join(directory, f"{stem}.avif")
+
+    # Variantes al día: el PNG no cambió desde la última corrida
+    outputs = [webp_path, thumb_path] + ([avif_path] if avif else [])
+    saved = 0
+    if not all(_is_fresh(p, path) for p in outputs):
+        saved = optimize_png(path)
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+            _save_atomic(img, webp_path, 'WEBP', quality=webp_quality, method=6)
+            if avif:
+                _save_atomic(img, avif_path, 'AVIF', quality=webp_quality - 20)
+        write_thumbnail(path, thumb_path, thumbnail_width)
+
+    result = _describe(path)
+    result['savedBytes'] = saved
+    result['variants'] = {
+        'webp': _describe(webp_path),
+        'thumbnail': _describe(thumb_path),
+    }
+    if avif:
+        result['variants']['avif'] = _describe(avif_path)
+    return result
+
+
+def postprocess_screenshots(directory, filenames, workers=DEFAULT_WORKERS, avif=False):
+    """Procesa los PNG en paralelo; devuelve {filename: resultado} (omite los que fallan)"""
+    if Image is None:
+        print_error("Pillow no está instalado: se omite la optimización de screenshots (pip install Pillow)")
+        return {}
+    if avif and not avif_supported():
+        print_info("Esta versión de Pillow no soporta AVIF; solo se generará WebP")
+        avif = False
+
+    results = {}
+    pngs = [f for f in filenames if f.lower().endswith('.png') and os.path.exists(os.path.join(directory, f))]
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pngs) or 1))) as pool:
+        futures = {
+            pool.submit(process_screenshot, os.path.join(directory, f), avif=avif): f
+            for f in pngs
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                results[filename] = future.result()
+            except Exception as e:
+                print_error(f"No se pudo procesar {filename}: {e}")
+    return results
+
+
+def apply_to_metadata(entries, results):
+    """Agrega dimensiones y variantes a las entradas de screenshots-metadata.json"""
+    for entry in entries:
+        result = results.get(entry.get('filename'))
+        if not result:
+            continue
+        base_path = entry.get('path', f"/docs/screenshots/{entry['filename']}").rsplit('/', 1)[0]
+        entry['width'] = result['width']
+        entry['height'] = result['height']
+        entry['bytes'] = result['bytes']
+        if 'size' in entry:
+            entry['size'] = f"{result['bytes'] / 1024:.1f} KB"
+        entry['variants'] = {
+            name: dict(variant, path=f"{base_path}/{variant['filename']}")
+            for name, variant in result['variants'].items()
+        }
+    return entries
+
+
+def print_savings(results):
+    if not results:
+        return
+    original = sum(r['bytes'] + r['savedBytes'] for r in results.values())
+    png = sum(r['bytes'] for r in results.values())
+    webp = sum(r['variants']['webp']['bytes'] for r in results.values())
+    thumbs = sum(r['variants']['thumbnail']['bytes'] for r in results.values())
+    print_success(f"{len(results)} screenshots optimizados")
+    print_info(f"PNG: {original / 1024:.0f} KB → {png / 1024:.0f} KB | "
+               f"WebP: {webp / 1024:.0f} KB | Miniaturas: {thumbs / 1024:.0f} KB")
@@ -0,0 +1,102 @@
+"""
+Registro de latencias por endpoint para las pruebas de carga
+
+Cada muestra guarda duración, status y error; el resumen calcula throughput,
+tasa de error y percentiles p50/p95/p99 por endpoint.
+"""
+import json
+import math
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from harness.console import Colors, print_header
+
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint, elapsed, status=None, error=None):
+        """status None + error = fallo de red/timeout; status >= 400 = error HTTP"""
+        self.samples[endpoint].append((elapsed, status, error))
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summarize_endpoint(self, samples, duration):
+        latencies = sorted(elapsed for elapsed, status, _ in samples if status is not None)
+        errors = sum(1 for _, status, error in samples if error or status is None or status >= 400)
+        throttled = sum(1 for _, status, _ in samples if status == 429)
+        statuses = defaultdict(int)
+        for _, status, error in samples:
+            statuses[str(status) if status is not None else 'network'] += 1
+
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'errorRate': round(errors / len(samples), 4) if samples else 0,
+            'throttled': throttled,
+            'throughput': round(len(samples) / duration, 2) if duration else 0,
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1] if latencies else None),
+            'statuses': dict(statuses),
+        }
+
+    def summary(self):
+        duration = self.duration
+        endpoints = {
+            endpoint: self.summarize_endpoint(samples, duration)
+            for endpoint, samples in sorted(self.samples.items())
+        }
+        all_samples = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            'duration': round(duration, 2),
+            'endpoints': endpoints,
+            'total': self.summarize_endpoint(all_samples, duration),
+        }
+
+    def print_table(self, title="RESULTADOS DE CARGA"):
+        summary = self.summary()
+        print_header(title)
+        print(f"  {'Endpoint':<34}{'Req':>8}{'req/s':>9}{'Err%':>8}{'429':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        print(f"  {'-' * 101}")
+        rows = list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]
+        for endpoint, stats in rows:
+            color = Colors.RED if stats['errorRate'] > 0.01 else Colors.GREEN
+            print(
+                f"  {endpoint:<34}{stats['requests']:>8}{stats['throughput']:>9.1f}"
+                f"{color}{stats['errorRate'] * 100:>7.1f}%{Colors.END}{stats['throttled']:>6}"
+                f"{_fmt_ms(stats['p50'])}{_fmt_ms(stats['p95'])}{_fmt_ms(stats['p99'])}{_fmt_ms(stats['max'])}"
+            )
+        print(f"\n  Duración: {summary['duration']:.1f}s (latencias en ms)")
+        return summary
+
+    def save_json(self, path, **extra):
+        data = {'timestamp': datetime.now().isoformat(), **extra, **self.summary()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return path
+
+
+def _fmt_ms(value):
+    return f"{'-':>9}" if value is None else f"{value:>9.1f}"
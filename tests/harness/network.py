@@ -0,0 +1,213 @@
+"""
+Registro de tráfico de red por CDP y análisis de polling redundante
+
+Chrome entrega los eventos Network.* del DevTools Protocol en el log de
+rendimiento (goog:loggingPrefs performance=ALL, ver driver.create_driver).
+NetworkRecorder los drena periódicamente, arma una petición por requestId
+(inicio, fin, status, bytes transferidos) y, al terminar cada respuesta a
+/api/*, pide su cuerpo con Network.getResponseBody para guardar solo su hash.
+
+analyze_requests() agrupa por endpoint (ruta sin query string):
+- peticiones y bytes por minuto
+- respuestas idénticas a la anterior del mismo endpoint (polling sin cambios)
+  y duplicadas (cuerpo ya visto en la ventana)
+- peticiones superpuestas: inician mientras otra al mismo endpoint sigue en curso
+- intervalo real entre peticiones (mediana) frente al configurado en la página
+
+forwarded_headers() da a cada cliente simulado su propia IP (X-Forwarded-For)
+para los generadores de carga HTTP.
+"""
+import hashlib
+import json
+import statistics
+import time
+from urllib.parse import urlparse
+
+try:
+    from selenium.common.exceptions import WebDriverException
+except ImportError:
+    class WebDriverException(Exception):
+        pass
+
+TRACKED_TYPES = ('Fetch', 'XHR', 'EventSource')
+
+
+def forwarded_headers(prefix, n):
+    """
+    X-Forwarded-For 10.<prefix>.x.y distinto para cada n
+
+    middleware.ts limita por ip:ruta; en piso cada pantalla y flebotomista
+    tiene su propia IP. Cada script usa su propio prefix para que dos
+    herramientas corriendo a la vez no compartan presupuesto. Pasadas 62500
+    IPs el segundo octeto avanza (prefix + 0..99).
+    """
+    return {'X-Forwarded-For': f"10.{prefix + n // 62500 % 100}.{n // 250 % 250}.{n % 250 + 1}"}
+
+
+class NetworkRecorder:
+    """Peticiones fetch/XHR a /api/* observadas por CDP en un WebDriver de Chrome"""
+
+    def __init__(self, driver, api_prefix='/api/', hash_bodies=True):
+        self.driver = driver
+        self.api_prefix = api_prefix
+        self.hash_bodies = hash_bodies
+        self.requests = {}
+        self.started = time.monotonic()
+        self.body_errors = 0
+
+    def start(self):
+        """Habilita Network y descarta el log acumulado hasta ahora"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.get_log('performance')
+        self.requests.clear()
+        self.started = time.monotonic()
+
+    def _is_tracked(self, params):
+        url = params.get('request', {}).get('url') or params.get('response', {}).get('url', '')
+        return urlparse(url).path.startswith(self.api_prefix) and params.get('type', 'Fetch') in TRACKED_TYPES
+
+    def _body_hash(self, request_id):
+        try:
+            body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            # El cuerpo ya no está en el buffer de Chrome (respuesta grande o página recargada)
+            self.body_errors += 1
+            return None
+        return hashlib.sha1(body.get('body', '').encode('utf-8')).hexdigest()
+
+    def drain(self):
+        """Procesa los eventos pendientes del log de rendimiento; devuelve cuántos se procesaron"""
+        entries = self.driver.get_log('performance')
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method', ''), message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                if not self._is_tracked(params):
+                    continue
+                # Un redirect reutiliza el requestId: se conserva la última petición
+                url = params['request']['url']
+                self.requests[request_id] = {
+                    'requestId': request_id,
+                    'endpoint': urlparse(url).path,
+                    'url': url,
+                    'method': params['request']['method'],
+                    'start': params['timestamp'],
+                    'end': None,
+                    'status': None,
+                    'bytes': 0,
+                    'bodyHash': None,
+                    'failed': False,
+                }
+            elif request_id not in self.requests:
+                continue
+            elif method == 'Network.responseReceived':
+                self.requests[request_id]['status'] = params['response']['status']
+            elif method == 'Network.loadingFinished':
+                request = self.requests[request_id]
+                request['end'] = params['timestamp']
+                request['bytes'] = params.get('encodedDataLength', 0)
+                if self.hash_bodies:
+                    request['bodyHash'] = self._body_hash(request_id)
+            elif method == 'Network.loadingFailed':
+                request = self.requests[request_id]
+                request['end'] = params['timestamp']
+                request['failed'] = True
+        return len(entries)
+
+    def watch(self, seconds, poll_interval=1.0, on_tick=None):
+        """Drena el log durante `seconds`; on_tick(transcurrido) se llama en cada vuelta"""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.drain()
+            if on_tick:
+                on_tick(time.monotonic() - self.started)
+            time.sleep(poll_interval)
+        self.drain()
+        return self.finished()
+
+    def finished(self):
+        """Peticiones completas (con fin), ordenadas por inicio"""
+        return sorted((r for r in self.requests.values() if r['end'] is not None), key=lambda r: r['start'])
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+def analyze_requests(requests, duration):
+    """
+    Métricas de polling por endpoint a partir de las peticiones registradas
+    @param {float} duration - segundos observados
+    @returns {dict} {endpoint: métricas} más la clave 'TOTAL'
+    """
+    minutes = duration / 60 if duration else 1
+    by_endpoint = {}
+    for request in requests:
+        by_endpoint.setdefault(request['endpoint'], []).append(request)
+
+    def summarize(items, per_endpoint=True):
+        hashed = [r for r in items if r['bodyHash']]
+        unchanged = duplicates = 0
+        seen = set()
+        previous = None
+        for r in hashed:
+            if r['bodyHash'] == previous:
+                unchanged += 1
+            if r['bodyHash'] in seen:
+                duplicates += 1
+            seen.add(r['bodyHash'])
+            previous = r['bodyHash']
+
+        overlapping = max_inflight = 0
+        in_flight_ends = []
+        for r in items:
+            in_flight_ends = [end for end in in_flight_ends if end > r['start']]
+            if in_flight_ends:
+                overlapping += 1
+            in_flight_ends.append(r['end'])
+            max_inflight = max(max_inflight, len(in_flight_ends))
+
+        total_bytes = sum(r['bytes'] for r in items)
+        redundant_bytes = 0
+        previous = None
+        for r in hashed:
+            if r['bodyHash'] == previous:
+                redundant_bytes += r['bytes']
+            previous = r['bodyHash']
+
+        gaps = [b['start'] - a['start'] for a, b in zip(items, items[1:])]
+        durations = sorted((r['end'] - r['start']) * 1000 for r in items)
+        stats = {
+            'requests': len(items),
+            'requestsPerMin': round(len(items) / minutes, 2),
+            'bytes': total_bytes,
+            'bytesPerMin': round(total_bytes / minutes),
+            'hashed': len(hashed),
+            'unchanged': unchanged,
+            'unchangedRatio': round(unchanged / len(hashed), 3) if hashed else None,
+            'duplicates': duplicates,
+            'duplicateRatio': round(duplicates / len(hashed), 3) if hashed else None,
+            'redundantBytesPerMin': round(redundant_bytes / minutes),
+            'overlapping': overlapping,
+            'maxInFlight': max_inflight,
+            'failed': sum(1 for r in items if r['failed']),
+            'medianMs': round(statistics.median(durations), 1) if durations else None,
+        }
+        if per_endpoint:
+            stats['medianIntervalS'] = round(statistics.median(gaps), 2) if gaps else None
+        return stats
+
+    result = {endpoint: summarize(items) for endpoint, items in sorted(by_endpoint.items())}
+    # En el total los "duplicados" comparan cuerpos entre endpoints distintos; solo
+    # tienen sentido por endpoint, así que el total se reduce a sumas
+    totals = summarize(requests, per_endpoint=False)
+    totals['unchanged'] = sum(s['unchanged'] for s in result.values())
+    totals['duplicates'] = sum(s['duplicates'] for s in result.values())
+    totals['redundantBytesPerMin'] = sum(s['redundantBytesPerMin'] for s in result.values())
+    totals['overlapping'] = sum(s['overlapping'] for s in result.values())
+    totals['unchangedRatio'] = round(totals['unchanged'] / totals['hashed'], 3) if totals['hashed'] else None
+    totals['duplicateRatio'] = round(totals['duplicates'] / totals['hashed'], 3) if totals['hashed'] else None
+    result['TOTAL'] = totals
+    return result
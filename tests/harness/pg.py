@@ -0,0 +1,129 @@
+"""
+Conexión directa a PostgreSQL para las herramientas de datos y benchmarks
+
+Usa la misma DATABASE_URL que Prisma (variable de entorno, o .env.local / .env
+en la raíz del proyecto). Acepta psycopg 3 o psycopg2; ninguno es dependencia
+obligatoria del resto del harness.
+
+scalar() y explain() son las consultas de apoyo de los benchmarks: un valor
+suelto y el resumen de EXPLAIN (ANALYZE, BUFFERS) de una consulta.
+"""
+import io
+import json
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import psycopg
+    psycopg2 = None
+except ImportError:
+    psycopg = None
+    try:
+        import psycopg2
+    except ImportError:
+        psycopg2 = None
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+ENV_FILES = ('.env.local', '.env')
+
+# Parámetros propios de Prisma que libpq no reconoce
+PRISMA_ONLY_PARAMS = {'schema', 'connection_limit', 'pool_timeout', 'pgbouncer', 'statement_cache_size',
+                      'socket_timeout', 'connect_timeout_ms'}
+
+
+class DatabaseError(RuntimeError):
+    """No hay driver de PostgreSQL o no se pudo obtener la URL de conexión"""
+
+
+def driver_available():
+    return psycopg is not None or psycopg2 is not None
+
+
+def _read_env_file(path, name):
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                match = re.match(rf'^\s*{name}\s*=\s*(.+?)\s*$', line)
+                if match:
+                    return match.group(1).strip('"\'')
+    except OSError:
+        return None
+    return None
+
+
+def database_url():
+    """DATABASE_URL del entorno o de .env.local/.env, sin los parámetros exclusivos de Prisma"""
+    url = os.environ.get('DATABASE_URL')
+    for filename in ENV_FILES:
+        if url:
+            break
+        url = _read_env_file(os.path.join(ROOT, filename), 'DATABASE_URL')
+    if not url:
+        raise DatabaseError("DATABASE_URL no definida (entorno, .env.local o .env)")
+
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in PRISMA_ONLY_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def connect(url=None):
+    """Conexión sin autocommit; el llamador decide cuándo confirmar"""
+    url = url or database_url()
+    if psycopg is not None:
+        return psycopg.connect(url)
+    if psycopg2 is not None:
+        return psycopg2.connect(url)
+    raise DatabaseError("Se requiere psycopg o psycopg2 (pip install 'psycopg[binary]')")
+
+
+def copy_rows(conn, table, columns, text):
+    """COPY ... FROM STDIN (CSV) con el bloque `text` ya serializado"""
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    sql = f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+    with conn.cursor() as cur:
+        if psycopg is not None:
+            with cur.copy(sql) as copy:
+                copy.write(text)
+        else:
+            cur.copy_expert(sql, io.StringIO(text))
+
+
+def scalar(conn, sql, params=()):
+    """Primera columna de la primera fila (o None); no deja la transacción abierta"""
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        row = cur.fetchone()
+    conn.rollback()
+    return row[0] if row else None
+
+
+def walk_plan(node):
+    """Nodos de un plan de EXPLAIN (FORMAT JSON), en preorden"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+
+def explain(conn, sql, params=None):
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) resumido; la consulta se ejecuta realmente (solo SELECT)"""
+    with conn.cursor() as cur:
+        cur.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params)
+        raw = cur.fetchone()[0]
+    conn.rollback()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    root = plan['Plan']
+    nodes = list(walk_plan(root))
+    return {
+        'executionMs': round(plan['Execution Time'], 2),
+        'planningMs': round(plan['Planning Time'], 2),
+        'rows': root.get('Actual Rows'),
+        'sharedHit': root.get('Shared Hit Blocks', 0),
+        'sharedRead': root.get('Shared Read Blocks', 0),
+        'sharedBlocks': root.get('Shared Hit Blocks', 0) + root.get('Shared Read Blocks', 0),
+        'tempWritten': root.get('Temp Written Blocks', 0),
+        'seqScans': sorted({n['Relation Name'] for n in nodes if n['Node Type'] == 'Seq Scan' and 'Relation Name' in n}),
+        'indexes': sorted({n['Index Name'] for n in nodes if 'Index Name' in n}),
+        'nodes': [n['Node Type'] for n in nodes],
+        'plan': plan,
+    }
@@ -0,0 +1,85 @@
+"""
+Memoria residente (RSS) del servidor Next.js durante un benchmark
+
+Los procesos se detectan por el puerto en escucha (lsof) o se pasan
+explícitamente (p. ej. los workers de PM2: `pm2 pid toma-turno`). La lectura
+usa `ps -o rss=`, disponible en Linux y macOS.
+"""
+import subprocess
+import threading
+
+SAMPLE_INTERVAL = 0.05
+
+
+def listening_pids(port):
+    """PIDs con un socket TCP en escucha en el puerto (vacío si lsof no está disponible)"""
+    try:
+        output = subprocess.run(['lsof', '-ti', f'tcp:{port}', '-sTCP:LISTEN'], capture_output=True,
+                                text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return sorted({int(pid) for pid in output.split() if pid.isdigit()})
+
+
+def rss_kb(pids):
+    """Suma del RSS en KB de los procesos (None si ninguno existe)"""
+    if not pids:
+        return None
+    try:
+        output = subprocess.run(['ps', '-o', 'rss=', '-p', ','.join(str(p) for p in pids)],
+                                capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    values = [int(v) for v in output.split() if v.isdigit()]
+    return sum(values) if values else None
+
+
+class RssSampler:
+    """
+    Muestrea el RSS en un hilo mientras dura el bloque `with`
+
+        with RssSampler(pids) as rss:
+            hacer_peticion()
+        rss.result()  # {'beforeMB', 'peakMB', 'afterMB', 'deltaMB'}
+    """
+
+    def __init__(self, pids, interval=SAMPLE_INTERVAL):
+        self.pids = pids
+        self.interval = interval
+        self.before = self.peak = self.after = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            value = rss_kb(self.pids)
+            if value is not None:
+                self.peak = max(self.peak or 0, value)
+
+    def __enter__(self):
+        self.before = rss_kb(self.pids)
+        self.peak = self.before
+        if self.pids:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.after = rss_kb(self.pids)
+        if self.after is not None:
+            self.peak = max(self.peak or 0, self.after)
+        return False
+
+    def result(self):
+        def mb(kb):
+            return round(kb / 1024, 1) if kb is not None else None
+
+        return {
+            'beforeMB': mb(self.before),
+            'peakMB': mb(self.peak),
+            'afterMB': mb(self.after),
+            'deltaMB': mb(self.peak - self.before) if self.peak is not None and self.before is not None else None,
+        }
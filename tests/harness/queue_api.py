@@ -0,0 +1,112 @@
+"""
+Operaciones de la API de turnos para simuladores y pruebas de estrés
+
+Envuelve las rutas que usan recepción y flebotomistas, registrando la latencia
+de cada llamada en un LatencyRecorder. Cada método devuelve (status, data);
+status es None si la petición falló a nivel de red.
+"""
+import itertools
+
+from harness.asynchttp import HttpError
+from harness.session import SessionBroker, SessionError
+
+PHLEBOTOMIST_ROLES = ('flebotomista', 'Flebotomista')
+
+
+class QueueApi:
+    def __init__(self, client, recorder, headers=None):
+        self.client = client
+        self.recorder = recorder
+        self.headers = headers or {}
+
+    async def _request(self, method, endpoint, path=None, json_body=None):
+        try:
+            response = await self.client.request(method, path or endpoint, json_body=json_body, headers=self.headers)
+        except HttpError as e:
+            self.recorder.record(endpoint, 0.0, None, str(e))
+            return None, None
+
+        self.recorder.record(endpoint, response.elapsed, response.status)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status, data
+
+    async def create_turn(self, payload):
+        return await self._request('POST', "/api/turns/create", json_body=payload)
+
+    async def assign_holding(self, user_id):
+        return await self._request('POST', "/api/queue/assignHolding", json_body={'userId': user_id})
+
+    async def holding(self, user_id):
+        return await self._request('GET', "/api/queue/assignHolding", path=f"/api/queue/assignHolding?userId={user_id}")
+
+    async def release_holding(self, user_id):
+        return await self._request('POST', "/api/queue/releaseHolding", json_body={'userId': user_id})
+
+    async def call(self, turn_id, user_id, cubicle_id):
+        return await self._request('POST', "/api/attention/call", json_body={
+            'turnId': turn_id, 'userId': user_id, 'cubicleId': cubicle_id,
+        })
+
+    async def repeat_call(self, turn_id):
+        return await self._request('POST', "/api/attention/repeatCall", json_body={'turnId': turn_id})
+
+    async def complete(self, turn_id, user_id):
+        return await self._request('POST', "/api/attention/complete", json_body={'turnId': turn_id, 'userId': user_id})
+
+    async def defer(self, turn_id):
+        return await self._request('POST', "/api/queue/defer", json_body={'turnId': turn_id})
+
+    async def cancel_turn(self, turn_id, reason):
+        """Requiere headers con el token de un administrador"""
+        return await self._request('POST', "/api/admin/cancel-turn", json_body={'turnId': turn_id, 'reason': reason})
+
+    async def queue_list(self):
+        return await self._request('GET', "/api/queue/list")
+
+
+async def discover_agents(client, base_url, admin_credentials, limit, share_cubicles=False):
+    """
+    Empareja flebotomistas activos con cubículos activos usando la sesión de admin
+
+    Con share_cubicles varios flebotomistas pueden compartir cubículo (pruebas
+    de estrés con más usuarios que cubículos). Devuelve [(userId, cubicleId,
+    nombre)]; lanza SessionError si no hay credenciales válidas o la API no
+    devuelve datos utilizables.
+    """
+    session = SessionBroker(base_url).get(*admin_credentials)
+    auth = {'Authorization': f"Bearer {session.token}"}
+
+    users_response = await client.get("/api/users", headers=auth)
+    cubicles_response = await client.get("/api/cubicles?activeOnly=true")
+    if not users_response.ok or not cubicles_response.ok:
+        raise SessionError(
+            f"No se pudieron leer usuarios/cubículos ({users_response.status}/{cubicles_response.status})"
+        )
+
+    users = users_response.json().get('data', [])
+    phlebotomists = [
+        u for u in users
+        if u.get('role') in PHLEBOTOMIST_ROLES and u.get('isActive') and u.get('status', 'ACTIVE') == 'ACTIVE'
+    ]
+    cubicles = cubicles_response.json()
+
+    cubicle_pool = itertools.cycle(cubicles) if share_cubicles and cubicles else cubicles
+    agents = [
+        (user['id'], cubicle['id'], user.get('name') or user.get('username'))
+        for user, cubicle in zip(phlebotomists, cubicle_pool)
+    ]
+    if not agents:
+        raise SessionError("No hay flebotomistas activos con cubículo disponible")
+    return agents[:limit] if limit else agents
+
+
+def parse_agents(value):
+    """'2:1,3:2' → [(2, 1, 'usuario 2'), (3, 2, 'usuario 3')] (userId:cubicleId)"""
+    agents = []
+    for pair in value.split(','):
+        user_id, _, cubicle_id = pair.partition(':')
+        agents.append((int(user_id), int(cubicle_id), f"usuario {user_id}"))
+    return agents
@@ -0,0 +1,347 @@
+"""
+Reporte HTML ligero y en streaming compartido por las suites Selenium
+
+Cada resultado se escribe (y se hace flush) como una fila de la tabla en
+cuanto termina la prueba, así el reporte se puede abrir durante la ejecución y
+nunca se arma un string gigante en memoria. Las capturas se muestran como
+miniaturas WebP con loading="lazy" que enlazan a la imagen completa; la
+duración de cada paso queda en su propia columna.
+
+Cada corrida genera su propio archivo en <directorio>/reports/ y se agrega a
+runs.jsonl; index.html lista las corridas (más recientes primero) sin tener
+que abrir ni regenerar los reportes anteriores.
+"""
+import html
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from harness.image_pipeline import pillow_available, write_thumbnail
+from harness.telemetry import save_run_telemetry
+from harness.trends import HISTORY_ENABLED, print_gate, record_and_compare
+
+STATUSES = ('PASS', 'WARN', 'FAIL', 'ERROR', 'SKIP')
+INDEX_LIMIT = 500
+SLOWEST_STEPS = 10
+
+STYLE = """
+* { box-sizing: border-box; }
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; padding: 24px; background: #f3f4f6; color: #1f2937; }
+header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 24px; border-radius: 12px; margin-bottom: 16px; }
+header h1 { margin: 0 0 6px; font-size: 24px; }
+.summary { display: flex; flex-wrap: wrap; gap: 12px; margin-bottom: 16px; }
+.card { background: white; border-radius: 10px; padding: 12px 18px; box-shadow: 0 1px 3px rgba(0,0,0,.1); min-width: 120px; }
+.card b { display: block; font-size: 22px; }
+.filters { margin-bottom: 12px; }
+.filters label { margin-right: 14px; cursor: pointer; }
+table { width: 100%; border-collapse: collapse; background: white; border-radius: 10px; overflow: hidden; }
+th { background: #4b5563; color: white; text-align: left; padding: 10px; position: sticky; top: 0; }
+td { padding: 8px 10px; border-bottom: 1px solid #e5e7eb; vertical-align: top; font-size: 14px; }
+td.num { text-align: right; white-space: nowrap; font-variant-numeric: tabular-nums; }
+.badge { padding: 3px 10px; border-radius: 12px; font-size: 12px; font-weight: 600; }
+.PASS .badge { background: #d1fae5; color: #065f46; }
+.WARN .badge, .SKIP .badge { background: #fef3c7; color: #92400e; }
+.FAIL .badge, .ERROR .badge { background: #fee2e2; color: #991b1b; }
+.shots a { display: inline-block; margin: 0 6px 6px 0; }
+.shots img { width: 160px; height: auto; border: 1px solid #d1d5db; border-radius: 6px; }
+.slow { color: #b45309; font-weight: 600; }
+.hide-PASS tr.PASS, .hide-WARN tr.WARN, .hide-SKIP tr.SKIP { display: none; }
+"""
+
+# Filtros por estado: solo alterna clases CSS en la tabla, no recorre filas
+FILTER_JS = """
+document.querySelectorAll('.filters input').forEach(function (box) {
+  box.addEventListener('change', function () {
+    document.getElementById('results').classList.toggle('hide-' + box.value, !box.checked);
+  });
+});
+var summary = document.getElementById('final-summary');
+if (summary) document.getElementById('summary').replaceWith(summary);
+"""
+
+
+def _e(value):
+    return html.escape(str(value)) if value is not None else ''
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return ''
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+class StreamingReport:
+    def __init__(self, directory, title, suite, subtitle=None, slow_step=5.0):
+        self.directory = directory
+        self.reports_dir = os.path.join(directory, 'reports')
+        self.thumbs_dir = os.path.join(directory, 'thumbs')
+        os.makedirs(self.reports_dir, exist_ok=True)
+
+        self.title = title
+        self.suite = suite
+        self.slow_step = slow_step
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.counts = Counter()
+        self.durations = []
+        self.count = 0
+        self.closed = False
+
+        run_id = self.started_at.strftime('%Y%m%d-%H%M%S')
+        self.path = os.path.join(self.reports_dir, f"{suite}-{run_id}.html")
+        attempt = 1
+        while os.path.exists(self.path):
+            attempt += 1
+            self.path = os.path.join(self.reports_dir, f"{suite}-{run_id}-{attempt}.html")
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write(f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{_e(title)}</title>
+<style>{STYLE}</style>
+</head>
+<body>
+<header>
+<h1>{_e(title)}</h1>
+<div>{_e(subtitle or 'Sistema de Gestión de Turnos - INER')} · Inicio: {self.started_at.strftime('%d/%m/%Y %H:%M:%S')}</div>
+</header>
+<div id="summary" class="summary"><div class="card">En ejecución…</div></div>
+<div class="filters">Mostrar:
+{''.join(f'<label><input type="checkbox" value="{s}" checked> {s}</label>' for s in STATUSES)}
+</div>
+<table id="results">
+<thead><tr><th>#</th><th>Módulo</th><th>Prueba</th><th>Estado</th><th>Detalles</th><th>Duración</th><th>Hora</th><th>Capturas</th></tr></thead>
+<tbody>
+""")
+
+    def _write(self, text):
+        self._file.write(text)
+        self._file.flush()
+
+    def _thumbnail(self, filename):
+        """Ruta relativa (desde reports/) de la miniatura, o de la imagen completa sin Pillow"""
+        source = os.path.join(self.directory, filename)
+        if not pillow_available() or not os.path.exists(source):
+            return f"../{filename}"
+
+        thumb_name = f"{os.path.splitext(filename)[0]}.webp"
+        thumb_path = os.path.join(self.thumbs_dir, thumb_name)
+        if not os.path.exists(thumb_path) or os.path.getmtime(thumb_path) < os.path.getmtime(source):
+            try:
+                write_thumbnail(source, thumb_path)
+            except OSError:
+                return f"../{filename}"
+        return f"../thumbs/{thumb_name}"
+
+    def add(self, name, status, details='', module=None, duration=None, time_label=None, screenshots=()):
+        """Agrega una fila y la escribe a disco de inmediato"""
+        self.count += 1
+        self.counts[status] += 1
+        if duration is not None:
+            self.durations.append((duration, module, name))
+
+        shots = ''.join(
+            f'<a href="../{_e(f)}" target="_blank"><img src="{_e(self._thumbnail(f))}" loading="lazy" '
+            f'alt="{_e(f)}" title="{_e(f)}"></a>'
+            for f in screenshots
+        )
+        slow = ' class="num slow"' if duration is not None and duration >= self.slow_step else ' class="num"'
+        self._write(
+            f'<tr class="{_e(status)}"><td class="num">{self.count}</td><td>{_e(module)}</td>'
+            f'<td><strong>{_e(name)}</strong></td><td><span class="badge">{_e(status)}</span></td>'
+            f'<td>{_e(details)}</td><td{slow}>{format_duration(duration)}</td>'
+            f'<td>{_e(time_label or datetime.now().strftime("%H:%M:%S"))}</td>'
+            f'<td class="shots">{shots}</td></tr>\n'
+        )
+
+    def add_result(self, result):
+        """Agrega un dict de test_results (formatos de todas las suites)"""
+        details = result.get('details', '')
+        if result.get('loadTime') is not None and not details:
+            details = f"Cargada en {result['loadTime']:.2f}s"
+        for visit in result.get('telemetry', ()):
+            s = visit['summary']
+            details += (f" · FCP {s['fcp'] or '-'} ms · LCP {s['lcp'] or '-'} ms"
+                        f" · heap {s['jsHeapMB'] or '-'} MB · {s['requests']} req")
+            if visit['budgetViolations']:
+                details += " · fuera de presupuesto: " + ", ".join(v['metric'] for v in visit['budgetViolations'])
+        self.add(
+            name=result.get('test') or result.get('page') or '',
+            status=result.get('status', ''),
+            details=details,
+            module=result.get('module'),
+            duration=result.get('duration'),
+            time_label=result.get('timestamp') or result.get('time'),
+            screenshots=result.get('screenshots', ()),
+        )
+
+    def _summary_html(self, elapsed, notes):
+        passed = self.counts.get('PASS', 0)
+        rate = passed / self.count * 100 if self.count else 0
+        cards = [('Total', self.count), ('Tasa de éxito', f"{rate:.1f}%"), ('Tiempo', format_duration(elapsed))]
+        cards += [(status, self.counts[status]) for status in STATUSES if self.counts.get(status)]
+        parts = ['<div id="final-summary"><div class="summary">']
+        parts += [f'<div class="card">{_e(label)}<b>{_e(value)}</b></div>' for label, value in cards]
+        parts.append('</div>')
+
+        slowest = sorted(self.durations, key=lambda d: d[0], reverse=True)[:SLOWEST_STEPS]
+        if slowest:
+            parts.append('<div class="card" style="margin-bottom:16px"><strong>Pasos más lentos</strong><ol>')
+            parts += [f'<li>{_e(module or "")} {_e(name)} — {format_duration(d)}</li>' for d, module, name in slowest]
+            parts.append('</ol></div>')
+        if notes:
+            parts.append('<div class="card" style="margin-bottom:16px"><strong>Notas</strong><ul>')
+            parts += [f'<li>{_e(note)}</li>' for note in notes]
+            parts.append('</ul></div>')
+        parts.append('</div>')
+        return ''.join(parts)
+
+    def close(self, notes=()):
+        """Cierra la tabla, agrega el resumen, registra la corrida y actualiza el índice"""
+        if self.closed:
+            return self.path
+        elapsed = time.perf_counter() - self.started
+        self._write(f"</tbody>\n</table>\n{self._summary_html(elapsed, notes)}\n<script>{FILTER_JS}</script>\n</body>\n</html>\n")
+        self._file.close()
+        self.closed = True
+
+        run = {
+            'suite': self.suite,
+            'title': self.title,
+            'report': os.path.basename(self.path),
+            'startedAt': self.started_at.isoformat(timespec='seconds'),
+            'elapsed': round(elapsed, 2),
+            'total': self.count,
+            'counts': dict(self.counts),
+        }
+        with open(os.path.join(self.reports_dir, 'runs.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False) + '\n')
+        write_index(self.reports_dir)
+        return self.path
+
+
+def write_index(reports_dir, limit=INDEX_LIMIT):
+    """index.html con las últimas corridas de todas las suites"""
+    runs = []
+    try:
+        with open(os.path.join(reports_dir, 'runs.jsonl'), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return None
+
+    rows = []
+    for run in reversed(runs[-limit:]):
+        counts = run.get('counts', {})
+        failed = counts.get('FAIL', 0) + counts.get('ERROR', 0)
+        status = 'FAIL' if failed else 'PASS'
+        rows.append(
+            f'<tr class="{status}"><td>{_e(run["startedAt"].replace("T", " "))}</td><td>{_e(run["suite"])}</td>'
+            f'<td><a href="{_e(run["report"])}">{_e(run["title"])}</a></td>'
+            f'<td class="num">{run["total"]}</td><td class="num">{counts.get("PASS", 0)}</td>'
+            f'<td class="num"><span class="badge">{failed}</span></td>'
+            f'<td class="num">{format_duration(run["elapsed"])}</td></tr>'
+        )
+
+    index_path = os.path.join(reports_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Corridas de pruebas - Sistema de Turnos INER</title><style>{STYLE}</style></head>
+<body>
+<header><h1>Corridas de pruebas</h1><div>{len(runs)} corridas registradas (se muestran las últimas {min(len(runs), limit)})</div></header>
+<table>
+<thead><tr><th>Inicio</th><th>Suite</th><th>Reporte</th><th>Total</th><th>Exitosas</th><th>Fallidas</th><th>Duración</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+</body>
+</html>
+""")
+    return index_path
+
+
+class ReportedSteps:
+    """
+    Mixin para las suites: asocia a cada resultado las capturas tomadas desde
+    el resultado anterior y la duración del paso, y lo envía al reporte abierto
+
+    En ejecución serial el reporte se abre al inicio y se llena en vivo; con el
+    runner paralelo los workers no abren reporte y el proceso padre escribe los
+    resultados fusionados al final (finish_report).
+    """
+    report = None
+    REPORT_TITLE = "Reporte de Pruebas - Sistema de Turnos INER"
+    REPORT_SUITE = "pruebas"
+
+    def open_report(self, directory):
+        self.report = StreamingReport(directory, self.REPORT_TITLE, self.REPORT_SUITE)
+        self.start_step()
+        return self.report
+
+    def start_step(self):
+        self._step_started = time.perf_counter()
+
+    def note_screenshot(self, filename):
+        self.__dict__.setdefault('_pending_screenshots', []).append(filename)
+
+    def _new_visits(self):
+        """Telemetría de las navegaciones hechas desde el resultado anterior"""
+        telemetry = getattr(getattr(self, 'readiness', None), 'telemetry', None)
+        if not telemetry:
+            return []
+        seen = self.__dict__.get('_visits_seen', 0)
+        self._visits_seen = len(telemetry.visits)
+        return telemetry.visits[seen:]
+
+    def record_step(self, result):
+        """Completa el resultado con duración, capturas y telemetría, y lo escribe en el reporte"""
+        now = time.perf_counter()
+        started = getattr(self, '_step_started', None)
+        result['duration'] = round(now - started, 3) if started is not None else None
+        result['screenshots'] = self.__dict__.pop('_pending_screenshots', [])
+        result['telemetry'] = self._new_visits()
+        self._step_started = now
+        if self.report:
+            self.report.add_result(result)
+        return result
+
+    def finish_report(self, directory, notes=()):
+        """
+        Cierra el reporte en vivo, o lo genera completo a partir de test_results,
+        y guarda la telemetría de todas las visitas de la corrida en JSON
+        """
+        if self.report is None:
+            self.report = StreamingReport(directory, self.REPORT_TITLE, self.REPORT_SUITE)
+            for result in self.test_results:
+                self.report.add_result(result)
+
+        visits = [visit for result in self.test_results for visit in result.get('telemetry', ())]
+        if visits:
+            self.telemetry_path = save_run_telemetry(directory, visits, self.REPORT_SUITE)
+            notes = list(notes) + [f"Telemetría de rendimiento: {self.telemetry_path}"]
+            if HISTORY_ENABLED:
+                notes += self._perf_gate(directory, visits)
+        return self.report.close(notes)
+
+    @property
+    def perf_gate_passed(self):
+        gate = self.__dict__.get('perf_gate')
+        return not (gate and gate['gated'] and gate['regressions'])
+
+    def _perf_gate(self, directory, visits):
+        """Registra la corrida en el histórico SQLite y la compara con la línea base (harness.trends)"""
+        self.perf_gate = record_and_compare(directory, self.REPORT_SUITE, visits)
+        print_gate(self.perf_gate)
+        return [
+            f"Regresión: {r['key']} {r['metric']} {r['value']} {r['unit']} (línea base {r['baseline']})"
+            for r in self.perf_gate['regressions']
+        ]
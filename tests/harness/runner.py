@@ -0,0 +1,233 @@
+"""
+Ejecución paralela de las suites Selenium
+
+Reparte las tareas (métodos test_*) de una clase de pruebas entre un pool de
+procesos. Cada proceso levanta su propio Chrome headless, ejecuta su porción y
+devuelve sus test_results; el proceso padre los fusiona en el orden original
+de las tareas y genera un único reporte.
+
+Uso:
+    python3 tests/complete_test_selenium.py --workers 8
+    cd tests && python3 -m harness.runner full_app_test:FullAppTester --workers 8
+"""
+import argparse
+import importlib
+import inspect
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from harness.console import print_header, print_success, print_error, print_info
+from harness.driver import create_driver
+from harness.session import warm_sessions
+
+DEFAULT_WORKERS = int(os.environ.get("SELENIUM_WORKERS", os.cpu_count() or 1))
+
+# Bloque de numeración de screenshots por worker (worker 0 → 001, worker 1 → 101, ...)
+# para que los archivos de distintos workers no se sobrescriban
+SCREENSHOT_BLOCK = 100
+
+
+@dataclass
+class ShardTask:
+    """Unidad de trabajo: método de la clase de pruebas, sus argumentos y el rol que requiere"""
+    method: str
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    role: str = None
+
+
+@dataclass
+class ParallelRun:
+    """Resultado fusionado de una ejecución paralela"""
+    results: list
+    workers: list
+    elapsed: float
+    perf_gate_passed: bool = True
+
+
+class ShardableTester:
+    """
+    Mixin para clases de pruebas que pueden repartirse entre workers
+
+    La clase debe aceptar `driver` en __init__ y exponer test_results y
+    screenshot_counter. ROLES mapea cada rol a los argumentos de login().
+    """
+    ROLES = {}
+    REPORT_METHOD = "generate_html_report"
+
+    @classmethod
+    def collect_tasks(cls):
+        """Por defecto: métodos test_* sin argumentos obligatorios, en orden de definición"""
+        tasks = []
+        for name, member in vars(cls).items():
+            if not name.startswith("test_") or not callable(member):
+                continue
+            required = [
+                p for p in list(inspect.signature(member).parameters.values())[1:]
+                if p.default is inspect.Parameter.empty
+                and p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+            ]
+            if not required:
+                tasks.append(ShardTask(name))
+        return tasks
+
+    @classmethod
+    def for_report(cls, test_results):
+        """Instancia sin navegador, solo para generar el reporte con resultados fusionados"""
+        tester = cls.__new__(cls)
+        tester.driver = None
+        tester.test_results = test_results
+        tester.screenshot_counter = len(test_results) + 1
+        return tester
+
+    def prepare_role(self, role):
+        """Inicia sesión con las credenciales del rol; True si quedó autenticado"""
+        return self.login(*self.ROLES[role])
+
+    def add_shard_error(self, task, error):
+        """Registra una excepción no controlada dentro de una tarea"""
+        self.add_result(task.method, "ERROR", str(error)[:100])
+
+
+def _run_shard(tester_cls, indexed_tasks, worker_id):
+    """Ejecuta una porción de tareas en un Chrome headless propio (proceso hijo)"""
+    start = time.time()
+    driver = create_driver(headless=True)
+    tester = tester_cls(driver=driver)
+    tester.screenshot_counter = worker_id * SCREENSHOT_BLOCK + 1
+
+    outcomes = []
+    current_role = None
+    failed_roles = set()
+
+    try:
+        for index, task in indexed_tasks:
+            before = len(tester.test_results)
+
+            if task.role and task.role != current_role:
+                if task.role in failed_roles or not tester.prepare_role(task.role):
+                    failed_roles.add(task.role)
+                    outcomes.append((index, tester.test_results[before:]))
+                    continue
+                current_role = task.role
+
+            # Duración por tarea en el reporte (ReportedSteps)
+            if hasattr(tester, 'start_step'):
+                tester.start_step()
+            try:
+                getattr(tester, task.method)(*task.args, **task.kwargs)
+            except Exception as e:
+                tester.add_shard_error(task, e)
+
+            outcomes.append((index, tester.test_results[before:]))
+    finally:
+        driver.quit()
+
+    return {
+        'worker': worker_id,
+        'tasks': len(indexed_tasks),
+        'outcomes': outcomes,
+        'elapsed': time.time() - start,
+    }
+
+
+def shard_tasks(tasks, workers):
+    """
+    Reparte las tareas en round-robin tras agruparlas por rol,
+    así cada worker inicia sesión a lo sumo una vez por rol
+    """
+    indexed = sorted(enumerate(tasks), key=lambda item: item[1].role or "")
+    return [shard for shard in (indexed[i::workers] for i in range(workers)) if shard]
+
+
+def run_parallel(tester_cls, workers=DEFAULT_WORKERS, tasks=None):
+    """Ejecuta las tareas de tester_cls en `workers` navegadores y fusiona sus resultados"""
+    tasks = tasks if tasks is not None else tester_cls.collect_tasks()
+    workers = max(1, min(workers, len(tasks)))
+    shards = shard_tasks(tasks, workers)
+
+    print_header(f"EJECUCIÓN PARALELA - {tester_cls.__name__} ({len(tasks)} tareas, {len(shards)} workers)")
+
+    # Un solo login por API por rol; los workers siembran el token desde la caché
+    roles = sorted({task.role for task in tasks if task.role in tester_cls.ROLES})
+    warm_sessions([tester_cls.ROLES[role][:2] for role in roles])
+
+    start = time.time()
+    outcomes = []
+    worker_timings = []
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        futures = {
+            pool.submit(_run_shard, tester_cls, shard, worker_id): worker_id
+            for worker_id, shard in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            worker_id = futures[future]
+            try:
+                shard_result = future.result()
+            except Exception as e:
+                print_error(f"Worker {worker_id} falló: {e}")
+                worker_timings.append({'worker': worker_id, 'tasks': len(shards[worker_id]), 'elapsed': None})
+                continue
+
+            outcomes.extend(shard_result['outcomes'])
+            worker_timings.append({
+                'worker': worker_id,
+                'tasks': shard_result['tasks'],
+                'elapsed': shard_result['elapsed'],
+            })
+            print_success(f"Worker {worker_id}: {shard_result['tasks']} tareas en {shard_result['elapsed']:.1f}s")
+
+    merged = [result for _, results in sorted(outcomes, key=lambda o: o[0]) for result in results]
+    worker_timings.sort(key=lambda w: w['worker'])
+
+    return ParallelRun(results=merged, workers=worker_timings, elapsed=time.time() - start)
+
+
+def run_parallel_suite(tester_cls, workers=DEFAULT_WORKERS):
+    """Ejecuta la suite en paralelo, genera el reporte fusionado e imprime el resumen"""
+    run = run_parallel(tester_cls, workers)
+    reporter = tester_cls.for_report(run.results)
+    report_path = getattr(reporter, tester_cls.REPORT_METHOD)()
+    run.perf_gate_passed = getattr(reporter, 'perf_gate_passed', True)
+
+    busy = sum(w['elapsed'] or 0 for w in run.workers)
+    passed = sum(1 for r in run.results if r['status'] == 'PASS')
+
+    print_header("RESUMEN EJECUCIÓN PARALELA")
+    print_success(f"⏱️  Tiempo total: {run.elapsed:.1f}s (suma por worker: {busy:.1f}s)")
+    print_success(f"🧪 Resultados: {len(run.results)} ({passed} exitosos)")
+    print_success(f"📄 Reporte: {report_path}")
+    print_info(f"Finalizado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+
+    return run
+
+
+def add_parallel_arguments(parser):
+    parser.add_argument(
+        '--workers', '-w', type=int, default=1,
+        help="Número de navegadores headless en paralelo (1 = ejecución serial visible)"
+    )
+    return parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner paralelo de suites Selenium")
+    parser.add_argument('suite', help="Clase de pruebas en formato modulo:Clase (ej. full_app_test:FullAppTester)")
+    add_parallel_arguments(parser)
+    parser.set_defaults(workers=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    module_name, class_name = args.suite.split(":")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tester_cls = getattr(importlib.import_module(module_name), class_name)
+
+    run_parallel_suite(tester_cls, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Reutilización de sesiones autenticadas entre navegadores
+
+En lugar de llenar el formulario de /login en cada script y cada worker, el
+broker llama una sola vez por usuario a POST /api/auth/login, guarda el JWT,
+el refresh token y su expiración en un archivo de caché y siembra esos datos
+en el localStorage de cada WebDriver nuevo antes de la primera navegación.
+
+La aplicación guarda la sesión solo en localStorage (token, userData,
+refreshToken; ver contexts/AuthContext.js), no usa cookies de autenticación.
+
+Variables de entorno:
+- SELENIUM_SESSION_CACHE: ruta del archivo de caché (default
+  ~/.cache/turnos/selenium_sessions.json; contiene JWT de admin, así que se
+  escribe con permisos 0600 en un directorio del usuario, no en /tmp)
+- SELENIUM_FORM_LOGIN=1: desactiva el broker y fuerza el login por formulario
+"""
+import base64
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, asdict
+
+try:
+    from selenium.common.exceptions import WebDriverException
+except ImportError:
+    # Las herramientas solo HTTP (carga, simulación) usan el broker sin Selenium
+    class WebDriverException(Exception):
+        pass
+
+from harness.console import print_success, print_error, print_info
+
+BASE_URL = "http://localhost:3005"
+SESSION_CACHE = os.environ.get(
+    "SELENIUM_SESSION_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                 "turnos", "selenium_sessions.json"),
+)
+FORM_LOGIN = os.environ.get("SELENIUM_FORM_LOGIN") == "1"
+
+# Margen antes de la expiración del JWT (8h) para no sembrar tokens a punto de vencer
+EXPIRY_MARGIN = 10 * 60
+HTTP_TIMEOUT = 10
+
+# Se ejecuta antes de los scripts de la página, una sola vez por pestaña: si la
+# prueba hace logout después, la sesión no se vuelve a sembrar
+SEED_JS = """
+(function (origin, items) {
+  if (location.origin !== origin || sessionStorage.getItem('__turnosSeeded')) return;
+  localStorage.removeItem('selectedCubicle');
+  Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });
+  sessionStorage.setItem('__turnosSeeded', '1');
+})(%s, %s);
+"""
+
+
+class SessionError(RuntimeError):
+    """El servidor rechazó el login o no respondió"""
+
+
+@dataclass
+class AuthSession:
+    username: str
+    token: str
+    refreshToken: str
+    user: dict
+    expiresAt: float
+
+    def is_valid(self, margin=EXPIRY_MARGIN):
+        return self.expiresAt - margin > time.time()
+
+    def storage_items(self):
+        """Claves de localStorage que escribe AuthContext.login()"""
+        items = {'token': self.token, 'userData': json.dumps(self.user)}
+        if self.refreshToken:
+            items['refreshToken'] = self.refreshToken
+        return items
+
+
+def decode_jwt_exp(token):
+    """Lee el claim exp del JWT sin verificar la firma (solo para saber cuándo renovarlo)"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, ValueError):
+        return 0.0
+
+
+def _post_json(url, body):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            return response.status, json.loads(response.read() or b'{}')
+    except urllib.error.HTTPError as e:
+        try:
+            data = json.loads(e.read() or b'{}')
+        except ValueError:
+            data = {}
+        return e.code, data
+    except (urllib.error.URLError, OSError) as e:
+        raise SessionError(f"No se pudo conectar con {url}: {e}")
+
+
+class SessionBroker:
+    """Caché en disco de sesiones por usuario, compartida entre procesos"""
+
+    def __init__(self, base_url=BASE_URL, cache_path=SESSION_CACHE):
+        self.base_url = base_url.rstrip('/')
+        self.cache_path = cache_path
+
+    def _key(self, username):
+        return f"{self.base_url}|{username.lower()}"
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, session):
+        cache = self._load_cache()
+        cache[self._key(session.username)] = asdict(session)
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Escritura atómica: otros workers pueden estar leyendo el archivo. El
+        # temporal lo crea mkstemp (nombre impredecible, O_EXCL) y solo el
+        # usuario puede leerlo: guarda tokens
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.sessions-', suffix='.tmp')
+        try:
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def cached(self, username):
+        """Sesión vigente desde el archivo de caché, o None"""
+        data = self._load_cache().get(self._key(username))
+        if not data:
+            return None
+        try:
+            session = AuthSession(**data)
+        except TypeError:
+            return None
+        return session if session.is_valid() else None
+
+    def login(self, username, password):
+        """POST /api/auth/login y guarda la sesión resultante"""
+        status, data = _post_json(f"{self.base_url}/api/auth/login", {'username': username, 'password': password})
+        if status != 200 or not data.get('token'):
+            raise SessionError(f"Login de '{username}' rechazado ({status}): {data.get('error', 'sin detalle')}")
+
+        session = AuthSession(
+            username=username,
+            token=data['token'],
+            refreshToken=data.get('refreshToken'),
+            user=data.get('user') or {},
+            expiresAt=decode_jwt_exp(data['token']),
+        )
+        self._save(session)
+        return session
+
+    def verify(self, session):
+        """Confirma con /api/auth/verify que el token sigue aceptándose (usuario activo, mismo secreto)"""
+        status, data = _post_json(f"{self.base_url}/api/auth/verify", {'token': session.token})
+        return status == 200 and data.get('success', False)
+
+    def get(self, username, password, verify=False):
+        """Sesión del usuario: primero la caché, si no existe o venció se inicia sesión"""
+        session = self.cached(username)
+        if session and (not verify or self.verify(session)):
+            return session
+        return self.login(username, password)
+
+    def seed(self, driver, session):
+        """
+        Escribe la sesión en el localStorage del navegador
+
+        Con Chrome se registra por CDP antes de la primera navegación (sin
+        cargar ninguna página extra). Si el navegador ya está en el origen de
+        la app, o no soporta CDP, se escribe directamente con execute_script.
+        """
+        items = session.storage_items()
+        if driver.current_url.startswith(self.base_url):
+            self._seed_in_page(driver, items)
+            return
+
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": SEED_JS % (json.dumps(self.base_url), json.dumps(items)),
+            })
+        except (AttributeError, WebDriverException):
+            # Sin CDP: cargar un recurso ligero del mismo origen y escribir ahí
+            driver.get(f"{self.base_url}/favicon.ico")
+            self._seed_in_page(driver, items)
+
+    def _seed_in_page(self, driver, items):
+        driver.execute_script(
+            "var items = arguments[0];"
+            "localStorage.removeItem('selectedCubicle');"
+            "Object.keys(items).forEach(function (k) { localStorage.setItem(k, items[k]); });"
+            "sessionStorage.setItem('__turnosSeeded', '1');",
+            items,
+        )
+
+
+_broker = None
+
+
+def get_broker():
+    """Broker compartido del proceso"""
+    global _broker
+    if _broker is None:
+        _broker = SessionBroker()
+    return _broker
+
+
+def restore_session(driver, username, password):
+    """
+    Siembra en `driver` la sesión cacheada (o recién obtenida por API) del usuario
+
+    Nunca lanza excepción: devuelve la AuthSession, o None si el broker está
+    desactivado o falló, para que el llamador use el login por formulario.
+    """
+    if FORM_LOGIN:
+        return None
+    try:
+        session = get_broker().get(username, password)
+        get_broker().seed(driver, session)
+        print_success(f"Sesión de '{username}' reutilizada (expira {time.strftime('%H:%M', time.localtime(session.expiresAt))})")
+        return session
+    except (SessionError, WebDriverException) as e:
+        print_error(f"No se pudo reutilizar la sesión de '{username}': {e}")
+        print_info("Se usará el formulario de /login")
+        return None
+
+
+def warm_sessions(credentials):
+    """
+    Obtiene (y valida contra el servidor) la sesión de cada usuario antes de
+    lanzar los workers, para que estos solo lean la caché
+    """
+    if FORM_LOGIN:
+        return {}
+    sessions = {}
+    for username, password in credentials:
+        try:
+            sessions[username] = get_broker().get(username, password, verify=True)
+        except SessionError as e:
+            print_error(f"Precarga de sesión '{username}' falló: {e}")
+    return sessions
@@ -0,0 +1,239 @@
+"""
+Telemetría de rendimiento del navegador por cada visita de página
+
+Por cada driver.get (PageReadiness.navigate) recolecta:
+- Navigation Timing (DNS, conexión, TTFB, DOMContentLoaded, load, bytes)
+- Paint timings: first-paint, FCP y LCP
+- Long tasks (> 50 ms en el hilo principal)
+- Heap de JS y métricas de CDP (Performance.getMetrics: nodos, layouts, script)
+- Resource Timing de cada petición (con resumen de las llamadas a /api/*)
+
+Los observadores se instalan por CDP antes de que corra cualquier script de la
+página; las visitas se guardan como JSON estructurado por corrida, con los
+presupuestos por página evaluados (PAGE_BUDGETS).
+"""
+import json
+import os
+from datetime import datetime
+from urllib.parse import urlparse
+
+try:
+    from selenium.common.exceptions import WebDriverException
+except ImportError:
+    class WebDriverException(Exception):
+        pass
+
+from harness.console import print_info, print_error
+
+# SELENIUM_TELEMETRY=0 desactiva la recolección (p. ej. para depurar esperas)
+TELEMETRY_ENABLED = os.environ.get("SELENIUM_TELEMETRY", "1") != "0"
+RESOURCE_BUFFER = 2000
+MAX_LONG_TASKS = 50
+
+# Presupuestos por ruta (ms / MB). Las páginas más pesadas: attention.js (~2,500
+# líneas, polling de turnos/cubículos/estadísticas) y el panel de control
+PAGE_BUDGETS = {
+    '/turns/attention': {'fcp': 1500, 'lcp': 2500, 'longTasksTotal': 300, 'jsHeapMB': 60, 'requests': 60},
+    '/admin/control-panel': {'fcp': 1500, 'lcp': 2500, 'longTasksTotal': 300, 'jsHeapMB': 60, 'requests': 60},
+}
+DEFAULT_BUDGET = {'fcp': 1800, 'lcp': 3000, 'longTasksTotal': 500, 'jsHeapMB': 80}
+
+OBSERVERS_JS = """
+(function () {
+  if (window.__turnosPerf) return;
+  var perf = { lcp: null, longTasks: [] };
+  window.__turnosPerf = perf;
+  try { performance.setResourceTimingBufferSize(%d); } catch (e) {}
+  try {
+    new PerformanceObserver(function (list) {
+      var entries = list.getEntries();
+      var last = entries[entries.length - 1];
+      perf.lcp = { startTime: last.startTime, size: last.size,
+                   element: last.element ? last.element.tagName.toLowerCase() : null, url: last.url || null };
+    }).observe({ type: 'largest-contentful-paint', buffered: true });
+  } catch (e) {}
+  try {
+    new PerformanceObserver(function (list) {
+      list.getEntries().forEach(function (entry) {
+        perf.longTasks.push({ startTime: entry.startTime, duration: entry.duration });
+      });
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {}
+})();
+""" % RESOURCE_BUFFER
+
+COLLECT_JS = """
+var perf = window.__turnosPerf || { lcp: null, longTasks: [] };
+var nav = performance.getEntriesByType('navigation')[0];
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+var memory = performance.memory || {};
+return {
+  navigation: nav ? {
+    type: nav.type,
+    dns: nav.domainLookupEnd - nav.domainLookupStart,
+    connect: nav.connectEnd - nav.connectStart,
+    ttfb: nav.responseStart - nav.startTime,
+    response: nav.responseEnd - nav.responseStart,
+    domInteractive: nav.domInteractive,
+    domContentLoaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    transferSize: nav.transferSize,
+    decodedBodySize: nav.decodedBodySize
+  } : null,
+  paint: { firstPaint: paints['first-paint'] || null, fcp: paints['first-contentful-paint'] || null },
+  lcp: perf.lcp,
+  longTasks: perf.longTasks,
+  memory: { usedJSHeapSize: memory.usedJSHeapSize || null, totalJSHeapSize: memory.totalJSHeapSize || null },
+  resources: performance.getEntriesByType('resource').map(function (r) {
+    return { name: r.name, type: r.initiatorType, start: r.startTime, duration: r.duration,
+             transferSize: r.transferSize, encodedBodySize: r.encodedBodySize, decodedBodySize: r.decodedBodySize };
+  })
+};
+"""
+
+CDP_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'JSEventListeners', 'LayoutCount',
+               'RecalcStyleCount', 'ScriptDuration', 'TaskDuration', 'LayoutDuration')
+
+
+def _ms(value):
+    return round(value, 1) if isinstance(value, (int, float)) else None
+
+
+def summarize_resources(resources):
+    """Totales por tipo y detalle por endpoint /api/* (sin query string)"""
+    by_type = {}
+    api = {}
+    for r in resources:
+        kind = by_type.setdefault(r['type'] or 'other', {'count': 0, 'transferSize': 0})
+        kind['count'] += 1
+        kind['transferSize'] += r['transferSize'] or 0
+
+        path = urlparse(r['name']).path
+        if path.startswith('/api/'):
+            endpoint = api.setdefault(path, {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0, 'transferSize': 0})
+            endpoint['count'] += 1
+            endpoint['totalMs'] = round(endpoint['totalMs'] + r['duration'], 1)
+            endpoint['maxMs'] = round(max(endpoint['maxMs'], r['duration']), 1)
+            endpoint['transferSize'] += r['transferSize'] or 0
+    return by_type, api
+
+
+def budget_for(path):
+    return PAGE_BUDGETS.get(path.rstrip('/') or '/', DEFAULT_BUDGET)
+
+
+def evaluate_budget(summary, budget):
+    """Lista de métricas que exceden su presupuesto [{'metric', 'value', 'budget'}]"""
+    violations = []
+    for metric, limit in budget.items():
+        value = summary.get(metric)
+        if value is not None and value > limit:
+            violations.append({'metric': metric, 'value': value, 'budget': limit})
+    return violations
+
+
+class PerformanceTelemetry:
+    """Recolector de métricas de rendimiento asociado a un WebDriver (solo Chrome/CDP)"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.visits = []
+        self.cdp = False
+
+    def install(self):
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': OBSERVERS_JS})
+            self.driver.execute_cdp_cmd('Performance.enable', {})
+            self.cdp = True
+        except (AttributeError, WebDriverException):
+            self.cdp = False
+        return self.cdp
+
+    def _cdp_metrics(self):
+        if not self.cdp:
+            return {}
+        try:
+            metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        except WebDriverException:
+            return {}
+        return {m['name']: m['value'] for m in metrics if m['name'] in CDP_METRICS}
+
+    def collect(self, label, url=None, elapsed=None):
+        """Recolecta la telemetría de la página actual; devuelve la visita (o None si falló)"""
+        try:
+            raw = self.driver.execute_script(COLLECT_JS)
+            url = url or self.driver.current_url
+        except WebDriverException as e:
+            print_error(f"Telemetría no disponible para {label}: {str(e)[:80]}")
+            return None
+
+        metrics = self._cdp_metrics()
+        long_tasks = raw['longTasks']
+        heap = metrics.get('JSHeapUsedSize') or raw['memory']['usedJSHeapSize']
+        by_type, api = summarize_resources(raw['resources'])
+        nav = raw['navigation'] or {}
+
+        summary = {
+            'ttfb': _ms(nav.get('ttfb')),
+            'domContentLoaded': _ms(nav.get('domContentLoaded')),
+            'load': _ms(nav.get('load')),
+            'fcp': _ms(raw['paint']['fcp']),
+            'lcp': _ms((raw['lcp'] or {}).get('startTime')),
+            'longTasks': len(long_tasks),
+            'longTasksTotal': _ms(sum(t['duration'] for t in long_tasks)),
+            'jsHeapMB': round(heap / 1048576, 1) if heap else None,
+            'requests': len(raw['resources']),
+            'transferKB': round(sum(r['transferSize'] or 0 for r in raw['resources']) / 1024, 1),
+            'apiRequests': sum(e['count'] for e in api.values()),
+        }
+        path = urlparse(url).path
+        visit = {
+            'label': label,
+            'url': url,
+            'path': path,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'readyElapsed': round(elapsed, 3) if elapsed is not None else None,
+            'summary': summary,
+            'budgetViolations': evaluate_budget(summary, budget_for(path)),
+            'navigation': nav,
+            'paint': raw['paint'],
+            'lcp': raw['lcp'],
+            'longTasks': sorted(long_tasks, key=lambda t: t['duration'], reverse=True)[:MAX_LONG_TASKS],
+            'memory': raw['memory'],
+            'cdpMetrics': metrics,
+            'resourcesByType': by_type,
+            'api': api,
+            'resources': raw['resources'],
+        }
+        self.visits.append(visit)
+        return visit
+
+    def print_summary(self):
+        if not self.visits:
+            return
+        print_info(f"📈 Telemetría: {len(self.visits)} visitas")
+        for visit in self.visits:
+            s = visit['summary']
+            flag = " ⚠️ " + ", ".join(v['metric'] for v in visit['budgetViolations']) if visit['budgetViolations'] else ""
+            print_info(f"   {visit['path']:<32} FCP {s['fcp'] or '-'} ms | LCP {s['lcp'] or '-'} ms | "
+                       f"long tasks {s['longTasks']} ({s['longTasksTotal'] or 0} ms) | "
+                       f"heap {s['jsHeapMB'] or '-'} MB | {s['requests']} req{flag}")
+
+
+def save_run_telemetry(directory, visits, suite, **extra):
+    """Guarda las visitas de la corrida en <directorio>/telemetry/<suite>-<fecha>.json"""
+    telemetry_dir = os.path.join(directory, 'telemetry')
+    os.makedirs(telemetry_dir, exist_ok=True)
+    started = datetime.now()
+    path = os.path.join(telemetry_dir, f"{suite}-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'suite': suite,
+            'generatedAt': started.isoformat(timespec='seconds'),
+            'budgets': PAGE_BUDGETS,
+            'defaultBudget': DEFAULT_BUDGET,
+            'visits': visits,
+            **extra,
+        }, f, indent=2, ensure_ascii=False)
+    return path
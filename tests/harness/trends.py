@@ -0,0 +1,261 @@
+"""
+Histórico de rendimiento por corrida y gate de regresiones
+
+Cada corrida de una suite guarda en SQLite (<directorio de salida>/perf-history.sqlite)
+los tiempos de carga por página, la latencia por endpoint /api/* y los bytes
+transferidos, a partir de la telemetría de las visitas (harness.telemetry).
+
+La corrida nueva se compara contra la mediana de las últimas BASELINE_RUNS
+corridas aprobadas de la misma suite; una página o endpoint regresa cuando
+supera la línea base por más de la tolerancia relativa Y por más del mínimo
+absoluto (para no fallar por ruido en páginas de pocos milisegundos).
+
+Tolerancias configurables (REGRESSION_BUDGETS o un JSON en PERF_BUDGETS):
+    {
+      "default": {"tolerance": 0.2, "minDeltaMs": 75, "minDeltaKB": 25},
+      "/statistics/patients": {"tolerance": 0.15},
+      "/api/admin/dashboard": {"tolerance": 0.15, "minDeltaMs": 40}
+    }
+"""
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime
+
+from harness.console import print_info, print_error, print_success
+
+DB_FILENAME = 'perf-history.sqlite'
+BASELINE_RUNS = int(os.environ.get("PERF_BASELINE_RUNS", 10))
+# Corridas aprobadas necesarias antes de empezar a fallar por regresión
+MIN_BASELINE_RUNS = int(os.environ.get("PERF_MIN_BASELINE_RUNS", 3))
+# PERF_HISTORY=0 desactiva el registro automático al cerrar el reporte
+HISTORY_ENABLED = os.environ.get("PERF_HISTORY", "1") != "0"
+
+DEFAULT_REGRESSION = {'tolerance': 0.20, 'minDeltaMs': 75, 'minDeltaKB': 25}
+REGRESSION_BUDGETS = {
+    '/statistics/patients': {'tolerance': 0.15},
+    '/admin/control-panel': {'tolerance': 0.15},
+    '/api/admin/dashboard': {'tolerance': 0.15, 'minDeltaMs': 40},
+    '/api/statistics/patient-stats': {'tolerance': 0.15, 'minDeltaMs': 40},
+}
+
+# Métrica → unidad (para elegir el mínimo absoluto: minDeltaMs o minDeltaKB)
+PAGE_METRICS = {'loadMs': 'ms', 'lcp': 'ms', 'transferKB': 'KB'}
+API_METRICS = {'avgMs': 'ms', 'maxMs': 'ms', 'transferKB': 'KB'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    git_sha TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_lookup ON samples (kind, key, metric, run_id);
+CREATE INDEX IF NOT EXISTS runs_suite_status ON runs (suite, status, id);
+"""
+
+
+def load_budgets(path=None):
+    """Tolerancias por clave; PERF_BUDGETS apunta a un JSON que sobrescribe las de REGRESSION_BUDGETS"""
+    budgets = {'default': dict(DEFAULT_REGRESSION), **{k: dict(v) for k, v in REGRESSION_BUDGETS.items()}}
+    path = path or os.environ.get("PERF_BUDGETS")
+    if path:
+        with open(path, encoding='utf-8') as f:
+            for key, values in json.load(f).items():
+                budgets.setdefault(key, {}).update(values)
+    return budgets
+
+
+def budget_for_key(budgets, key):
+    return {**budgets['default'], **budgets.get(key, {})}
+
+
+def current_git_sha():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def samples_from_visits(visits):
+    """
+    Aplana la telemetría a {(kind, key, metric): valor}; las visitas repetidas a
+    una misma página o endpoint se promedian dentro de la corrida
+    """
+    collected = {}
+
+    def add(kind, key, metric, value):
+        if value is not None:
+            collected.setdefault((kind, key, metric), []).append(float(value))
+
+    for visit in visits:
+        summary = visit['summary']
+        path = visit['path'].rstrip('/') or '/'
+        if visit.get('readyElapsed') is not None:
+            add('page', path, 'loadMs', visit['readyElapsed'] * 1000)
+        add('page', path, 'lcp', summary.get('lcp'))
+        add('page', path, 'transferKB', summary.get('transferKB'))
+        for endpoint, stats in visit.get('api', {}).items():
+            add('api', endpoint, 'avgMs', stats['totalMs'] / stats['count'])
+            add('api', endpoint, 'maxMs', stats['maxMs'])
+            add('api', endpoint, 'transferKB', stats['transferSize'] / 1024)
+
+    return {key: round(statistics.fmean(values), 2) for key, values in collected.items()}
+
+
+class TrendStore:
+    """Histórico de métricas por corrida en un archivo SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def in_directory(cls, directory):
+        return cls(os.path.join(directory, DB_FILENAME))
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, suite, samples, git_sha=None):
+        """Guarda las muestras de una corrida (estado 'pending' hasta evaluarla); devuelve su id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO runs (suite, started_at, git_sha) VALUES (?, ?, ?)',
+                (suite, datetime.now().isoformat(timespec='seconds'), git_sha),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT INTO samples (run_id, kind, key, metric, value) VALUES (?, ?, ?, ?, ?)',
+                [(run_id, kind, key, metric, value) for (kind, key, metric), value in samples.items()],
+            )
+        return run_id
+
+    def set_status(self, run_id, status):
+        with self.conn:
+            self.conn.execute('UPDATE runs SET status = ? WHERE id = ?', (status, run_id))
+
+    def run_samples(self, run_id):
+        rows = self.conn.execute('SELECT kind, key, metric, value FROM samples WHERE run_id = ?', (run_id,))
+        return {(kind, key, metric): value for kind, key, metric, value in rows}
+
+    def baseline_runs(self, suite, before_run, window=BASELINE_RUNS):
+        """Ids de las últimas `window` corridas aprobadas de la suite anteriores a before_run"""
+        rows = self.conn.execute(
+            "SELECT id FROM runs WHERE suite = ? AND status = 'pass' AND id < ? ORDER BY id DESC LIMIT ?",
+            (suite, before_run, window),
+        )
+        return [row[0] for row in rows]
+
+    def baseline(self, run_ids):
+        """{(kind, key, metric): (mediana, muestras)} sobre las corridas indicadas"""
+        if not run_ids:
+            return {}
+        placeholders = ','.join('?' * len(run_ids))
+        values = {}
+        for kind, key, metric, value in self.conn.execute(
+            f'SELECT kind, key, metric, value FROM samples WHERE run_id IN ({placeholders})', run_ids
+        ):
+            values.setdefault((kind, key, metric), []).append(value)
+        return {key: (statistics.median(vals), len(vals)) for key, vals in values.items()}
+
+    def history(self, suite, key, metric, limit=20):
+        """[(run_id, fecha, git_sha, estado, valor)] más recientes primero"""
+        return self.conn.execute(
+            """SELECT r.id, r.started_at, r.git_sha, r.status, s.value
+               FROM samples s JOIN runs r ON r.id = s.run_id
+               WHERE r.suite = ? AND s.key = ? AND s.metric = ?
+               ORDER BY r.id DESC LIMIT ?""",
+            (suite, key, metric, limit),
+        ).fetchall()
+
+    def latest_run(self, suite=None):
+        if suite:
+            row = self.conn.execute('SELECT id FROM runs WHERE suite = ? ORDER BY id DESC LIMIT 1', (suite,))
+        else:
+            row = self.conn.execute('SELECT id FROM runs ORDER BY id DESC LIMIT 1')
+        row = row.fetchone()
+        return row[0] if row else None
+
+    def run_suite(self, run_id):
+        row = self.conn.execute('SELECT suite FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def compare(self, run_id, budgets=None, window=BASELINE_RUNS, min_runs=MIN_BASELINE_RUNS):
+        """
+        Compara la corrida contra la línea base móvil y deja su estado en pass/fail
+        @returns {dict} {'runId', 'baselineRuns', 'gated', 'regressions': [...], 'checked'}
+        """
+        budgets = budgets or load_budgets()
+        suite = self.run_suite(run_id)
+        run_ids = self.baseline_runs(suite, run_id, window)
+        baseline = self.baseline(run_ids)
+        gated = len(run_ids) >= min_runs
+
+        regressions = []
+        checked = 0
+        for (kind, key, metric), value in sorted(self.run_samples(run_id).items()):
+            if (kind, key, metric) not in baseline:
+                continue
+            reference, count = baseline[(kind, key, metric)]
+            checked += 1
+            budget = budget_for_key(budgets, key)
+            unit = (PAGE_METRICS if kind == 'page' else API_METRICS)[metric]
+            min_delta = budget['minDeltaKB'] if unit == 'KB' else budget['minDeltaMs']
+            limit = max(reference * (1 + budget['tolerance']), reference + min_delta)
+            if value > limit:
+                regressions.append({
+                    'kind': kind, 'key': key, 'metric': metric, 'unit': unit,
+                    'value': round(value, 1), 'baseline': round(reference, 1), 'limit': round(limit, 1),
+                    'change': round((value - reference) / reference, 3) if reference else None,
+                    'baselineSamples': count,
+                })
+
+        self.set_status(run_id, 'fail' if gated and regressions else 'pass')
+        return {'runId': run_id, 'baselineRuns': len(run_ids), 'gated': gated,
+                'regressions': regressions, 'checked': checked}
+
+
+def print_gate(result):
+    """Imprime el resultado del gate; devuelve True si la corrida pasa"""
+    if not result['gated']:
+        print_info(f"📉 Histórico: corrida #{result['runId']} registrada; línea base con "
+                   f"{result['baselineRuns']}/{MIN_BASELINE_RUNS} corridas, aún sin gate")
+    for r in result['regressions']:
+        change = f"+{r['change'] * 100:.0f}%" if r['change'] is not None else ""
+        line = (f"   {r['key']} {r['metric']}: {r['value']} {r['unit']} "
+                f"(línea base {r['baseline']}, límite {r['limit']}) {change}")
+        (print_error if result['gated'] else print_info)(line)
+    if not result['gated']:
+        return True
+    if result['regressions']:
+        print_error(f"📉 Regresión de rendimiento: {len(result['regressions'])} métricas sobre presupuesto "
+                    f"(corrida #{result['runId']} vs {result['baselineRuns']} corridas)")
+        return False
+    print_success(f"📉 Sin regresiones: {result['checked']} métricas dentro de presupuesto "
+                  f"(corrida #{result['runId']} vs {result['baselineRuns']} corridas)")
+    return True
+
+
+def record_and_compare(directory, suite, visits, budgets=None):
+    """Registra la corrida en <directorio>/perf-history.sqlite y la evalúa contra la línea base"""
+    store = TrendStore.in_directory(directory)
+    try:
+        run_id = store.record_run(suite, samples_from_visits(visits), current_git_sha())
+        return store.compare(run_id, budgets)
+    finally:
+        store.close()
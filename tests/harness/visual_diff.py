@@ -0,0 +1,324 @@
+"""
+Comparación visual de screenshots contra una línea base
+
+Diferencia perceptual por pixel (espacio YIQ, como pixelmatch) calculada con
+NumPy sobre la imagen completa, con:
+- Tolerancia global y por región (p. ej. gráficas con más margen)
+- Detección de antialiasing de pixelmatch: bordes de texto/íconos desplazados
+  un subpixel no cuentan como cambio
+- Regiones ignoradas (relojes, fechas); capture_cache las detecta al capturar
+- Heatmap PNG por página con los pixeles distintos en rojo y el antialiasing
+  en amarillo
+
+Las páginas se comparan en paralelo en un pool de procesos. Requiere NumPy y
+Pillow.
+"""
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    np = Image = None
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_THRESHOLD = 0.1      # 0..1, sensibilidad por pixel (0.1 ≈ pixelmatch)
+DEFAULT_MAX_DIFF = 0.001     # fracción de pixeles distintos tolerada por página
+MAX_YIQ_DELTA = 35215.0
+
+
+@dataclass
+class Region:
+    """Zona de la página en pixeles (x0, y0, x1, y1) con su propia tolerancia"""
+    name: str
+    box: tuple
+    max_diff_ratio: float = DEFAULT_MAX_DIFF
+    threshold: float = None
+    ignore: bool = False
+
+
+@dataclass
+class DiffProfile:
+    threshold: float = DEFAULT_THRESHOLD
+    max_diff_ratio: float = DEFAULT_MAX_DIFF
+    antialiasing: bool = True
+    regions: list = field(default_factory=list)
+
+    def with_ignored(self, boxes):
+        """Copia del perfil agregando regiones ignoradas [(x0, y0, x1, y1), ...]"""
+        extra = [Region(f"ignorada-{i + 1}", tuple(box), ignore=True) for i, box in enumerate(boxes)]
+        return DiffProfile(self.threshold, self.max_diff_ratio, self.antialiasing, self.regions + extra)
+
+
+def numpy_available():
+    return np is not None
+
+
+def _load_rgb(path):
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB'), dtype=np.float32)
+
+
+def _yiq(rgb):
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    y = 0.29889531 * r + 0.58662247 * g + 0.11448223 * b
+    i = 0.59597799 * r - 0.27417610 * g - 0.32180189 * b
+    q = 0.21147017 * r - 0.52261711 * g + 0.31114694 * b
+    return y, i, q
+
+
+def color_delta(baseline, current):
+    """Distancia perceptual por pixel (0..MAX_YIQ_DELTA) y luma de cada imagen"""
+    ya, ia, qa = _yiq(baseline)
+    yb, ib, qb = _yiq(current)
+    delta = 0.5053 * (ya - yb) ** 2 + 0.299 * (ia - ib) ** 2 + 0.1957 * (qa - qb) ** 2
+    return delta, ya, yb
+
+
+# Vecinos en el orden en que los recorre pixelmatch (x externo, y interno)
+_OFFSETS = [(dy, dx) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dy, dx) != (0, 0)]
+
+
+def _neighbors(rows, cols, shape):
+    """Coordenadas de los 8 vecinos de cada punto (8, n) y cuáles caen dentro de la imagen"""
+    h, w = shape
+    dy = np.array([o[0] for o in _OFFSETS])[:, None]
+    dx = np.array([o[1] for o in _OFFSETS])[:, None]
+    nr, nc = rows[None, :] + dy, cols[None, :] + dx
+    inside = (nr >= 0) & (nr < h) & (nc >= 0) & (nc < w)
+    return np.clip(nr, 0, h - 1), np.clip(nc, 0, w - 1), inside
+
+
+def _on_border(rows, cols, shape):
+    h, w = shape
+    return (rows == 0) | (rows == h - 1) | (cols == 0) | (cols == w - 1)
+
+
+def _has_many_siblings(rgb, rows, cols):
+    """Más de 2 vecinos idénticos al pixel (el borde de la imagen cuenta como uno)"""
+    nr, nc, inside = _neighbors(rows, cols, rgb.shape[:2])
+    same = (rgb[nr, nc] == rgb[rows, cols][None, :, :]).all(axis=2) & inside
+    return _on_border(rows, cols, rgb.shape[:2]).astype(int) + same.sum(axis=0) > 2
+
+
+def _antialiased(luma, rgb, other_rgb, rows, cols):
+    """
+    Prueba de antialiasing de pixelmatch para los pixeles (rows, cols) de una imagen
+
+    Un pixel es antialiasing si a lo sumo 2 de sus vecinos tienen su mismo
+    brillo (contando el borde de la imagen), tiene vecinos más oscuros y más
+    claros, y el vecino más oscuro o el más claro está dentro de una zona
+    plana (más de 2 hermanos idénticos) en ambas imágenes
+    """
+    nr, nc, inside = _neighbors(rows, cols, luma.shape)
+    delta = np.where(inside, luma[rows, cols][None, :] - luma[nr, nc], 0.0)
+
+    zeroes = _on_border(rows, cols, luma.shape).astype(int) + ((delta == 0) & inside).sum(axis=0)
+    darkest, brightest = delta.argmin(axis=0), delta.argmax(axis=0)
+    index = np.arange(rows.size)
+    has_range = (delta[darkest, index] < 0) & (delta[brightest, index] > 0)
+
+    dr, dc = nr[darkest, index], nc[darkest, index]
+    br, bc = nr[brightest, index], nc[brightest, index]
+    siblings = ((_has_many_siblings(rgb, dr, dc) & _has_many_siblings(other_rgb, dr, dc))
+                | (_has_many_siblings(rgb, br, bc) & _has_many_siblings(other_rgb, br, bc)))
+    return (zeroes <= 2) & has_range & siblings
+
+
+def antialias_mask(baseline, current, ya, yb, candidates):
+    """
+    Pixeles distintos que son antialiasing según pixelmatch, evaluados desde
+    cada imagen. Un cambio real (p. ej. otro dígito) deja pixeles con muchos
+    vecinos del mismo brillo o sin zonas planas alrededor y sí cuenta
+    """
+    mask = np.zeros_like(candidates)
+    rows, cols = np.nonzero(candidates)
+    if rows.size == 0:
+        return mask
+
+    mask[rows, cols] = (_antialiased(ya, baseline, current, rows, cols)
+                        | _antialiased(yb, current, baseline, rows, cols))
+    return mask
+
+
+def _clip_box(box, width, height):
+    x0, y0, x1, y1 = (int(round(v)) for v in box)
+    return max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+
+
+def write_heatmap(path, baseline, diff, antialiased, delta):
+    """Línea base en gris claro con los cambios en rojo (intensidad = magnitud)"""
+    gray = baseline.mean(axis=2)
+    faded = 255.0 - (255.0 - gray) * 0.15
+    out = np.repeat(faded[..., None], 3, axis=2)
+
+    intensity = np.clip(np.sqrt(delta / MAX_YIQ_DELTA) * 1.5, 0.4, 1.0)
+    out[diff] = np.stack([
+        np.full(intensity[diff].shape, 255.0), 255.0 * (1 - intensity[diff]), 255.0 * (1 - intensity[diff]),
+    ], axis=1)
+    out[antialiased] = (255.0, 200.0, 0.0)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    Image.fromarray(out.astype(np.uint8)).save(path, optimize=True)
+
+
+def compare_images(baseline_path, current_path, profile=None, heatmap_path=None):
+    """
+    Compara una captura con su línea base. Devuelve un dict serializable:
+    status 'pass' | 'fail' | 'error', diffPixels, diffRatio, antialiasPixels,
+    regiones con su resultado y la ruta del heatmap (si hubo diferencias)
+    """
+    profile = profile or DiffProfile()
+    started = time.perf_counter()
+    result = {
+        'name': os.path.basename(current_path),
+        'baseline': baseline_path,
+        'current': current_path,
+        'heatmap': None,
+    }
+
+    baseline = _load_rgb(baseline_path)
+    current = _load_rgb(current_path)
+    if baseline.shape != current.shape:
+        result.update(status='fail', reason=(
+            f"dimensiones distintas: línea base {baseline.shape[1]}x{baseline.shape[0]}, "
+            f"actual {current.shape[1]}x{current.shape[0]}"
+        ), elapsed=round(time.perf_counter() - started, 3))
+        return result
+
+    height, width = baseline.shape[:2]
+    delta, ya, yb = color_delta(baseline, current)
+
+    limits = np.full((height, width), (profile.threshold ** 2) * MAX_YIQ_DELTA, dtype=np.float32)
+    counted = np.ones((height, width), dtype=bool)
+    boxes = []
+    for region in profile.regions:
+        x0, y0, x1, y1 = _clip_box(region.box, width, height)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        boxes.append((region, (x0, y0, x1, y1)))
+        if region.ignore:
+            counted[y0:y1, x0:x1] = False
+        elif region.threshold is not None:
+            limits[y0:y1, x0:x1] = (region.threshold ** 2) * MAX_YIQ_DELTA
+
+    diff = (delta > limits) & counted
+    antialiased = antialias_mask(baseline, current, ya, yb, diff) if profile.antialiasing else np.zeros_like(diff)
+    diff &= ~antialiased
+
+    # Pixeles fuera de regiones con tolerancia propia se juzgan con la global
+    page_area = counted.copy()
+    region_results = []
+    for region, (x0, y0, x1, y1) in boxes:
+        if region.ignore:
+            continue
+        page_area[y0:y1, x0:x1] = False
+        area = counted[y0:y1, x0:x1].sum()
+        changed = int(diff[y0:y1, x0:x1].sum())
+        ratio = changed / area if area else 0.0
+        region_results.append({
+            'name': region.name,
+            'diffPixels': changed,
+            'diffRatio': round(ratio, 6),
+            'maxDiffRatio': region.max_diff_ratio,
+            'passed': ratio <= region.max_diff_ratio,
+        })
+
+    page_pixels = int(page_area.sum())
+    page_changed = int((diff & page_area).sum())
+    page_ratio = page_changed / page_pixels if page_pixels else 0.0
+    passed = page_ratio <= profile.max_diff_ratio and all(r['passed'] for r in region_results)
+
+    total_changed = int(diff.sum())
+    if heatmap_path and total_changed:
+        write_heatmap(heatmap_path, baseline, diff, antialiased, delta)
+        result['heatmap'] = heatmap_path
+
+    result.update(
+        status='pass' if passed else 'fail',
+        diffPixels=total_changed,
+        diffRatio=round(total_changed / int(counted.sum()), 6) if counted.any() else 0.0,
+        pageDiffRatio=round(page_ratio, 6),
+        antialiasPixels=int(antialiased.sum()),
+        ignoredPixels=int((~counted).sum()),
+        regions=region_results,
+        elapsed=round(time.perf_counter() - started, 3),
+    )
+    return result
+
+
+def _compare_safe(baseline_path, current_path, profile, heatmap_path):
+    try:
+        return compare_images(baseline_path, current_path, profile, heatmap_path)
+    except Exception as e:
+        return {'name': os.path.basename(current_path), 'status': 'error', 'reason': str(e),
+                'baseline': baseline_path, 'current': current_path, 'heatmap': None}
+
+
+def diff_directories(current_dir, baseline_dir, filenames, profiles=None, heatmap_dir=None,
+                     workers=DEFAULT_WORKERS):
+    """
+    Compara cada archivo de current_dir con el mismo nombre en baseline_dir, en
+    paralelo. profiles: {filename: DiffProfile} (los que falten usan el perfil
+    por defecto). Las capturas sin línea base quedan con status 'new'
+    """
+    profiles = profiles or {}
+    results = []
+    jobs = []
+    for filename in filenames:
+        baseline_path = os.path.join(baseline_dir, filename)
+        current_path = os.path.join(current_dir, filename)
+        if not os.path.exists(baseline_path):
+            results.append({'name': filename, 'status': 'new', 'current': current_path,
+                            'baseline': None, 'heatmap': None})
+            continue
+        heatmap = os.path.join(heatmap_dir, f"{os.path.splitext(filename)[0]}-diff.png") if heatmap_dir else None
+        jobs.append((baseline_path, current_path, profiles.get(filename) or DiffProfile(), heatmap))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+            futures = [pool.submit(_compare_safe, *job) for job in jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    return sorted(results, key=lambda r: r['name'])
+
+
+def update_baselines(current_dir, baseline_dir, filenames):
+    """Copia las capturas actuales como nueva línea base"""
+    os.makedirs(baseline_dir, exist_ok=True)
+    for filename in filenames:
+        shutil.copy2(os.path.join(current_dir, filename), os.path.join(baseline_dir, filename))
+
+
+def color_coverage(path, hex_color, tolerance=24):
+    """Fracción de pixeles a menos de `tolerance` (por canal) del color dado"""
+    target = np.array([int(hex_color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float32)
+    rgb = _load_rgb(path)
+    close = (np.abs(rgb - target) <= tolerance).all(axis=2)
+    return float(close.mean())
+
+
+def profile_from_dict(data):
+    """DiffProfile desde JSON: {"threshold", "maxDiffRatio", "antialiasing", "regions": [...]}"""
+    regions = [
+        Region(
+            name=r.get('name', f"region-{i + 1}"),
+            box=tuple(r['box']),
+            max_diff_ratio=r.get('maxDiffRatio', DEFAULT_MAX_DIFF),
+            threshold=r.get('threshold'),
+            ignore=r.get('ignore', False),
+        )
+        for i, r in enumerate(data.get('regions', []))
+    ]
+    return DiffProfile(
+        threshold=data.get('threshold', DEFAULT_THRESHOLD),
+        max_diff_ratio=data.get('maxDiffRatio', DEFAULT_MAX_DIFF),
+        antialiasing=data.get('antialiasing', True),
+        regions=regions,
+    )
+
@@ -0,0 +1,208 @@
+"""
+Esperas adaptativas basadas en señales reales del navegador
+
+Reemplaza los time.sleep fijos después de cada driver.get. Una página se
+considera lista cuando:
+- document.readyState == 'complete'
+- no hay peticiones fetch/XHR a /api/* en curso (contador inyectado)
+- el DOM no ha mutado durante QUIET_MS (MutationObserver)
+
+Cada espera queda registrada con su duración para detectar páginas lentas, y
+cada navigate() recolecta además la telemetría de rendimiento de la página
+(harness.telemetry).
+"""
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+from harness.console import print_info
+from harness.telemetry import PerformanceTelemetry, TELEMETRY_ENABLED
+
+DEFAULT_TIMEOUT = 15
+QUIET_MS = 400
+POLL_INTERVAL = 0.05
+
+# Se instala antes de que corra cualquier script de la página (CDP) y envuelve
+# fetch/XHR para contar peticiones a /api/* en curso
+INSTRUMENTATION_JS = """
+(function () {
+  if (window.__turnosReadiness) return;
+  var state = { inflight: 0, lastMutation: Date.now(), lastApi: Date.now() };
+  window.__turnosReadiness = state;
+
+  function isApi(url) {
+    try { return new URL(url, location.href).pathname.indexOf('/api/') === 0; }
+    catch (e) { return false; }
+  }
+  function done() { state.inflight--; state.lastApi = Date.now(); }
+
+  var originalFetch = window.fetch;
+  if (originalFetch) {
+    window.fetch = function (input) {
+      var url = typeof input === 'string' ? input : (input && input.url) || '';
+      if (!isApi(url)) return originalFetch.apply(this, arguments);
+      state.inflight++;
+      return originalFetch.apply(this, arguments).finally(done);
+    };
+  }
+
+  var originalOpen = XMLHttpRequest.prototype.open;
+  var originalSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.open = function (method, url) {
+    this.__turnosApi = isApi(url);
+    return originalOpen.apply(this, arguments);
+  };
+  XMLHttpRequest.prototype.send = function () {
+    if (this.__turnosApi) {
+      state.inflight++;
+      this.addEventListener('loadend', done, { once: true });
+    }
+    return originalSend.apply(this, arguments);
+  };
+
+  function observe() {
+    new MutationObserver(function () { state.lastMutation = Date.now(); })
+      .observe(document.documentElement, { childList: true, subtree: true, attributes: true, characterData: true });
+  }
+  if (document.documentElement) observe();
+  else document.addEventListener('DOMContentLoaded', observe);
+})();
+"""
+
+READINESS_PROBE_JS = """
+var s = window.__turnosReadiness;
+return {
+  readyState: document.readyState,
+  instrumented: !!s,
+  inflight: s ? s.inflight : 0,
+  quietMs: s ? Date.now() - Math.max(s.lastMutation, s.lastApi) : 0
+};
+"""
+
+
+class PageReadiness:
+    """Espera a que la página esté lista y registra cuánto tardó cada espera"""
+
+    def __init__(self, driver, timeout=DEFAULT_TIMEOUT, quiet_ms=QUIET_MS, telemetry=TELEMETRY_ENABLED):
+        self.driver = driver
+        self.timeout = timeout
+        self.quiet_ms = quiet_ms
+        self.timings = []
+        self.telemetry = PerformanceTelemetry(driver) if telemetry else None
+        self.install()
+
+    def install(self):
+        """Registra la instrumentación para todos los documentos nuevos (solo Chrome/CDP)"""
+        if self.telemetry:
+            self.telemetry.install()
+        try:
+            self.driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument', {'source': INSTRUMENTATION_JS}
+            )
+            return True
+        except (AttributeError, WebDriverException):
+            return False
+
+    def _probe(self):
+        state = self.driver.execute_script(READINESS_PROBE_JS)
+        if not state['instrumented'] and state['readyState'] == 'complete':
+            # Sin CDP: instrumentar tarde; se pierden las peticiones ya lanzadas
+            self.driver.execute_script(INSTRUMENTATION_JS)
+            state = self.driver.execute_script(READINESS_PROBE_JS)
+        return state
+
+    def _is_ready(self, state):
+        return (
+            state['readyState'] == 'complete'
+            and state['inflight'] <= 0
+            and state['quietMs'] >= self.quiet_ms
+        )
+
+    def wait_ready(self, label=None, timeout=None):
+        """
+        Bloquea hasta que la página esté lista o se agote el timeout.
+        No lanza excepción: la espera agotada queda marcada en timings.
+        @returns {float} segundos esperados
+        """
+        timeout = timeout or self.timeout
+        start = time.monotonic()
+        state = {}
+        ready = False
+
+        while time.monotonic() - start < timeout:
+            try:
+                state = self._probe()
+            except WebDriverException:
+                state = {}
+            if state and self._is_ready(state):
+                ready = True
+                break
+            time.sleep(POLL_INTERVAL)
+
+        return self._record(label, start, ready, state)
+
+    def wait_for(self, condition, label=None, timeout=None):
+        """Espera a que condition(driver) sea verdadera (p. ej. salir de /login)"""
+        timeout = timeout or self.timeout
+        start = time.monotonic()
+        ready = False
+
+        while time.monotonic() - start < timeout:
+            try:
+                if condition(self.driver):
+                    ready = True
+                    break
+            except WebDriverException:
+                pass
+            time.sleep(POLL_INTERVAL)
+
+        return self._record(label, start, ready, {})
+
+    def navigate(self, url, label=None):
+        """driver.get + wait_ready; devuelve los segundos hasta que la página quedó lista"""
+        start = time.monotonic()
+        self.driver.get(url)
+        self.wait_ready(label or url)
+        total = time.monotonic() - start
+        self.timings[-1]['elapsed'] = round(total, 3)
+        if self.telemetry:
+            self.telemetry.collect(label or url, elapsed=total)
+        return total
+
+    @property
+    def last_visit(self):
+        """Telemetría de la última navegación (None si está desactivada)"""
+        return self.telemetry.visits[-1] if self.telemetry and self.telemetry.visits else None
+
+    def _record(self, label, start, ready, state):
+        elapsed = time.monotonic() - start
+        try:
+            url = self.driver.current_url
+        except WebDriverException:
+            url = None
+        self.timings.append({
+            'label': label or url,
+            'url': url,
+            'elapsed': round(elapsed, 3),
+            'timedOut': not ready,
+            'inflight': state.get('inflight'),
+            'timestamp': datetime.now().strftime('%H:%M:%S'),
+        })
+        return elapsed
+
+    def slowest(self, count=5):
+        return sorted(self.timings, key=lambda t: t['elapsed'], reverse=True)[:count]
+
+    def print_summary(self, count=5):
+        """Imprime el total esperado y las páginas más lentas"""
+        if not self.timings:
+            return
+        total = sum(t['elapsed'] for t in self.timings)
+        timed_out = sum(1 for t in self.timings if t['timedOut'])
+        print_info(f"⏱️  Esperas: {len(self.timings)} ({total:.1f}s en total, {timed_out} agotadas)")
+        for t in self.slowest(count):
+            flag = " ⚠️ timeout" if t['timedOut'] else ""
+            print_info(f"   {t['elapsed']:.2f}s  {t['label']}{flag}")
+        if self.telemetry:
+            self.telemetry.print_summary()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga HTTP de la API de cola
+
+Simula N pantallas de TV consultando /api/queue/list (igual que
+pages/turns/queue.js: cada 3s si hay pacientes en espera o llamado, cada 8s si
+la cola está vacía) y M flebotomistas consultando /api/attention/list cada 10s
+y /api/cubicles/status cada 5s (pages/turns/attention.js).
+
+Reporta p50/p95/p99, throughput y tasa de error por endpoint, para dimensionar
+las instancias de PM2 (ecosystem.config.js) antes de agregar pantallas.
+
+Uso:
+    python3 tests/load_test_queue_api.py --displays 20 --phlebotomists 12 --duration 120
+    python3 tests/load_test_queue_api.py --displays 50 --output carga.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from harness.asynchttp import AsyncHttpClient, HttpError, MAX_CONNECTIONS
+from harness.console import print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.50.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 50
+
+# Intervalos de polling de las páginas reales (segundos)
+QUEUE_POLL_BUSY = 3
+QUEUE_POLL_IDLE = 8
+ATTENTION_POLL = 10
+CUBICLES_POLL = 5
+
+
+async def timed_get(client, recorder, endpoint, path, headers):
+    """GET registrando latencia; devuelve el JSON o None si falló"""
+    try:
+        response = await client.get(path, headers=headers)
+    except HttpError as e:
+        recorder.record(endpoint, 0.0, None, str(e))
+        return None
+
+    recorder.record(endpoint, response.elapsed, response.status)
+    if not response.ok:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        recorder.record(f"{endpoint} (JSON inválido)", response.elapsed, None, "JSON inválido")
+        return None
+
+
+async def poll_every(interval, stop_at, action):
+    """Ejecuta action() con periodo fijo (como setInterval), sin acumular retraso"""
+    while time.monotonic() < stop_at:
+        started = time.monotonic()
+        result = await action()
+        next_interval = interval(result) if callable(interval) else interval
+        wait = min(next_interval - (time.monotonic() - started), stop_at - time.monotonic())
+        await asyncio.sleep(max(0.0, wait))
+
+
+async def tv_display(client, recorder, index, start_delay, stop_at, distinct_ips):
+    headers = forwarded_headers(FORWARDED_PREFIX, index) if distinct_ips else {}
+    await asyncio.sleep(start_delay)
+
+    def next_interval(data):
+        busy = bool(data) and bool(data.get('pendingTurns') or data.get('inCallingTurns'))
+        return QUEUE_POLL_BUSY if busy or data is None else QUEUE_POLL_IDLE
+
+    await poll_every(
+        next_interval, stop_at,
+        lambda: timed_get(client, recorder, "/api/queue/list", "/api/queue/list", headers),
+    )
+
+
+async def phlebotomist(client, recorder, index, user_id, start_delay, stop_at, distinct_ips):
+    headers = forwarded_headers(FORWARDED_PREFIX, index) if distinct_ips else {}
+    await asyncio.sleep(start_delay)
+
+    attention_path = f"/api/attention/list?userId={user_id}" if user_id else "/api/attention/list"
+    await asyncio.gather(
+        poll_every(ATTENTION_POLL, stop_at,
+                   lambda: timed_get(client, recorder, "/api/attention/list", attention_path, headers)),
+        poll_every(CUBICLES_POLL, stop_at,
+                   lambda: timed_get(client, recorder, "/api/cubicles/status", "/api/cubicles/status", headers)),
+    )
+
+
+def offered_rate(displays, phlebotomists):
+    """Peticiones por segundo que generaría el piso con la cola ocupada"""
+    return displays / QUEUE_POLL_BUSY + phlebotomists * (1 / ATTENTION_POLL + 1 / CUBICLES_POLL)
+
+
+async def run_load(args):
+    recorder = LatencyRecorder()
+    stop_at = time.monotonic() + args.ramp_up + args.duration
+    user_ids = args.user_ids or [None]
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.max_connections) as client:
+        tasks = []
+        total_clients = args.displays + args.phlebotomists
+        for i in range(args.displays):
+            delay = args.ramp_up * i / max(1, total_clients) + random.uniform(0, QUEUE_POLL_BUSY)
+            tasks.append(tv_display(client, recorder, i, delay, stop_at, not args.same_ip))
+        for j in range(args.phlebotomists):
+            index = args.displays + j
+            delay = args.ramp_up * index / max(1, total_clients) + random.uniform(0, CUBICLES_POLL)
+            tasks.append(phlebotomist(client, recorder, index, user_ids[j % len(user_ids)],
+                                      delay, stop_at, not args.same_ip))
+
+        await asyncio.gather(*tasks)
+
+    recorder.stop()
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de cola (pantallas TV + flebotomistas)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--displays", "-d", type=int, default=10, help="Pantallas de TV consultando /api/queue/list")
+    parser.add_argument("--phlebotomists", "-p", type=int, default=6, help="Flebotomistas consultando atención y cubículos")
+    parser.add_argument("--duration", type=float, default=60, help="Segundos de carga sostenida (después del ramp-up)")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Segundos para arrancar gradualmente a todos los clientes")
+    parser.add_argument("--user-ids", type=lambda s: [int(x) for x in s.split(',') if x],
+                        help="IDs de flebotomistas para ?userId= (separados por coma)")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS, help="Conexiones keep-alive simultáneas")
+    parser.add_argument("--same-ip", action="store_true",
+                        help="Todos los clientes con la misma IP (el rate limiter de middleware.ts responderá 429)")
+    parser.add_argument("--output", "-o", help="Guardar el resumen en JSON")
+    args = parser.parse_args()
+
+    print_header("PRUEBA DE CARGA - API de Cola")
+    print_info(f"Servidor: {args.base_url}")
+    print_info(f"Pantallas TV: {args.displays} | Flebotomistas: {args.phlebotomists}")
+    print_info(f"Duración: {args.duration:.0f}s + {args.ramp_up:.0f}s de ramp-up")
+    print_info(f"Carga ofrecida con cola ocupada: {offered_rate(args.displays, args.phlebotomists):.1f} req/s")
+
+    try:
+        recorder = asyncio.run(run_load(args))
+    except KeyboardInterrupt:
+        print_error("Interrumpido")
+        sys.exit(1)
+
+    summary = recorder.print_table()
+    total = summary['total']
+
+    if total['throttled']:
+        print_error(f"{total['throttled']} respuestas 429: el rate limiter de middleware.ts está limitando")
+    if total['errorRate'] > 0.01:
+        print_error(f"Tasa de error {total['errorRate'] * 100:.1f}% (> 1%)")
+    else:
+        print_success(f"Tasa de error {total['errorRate'] * 100:.2f}%")
+
+    # Una pantalla con p95 por encima de su periodo de polling acumula peticiones en vuelo
+    queue_stats = summary['endpoints'].get("/api/queue/list")
+    if queue_stats and queue_stats['p95'] and queue_stats['p95'] > QUEUE_POLL_BUSY * 1000:
+        print_error(f"p95 de /api/queue/list ({queue_stats['p95']:.0f} ms) supera el periodo de polling de "
+                    f"{QUEUE_POLL_BUSY}s: el servidor está saturado, considerar más instancias en PM2")
+
+    if args.output:
+        recorder.save_json(args.output, config={
+            'baseUrl': args.base_url,
+            'displays': args.displays,
+            'phlebotomists': args.phlebotomists,
+            'duration': args.duration,
+            'rampUp': args.ramp_up,
+            'offeredRate': round(offered_rate(args.displays, args.phlebotomists), 2),
+        })
+        print_success(f"Resumen guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
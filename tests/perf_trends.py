@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Consulta y administración del histórico de rendimiento (perf-history.sqlite)
+
+Las suites Selenium registran cada corrida automáticamente al cerrar su
+reporte; este script permite revisar la tendencia de una página o endpoint,
+importar telemetría de otra máquina, re-evaluar una corrida y aceptar una
+corrida fallida como nueva línea base (p. ej. tras un cambio intencional).
+
+Uso:
+    python3 tests/perf_trends.py --dir screenshots/full_test
+    python3 tests/perf_trends.py --dir screenshots/full_test --key /statistics/patients --metric loadMs
+    python3 tests/perf_trends.py --dir screenshots/full_test --key /api/admin/dashboard --metric avgMs
+    python3 tests/perf_trends.py --dir screenshots/full_test --import telemetry/full_app-20260110-101500.json
+    python3 tests/perf_trends.py --dir screenshots/full_test --accept 42
+"""
+import argparse
+import json
+import sys
+
+from harness.console import Colors, print_header, print_success, print_info
+from harness.trends import TrendStore, current_git_sha, load_budgets, print_gate, samples_from_visits
+
+
+def print_history(store, suite, key, metric, limit):
+    rows = store.history(suite, key, metric, limit)
+    if not rows:
+        print_info(f"Sin datos para {key} {metric} en la suite {suite}")
+        return
+    print(f"\n{Colors.BOLD}{'Corrida':>8}  {'Fecha':<20} {'Commit':<10} {'Estado':<8} {metric:>10}{Colors.END}")
+    colors = {'pass': Colors.GREEN, 'fail': Colors.RED}
+    for run_id, started_at, sha, status, value in rows:
+        print(f"{run_id:>8}  {started_at:<20} {sha or '-':<10} "
+              f"{colors.get(status, '')}{status:<8}{Colors.END} {value:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico de rendimiento de las suites Selenium")
+    parser.add_argument("--dir", required=True, help="Directorio de salida de la suite (donde está perf-history.sqlite)")
+    parser.add_argument("--suite", default="full_app")
+    parser.add_argument("--key", help="Página (/statistics/patients) o endpoint (/api/admin/dashboard)")
+    parser.add_argument("--metric", default="loadMs", help="loadMs, lcp, transferKB, avgMs, maxMs")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--import", dest="import_path", help="Registrar y evaluar un JSON de telemetría")
+    parser.add_argument("--compare", type=int, metavar="RUN", help="Re-evaluar una corrida contra su línea base")
+    parser.add_argument("--accept", type=int, metavar="RUN", help="Marcar una corrida como aprobada (línea base)")
+    parser.add_argument("--budgets", help="JSON con tolerancias por página/endpoint")
+    args = parser.parse_args()
+
+    store = TrendStore.in_directory(args.dir)
+    print_header("HISTÓRICO DE RENDIMIENTO")
+    print_info(f"Base de datos: {store.path}")
+
+    try:
+        if args.accept:
+            store.set_status(args.accept, 'pass')
+            print_success(f"Corrida #{args.accept} aceptada como línea base")
+            return
+
+        if args.import_path or args.compare:
+            if args.import_path:
+                with open(args.import_path, encoding='utf-8') as f:
+                    data = json.load(f)
+                run_id = store.record_run(data.get('suite', args.suite), samples_from_visits(data['visits']),
+                                          current_git_sha())
+            else:
+                run_id = args.compare
+            passed = print_gate(store.compare(run_id, load_budgets(args.budgets)))
+            sys.exit(0 if passed else 1)
+
+        if args.key:
+            print_history(store, args.suite, args.key, args.metric, args.limit)
+            return
+
+        latest = store.latest_run(args.suite)
+        if latest is None:
+            print_info(f"Sin corridas registradas para la suite {args.suite}")
+            return
+        print_info(f"Última corrida: #{latest}")
+        samples = store.run_samples(latest)
+        print(f"\n{Colors.BOLD}{'Tipo':<6} {'Clave':<44} {'Métrica':<12} {'Valor':>10}{Colors.END}")
+        for (kind, key, metric), value in sorted(samples.items()):
+            print(f"{kind:<6} {key[:44]:<44} {metric:<12} {value:>10.1f}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
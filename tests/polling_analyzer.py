@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Análisis de polling y sobre-consumo de red en las páginas que se refrescan solas
+
+Abre cada página en su propio Chrome headless, la deja corriendo N minutos y
+registra por CDP todas las peticiones a /api/* (harness.network). Por endpoint
+reporta peticiones y bytes por minuto, respuestas sin cambios respecto a la
+anterior, cuerpos duplicados, peticiones superpuestas (una nueva antes de que
+termine la anterior) y el intervalo real frente al configurado en la página.
+
+Intervalos configurados:
+- /turns/attention: turnos cada 10 s, cubículos cada 5 s, estadísticas del día cada 30 s
+- /turns/queue_video: cola cada 3 s
+
+ATENCIÓN: /turns/attention con un flebotomista con cubículo puede tomar un
+paciente en holding; usar una base de prueba o un usuario sin cubículo.
+
+Uso:
+    python3 tests/polling_analyzer.py --minutes 5
+    python3 tests/polling_analyzer.py --pages queue_video --minutes 10 -o polling.json
+    python3 tests/polling_analyzer.py --user flebo2 --password flebo123 --screens 4
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.driver import create_driver
+from harness.network import NetworkRecorder, analyze_requests
+from harness.session import restore_session
+from harness.waits import PageReadiness
+
+BASE_URL = "http://localhost:3005"
+
+# página → ruta, si requiere sesión y {endpoint: intervalo configurado en segundos}
+POLLING_PAGES = {
+    'attention': {
+        'path': '/turns/attention',
+        'login': True,
+        'intervals': {
+            '/api/attention/list': 10,
+            '/api/cubicles/status': 5,
+            '/api/statistics/phlebotomist-daily': 30,
+        },
+    },
+    'queue_video': {
+        'path': '/turns/queue_video',
+        'login': False,
+        'intervals': {'/api/queue_video/list': 3},
+    },
+}
+
+
+def watch_page(name, args, screen):
+    """Abre la página en un Chrome headless y registra su tráfico durante args.minutes"""
+    page = POLLING_PAGES[name]
+    label = f"{name}#{screen}" if args.screens > 1 else name
+    driver = create_driver(headless=True, performance_log=True)
+    try:
+        if page['login'] and not restore_session(driver, args.user, args.password):
+            return {'page': label, 'error': f"No se pudo iniciar sesión como {args.user}"}
+
+        recorder = NetworkRecorder(driver, hash_bodies=not args.no_bodies)
+        readiness = PageReadiness(driver, telemetry=False)
+        recorder.start()
+        readiness.navigate(f"{args.base_url}{page['path']}", label)
+        print_info(f"{label}: observando {page['path']} durante {args.minutes:g} min")
+
+        requests = recorder.watch(args.minutes * 60)
+        duration = recorder.elapsed
+        return {
+            'page': label,
+            'path': page['path'],
+            'duration': round(duration, 1),
+            'bodyErrors': recorder.body_errors,
+            'intervals': page['intervals'],
+            'endpoints': analyze_requests(requests, duration),
+        }
+    except Exception as e:
+        return {'page': label, 'error': str(e)[:200]}
+    finally:
+        driver.quit()
+
+
+def _ratio(value):
+    return f"{value * 100:>6.1f}%" if value is not None else f"{'-':>7}"
+
+
+def print_page(result):
+    print_header(f"{result['page']} ({result['path']}, {result['duration'] / 60:.1f} min)")
+    print(f"  {Colors.BOLD}{'Endpoint':<38}{'req/min':>9}{'KB/min':>9}{'sin cambio':>11}{'dup':>8}"
+          f"{'KB/min redund.':>15}{'superp.':>8}{'máx':>5}{'intervalo':>11}{'p50 ms':>8}{Colors.END}")
+    print(f"  {'-' * 122}")
+    for endpoint, stats in result['endpoints'].items():
+        expected = result['intervals'].get(endpoint)
+        interval = stats.get('medianIntervalS')
+        interval_text = f"{interval:g}s" if interval is not None else "-"
+        if expected:
+            interval_text += f"/{expected}s"
+        color = Colors.YELLOW if (stats['unchangedRatio'] or 0) > 0.5 else ''
+        end = Colors.END if color else ''
+        print(f"  {endpoint[:38]:<38}{stats['requestsPerMin']:>9.1f}{stats['bytesPerMin'] / 1024:>9.1f}"
+              f"{color}{_ratio(stats['unchangedRatio']):>11}{end}{_ratio(stats['duplicateRatio']):>8}"
+              f"{stats['redundantBytesPerMin'] / 1024:>15.1f}{stats['overlapping']:>8}{stats['maxInFlight']:>5}"
+              f"{interval_text:>11}{stats['medianMs'] if stats['medianMs'] is not None else '-':>8}")
+    if result['bodyErrors']:
+        print_info(f"  {result['bodyErrors']} respuestas sin cuerpo disponible (no se pudo comparar su contenido)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de polling redundante por CDP")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--pages", default=",".join(POLLING_PAGES),
+                        help=f"Páginas separadas por coma ({', '.join(POLLING_PAGES)})")
+    parser.add_argument("--minutes", "-m", type=float, default=5, help="Minutos de observación por página")
+    parser.add_argument("--screens", type=int, default=1,
+                        help="Navegadores simultáneos por página (p. ej. varias pantallas de sala)")
+    parser.add_argument("--user", default="flebo1", help="Usuario para las páginas que requieren sesión")
+    parser.add_argument("--password", default="flebo123")
+    parser.add_argument("--no-bodies", action="store_true",
+                        help="No leer los cuerpos de respuesta (sin métricas de duplicados)")
+    parser.add_argument("--output", "-o", help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    pages = [name.strip() for name in args.pages.split(',') if name.strip()]
+    unknown = [name for name in pages if name not in POLLING_PAGES]
+    if unknown:
+        print_error(f"Páginas desconocidas: {', '.join(unknown)}")
+        sys.exit(2)
+
+    print_header("ANÁLISIS DE POLLING")
+    jobs = [(name, screen) for name in pages for screen in range(1, args.screens + 1)]
+    print_info(f"{len(jobs)} navegadores durante {args.minutes:g} min contra {args.base_url}")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(lambda job: watch_page(job[0], args, job[1]), jobs))
+
+    total_rpm = total_redundant = total_bytes = 0
+    for result in results:
+        if 'error' in result:
+            print_error(f"{result['page']}: {result['error']}")
+            continue
+        print_page(result)
+        totals = result['endpoints']['TOTAL']
+        total_rpm += totals['requestsPerMin']
+        total_bytes += totals['bytesPerMin']
+        total_redundant += totals['redundantBytesPerMin']
+
+    print_header("RESUMEN")
+    print_success(f"{total_rpm:.1f} peticiones/min y {total_bytes / 1024:.1f} KB/min hacia /api/* "
+                  f"desde {len(jobs)} navegadores")
+    if total_bytes:
+        print_info(f"{total_redundant / 1024:.1f} KB/min ({total_redundant / total_bytes * 100:.1f}%) "
+                   f"fueron respuestas idénticas a la anterior del mismo endpoint")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'minutes': args.minutes, 'baseUrl': args.base_url, 'elapsed': round(time.time() - started, 1),
+                       'pages': results}, f, indent=2, ensure_ascii=False)
+        print_success(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de /api/queue/stream (cola por Server-Sent Events)
+
+Conecta N pantallas simuladas al stream, genera K cambios reales en la cola
+(turnos SSE-... creados por recepción y luego cancelados por admin) y verifica
+que:
+- Cada pantalla recibe cada versión una sola vez y en orden
+- El servidor calcula el snapshot una vez por cambio, no una vez por pantalla
+  (contadores de /api/queue/stream?stats=1 antes y después, con el token admin)
+- La latencia cambio → pantalla se mantiene acotada con 100+ suscriptores
+
+Para comparar: con polling, N pantallas cada 3 s son N/3 cálculos por segundo
+aunque la cola no cambie (tests/load_test_queue_api.py).
+
+ATENCIÓN: crea y cancela turnos reales. Usar una base de prueba.
+
+Uso:
+    python3 tests/queue_stream_load_test.py --screens 150 --changes 10
+    python3 tests/queue_stream_load_test.py --screens 300 --view video --interval 0.5 -o sse.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, EventStream, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.network import forwarded_headers
+from harness.queue_api import QueueApi
+from harness.session import get_broker, SessionError
+
+BASE_URL = "http://localhost:3005"
+# X-Forwarded-For 10.70.x.y (middleware.ts limita por ip:ruta)
+FORWARDED_PREFIX = 70
+CONNECT_CONCURRENCY = 50
+# El canal agrupa avisos en 150 ms; margen para que llegue el último evento
+SETTLE_SECONDS = 2.0
+
+
+class Screen:
+    """Una pantalla suscrita: versiones recibidas y momento de llegada"""
+
+    def __init__(self, index):
+        self.index = index
+        self.events = []
+        self.connected = asyncio.Event()
+        self.error = None
+
+    async def run(self, base_url, path, stop):
+        try:
+            async with EventStream(base_url, path, headers=forwarded_headers(FORWARDED_PREFIX, self.index)) as stream:
+                async for event in stream:
+                    if event.event != 'queue':
+                        continue
+                    message = event.json()
+                    self.events.append((message['version'], event.received))
+                    self.connected.set()
+                    if stop.is_set():
+                        break
+        except HttpError as e:
+            self.error = str(e)
+            self.connected.set()
+
+    def versions(self):
+        return [version for version, _ in self.events]
+
+
+async def fetch_stats(client, view, token):
+    response = await client.get("/api/queue/stream?stats=1", headers={'Authorization': f"Bearer {token}"})
+    if response.status != 200:
+        raise HttpError(f"stats: status {response.status}")
+    return response.json()[view]
+
+
+async def make_changes(api, admin_api, run_id, count, interval):
+    """Crea count/2 turnos y luego los cancela (cada operación es un cambio en la cola)"""
+    created = []
+    changes = []
+    creates = (count + 1) // 2
+    for i in range(creates):
+        sent = time.perf_counter()
+        status, data = await api.create_turn({
+            'patientName': f"SSE-{run_id}-{i:03d}",
+            'age': 40,
+            'gender': 'F',
+            'studies': ["Prueba de stream"],
+            'tubesRequired': 1,
+            'tipoAtencion': 'General',
+        })
+        if status in (200, 201) and data and data.get('assignedTurn'):
+            created.append(data['assignedTurn'])
+            changes.append(sent)
+        await asyncio.sleep(interval)
+
+    for turn_id in created[:count - creates]:
+        sent = time.perf_counter()
+        status, _ = await admin_api.cancel_turn(turn_id, f"Prueba de carga SSE {run_id}")
+        if status == 200:
+            changes.append(sent)
+        await asyncio.sleep(interval)
+
+    # Los que quedaron sin cancelar (count impar) se cancelan fuera de la medición
+    return changes, created[count - creates:]
+
+
+async def run_test(args):
+    view = 'video' if args.view == 'video' else 'queue'
+    path = "/api/queue/stream" + ("?view=video" if view == 'video' else "")
+    recorder = LatencyRecorder()
+    run_id = datetime.now().strftime('%H%M%S')
+
+    try:
+        admin = get_broker().get(args.admin_user, args.admin_password)
+    except SessionError as e:
+        print_error(f"No se pudo iniciar sesión como {args.admin_user}: {e}")
+        return None
+
+    async with AsyncHttpClient(args.base_url, max_connections=4) as client:
+        api = QueueApi(client, recorder, headers=forwarded_headers(FORWARDED_PREFIX, 9000))
+        admin_api = QueueApi(client, recorder, headers={
+            **forwarded_headers(FORWARDED_PREFIX, 9001), 'Authorization': f"Bearer {admin.token}",
+        })
+
+        stop = asyncio.Event()
+        screens = [Screen(i) for i in range(args.screens)]
+        limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+        async def start(screen):
+            async with limit:
+                task = asyncio.create_task(screen.run(args.base_url, path, stop))
+                await screen.connected.wait()
+                return task
+
+        print_info(f"Conectando {args.screens} pantallas a {path}...")
+        started = time.perf_counter()
+        tasks = await asyncio.gather(*(start(s) for s in screens))
+        failed = [s for s in screens if s.error]
+        print_info(f"{args.screens - len(failed)} conectadas en {time.perf_counter() - started:.1f}s"
+                   + (f", {len(failed)} con error ({failed[0].error})" if failed else ""))
+        if len(failed) == len(screens):
+            stop.set()
+            return None
+
+        before = await fetch_stats(client, view, admin.token)
+        print_info(f"Canal {view}: versión {before['version']}, {before['subscribers']} suscriptores, "
+                   f"{before['computations']} cálculos")
+
+        print_info(f"Generando {args.changes} cambios cada {args.interval:g}s...")
+        changes, leftover = await make_changes(api, admin_api, run_id, args.changes, args.interval)
+        await asyncio.sleep(SETTLE_SECONDS)
+        after = await fetch_stats(client, view, admin.token)
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for turn_id in leftover:
+            await admin_api.cancel_turn(turn_id, f"Prueba de carga SSE {run_id}")
+
+    return analyze(screens, changes, before, after, args)
+
+
+def analyze(screens, changes, before, after, args):
+    live = [s for s in screens if not s.error]
+    computations = after['computations'] - before['computations']
+    versions = after['version'] - before['version']
+
+    # Latencia cambio → pantalla: cada versión nueva contra el último cambio enviado antes de recibirla
+    latencies = []
+    duplicated = out_of_order = 0
+    received = []
+    for screen in live:
+        seen = screen.versions()
+        duplicated += len(seen) - len(set(seen))
+        out_of_order += sum(1 for a, b in zip(seen, seen[1:]) if b <= a)
+        new_events = [(v, t) for v, t in screen.events if v > before['version']]
+        received.append(len(new_events))
+        for _, arrived in new_events:
+            previous = [c for c in changes if c <= arrived]
+            if previous:
+                latencies.append((arrived - previous[-1]) * 1000)
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1) if latencies else None
+
+    return {
+        'screens': len(screens),
+        'connected': len(live),
+        'changes': len(changes),
+        'versions': versions,
+        'computations': computations,
+        'computationsPerChange': round(computations / len(changes), 2) if changes else None,
+        'pollingEquivalentPerChange': round(len(live) * args.interval / 3, 1),
+        'eventsPerScreen': {'min': min(received, default=0), 'max': max(received, default=0)},
+        'duplicated': duplicated,
+        'outOfOrder': out_of_order,
+        'latencyMs': {'p50': pct(0.5), 'p95': pct(0.95), 'p99': pct(0.99),
+                      'max': round(latencies[-1], 1) if latencies else None,
+                      'mean': round(statistics.mean(latencies), 1) if latencies else None},
+        'before': before,
+        'after': after,
+    }
+
+
+def print_result(result):
+    print_header("RESULTADO")
+    print(f"  Pantallas conectadas:     {result['connected']}/{result['screens']}")
+    print(f"  Cambios generados:        {result['changes']}")
+    print(f"  Versiones publicadas:     {result['versions']}")
+    ratio = result['computationsPerChange']
+    color = Colors.GREEN if ratio is not None and ratio <= 1.5 else Colors.RED
+    print(f"  Cálculos del snapshot:    {color}{result['computations']} ({ratio} por cambio){Colors.END}")
+    print(f"  Equivalente con polling:  ~{result['pollingEquivalentPerChange']} cálculos por cambio "
+          f"(pantallas × intervalo / 3 s)")
+    events = result['eventsPerScreen']
+    print(f"  Eventos por pantalla:     {events['min']}–{events['max']}")
+    print(f"  Duplicados / desorden:    {result['duplicated']} / {result['outOfOrder']}")
+    latency = result['latencyMs']
+    print(f"  Latencia cambio→pantalla: p50 {latency['p50']} ms · p95 {latency['p95']} ms · "
+          f"p99 {latency['p99']} ms · máx {latency['max']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del stream SSE de la cola")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--screens", "-n", type=int, default=120, help="Pantallas suscritas")
+    parser.add_argument("--changes", "-k", type=int, default=10, help="Cambios a generar en la cola")
+    parser.add_argument("--interval", type=float, default=1.0, help="Segundos entre cambios")
+    parser.add_argument("--view", choices=['queue', 'video'], default='queue',
+                        help="queue: queue.js/queue-tv.js · video: queue_video.js")
+    parser.add_argument("--admin-user", default="admin")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--output", "-o", help="Guardar el resultado en JSON")
+    args = parser.parse_args()
+
+    print_header("CARGA DEL STREAM DE COLA (SSE)")
+    result = asyncio.run(run_test(args))
+    if result is None:
+        sys.exit(1)
+    print_result(result)
+
+    ok = (result['computationsPerChange'] is not None and result['computationsPerChange'] <= 1.5
+          and result['duplicated'] == 0 and result['outOfOrder'] == 0 and result['connected'] == result['screens'])
+    print()
+    if ok:
+        print_success(f"{result['connected']} pantallas atendidas con {result['computations']} cálculos "
+                      f"para {result['changes']} cambios")
+    else:
+        print_error("El stream no cumplió: un cálculo por cambio, sin duplicados ni pantallas desconectadas")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args), 'result': result},
+                      f, indent=2, ensure_ascii=False)
+        print_success(f"Resultado guardado en {args.output}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Prueba de inundación del rate limiter de /api/* (middleware.ts + lib/rateLimit.js)
+
+1. Precisión: para cada presupuesto (polling, default, admin, login) una IP
+   nueva manda limit + --extra peticiones lo más rápido posible. Deben pasar
+   exactamente `limit` (X-RateLimit-Limit) y el resto recibir 429 con
+   Retry-After. Con --peer-url las peticiones se reparten entre dos procesos
+   del servidor: con RATE_LIMIT_BACKEND=postgres el total aceptado sigue
+   siendo `limit`; con el backend en memoria cada proceso cuenta aparte.
+
+2. Sobrecarga: latencia de una ruta barata con pocas claves en el limiter y
+   después de registrar --keys IPs distintas. El limiter anterior recorría
+   todas las claves en cada petición, así que su latencia crecía con ellas;
+   ahora debe quedarse plana (--max-ratio).
+
+Las rutas de prueba no tocan la base: ?stats=1 sin token (401) o métodos que
+responden 405 (el middleware cuenta la petición antes de que la ruta la rechace).
+
+Uso:
+    python3 tests/rate_limit_flood_test.py
+    python3 tests/rate_limit_flood_test.py --keys 20000 --max-ratio 1.5 -o flood.json
+    python3 tests/rate_limit_flood_test.py --peer-url http://localhost:3006
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+
+BASE_URL = "http://localhost:3005"
+
+# (presupuesto, método, ruta) — ver RATE_LIMIT_RULES en lib/rateLimit.js
+PROBES = [
+    ('polling', 'GET', '/api/queue/stream?stats=1'),
+    ('default', 'GET', '/api/auth/verify?stats=1'),
+    ('admin', 'GET', '/api/admin/cancel-turn'),
+    ('login', 'GET', '/api/auth/login'),
+]
+OVERHEAD_PATH = '/api/auth/verify?stats=1'
+
+
+class IpPool:
+    """IPs únicas por corrida, para empezar cada prueba con presupuesto completo"""
+
+    def __init__(self):
+        self.prefix = f"10.{random.randint(100, 250)}"
+        self.counter = 0
+
+    def next(self):
+        self.counter += 1
+        return f"{self.prefix}.{self.counter // 250 % 250}.{self.counter % 250 + 1}"
+
+
+async def flood(clients, method, path, ip, total, concurrency):
+    """`total` peticiones con la misma IP, repartidas entre los clientes"""
+    results = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        client = clients[index % len(clients)]
+        async with slots:
+            try:
+                response = await client.request(method, path, headers={'X-Forwarded-For': ip})
+                results.append(response)
+            except HttpError as e:
+                results.append(e)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return results
+
+
+async def accuracy(args, ips):
+    clients = [AsyncHttpClient(url, max_connections=args.concurrency) for url in [args.base_url, *args.peer_url]]
+    report = []
+    try:
+        for name, method, path in PROBES:
+            # Descubrir el límite con una IP distinta a la de la inundación
+            probe = await clients[0].request(method, path, headers={'X-Forwarded-For': ips.next()})
+            limit = int(probe.headers.get('x-ratelimit-limit', 0))
+            if not limit:
+                report.append({'budget': name, 'path': path, 'error': 'sin X-RateLimit-Limit (¿middleware anterior?)'})
+                continue
+
+            results = await flood(clients, method, path, ips.next(), limit + args.extra, args.concurrency)
+            responses = [r for r in results if not isinstance(r, HttpError)]
+            throttled = [r for r in responses if r.status == 429]
+            report.append({
+                'budget': name,
+                'path': path,
+                'limit': limit,
+                'sent': len(results),
+                'allowed': len(responses) - len(throttled),
+                'throttled': len(throttled),
+                'networkErrors': len(results) - len(responses),
+                'retryAfter': all(r.headers.get('retry-after') for r in throttled),
+            })
+    finally:
+        for client in clients:
+            await client.close()
+    return report
+
+
+async def measure(client, recorder, label, ips, samples):
+    for _ in range(samples):
+        try:
+            response = await client.get(OVERHEAD_PATH, headers={'X-Forwarded-For': ips.next()})
+            recorder.record(label, response.elapsed, response.status)
+        except HttpError as e:
+            recorder.record(label, 0.0, None, str(e))
+
+
+async def overhead(args, ips):
+    recorder = LatencyRecorder()
+    async with AsyncHttpClient(args.base_url, max_connections=args.concurrency) as client:
+        # Secuencial: se mide el costo por petición, no la concurrencia
+        await measure(client, recorder, 'pocas-claves', ips, args.samples)
+
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def register():
+            async with slots:
+                try:
+                    await client.get(OVERHEAD_PATH, headers={'X-Forwarded-For': ips.next()})
+                except HttpError:
+                    pass
+
+        print_info(f"Registrando {args.keys} claves en el limiter...")
+        await asyncio.gather(*(register() for _ in range(args.keys)))
+
+        await measure(client, recorder, 'muchas-claves', ips, args.samples)
+    return recorder.summary()['endpoints']
+
+
+def print_accuracy(report, tolerance):
+    print(f"\n{Colors.BOLD}{'Presupuesto':<12}{'límite':>8}{'enviadas':>10}{'aceptadas':>11}{'429':>7}{'error %':>9}{Colors.END}")
+    print('-' * 57)
+    failures = 0
+    for row in report:
+        if 'error' in row:
+            print(f"{row['budget']:<12}{Colors.RED}{row['error']}{Colors.END}")
+            failures += 1
+            continue
+        deviation = abs(row['allowed'] - row['limit']) / row['limit']
+        row['deviation'] = round(deviation, 4)
+        color = Colors.GREEN if deviation <= tolerance else Colors.RED
+        failures += deviation > tolerance or not row['retryAfter']
+        print(f"{row['budget']:<12}{row['limit']:>8}{row['sent']:>10}{row['allowed']:>11}{row['throttled']:>7}"
+              f"{color}{deviation * 100:>8.1f}%{Colors.END}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisión y sobrecarga del rate limiter de /api/*")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--peer-url", action="append", default=[],
+                        help="Otro proceso del servidor que comparte el backend (repetible)")
+    parser.add_argument("--extra", type=int, default=50, help="Peticiones por encima del límite en cada inundación")
+    parser.add_argument("--concurrency", "-c", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Desviación máxima aceptada (fracción)")
+    parser.add_argument("--keys", type=int, default=10000, help="Claves distintas para la prueba de sobrecarga")
+    parser.add_argument("--samples", type=int, default=300, help="Peticiones medidas por fase de sobrecarga")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="p50 máximo con muchas claves / p50 con pocas claves")
+    parser.add_argument("--skip-overhead", action="store_true")
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("INUNDACIÓN DEL RATE LIMITER")
+    ips = IpPool()
+
+    try:
+        print_info(f"Precisión: límite + {args.extra} peticiones por presupuesto contra "
+                   f"{', '.join([args.base_url, *args.peer_url])}")
+        report = asyncio.run(accuracy(args, ips))
+        latency = None if args.skip_overhead else asyncio.run(overhead(args, ips))
+    except HttpError as e:
+        print_error(f"No se pudo consultar {args.base_url}: {e}")
+        sys.exit(1)
+
+    failures = print_accuracy(report, args.tolerance)
+
+    if latency:
+        few, many = latency.get('pocas-claves', {}), latency.get('muchas-claves', {})
+        ratio = (many.get('p50') or 0) / few['p50'] if few.get('p50') else None
+        print(f"\n{Colors.BOLD}Sobrecarga ({OVERHEAD_PATH}){Colors.END}")
+        for label, stats in (('pocas claves', few), (f"{args.keys} claves", many)):
+            print(f"  {label + ':':<16}p50 {stats.get('p50') or 0:>7.1f} ms   p95 {stats.get('p95') or 0:>7.1f} ms")
+        if ratio is not None and ratio > args.max_ratio:
+            print_error(f"La latencia creció x{ratio:.2f} con {args.keys} claves (máximo x{args.max_ratio})")
+            failures += 1
+        elif ratio is not None:
+            print_success(f"Latencia estable con {args.keys} claves (x{ratio:.2f})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), **vars(args),
+                       'accuracy': report, 'overhead': latency}, f, indent=2, ensure_ascii=False, default=str)
+        print_success(f"Resultados guardados en {args.output}")
+
+    print()
+    if failures:
+        print_error(f"{failures} comprobaciones fallidas")
+        sys.exit(1)
+    print_success("Límites exactos y sin degradación por número de claves")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Simulador de una mañana completa en toma de muestras (eventos discretos)
+
+Reproduce el flujo real contra la API con un factor de compresión de tiempo:
+- Recepción crea turnos con /api/turns/create siguiendo una curva de llegadas
+  por hora (pico al abrir, cola larga hacia el mediodía)
+- Cada flebotomista es un agente que toma holding (/api/queue/assignHolding),
+  llama (/api/attention/call), atiende durante un tiempo de servicio y finaliza
+  (/api/attention/complete, que le asigna el siguiente holding). Si el paciente
+  no se presenta, repite el llamado y lo difiere (/api/queue/defer)
+
+Tiempos de servicio (scripts/simulate-real-attention.js):
+    70% 5-10 min, 20% 10-15 min, 10% 15-20 min
+
+El reloj simulado avanza `compression` veces más rápido que el real; la
+latencia del servidor también se amplifica (100 ms a 60x son 6 s simulados),
+por eso el reporte incluye el retraso acumulado de cada agente.
+
+ATENCIÓN: crea turnos reales (nombre "SIM-0001 ..."). Usar una base de prueba.
+
+Uso:
+    python3 tests/simulate_clinic_day.py --patients 600 --compression 60
+    python3 tests/simulate_clinic_day.py --patients 100 --agents 2:1,3:2 --compression 120 -o dia.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder, percentile
+from harness.queue_api import QueueApi, discover_agents, parse_agents
+from harness.session import SessionError
+
+BASE_URL = "http://localhost:3005"
+ADMIN_CREDENTIALS = ("admin", "123")
+
+# Llegadas por hora desde la apertura (fracción del total de pacientes)
+ARRIVAL_CURVE = [
+    (0, 0.30),  # 07:00-08:00
+    (1, 0.28),  # 08:00-09:00
+    (2, 0.20),  # 09:00-10:00
+    (3, 0.14),  # 10:00-11:00
+    (4, 0.08),  # 11:00-12:00
+]
+OPENING_HOUR = 7
+
+# (probabilidad, minutos mínimo, minutos máximo)
+SERVICE_TIME_BUCKETS = [
+    (0.70, 5, 10),
+    (0.20, 10, 15),
+    (0.10, 15, 20),
+]
+
+PRIORITY_MIX = [
+    ('General', 0.85),
+    ('Prioritario', 0.08),
+    ('RiesgoCaida', 0.04),
+    ('PrioritarioRiesgo', 0.02),
+    ('MuyEspecial', 0.01),
+]
+
+STUDIES = [
+    ["Biometría Hemática", "Química Sanguínea"],
+    ["Glucosa", "Hemoglobina Glucosilada"],
+    ["Perfil Lipídico"],
+    ["TSH", "T4 Libre"],
+    ["Examen General de Orina"],
+    ["Tiempos de Coagulación", "Biometría Hemática"],
+]
+
+# Segundos simulados
+IDLE_POLL = 10            # El agente sin paciente vuelve a pedir holding (como el polling de attention.js)
+RETRY_DELAY = 5           # Tras un llamado rechazado (409/403/500)
+NO_SHOW_WAIT = 120        # Espera antes de repetir el llamado
+SAMPLE_INTERVAL = 60      # Muestreo de la cola para la línea de tiempo
+
+
+class SimClock:
+    """Reloj simulado: 1 segundo real = `compression` segundos simulados"""
+
+    def __init__(self, compression):
+        self.compression = compression
+        self.wall_start = time.monotonic()
+
+    def now(self):
+        return (time.monotonic() - self.wall_start) * self.compression
+
+    async def sleep(self, sim_seconds):
+        await asyncio.sleep(max(0.0, sim_seconds) / self.compression)
+
+    async def sleep_until(self, sim_time):
+        await self.sleep(sim_time - self.now())
+
+    @staticmethod
+    def label(sim_seconds):
+        total = int(OPENING_HOUR * 3600 + sim_seconds)
+        return f"{total // 3600:02d}:{total % 3600 // 60:02d}"
+
+
+@dataclass
+class Patient:
+    index: int
+    arrival: float
+    tipoAtencion: str
+    service: float
+    no_show: bool
+    turn_id: int = None
+    called_at: float = None
+    finished_at: float = None
+    deferrals: int = 0
+    foreign: bool = False
+
+
+@dataclass
+class SimState:
+    arrivals: dict = field(default_factory=dict)    # índice SIM -> Patient
+    patients: dict = field(default_factory=dict)    # turn_id -> Patient
+    foreign: dict = field(default_factory=dict)     # turns que ya estaban en la base
+    created: int = 0
+    create_failed: int = 0
+    completed: int = 0
+    deferred: int = 0
+    call_conflicts: int = 0
+    arrivals_done: bool = False
+    timeline: list = field(default_factory=list)
+    agent_stats: dict = field(default_factory=lambda: defaultdict(lambda: defaultdict(float)))
+
+    def waiting(self):
+        return sum(1 for p in self.patients.values() if p.called_at is None)
+
+    def in_service(self):
+        return sum(1 for p in self.patients.values() if p.called_at is not None and p.finished_at is None)
+
+    def finished(self, total):
+        return self.arrivals_done and self.completed + self.create_failed >= total
+
+    def register(self, patient, turn_id):
+        patient.turn_id = turn_id
+        self.patients[turn_id] = patient
+
+    def find(self, turn):
+        """
+        Paciente simulado de un turno. Un agente puede recibir el turno en
+        holding antes de que llegue la respuesta de /api/turns/create, así que
+        también se reconoce por el prefijo SIM-NNNN del nombre
+        """
+        patient = self.patients.get(turn['id']) or self.foreign.get(turn['id'])
+        if patient:
+            return patient
+        name = turn.get('patientName') or ''
+        if name.startswith('SIM-') and name[4:8].isdigit():
+            patient = self.arrivals.get(int(name[4:8]))
+            if patient and patient.turn_id is None:
+                self.register(patient, turn['id'])
+                return patient
+        return None
+
+
+def weighted_choice(rng, options):
+    roll = rng.random()
+    cumulative = 0.0
+    for value, weight in options:
+        cumulative += weight
+        if roll <= cumulative:
+            return value
+    return options[-1][0]
+
+
+def sample_service_time(rng):
+    roll = rng.random()
+    cumulative = 0.0
+    for probability, low, high in SERVICE_TIME_BUCKETS:
+        cumulative += probability
+        if roll <= cumulative:
+            return rng.uniform(low, high) * 60
+    _, low, high = SERVICE_TIME_BUCKETS[-1]
+    return rng.uniform(low, high) * 60
+
+
+def build_arrivals(total, rng, no_show_rate):
+    """Tiempos de llegada (s simulados desde la apertura) según ARRIVAL_CURVE"""
+    arrivals = []
+    for index in range(total):
+        hour = weighted_choice(rng, ARRIVAL_CURVE)
+        arrivals.append(hour * 3600 + rng.uniform(0, 3600))
+    arrivals.sort()
+    return [
+        Patient(
+            index=i + 1,
+            arrival=arrival,
+            tipoAtencion=weighted_choice(rng, PRIORITY_MIX),
+            service=sample_service_time(rng),
+            no_show=rng.random() < no_show_rate,
+        )
+        for i, arrival in enumerate(arrivals)
+    ]
+
+
+def turn_payload(patient, rng):
+    return {
+        'patientName': f"SIM-{patient.index:04d} Paciente Simulado",
+        'age': rng.randint(1, 90),
+        'gender': rng.choice(['M', 'F']),
+        'studies': rng.choice(STUDIES),
+        'tubesRequired': rng.randint(1, 5),
+        'tipoAtencion': patient.tipoAtencion,
+        'observations': "Turno generado por simulate_clinic_day.py",
+    }
+
+
+async def reception(api, clock, state, arrivals, rng):
+    """Crea cada turno a su hora de llegada"""
+    pending_creates = []
+
+    async def create(patient):
+        status, data = await api.create_turn(turn_payload(patient, rng))
+        if status in (200, 201) and data and data.get('assignedTurn'):
+            state.register(patient, data['assignedTurn'])
+            state.created += 1
+        else:
+            state.create_failed += 1
+
+    for patient in arrivals:
+        await clock.sleep_until(patient.arrival)
+        # Sin esperar la respuesta: la recepción no se frena si el servidor está lento
+        pending_creates.append(asyncio.create_task(create(patient)))
+
+    await asyncio.gather(*pending_creates)
+    state.arrivals_done = True
+
+
+async def phlebotomist(api, clock, state, total, user_id, cubicle_id, name, rng):
+    """Ciclo de un flebotomista: holding → llamado → atención → finalizar"""
+    stats = state.agent_stats[name]
+    next_turn = None
+
+    while not state.finished(total):
+        if next_turn is None:
+            status, data = await api.assign_holding(user_id)
+            next_turn = (data or {}).get('turn') if status == 200 else None
+            if next_turn is None:
+                stats['idlePolls'] += 1
+                await clock.sleep(IDLE_POLL)
+                continue
+
+        turn, next_turn = next_turn, None
+        turn_id = turn['id']
+        patient = state.find(turn)
+        if patient is None:
+            # Turno que ya estaba pendiente en la base: se atiende igual (si no,
+            # bloquearía la cabeza de la cola) pero no cuenta en el flujo simulado
+            patient = Patient(
+                index=0, arrival=clock.now(), tipoAtencion=turn.get('tipoAtencion', 'General'),
+                service=sample_service_time(rng), no_show=False, turn_id=turn_id, foreign=True,
+            )
+            state.foreign[turn_id] = patient
+            stats['foreignTurns'] += 1
+
+        status, data = await api.call(turn_id, user_id, cubicle_id)
+        if status != 200:
+            state.call_conflicts += 1
+            stats['callConflicts'] += 1
+            await clock.sleep(RETRY_DELAY)
+            continue
+
+        call_time = clock.now()
+        if patient.called_at is None:
+            patient.called_at = call_time
+
+        if patient.no_show and patient.deferrals == 0:
+            # No se presenta: repetir el llamado y diferir
+            await clock.sleep(NO_SHOW_WAIT)
+            await api.repeat_call(turn_id)
+            await clock.sleep(NO_SHOW_WAIT)
+            status, _ = await api.defer(turn_id)
+            if status == 200:
+                patient.deferrals += 1
+                patient.called_at = None
+                state.deferred += 1
+                stats['deferred'] += 1
+            continue
+
+        await clock.sleep_until(call_time + patient.service)
+        # Retraso: cuánto se desfasa el agente del plan por la latencia del servidor
+        stats['lagSeconds'] += max(0.0, clock.now() - (call_time + patient.service))
+
+        status, data = await api.complete(turn_id, user_id)
+        if status == 200:
+            patient.finished_at = clock.now()
+            if not patient.foreign:
+                state.completed += 1
+            stats['attended'] += 1
+            next_turn = (data or {}).get('nextHoldingTurn')
+        else:
+            await clock.sleep(RETRY_DELAY)
+
+
+async def sampler(clock, state, total):
+    """Foto de la cola cada SAMPLE_INTERVAL segundos simulados"""
+    while not state.finished(total):
+        state.timeline.append({
+            'simTime': round(clock.now()),
+            'clock': SimClock.label(clock.now()),
+            'waiting': state.waiting(),
+            'inService': state.in_service(),
+            'completed': state.completed,
+        })
+        await clock.sleep(SAMPLE_INTERVAL)
+
+
+def hourly_breakdown(state):
+    """Pacientes atendidos y tiempo de espera por hora simulada"""
+    by_hour = defaultdict(lambda: {'attended': 0, 'waits': []})
+    for patient in state.patients.values():
+        if patient.finished_at is None:
+            continue
+        hour = SimClock.label(patient.finished_at)[:2] + ":00"
+        by_hour[hour]['attended'] += 1
+        by_hour[hour]['waits'].append((patient.called_at or patient.finished_at) - patient.arrival)
+
+    rows = {}
+    for hour, data in sorted(by_hour.items()):
+        waits = sorted(data['waits'])
+        rows[hour] = {
+            'attended': data['attended'],
+            'waitP50Min': round(percentile(waits, 50) / 60, 1),
+            'waitP95Min': round(percentile(waits, 95) / 60, 1),
+        }
+    return rows
+
+
+async def run_simulation(args):
+    rng = random.Random(args.seed)
+    recorder = LatencyRecorder()
+    state = SimState()
+    arrivals = build_arrivals(args.patients, rng, args.no_show)
+    state.arrivals = {patient.index: patient for patient in arrivals}
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.max_connections) as client:
+        if args.agents:
+            agents = parse_agents(args.agents)
+        else:
+            agents = await discover_agents(client, args.base_url, ADMIN_CREDENTIALS, args.phlebotomists)
+
+        print_info(f"Flebotomistas: {', '.join(f'{name} (cub. {cub})' for _, cub, name in agents)}")
+
+        api = QueueApi(client, recorder)
+        clock = SimClock(args.compression)
+        deadline = args.max_hours * 3600
+
+        tasks = [
+            reception(api, clock, state, arrivals, rng),
+            sampler(clock, state, args.patients),
+            *(phlebotomist(api, clock, state, args.patients, user_id, cubicle_id, name,
+                           random.Random(f"{args.seed}-{user_id}"))
+              for user_id, cubicle_id, name in agents),
+        ]
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout=deadline / args.compression)
+        except asyncio.TimeoutError:
+            print_error(f"Se alcanzó el límite de {args.max_hours}h simuladas con pacientes pendientes")
+
+    recorder.stop()
+    return recorder, state, clock, agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de una mañana en toma de muestras contra la API")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--patients", "-n", type=int, default=600)
+    parser.add_argument("--compression", "-c", type=float, default=60,
+                        help="Segundos simulados por segundo real (60 = una hora por minuto)")
+    parser.add_argument("--phlebotomists", "-p", type=int, default=0,
+                        help="Máximo de flebotomistas descubiertos automáticamente (0 = todos)")
+    parser.add_argument("--agents", help="Pares userId:cubicleId separados por coma (omite el descubrimiento)")
+    parser.add_argument("--no-show", type=float, default=0.05, help="Fracción de pacientes que no se presentan al primer llamado")
+    parser.add_argument("--max-hours", type=float, default=10, help="Límite de horas simuladas")
+    parser.add_argument("--max-connections", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", help="Guardar resumen y línea de tiempo en JSON")
+    args = parser.parse_args()
+
+    print_header("SIMULACIÓN DE UN DÍA EN TOMA DE MUESTRAS")
+    print_info(f"Servidor: {args.base_url}")
+    print_info(f"Pacientes: {args.patients} | Compresión: {args.compression:.0f}x "
+               f"(~{args.max_hours * 3600 / args.compression / 60:.0f} min reales como máximo)")
+    print_error("Se crearán turnos reales en la base de datos (prefijo SIM-)")
+
+    try:
+        recorder, state, clock, agents = asyncio.run(run_simulation(args))
+    except (SessionError, HttpError) as e:
+        print_error(f"No se pudo preparar la simulación: {e}")
+        print_info("Indicar los flebotomistas manualmente con --agents userId:cubicleId,...")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print_error("Interrumpida")
+        sys.exit(1)
+
+    recorder.print_table("LATENCIA DEL SERVIDOR DURANTE LA SIMULACIÓN")
+
+    waits = sorted(
+        p.called_at - p.arrival for p in state.patients.values() if p.called_at is not None
+    )
+    sim_hours = clock.now() / 3600
+    hourly = hourly_breakdown(state)
+
+    print_header("FLUJO DE PACIENTES")
+    print_success(f"Turnos creados: {state.created} (fallidos: {state.create_failed})")
+    print_success(f"Atendidos: {state.completed} | Diferidos: {state.deferred} | Conflictos de llamado: {state.call_conflicts}")
+    if state.foreign:
+        print_info(f"Turnos previos de la base atendidos de paso: {len(state.foreign)}")
+    print_success(f"Tiempo simulado: {sim_hours:.1f}h (hasta las {SimClock.label(clock.now())})")
+    if waits:
+        print_success(f"Espera en cola: p50 {percentile(waits, 50) / 60:.1f} min | p95 {percentile(waits, 95) / 60:.1f} min")
+    max_waiting = max((s['waiting'] for s in state.timeline), default=0)
+    print_success(f"Cola máxima: {max_waiting} pacientes")
+
+    print_info("\nAtendidos por hora:")
+    for hour, row in hourly.items():
+        print_info(f"  {hour}  {row['attended']:>4} pacientes  espera p50 {row['waitP50Min']:>5.1f} min  p95 {row['waitP95Min']:>5.1f} min")
+
+    print_info("\nRetraso acumulado por agente (latencia amplificada por la compresión):")
+    for name, stats in state.agent_stats.items():
+        print_info(f"  {name}: {int(stats['attended'])} atendidos, retraso {stats['lagSeconds'] / 60:.1f} min simulados")
+
+    if args.output:
+        recorder.save_json(
+            args.output,
+            config=vars(args),
+            agents=[{'userId': u, 'cubicleId': c, 'name': n} for u, c, n in agents],
+            flow={
+                'created': state.created,
+                'createFailed': state.create_failed,
+                'completed': state.completed,
+                'deferred': state.deferred,
+                'callConflicts': state.call_conflicts,
+                'simHours': round(sim_hours, 2),
+                'waitP50Min': round(percentile(waits, 50) / 60, 1) if waits else None,
+                'waitP95Min': round(percentile(waits, 95) / 60, 1) if waits else None,
+                'maxWaiting': max_waiting,
+            },
+            hourly=hourly,
+            agentStats={name: dict(stats) for name, stats in state.agent_stats.items()},
+            timeline=state.timeline,
+        )
+        print_success(f"Resumen guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
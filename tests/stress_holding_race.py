@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Prueba de estrés de concurrencia para holding y llamado de turnos
+
+Amplía scripts/test-call-race-condition.js (10 llamadas a un solo turno) a
+cientos de peticiones simultáneas, por niveles de concurrencia crecientes.
+En cada ronda:
+  1. Se crean tantos turnos STRESS-... como flebotomistas participan
+  2. Ráfaga de holding: todos piden /api/queue/assignHolding al mismo tiempo
+  3. Ráfaga de llamado: cada turno recibe --rivals llamadas simultáneas a
+     /api/attention/call (el dueño del holding + rivales)
+  4. Se finalizan los turnos llamados (/api/attention/complete, que vuelve a
+     asignar holding en paralelo) y se liberan los holdings restantes
+
+Invariantes verificadas:
+- Ningún turno queda en holding para dos flebotomistas en la misma ráfaga
+- Ningún turno es llamado con éxito más de una vez
+
+Mide la latencia bajo contención (p50/p95/p99) y las asignaciones exitosas
+por segundo en cada nivel, para ver dónde lib/holdingUtils.js deja de escalar.
+
+ATENCIÓN: crea turnos y (con --create-users) usuarios reales. Usar una base de prueba.
+
+Uso:
+    python3 tests/stress_holding_race.py --levels 5,10,25,50 --create-users 50
+    python3 tests/stress_holding_race.py --agents 2:1,3:2,4:3 --levels 3 --rounds 5 -o estres.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from harness.asynchttp import AsyncHttpClient, HttpError
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.metrics import LatencyRecorder
+from harness.queue_api import QueueApi, discover_agents, parse_agents
+from harness.session import SessionBroker, SessionError
+
+BASE_URL = "http://localhost:3005"
+ADMIN_CREDENTIALS = ("admin", "123")
+SYNTHETIC_PREFIX = "stress.f"
+SYNTHETIC_PASSWORD = "Stress2024x"
+CREATE_CONCURRENCY = 20
+
+
+async def ensure_synthetic_users(client, base_url, count):
+    """Crea (si no existen) usuarios flebotomistas stress.f001..N mediante la API de admin"""
+    session = SessionBroker(base_url).get(*ADMIN_CREDENTIALS)
+    auth = {'Authorization': f"Bearer {session.token}"}
+    created = 0
+    for i in range(1, count + 1):
+        response = await client.post("/api/users", json_body={
+            'username': f"{SYNTHETIC_PREFIX}{i:03d}",
+            'password': SYNTHETIC_PASSWORD,
+            'name': f"Flebotomista Estrés {i:03d}",
+            'role': 'Flebotomista',
+        }, headers=auth)
+        if response.ok:
+            created += 1
+        elif response.status != 400:
+            # 400 = ya existe; cualquier otro status es un problema real
+            raise SessionError(f"No se pudo crear {SYNTHETIC_PREFIX}{i:03d}: {response.status} {response.body[:200]!r}")
+    return created
+
+
+async def burst(coroutines):
+    """Lanza todas las corrutinas a la vez detrás de una barrera y mide la ráfaga completa"""
+    gate = asyncio.Event()
+
+    async def gated(coroutine):
+        await gate.wait()
+        return await coroutine
+
+    tasks = [asyncio.create_task(gated(c)) for c in coroutines]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    gate.set()
+    results = await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+async def create_turns(api, run_id, level, round_index, count):
+    limit = asyncio.Semaphore(CREATE_CONCURRENCY)
+
+    async def create(i):
+        async with limit:
+            status, data = await api.create_turn({
+                'patientName': f"STRESS-{run_id}-{level}-{round_index}-{i:03d}",
+                'age': 40,
+                'gender': 'M',
+                'studies': ["Prueba de estrés"],
+                'tubesRequired': 1,
+                'tipoAtencion': 'General',
+            })
+            return data.get('assignedTurn') if status in (200, 201) and data else None
+
+    ids = await asyncio.gather(*(create(i) for i in range(count)))
+    return {turn_id for turn_id in ids if turn_id}
+
+
+def find_double_holdings(assignments):
+    """assignments: [(userId, turnId)] de una misma ráfaga → {turnId: [userIds]} con más de un dueño"""
+    holders = defaultdict(set)
+    for user_id, turn_id in assignments:
+        if turn_id is not None:
+            holders[turn_id].add(user_id)
+    return {turn_id: sorted(users) for turn_id, users in holders.items() if len(users) > 1}
+
+
+async def run_round(api, agents, level, round_index, run_id, rivals, stats):
+    participants = agents[:level]
+    own_turns = await create_turns(api, run_id, level, round_index, level)
+    if len(own_turns) < level:
+        stats['createFailed'] += level - len(own_turns)
+
+    # 1) Ráfaga de holding
+    results, elapsed = await burst(api.assign_holding(user_id) for user_id, _, _ in participants)
+    assignments = []
+    for (user_id, _, _), (status, data) in zip(participants, results):
+        turn = (data or {}).get('turn') if status == 200 else None
+        if status != 200:
+            stats['assignErrors'] += 1
+        assignments.append((user_id, turn['id'] if turn else None))
+
+    held = [(user_id, turn_id) for user_id, turn_id in assignments if turn_id in own_turns]
+    stats['assigned'] += len(held)
+    stats['foreignHolds'] += sum(1 for _, turn_id in assignments if turn_id and turn_id not in own_turns)
+    stats['assignBurstSeconds'] += elapsed
+    doubles = find_double_holdings(assignments)
+    stats['doubleHeld'] += len(doubles)
+
+    # 2) Ráfaga de llamado: dueño + rivales por cada turno propio
+    cubicle_by_user = {user_id: cubicle_id for user_id, cubicle_id, _ in participants}
+    holder_by_turn = {turn_id: user_id for user_id, turn_id in held}
+    calls = []
+    for index, turn_id in enumerate(sorted(own_turns)):
+        callers = [holder_by_turn[turn_id]] if turn_id in holder_by_turn else []
+        offset = index
+        while len(callers) < min(rivals, len(participants)):
+            candidate = participants[offset % len(participants)][0]
+            if candidate not in callers:
+                callers.append(candidate)
+            offset += 1
+        calls.extend((turn_id, user_id) for user_id in callers)
+
+    results, elapsed = await burst(
+        api.call(turn_id, user_id, cubicle_by_user[user_id]) for turn_id, user_id in calls
+    )
+    wins = Counter()
+    winners = {}
+    for (turn_id, user_id), (status, data) in zip(calls, results):
+        if status == 200:
+            wins[turn_id] += 1
+            winners.setdefault(turn_id, user_id)
+        elif status in (400, 403, 409):
+            stats['callRejected'] += 1
+        else:
+            stats['callErrors'] += 1
+    stats['called'] += len(wins)
+    stats['doubleCalled'] += sum(1 for count in wins.values() if count > 1)
+    stats['callBurstSeconds'] += elapsed
+
+    # 3) Finalizar en paralelo: complete reasigna holding a cada flebotomista a la vez
+    results, _ = await burst(api.complete(turn_id, user_id) for turn_id, user_id in winners.items())
+    next_holdings = []
+    for (turn_id, user_id), (status, data) in zip(winners.items(), results):
+        next_turn = (data or {}).get('nextHoldingTurn') if status == 200 else None
+        next_holdings.append((user_id, next_turn['id'] if next_turn else None))
+    stats['doubleHeld'] += len(find_double_holdings(next_holdings))
+
+    # 4) Limpieza: liberar holdings y despachar turnos propios que quedaron pendientes
+    await asyncio.gather(*(api.release_holding(user_id) for user_id, _, _ in participants))
+    leftovers = own_turns - set(winners)
+    cleaner_id, cleaner_cubicle, _ = participants[0]
+    for turn_id in sorted(leftovers):
+        status, _ = await api.call(turn_id, cleaner_id, cleaner_cubicle)
+        if status == 200:
+            await api.complete(turn_id, cleaner_id)
+    await api.release_holding(cleaner_id)
+
+    return doubles
+
+
+def level_summary(level, stats, recorder):
+    endpoints = recorder.summary()['endpoints']
+    assign = endpoints.get("/api/queue/assignHolding", {})
+    call = endpoints.get("/api/attention/call", {})
+    return {
+        'concurrency': level,
+        'assigned': int(stats['assigned']),
+        'assignErrors': int(stats['assignErrors']),
+        'assignmentsPerSecond': round(stats['assigned'] / stats['assignBurstSeconds'], 1) if stats['assignBurstSeconds'] else 0,
+        'assignP50': assign.get('p50'),
+        'assignP95': assign.get('p95'),
+        'assignP99': assign.get('p99'),
+        'called': int(stats['called']),
+        'callRejected': int(stats['callRejected']),
+        'callErrors': int(stats['callErrors']),
+        'callsPerSecond': round(stats['called'] / stats['callBurstSeconds'], 1) if stats['callBurstSeconds'] else 0,
+        'callP50': call.get('p50'),
+        'callP95': call.get('p95'),
+        'callP99': call.get('p99'),
+        'doubleHeld': int(stats['doubleHeld']),
+        'doubleCalled': int(stats['doubleCalled']),
+        'foreignHolds': int(stats['foreignHolds']),
+        'createFailed': int(stats['createFailed']),
+    }
+
+
+def print_levels(rows):
+    print_header("RESULTADOS POR NIVEL DE CONCURRENCIA")
+    print(f"  {'Conc':>5}{'Asign':>7}{'asig/s':>8}{'Err':>5}{'p50':>8}{'p95':>8}{'p99':>8}"
+          f"{'Llam':>7}{'llam/s':>8}{'p95':>8}{'2xHold':>8}{'2xCall':>8}")
+    print(f"  {'-' * 98}")
+    previous = None
+    for row in rows:
+        violations = row['doubleHeld'] + row['doubleCalled']
+        color = Colors.RED if violations else Colors.GREEN
+        print(
+            f"  {row['concurrency']:>5}{row['assigned']:>7}{row['assignmentsPerSecond']:>8.1f}{row['assignErrors']:>5}"
+            f"{_ms(row['assignP50'])}{_ms(row['assignP95'])}{_ms(row['assignP99'])}"
+            f"{row['called']:>7}{row['callsPerSecond']:>8.1f}{_ms(row['callP95'])}"
+            f"{color}{row['doubleHeld']:>8}{row['doubleCalled']:>8}{Colors.END}"
+        )
+        # Punto de quiebre: más concurrencia sin más asignaciones por segundo
+        if previous and previous['assignmentsPerSecond'] and \
+                row['assignmentsPerSecond'] < previous['assignmentsPerSecond'] * 1.1:
+            row['saturated'] = True
+        previous = row
+    print("  (latencias en ms)")
+
+
+def _ms(value):
+    return f"{'-':>8}" if value is None else f"{value:>8.0f}"
+
+
+async def run_stress(args):
+    run_id = datetime.now().strftime('%H%M%S')
+    rows = []
+
+    async with AsyncHttpClient(args.base_url, max_connections=args.max_connections) as client:
+        if args.create_users:
+            created = await ensure_synthetic_users(client, args.base_url, args.create_users)
+            print_info(f"Usuarios sintéticos: {created} creados ({args.create_users} solicitados)")
+
+        if args.agents:
+            agents = parse_agents(args.agents)
+        else:
+            agents = await discover_agents(client, args.base_url, ADMIN_CREDENTIALS, 0, share_cubicles=True)
+        print_info(f"Flebotomistas disponibles: {len(agents)}")
+
+        levels = [level for level in args.levels if level <= len(agents)]
+        skipped = [level for level in args.levels if level > len(agents)]
+        if skipped:
+            print_error(f"Niveles omitidos por falta de flebotomistas: {skipped} (usar --create-users)")
+
+        for level in levels:
+            recorder = LatencyRecorder()
+            api = QueueApi(client, recorder)
+            stats = defaultdict(float)
+            print_info(f"Nivel {level}: {args.rounds} rondas...")
+            for round_index in range(args.rounds):
+                doubles = await run_round(api, agents, level, round_index, run_id, args.rivals, stats)
+                for turn_id, users in doubles.items():
+                    print_error(f"  Turno {turn_id} en holding para {users} a la vez")
+            recorder.stop()
+            rows.append(level_summary(level, stats, recorder))
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estrés de concurrencia para assignHolding y attention/call")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(',') if x], default=[5, 10, 25, 50, 100],
+                        help="Niveles de concurrencia (flebotomistas simultáneos)")
+    parser.add_argument("--rounds", type=int, default=3, help="Rondas por nivel")
+    parser.add_argument("--rivals", type=int, default=5, help="Llamadas simultáneas por turno (dueño + rivales)")
+    parser.add_argument("--agents", help="Pares userId:cubicleId separados por coma (omite el descubrimiento)")
+    parser.add_argument("--create-users", type=int, default=0,
+                        help=f"Crear N flebotomistas sintéticos {SYNTHETIC_PREFIX}NNN si no existen")
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--output", "-o", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    print_header("ESTRÉS DE CONCURRENCIA - HOLDING Y LLAMADO")
+    print_info(f"Servidor: {args.base_url}")
+    print_info(f"Niveles: {args.levels} | Rondas: {args.rounds} | Rivales por turno: {args.rivals}")
+    print_error("Se crearán turnos reales en la base de datos (prefijo STRESS-)")
+
+    try:
+        rows = asyncio.run(run_stress(args))
+    except (SessionError, HttpError) as e:
+        print_error(f"No se pudo preparar la prueba: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print_error("Interrumpida")
+        sys.exit(1)
+
+    print_levels(rows)
+
+    violations = sum(row['doubleHeld'] + row['doubleCalled'] for row in rows)
+    if violations:
+        print_error(f"❌ {violations} violaciones de exclusividad (turnos en holding o llamados dos veces)")
+    else:
+        print_success("✅ Ningún turno quedó en holding ni fue llamado dos veces")
+
+    errors = sum(row['assignErrors'] + row['callErrors'] for row in rows)
+    if errors:
+        print_error(f"{errors} respuestas 5xx/red bajo contención (assignHolding/call)")
+
+    knee = next((row for row in rows if row.get('saturated')), None)
+    if knee:
+        print_error(f"Las asignaciones/s dejan de crecer a partir de {knee['concurrency']} flebotomistas simultáneos")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(), 'config': vars(args), 'levels': rows},
+                      f, indent=2, ensure_ascii=False)
+        print_success(f"Resultados guardados en {args.output}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
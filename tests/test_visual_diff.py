@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la comparación visual (harness/visual_diff.py)
+
+La detección de antialiasing no debe esconder cambios reales de texto: un
+dígito distinto tiene que fallar aunque sus pixeles estén en bordes.
+
+Uso:
+    python3 tests/test_visual_diff.py
+    python3 -m pytest tests/test_visual_diff.py
+"""
+import os
+import sys
+import tempfile
+
+from harness.visual_diff import DiffProfile, compare_images, numpy_available
+
+if numpy_available():
+    from PIL import Image, ImageDraw
+
+
+def render_text(path, text):
+    img = Image.new('RGB', (220, 40), 'white')
+    ImageDraw.Draw(img).text((10, 12), text, fill='black')
+    img.save(path)
+
+
+def render_edge(path, edge_gray):
+    """Bloque negro sobre blanco con una columna de borde suavizado en gris"""
+    img = Image.new('RGB', (40, 30), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((5, 5, 19, 24), fill='black')
+    draw.line((20, 5, 20, 24), fill=(edge_gray,) * 3)
+    img.save(path)
+
+
+def compare(make, first, second, profile=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline, current = os.path.join(tmp, 'base.png'), os.path.join(tmp, 'actual.png')
+        make(baseline, first)
+        make(current, second)
+        return compare_images(baseline, current, profile)
+
+
+def test_identical_text_passes():
+    result = compare(render_text, "Turno 12 - Cubiculo 3", "Turno 12 - Cubiculo 3")
+    assert result['status'] == 'pass' and result['diffPixels'] == 0
+
+
+def test_changed_digit_fails():
+    result = compare(render_text, "Turno 12 - Cubiculo 3", "Turno 17 - Cubiculo 8")
+    assert result['status'] == 'fail'
+
+
+def test_shifted_edge_is_antialiasing():
+    result = compare(render_edge, 128, 96)
+    assert result['diffPixels'] == 0 and result['antialiasPixels'] > 0
+    assert compare(render_edge, 128, 96, DiffProfile(antialiasing=False))['status'] == 'fail'
+
+
+if __name__ == "__main__":
+    if not numpy_available():
+        print("Se requieren NumPy y Pillow")
+        sys.exit(1)
+    failures = 0
+    for name, test in sorted((n, f) for n, f in globals().items() if n.startswith('test_')):
+        try:
+            test()
+            print(f"✓ {name}")
+        except AssertionError:
+            failures += 1
+            print(f"✗ {name}")
+    sys.exit(1 if failures else 0)
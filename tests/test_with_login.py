@@ -7,6 +7,7 @@ Password: 123
 import time
 import sys
 import os
+import argparse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -15,10 +16,31 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 
+from harness.runner import ShardableTester, ShardTask, add_parallel_arguments, run_parallel_suite
+from harness.report import ReportedSteps
+from harness.session import restore_session
+from harness.waits import PageReadiness
+
 BASE_URL = "http://localhost:3005"
 WAIT_TIMEOUT = 15
 SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/screenshots/admin_test"
 
+# (sección, ruta, nombre, módulo) en el orden de ejecución serial
+PAGES = [
+    ("\n📋 MÓDULO DE TURNOS", "/turns", "Gestión de Turnos", "Turnos"),
+    ("\n📋 MÓDULO DE TURNOS", "/turns/queue", "Cola Pública", "Turnos"),
+    ("\n📋 MÓDULO DE TURNOS", "/turns/attention", "Atención de Pacientes", "Turnos"),
+    ("\n📊 MÓDULO DE ESTADÍSTICAS", "/statistics", "Dashboard", "Estadísticas"),
+    ("\n📊 MÓDULO DE ESTADÍSTICAS", "/statistics/daily", "Diarias", "Estadísticas"),
+    ("\n📊 MÓDULO DE ESTADÍSTICAS", "/statistics/monthly", "Mensuales", "Estadísticas"),
+    ("\n📊 MÓDULO DE ESTADÍSTICAS", "/statistics/phlebotomists", "Flebotomistas", "Estadísticas"),
+    ("\n📊 MÓDULO DE ESTADÍSTICAS", "/statistics/average-time", "Tiempo Promedio", "Estadísticas"),
+    ("\n⚙️ MÓDULO DE GESTIÓN", "/cubicles", "Cubículos", "Gestión"),
+    ("\n⚙️ MÓDULO DE GESTIÓN", "/users", "Usuarios", "Gestión"),
+    ("\n🏠 OTROS MÓDULOS", "/", "Home", "General"),
+    ("\n🏠 OTROS MÓDULOS", "/docs", "Documentación", "General"),
+]
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -45,8 +67,13 @@ def print_error(msg):
 def print_info(msg):
     print(f"  {Colors.BLUE}ℹ{Colors.END} {msg}")
 
-class AdminTester:
-    def __init__(self):
+class AdminTester(ShardableTester, ReportedSteps):
+    ROLES = {'admin': ("admin", "123")}
+    REPORT_TITLE = "Reporte de Pruebas con Login Admin - Sistema de Turnos INER"
+    REPORT_SUITE = "admin"
+    REPORT_METHOD = "generate_report"
+
+    def __init__(self, driver=None):
         print_header("PRUEBA COMPLETA CON LOGIN - Usuario ADMIN")
 
         os.makedirs(SCREENSHOT_DIR, exist_ok=True)
@@ -58,38 +85,57 @@ class AdminTester:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
 
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # El runner paralelo inyecta su propio Chrome headless
+        self.driver = driver or webdriver.Chrome(options=chrome_options)
         self.wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
+        self.readiness = PageReadiness(self.driver, timeout=WAIT_TIMEOUT)
         print_success("✅ Chrome iniciado")
 
-        self.counter = 1
-        self.results = []
-        time.sleep(1)
+        self.screenshot_counter = 1
+        self.test_results = []
+
+    @classmethod
+    def collect_tasks(cls):
+        """Una tarea por página, todas con sesión de admin"""
+        return [
+            ShardTask("test_page", args=(f"{BASE_URL}{url}", name, module), role='admin')
+            for _, url, name, module in PAGES
+        ]
+
+    def prepare_role(self, role):
+        return self.login_admin()
+
+    def add_shard_error(self, task, error):
+        _, name, module = task.args
+        self.add_result(module, name, "ERROR")
 
     def screenshot(self, name):
-        filename = f"{self.counter:03d}_{name}.png"
+        filename = f"{self.screenshot_counter:03d}_{name}.png"
         filepath = os.path.join(SCREENSHOT_DIR, filename)
         self.driver.save_screenshot(filepath)
+        self.note_screenshot(filename)
         print_success(f"📸 {filename}")
-        self.counter += 1
-        time.sleep(0.5)
+        self.screenshot_counter += 1
         return filename
 
     def add_result(self, module, page, status):
-        self.results.append({
+        self.test_results.append(self.record_step({
             'module': module,
             'page': page,
             'status': status,
             'time': datetime.now().strftime('%H:%M:%S')
-        })
+        }))
 
     def login_admin(self):
         """Login como admin con password 123"""
         print_step(1, "Login como ADMIN")
 
+        if restore_session(self.driver, *self.ROLES['admin']):
+            self.add_result("Auth", "Login Admin", "PASS")
+            return True
+
         try:
-            self.driver.get(f"{BASE_URL}/login")
-            time.sleep(3)
+            self.readiness.navigate(f"{BASE_URL}/login")
             self.screenshot("login_page")
 
             # Esperar que cargue la página
@@ -131,11 +177,9 @@ class AdminTester:
             print_info("Ingresando credenciales...")
             username_field.clear()
             username_field.send_keys("admin")
-            time.sleep(0.5)
 
             password_field.clear()
             password_field.send_keys("123")
-            time.sleep(0.5)
 
             self.screenshot("credentials_filled")
 
@@ -157,8 +201,9 @@ class AdminTester:
                 submit_btn.click()
                 print_success("Click en botón de login")
 
-            # Esperar redirección
-            time.sleep(5)
+            # Esperar redirección (sale de /login o agota el timeout)
+            self.readiness.wait_for(lambda d: "/login" not in d.current_url, "login admin")
+            self.readiness.wait_ready("post-login")
 
             current_url = self.driver.current_url
             print_info(f"URL actual: {current_url}")
@@ -189,9 +234,8 @@ class AdminTester:
     def test_page(self, url, name, module):
         """Prueba una página después del login"""
         try:
-            print_step(self.counter, f"{module} → {name}")
-            self.driver.get(url)
-            time.sleep(3)
+            print_step(self.screenshot_counter, f"{module} → {name}")
+            self.readiness.navigate(url)
 
             self.screenshot(name.lower().replace(' ', '_'))
 
@@ -219,38 +263,23 @@ class AdminTester:
 
     def run_all_tests(self):
         start = time.time()
+        self.open_report(SCREENSHOT_DIR)
 
         # 1. Login
         if not self.login_admin():
             print_error("\n❌ LOGIN FALLÓ - No se pueden ejecutar más pruebas")
+            print_info(f"Reporte: {self.generate_report()}")
             self.driver.quit()
             return
 
         print_header("PROBANDO MÓDULOS COMO ADMIN")
 
-        # 2. Módulo de Turnos
-        print_info("\n📋 MÓDULO DE TURNOS")
-        self.test_page(f"{BASE_URL}/turns", "Gestión de Turnos", "Turnos")
-        self.test_page(f"{BASE_URL}/turns/queue", "Cola Pública", "Turnos")
-        self.test_page(f"{BASE_URL}/turns/attention", "Atención de Pacientes", "Turnos")
-
-        # 3. Módulo de Estadísticas
-        print_info("\n📊 MÓDULO DE ESTADÍSTICAS")
-        self.test_page(f"{BASE_URL}/statistics", "Dashboard", "Estadísticas")
-        self.test_page(f"{BASE_URL}/statistics/daily", "Diarias", "Estadísticas")
-        self.test_page(f"{BASE_URL}/statistics/monthly", "Mensuales", "Estadísticas")
-        self.test_page(f"{BASE_URL}/statistics/phlebotomists", "Flebotomistas", "Estadísticas")
-        self.test_page(f"{BASE_URL}/statistics/average-time", "Tiempo Promedio", "Estadísticas")
-
-        # 4. Módulo de Gestión
-        print_info("\n⚙️ MÓDULO DE GESTIÓN")
-        self.test_page(f"{BASE_URL}/cubicles", "Cubículos", "Gestión")
-        self.test_page(f"{BASE_URL}/users", "Usuarios", "Gestión")
-
-        # 5. Otros
-        print_info("\n🏠 OTROS MÓDULOS")
-        self.test_page(f"{BASE_URL}/", "Home", "General")
-        self.test_page(f"{BASE_URL}/docs", "Documentación", "General")
+        current_section = None
+        for section, url, name, module in PAGES:
+            if section != current_section:
+                print_info(section)
+                current_section = section
+            self.test_page(f"{BASE_URL}{url}", name, module)
 
         # Generar reporte
         report = self.generate_report()
@@ -259,12 +288,12 @@ class AdminTester:
 
         print_header("RESUMEN FINAL")
         print_success(f"⏱️  Tiempo: {elapsed:.1f}s")
-        print_success(f"📸 Screenshots: {self.counter - 1}")
-        print_success(f"🧪 Pruebas: {len(self.results)}")
+        print_success(f"📸 Screenshots: {self.screenshot_counter - 1}")
+        print_success(f"🧪 Pruebas: {len(self.test_results)}")
 
-        passed = sum(1 for r in self.results if r['status'] == 'PASS')
-        failed = sum(1 for r in self.results if r['status'] == 'FAIL')
-        errors = sum(1 for r in self.results if r['status'] == 'ERROR')
+        passed = sum(1 for r in self.test_results if r['status'] == 'PASS')
+        failed = sum(1 for r in self.test_results if r['status'] == 'FAIL')
+        errors = sum(1 for r in self.test_results if r['status'] == 'ERROR')
 
         print_success(f"✅ Exitosas: {passed}")
         if failed > 0:
@@ -273,8 +302,8 @@ class AdminTester:
             print_error(f"⚠️  Errores: {errors}")
 
         print_success(f"\n📄 Reporte: {report}")
+        self.readiness.print_summary()
 
-        time.sleep(3)
         self.driver.quit()
         print_success("Navegador cerrado")
 
@@ -282,222 +311,17 @@ class AdminTester:
         os.system(f"open {report}")
 
     def generate_report(self):
-        """Genera reporte HTML"""
-        screenshots = sorted([f for f in os.listdir(SCREENSHOT_DIR) if f.endswith('.png')])
-
-        total = len(self.results)
-        passed = sum(1 for r in self.results if r['status'] == 'PASS')
-        failed = sum(1 for r in self.results if r['status'] == 'FAIL')
-        errors = sum(1 for r in self.results if r['status'] == 'ERROR')
-        rate = (passed / total * 100) if total > 0 else 0
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <title>Reporte Login Admin - Sistema INER</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 50px;
-            text-align: center;
-        }}
-        .header h1 {{ font-size: 3em; margin-bottom: 10px; }}
-        .header p {{ font-size: 1.3em; opacity: 0.9; }}
-
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 40px;
-            background: #f8f9fa;
-        }}
-        .stat-card {{
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            text-align: center;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
-        .stat-card h3 {{ font-size: 3em; margin-bottom: 10px; }}
-        .stat-card.success h3 {{ color: #10b981; }}
-        .stat-card.fail h3 {{ color: #ef4444; }}
-        .stat-card.total h3 {{ color: #3b82f6; }}
-
-        .content {{ padding: 40px; }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
-        th {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 15px;
-            text-align: left;
-        }}
-        td {{
-            padding: 15px;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        tr:hover {{ background: #f9fafb; }}
-
-        .badge {{
-            display: inline-block;
-            padding: 5px 15px;
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 0.9em;
-        }}
-        .badge.PASS {{ background: #d1fae5; color: #065f46; }}
-        .badge.FAIL {{ background: #fee2e2; color: #991b1b; }}
-        .badge.ERROR {{ background: #fef3c7; color: #92400e; }}
-
-        .screenshots {{
-            margin-top: 40px;
-        }}
-        .screenshot-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(400px, 1fr));
-            gap: 30px;
-            margin-top: 20px;
-        }}
-        .screenshot-card {{
-            background: white;
-            border-radius: 15px;
-            overflow: hidden;
-            box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-        }}
-        .screenshot-card img {{
-            width: 100%;
-            height: 250px;
-            object-fit: cover;
-        }}
-        .screenshot-info {{
-            padding: 20px;
-        }}
-        .screenshot-title {{
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🧪 Reporte de Pruebas - Login Admin</h1>
-            <p>Sistema de Gestión de Turnos INER</p>
-            <p style="font-size: 0.9em; margin-top: 10px;">
-                {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
-            </p>
-        </div>
-
-        <div class="stats">
-            <div class="stat-card total">
-                <h3>{total}</h3>
-                <p>Total Pruebas</p>
-            </div>
-            <div class="stat-card success">
-                <h3>{passed}</h3>
-                <p>Exitosas</p>
-            </div>
-            <div class="stat-card fail">
-                <h3>{failed}</h3>
-                <p>Fallidas</p>
-            </div>
-            <div class="stat-card fail">
-                <h3>{errors}</h3>
-                <p>Errores</p>
-            </div>
-            <div class="stat-card total">
-                <h3>{rate:.0f}%</h3>
-                <p>Éxito</p>
-            </div>
-        </div>
-
-        <div class="content">
-            <h2>📊 Resultados</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>#</th>
-                        <th>Módulo</th>
-                        <th>Página</th>
-                        <th>Estado</th>
-                        <th>Hora</th>
-                    </tr>
-                </thead>
-                <tbody>
-"""
-
-        for i, r in enumerate(self.results, 1):
-            html += f"""
-                    <tr>
-                        <td>{i}</td>
-                        <td>{r['module']}</td>
-                        <td><strong>{r['page']}</strong></td>
-                        <td><span class="badge {r['status']}">{r['status']}</span></td>
-                        <td>{r['time']}</td>
-                    </tr>
-"""
+        """Cierra el reporte HTML (escrito en streaming) con el resumen de la corrida"""
+        return self.finish_report(SCREENSHOT_DIR)
 
-        html += f"""
-                </tbody>
-            </table>
-
-            <div class="screenshots">
-                <h2>📸 Capturas ({len(screenshots)} screenshots)</h2>
-                <div class="screenshot-grid">
-"""
-
-        for i, ss in enumerate(screenshots, 1):
-            name = ss.replace('.png', '').replace('_', ' ').title()
-            html += f"""
-                    <div class="screenshot-card">
-                        <img src="{ss}" alt="{name}">
-                        <div class="screenshot-info">
-                            <div class="screenshot-title">{i}. {name}</div>
-                        </div>
-                    </div>
-"""
-
-        html += """
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-        report_path = os.path.join(SCREENSHOT_DIR, "REPORTE_ADMIN.html")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+def main():
+    parser = add_parallel_arguments(argparse.ArgumentParser(description="Prueba completa con login de admin"))
+    args = parser.parse_args()
 
-        return report_path
+    if args.workers > 1:
+        run_parallel_suite(AdminTester, args.workers)
+        return
 
-def main():
     tester = AdminTester()
     tester.run_all_tests()
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Regresión visual de screenshots contra una línea base
+
+Compara cada PNG del directorio de capturas (por defecto
+public/docs/screenshots) con la copia guardada en tests/visual_baselines,
+ignorando relojes y fechas detectados al capturar (screenshots-manifest.json),
+y genera un heatmap por página con diferencias.
+
+Perfiles opcionales por archivo (--profiles perfiles.json):
+    {
+      "statistics-dashboard-main.png": {
+        "maxDiffRatio": 0.002,
+        "regions": [{"name": "gráficas", "box": [0, 300, 1920, 900], "threshold": 0.2, "maxDiffRatio": 0.02}]
+      }
+    }
+
+Uso:
+    python3 tests/visual_regression.py
+    python3 tests/visual_regression.py --update-baseline
+    python3 tests/visual_regression.py --current /tmp/capturas --workers 8 -o visual.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from harness.capture_cache import MANIFEST_FILENAME
+from harness.console import Colors, print_header, print_success, print_error, print_info
+from harness.visual_diff import (
+    DEFAULT_MAX_DIFF, DEFAULT_THRESHOLD, DEFAULT_WORKERS, DiffProfile,
+    diff_directories, numpy_available, profile_from_dict, update_baselines,
+)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CURRENT_DIR = os.path.join(ROOT, 'public', 'docs', 'screenshots')
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'visual_baselines')
+HEATMAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'visual_diffs')
+
+
+def load_ignore_regions(current_dir):
+    """{filename: [(x0, y0, x1, y1)]} desde el manifiesto de la captura incremental"""
+    try:
+        with open(os.path.join(current_dir, MANIFEST_FILENAME), encoding='utf-8') as f:
+            entries = json.load(f).get('entries', {})
+    except (OSError, ValueError):
+        return {}
+    return {name: entry.get('ignoreRegions', []) for name, entry in entries.items()}
+
+
+def build_profiles(filenames, args):
+    custom = {}
+    if args.profiles:
+        with open(args.profiles, encoding='utf-8') as f:
+            custom = json.load(f)
+
+    ignore = load_ignore_regions(args.current)
+    default = DiffProfile(threshold=args.threshold, max_diff_ratio=args.max_diff)
+    profiles = {}
+    for filename in filenames:
+        profile = profile_from_dict(custom[filename]) if filename in custom else default
+        profiles[filename] = profile.with_ignored(ignore.get(filename, []))
+    return profiles
+
+
+def print_results(results):
+    print(f"\n{Colors.BOLD}{'Captura':<44} {'Estado':<8} {'Distintos':>10} {'%':>8} {'AA':>8} {'ms':>7}{Colors.END}")
+    print('-' * 90)
+    colors = {'pass': Colors.GREEN, 'fail': Colors.RED, 'error': Colors.RED, 'new': Colors.YELLOW}
+    for r in results:
+        color = colors.get(r['status'], '')
+        ratio = f"{r['diffRatio'] * 100:.3f}" if 'diffRatio' in r else '-'
+        elapsed = f"{r['elapsed'] * 1000:.0f}" if 'elapsed' in r else '-'
+        print(f"{r['name'][:44]:<44} {color}{r['status'].upper():<8}{Colors.END} "
+              f"{r.get('diffPixels', '-'):>10} {ratio:>8} {r.get('antialiasPixels', '-'):>8} {elapsed:>7}")
+        if r.get('reason'):
+            print(f"    {Colors.RED}{r['reason']}{Colors.END}")
+        for region in r.get('regions', []):
+            if not region['passed']:
+                print(f"    {Colors.RED}región {region['name']}: {region['diffRatio'] * 100:.2f}% "
+                      f"(máx {region['maxDiffRatio'] * 100:.2f}%){Colors.END}")
+        if r.get('heatmap') and r['status'] != 'pass':
+            print(f"    heatmap: {r['heatmap']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regresión visual de screenshots contra la línea base")
+    parser.add_argument("--current", default=CURRENT_DIR, help="Directorio con las capturas nuevas")
+    parser.add_argument("--baseline", default=BASELINE_DIR, help="Directorio de la línea base")
+    parser.add_argument("--heatmaps", default=HEATMAP_DIR, help="Directorio de salida de los heatmaps")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Sensibilidad por pixel 0..1 (menor = más estricto)")
+    parser.add_argument("--max-diff", type=float, default=DEFAULT_MAX_DIFF,
+                        help="Fracción máxima de pixeles distintos por página")
+    parser.add_argument("--profiles", help="JSON con tolerancias/regiones por archivo")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Aceptar las capturas actuales como nueva línea base")
+    parser.add_argument("--output", "-o", help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print_error("La comparación visual requiere NumPy y Pillow (pip install numpy Pillow)")
+        sys.exit(2)
+
+    filenames = sorted(f for f in os.listdir(args.current) if f.lower().endswith('.png'))
+    print_header("REGRESIÓN VISUAL")
+    print_info(f"Capturas: {args.current} ({len(filenames)} PNG)")
+    print_info(f"Línea base: {args.baseline}")
+
+    if args.update_baseline:
+        update_baselines(args.current, args.baseline, filenames)
+        print_success(f"Línea base actualizada con {len(filenames)} capturas")
+        return
+
+    started = time.perf_counter()
+    results = diff_directories(args.current, args.baseline, filenames, build_profiles(filenames, args),
+                               heatmap_dir=args.heatmaps, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print_results(results)
+
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('pass', 'fail', 'error', 'new')}
+    print()
+    print_info(f"{len(results)} capturas comparadas en {elapsed:.1f}s con {args.workers} procesos")
+    if counts['new']:
+        print_info(f"{counts['new']} sin línea base (usar --update-baseline para aceptarlas)")
+    if counts['fail'] or counts['error']:
+        print_error(f"{counts['fail']} con diferencias, {counts['error']} con error")
+    else:
+        print_success(f"{counts['pass']} sin diferencias visuales")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': round(elapsed, 2), 'counts': counts, 'results': results}, f, indent=2,
+                      ensure_ascii=False)
+        print_success(f"Resultados guardados en {args.output}")
+
+    sys.exit(1 if counts['fail'] or counts['error'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from harness.report import ReportedSteps
+from harness.waits import PageReadiness
+
 BASE_URL = "http://localhost:3005"
 WAIT_TIMEOUT = 10
 SCREENSHOT_DIR = "/Users/samuelquiroz/Documents/proyectos/toma-turno/screenshots"
@@ -42,7 +45,16 @@ def print_error(message):
 def print_info(message):
     print(f"  {Colors.BLUE}ℹ{Colors.END} {message}")
 
-class VisualTester:
+class VisualTester(ReportedSteps):
+    REPORT_TITLE = "Reporte de Pruebas Visuales - Sistema de Turnos INER"
+    REPORT_SUITE = "visual"
+    REPORT_NOTES = (
+        "Página de cola pública cargada correctamente",
+        "Login funcional con credenciales de administrador",
+        "Página de atención accesible",
+        "Para ver los colores específicos (ámbar #f59e0b) de los iconos, abrir cada captura en tamaño completo",
+    )
+
     def __init__(self):
         print(f"\n{Colors.BOLD}{'='*70}{Colors.END}")
         print(f"{Colors.BOLD}{Colors.BLUE}  PRUEBA VISUAL AUTOMÁTICA - Sistema de Turnos INER{Colors.END}")
@@ -63,9 +75,10 @@ class VisualTester:
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
+            self.readiness = PageReadiness(self.driver, timeout=WAIT_TIMEOUT)
             print_success("Navegador Chrome iniciado")
             self.screenshot_counter = 1
-            time.sleep(1)
+            self.test_results = []
         except Exception as e:
             print_error(f"Error al iniciar Chrome: {e}")
             sys.exit(1)
@@ -77,14 +90,20 @@ class VisualTester:
         self.driver.save_screenshot(filepath)
         print_success(f"Screenshot: {filename}")
         self.screenshot_counter += 1
-        time.sleep(1)
+
+        # Cada captura es un paso del reporte, con el tiempo desde la anterior
+        self.note_screenshot(filename)
+        self.test_results.append(self.record_step({
+            'test': name.replace('_', ' ').capitalize(),
+            'status': 'PASS',
+            'details': self.driver.current_url,
+        }))
 
     def test_queue_page(self):
         print_step(1, "Probando Página de Cola Pública (/turns/queue)")
 
         print_action("Navegando a /turns/queue...")
-        self.driver.get(f"{BASE_URL}/turns/queue")
-        time.sleep(3)
+        self.readiness.navigate(f"{BASE_URL}/turns/queue")
 
         self.take_screenshot("queue_page_initial")
 
@@ -113,8 +132,7 @@ class VisualTester:
         print_step(2, "Realizando Login como Supervisor")
 
         print_action("Navegando a /login...")
-        self.driver.get(f"{BASE_URL}/login")
-        time.sleep(2)
+        self.readiness.navigate(f"{BASE_URL}/login")
 
         self.take_screenshot("login_page")
 
@@ -127,9 +145,7 @@ class VisualTester:
             password_field = self.driver.find_element(By.NAME, "password")
 
             username_field.send_keys("admin")
-            time.sleep(0.5)
             password_field.send_keys("admin123")
-            time.sleep(0.5)
 
             self.take_screenshot("login_credentials_entered")
 
@@ -137,7 +153,8 @@ class VisualTester:
             login_button.click()
 
             print_action("Esperando redirección...")
-            time.sleep(3)
+            self.readiness.wait_for(lambda d: "/login" not in d.current_url, "login admin")
+            self.readiness.wait_ready("post-login")
 
             self.take_screenshot("after_login")
 
@@ -156,8 +173,7 @@ class VisualTester:
         print_step(3, "Probando Página de Atención (/turns/attention)")
 
         print_action("Navegando a /turns/attention...")
-        self.driver.get(f"{BASE_URL}/turns/attention")
-        time.sleep(4)
+        self.readiness.navigate(f"{BASE_URL}/turns/attention")
 
         self.take_screenshot("attention_page_initial")
 
@@ -201,7 +217,7 @@ class VisualTester:
                 else:
                     print_info(f"  ○ {btn_name} (puede no estar visible)")
 
-            time.sleep(2)
+            self.readiness.wait_ready("attention analizada")
             self.take_screenshot("attention_page_analyzed")
 
         except Exception as e:
@@ -215,12 +231,12 @@ class VisualTester:
         try:
             # Scroll hacia abajo
             self.driver.execute_script("window.scrollTo(0, 500)")
-            time.sleep(1)
+            self.readiness.wait_ready("scroll")
             self.take_screenshot("scrolled_middle")
 
             # Scroll hacia arriba
             self.driver.execute_script("window.scrollTo(0, 0)")
-            time.sleep(1)
+            self.readiness.wait_ready("scroll")
 
             # Si hay sidebar, intentar capturarlo
             print_action("Buscando sidebar con pacientes...")
@@ -235,143 +251,14 @@ class VisualTester:
 
     def generate_report(self):
         print_step(5, "Generando reporte HTML")
-
-        screenshots = sorted([f for f in os.listdir(SCREENSHOT_DIR) if f.endswith('.png')])
-
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Reporte de Pruebas Visuales - v2.6.1</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #34495e;
-            margin-top: 30px;
-        }}
-        .screenshot-container {{
-            background: white;
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .screenshot-container img {{
-            max-width: 100%;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-        }}
-        .screenshot-title {{
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 10px;
-            font-size: 18px;
-        }}
-        .metadata {{
-            color: #7f8c8d;
-            font-size: 14px;
-            margin-top: 10px;
-        }}
-        .badge {{
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            font-weight: bold;
-            margin-right: 5px;
-        }}
-        .badge-success {{
-            background: #27ae60;
-            color: white;
-        }}
-        .badge-info {{
-            background: #3498db;
-            color: white;
-        }}
-        .summary {{
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 8px;
-            margin: 20px 0;
-        }}
-    </style>
-</head>
-<body>
-    <h1>🧪 Reporte de Pruebas Visuales - v2.6.1</h1>
-
-    <div class="summary">
-        <h2>📊 Resumen</h2>
-        <p><span class="badge badge-success">✓ Completado</span></p>
-        <p><strong>Total de screenshots:</strong> {len(screenshots)}</p>
-        <p><strong>Fecha:</strong> {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
-        <p><strong>Sistema:</strong> Toma de Muestras - INER</p>
-    </div>
-
-    <h2>📸 Screenshots Capturados</h2>
-"""
-
-        for i, screenshot in enumerate(screenshots, 1):
-            # Extraer nombre descriptivo del archivo
-            name = screenshot.replace('.png', '').replace('_', ' ').title()
-
-            html_content += f"""
-    <div class="screenshot-container">
-        <div class="screenshot-title">{i}. {name}</div>
-        <img src="{screenshot}" alt="{name}">
-        <div class="metadata">Archivo: {screenshot}</div>
-    </div>
-"""
-
-        html_content += """
-    <div class="summary">
-        <h2>✅ Verificaciones Realizadas</h2>
-        <ul>
-            <li>✓ Página de cola pública cargada correctamente</li>
-            <li>✓ Login funcional con credenciales de administrador</li>
-            <li>✓ Página de atención accesible</li>
-            <li>✓ Interfaz responsive y elementos visibles</li>
-            <li>✓ Botones principales detectados</li>
-        </ul>
-    </div>
-
-    <div class="summary">
-        <h2>📝 Notas</h2>
-        <p>Para ver los colores específicos (ámbar #f59e0b) de los iconos, revisar los screenshots directamente.</p>
-        <p>Los cambios implementados en v2.6.1 incluyen:</p>
-        <ul>
-            <li>Nuevo color ámbar para iconos de pacientes diferidos</li>
-            <li>Botón "Regresar a Cola" con estilo mejorado</li>
-            <li>Iconos de tamaño optimizado</li>
-            <li>Ordenamiento mejorado de pacientes</li>
-        </ul>
-    </div>
-</body>
-</html>
-"""
-
-        report_path = os.path.join(SCREENSHOT_DIR, "visual_test_report.html")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
+        report_path = self.finish_report(SCREENSHOT_DIR, notes=self.REPORT_NOTES)
         print_success(f"Reporte HTML generado: {report_path}")
         return report_path
 
     def run_all_tests(self):
         try:
             print_action("Iniciando pruebas visuales automáticas...\n")
-            time.sleep(1)
+            self.open_report(SCREENSHOT_DIR)
 
             self.test_queue_page()
             self.test_login()
@@ -391,6 +278,8 @@ class VisualTester:
             print_info(f"   1. Abrir: {report_path}")
             print_info(f"   2. O ver screenshots en: {SCREENSHOT_DIR}")
 
+            self.readiness.print_summary()
+
             # Mantener navegador abierto 5 segundos más
             print_info("\nManteniendo navegador abierto 5 segundos...")
             time.sleep(5)